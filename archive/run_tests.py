@@ -373,7 +373,7 @@ class TestSuite:
             
             # Test key generation
             keys = uploader.keys
-            assert 'file_content' in keys
+            assert 'file_blob' in keys
             assert 'file_name' in keys
             assert 'upload_timestamp' in keys
             
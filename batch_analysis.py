@@ -0,0 +1,96 @@
+"""
+Analyse en lot des liasses BCEAO - ligne de commande
+
+Usage :
+    python batch_analysis.py dossier_liasses/ -o resultats.csv --workers 8 --timeout 60
+
+Notation d'un portefeuille (fichier CSV/Parquet de postes, une ligne par entreprise) :
+    python batch_analysis.py portefeuille.parquet -o scores.parquet --chunk-rows 50000
+
+N'importe pas Streamlit : utilisable en tâche planifiée ou sur un serveur.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.core.batch import discover_files, run_batch, write_results
+from modules.core.portfolio import DEFAULT_CHUNK_ROWS, PORTFOLIO_EXTENSIONS, score_portfolio
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analyse financière en lot de tous les fichiers .xlsx/.xls d'un répertoire"
+    )
+    parser.add_argument('directory', help="Répertoire contenant les liasses Excel, ou fichier CSV/Parquet "
+                                          "de postes à noter en portefeuille")
+    parser.add_argument('-o', '--output', default='resultats_batch.csv',
+                        help="Fichier de sortie (.csv, .parquet ou .jsonl)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus d'analyse (défaut : nombre de CPU)")
+    parser.add_argument('--timeout', type=float, default=120.0,
+                        help="Délai maximal par fichier en secondes (0 = aucun)")
+    parser.add_argument('--secteur', default=None,
+                        help="Secteur d'activité appliqué à tous les fichiers")
+    parser.add_argument('--recursive', action='store_true',
+                        help="Inclure les sous-répertoires")
+    parser.add_argument('--verbose', action='store_true',
+                        help="Afficher les messages de l'analyseur")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="Portefeuille : lignes lues et notées par bloc")
+    parser.add_argument('--secteur-colonne', default=None,
+                        help="Portefeuille : colonne donnant le secteur de chaque ligne")
+    parser.add_argument('--mode', choices=('absolu', 'sectoriel'), default=None,
+                        help="Notation sur les seuils absolus ou relative au secteur")
+    return parser.parse_args(argv)
+
+
+def main_portfolio(args):
+    print(f"📂 Notation du portefeuille {args.directory} par blocs de {args.chunk_rows} lignes")
+    _, summary = score_portfolio(args.directory, args.output, chunk_rows=args.chunk_rows,
+                                 secteur=args.secteur, sector_column=args.secteur_colonne, mode=args.mode)
+
+    print(f"✅ Résultats écrits dans {args.output}")
+    print(f"📊 {summary['lignes']} entreprises | classes " +
+          " ".join(f"{grade}: {count}" for grade, count in summary['classes'].items()))
+    print(f"⏱️ {summary['duree_totale_s']:.2f} s | {summary['lignes_par_minute']:,.0f} entreprises/min")
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if os.path.isfile(args.directory) and os.path.splitext(args.directory)[1].lower() in PORTFOLIO_EXTENSIONS:
+        return main_portfolio(args)
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ Répertoire introuvable: {args.directory}")
+        return 2
+
+    files = discover_files(args.directory, recursive=args.recursive)
+    if not files:
+        print(f"⚠️ Aucun fichier .xlsx/.xls dans {args.directory}")
+        return 1
+
+    print(f"📂 {len(files)} fichier(s) à analyser avec {args.workers} processus")
+    records, summary = run_batch(files, secteur=args.secteur, workers=args.workers,
+                                 timeout=args.timeout or None, verbose=args.verbose)
+
+    for record in records:
+        if record['statut'] != 'ok':
+            print(f"❌ {record['fichier']}: {record['statut']} - {record['erreur']}")
+
+    output = write_results(records, args.output)
+
+    print(f"✅ Résultats écrits dans {output}")
+    print(f"📊 {summary['succes']} succès | {summary['erreurs']} erreurs | {summary['timeouts']} timeouts")
+    print(f"⏱️ {summary['duree_totale_s']:.2f} s | {summary['fichiers_par_s']:.2f} fichiers/s | "
+          f"p50 {summary['latence_p50_s'] * 1000:.0f} ms | p95 {summary['latence_p95_s'] * 1000:.0f} ms")
+
+    return 0 if summary['succes'] == summary['fichiers'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
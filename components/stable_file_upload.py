@@ -8,8 +8,8 @@ import streamlit as st
 import pandas as pd
 from typing import Optional, Dict, Any, Callable
 from datetime import datetime
-import hashlib
-import io
+
+from modules.core.blob_store import get_blob_store, release_upload, store_upload
 
 class StableFileUpload:
     """Composant d'upload de fichier avec persistance de session"""
@@ -21,7 +21,7 @@ class StableFileUpload:
     def _init_session_keys(self):
         """Initialise les clés de session pour la persistance"""
         self.keys = {
-            'file_content': f'{self.prefix}_file_content',
+            'file_blob': f'{self.prefix}_file_blob',
             'file_name': f'{self.prefix}_file_name',
             'file_type': f'{self.prefix}_file_type',
             'file_size': f'{self.prefix}_file_size',
@@ -43,7 +43,8 @@ class StableFileUpload:
         """
         
         if accepted_types is None:
-            accepted_types = ['xlsx', 'xls', 'csv']
+            from modules.core.readers import supported_extensions
+            accepted_types = [ext.lstrip('.') for ext in supported_extensions()]
         
         # Vérifier si un fichier est déjà en session
         has_persisted_file = self._has_persisted_file()
@@ -67,11 +68,10 @@ class StableFileUpload:
         return None
     
     def _has_persisted_file(self) -> bool:
-        """Vérifie si un fichier est déjà persisté en session"""
+        """Vérifie si un fichier est déjà persisté (handle en session, fichier non expiré)"""
         return (
-            self.keys['file_content'] in st.session_state and
             self.keys['file_name'] in st.session_state and
-            st.session_state[self.keys['file_content']] is not None
+            get_blob_store().exists(st.session_state.get(self.keys['file_blob']))
         )
     
     def _display_persisted_file(self) -> Dict[str, Any]:
@@ -100,30 +100,23 @@ class StableFileUpload:
                 st.rerun()
         
         # Retourner les informations du fichier
-        return {
-            'content': st.session_state[self.keys['file_content']],
-            'name': file_name,
-            'type': st.session_state.get(self.keys['file_type'], ''),
-            'size': file_size,
-            'timestamp': upload_time,
-            'hash': st.session_state.get(self.keys['file_hash'], '')
-        }
+        return self._get_persisted_file_info()
     
     def _process_uploaded_file(self, uploaded_file, max_size_mb: int) -> Optional[Dict[str, Any]]:
         """Traite et persiste le fichier uploadé"""
         
         try:
             # Vérifications de sécurité
-            file_size = len(uploaded_file.getvalue())
+            file_buffer = uploaded_file.getbuffer()
+            file_size = file_buffer.nbytes
             max_size_bytes = max_size_mb * 1024 * 1024
             
             if file_size > max_size_bytes:
                 st.error(f"❌ Fichier trop volumineux ({file_size:,} octets). Maximum: {max_size_mb}MB")
                 return None
             
-            # Lecture du contenu
-            file_content = uploaded_file.getvalue()
-            file_hash = hashlib.md5(file_content).hexdigest()
+            # Empreinte SHA-256 : handle du magasin et clé du cache des analyses
+            file_hash = get_blob_store().hash_bytes(file_buffer)
             
             # Vérifier si c'est le même fichier que précédemment
             if (self.keys['file_hash'] in st.session_state and 
@@ -132,13 +125,13 @@ class StableFileUpload:
                 return self._get_persisted_file_info()
             
             # Validation du format
-            if not self._validate_file_format(uploaded_file, file_content):
+            if not self._validate_file_format(uploaded_file, file_buffer):
                 return None
             
-            # Persistance en session
+            # Persistance : le contenu va au magasin, la session ne garde que le handle
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
-            st.session_state[self.keys['file_content']] = file_content
+            store_upload(st.session_state, self.keys['file_blob'], file_buffer)
             st.session_state[self.keys['file_name']] = uploaded_file.name
             st.session_state[self.keys['file_type']] = uploaded_file.type
             st.session_state[self.keys['file_size']] = file_size
@@ -148,47 +141,43 @@ class StableFileUpload:
             
             st.success(f"✅ Fichier **{uploaded_file.name}** chargé avec succès!")
             
-            return {
-                'content': file_content,
-                'name': uploaded_file.name,
-                'type': uploaded_file.type,
-                'size': file_size,
-                'timestamp': timestamp,
-                'hash': file_hash
-            }
+            return self._get_persisted_file_info()
             
         except Exception as e:
             st.error(f"❌ Erreur lors du traitement du fichier: {e}")
             return None
     
-    def _validate_file_format(self, uploaded_file, file_content: bytes) -> bool:
-        """Valide le format du fichier"""
-        
-        file_extension = uploaded_file.name.lower().split('.')[-1]
+    def _validate_file_format(self, uploaded_file, file_content) -> bool:
+        """Valide le format du fichier d'après son contenu (signature), pas son extension"""
         
         try:
-            if file_extension in ['xlsx', 'xls']:
-                # Tenter de lire le fichier Excel
-                pd.read_excel(io.BytesIO(file_content), nrows=1)
-                return True
-                
-            elif file_extension == 'csv':
-                # Tenter de lire le fichier CSV
-                pd.read_csv(io.BytesIO(file_content), nrows=1)
-                return True
-                
-            else:
-                st.error(f"❌ Format de fichier non supporté: {file_extension}")
+            from modules.core.preflight import preflight_workbook
+            
+            # Format, intégrité et taille de l'archive, sans décoder de feuille
+            preflight = preflight_workbook(file_content, required_sheets=(), file_name=uploaded_file.name)
+            if not preflight.ok:
+                st.error(f"❌ {preflight.reason}")
                 return False
+            
+            from modules.core.preview import read_preview
+            
+            # Tenter de lire la première ligne (le lecteur reste en cache pour l'aperçu)
+            read_preview(file_content, max_rows=1, file_name=uploaded_file.name)
+            return True
                 
         except Exception as e:
             st.error(f"❌ Fichier corrompu ou format invalide: {e}")
             return False
     
     def _get_persisted_file_info(self) -> Dict[str, Any]:
-        """Récupère les informations du fichier persisté"""
+        """
+        Récupère les informations du fichier persisté
+        
+        'content' est le chemin du fichier dans le magasin, lisible directement
+        par les chargeurs et l'aperçu.
+        """
         return {
-            'content': st.session_state[self.keys['file_content']],
+            'content': get_blob_store().path(st.session_state[self.keys['file_blob']]),
             'name': st.session_state[self.keys['file_name']],
             'type': st.session_state.get(self.keys['file_type'], ''),
             'size': st.session_state.get(self.keys['file_size'], 0),
@@ -198,6 +187,7 @@ class StableFileUpload:
     
     def clear_persisted_file(self):
         """Nettoie le fichier persisté de la session"""
+        release_upload(st.session_state, self.keys['file_blob'])
         for key in self.keys.values():
             if key in st.session_state:
                 del st.session_state[key]
@@ -219,19 +209,19 @@ class StableFileUpload:
             return None
         
         try:
-            file_content = st.session_state[self.keys['file_content']]
+            file_content = get_blob_store().path(st.session_state[self.keys['file_blob']])
             file_name = st.session_state[self.keys['file_name']]
             
-            file_extension = file_name.lower().split('.')[-1]
+            from modules.core.readers import sniff_format
             
-            if file_extension in ['xlsx', 'xls']:
-                df = pd.read_excel(io.BytesIO(file_content), nrows=max_rows)
-            elif file_extension == 'csv':
-                df = pd.read_csv(io.BytesIO(file_content), nrows=max_rows)
-            else:
+            if sniff_format(file_content, file_name) is None:
                 return None
             
-            return df
+            from modules.core.preview import read_preview
+            
+            # Première feuille uniquement, lue en flux sur max_rows lignes
+            previews = read_preview(file_content, max_rows=max_rows, file_name=file_name)
+            return next(iter(previews.values()), None)
             
         except Exception as e:
             st.error(f"❌ Erreur génération aperçu: {e}")
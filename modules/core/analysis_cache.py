@@ -0,0 +1,253 @@
+"""
+Cache des analyses adressé par contenu (SHA-256 du fichier importé)
+
+Deux niveaux :
+- mémoire : LRU borné en nombre d'entrées et en octets
+- disque (optionnel) : fichiers JSON dans un répertoire configurable, éviction
+  des entrées les moins récemment utilisées au-delà d'une taille maximale
+
+Un même classeur réimporté (nouveau clic sur « Lancer l'Analyse », changement
+de secteur, autre analyste) ne coûte alors qu'un hachage et une recherche.
+
+Les scores dépendent des normes : la clé d'une analyse inclut la version et
+la signature du fichier des normes, si bien qu'un rechargement à chaud (ou un
+redémarrage sur des normes modifiées) ne sert pas d'anciens scores.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from modules.core.norms import get_norms
+
+# Incrémenter lorsque le format des données extraites change (invalide le disque)
+CACHE_VERSION = 3
+
+ENV_CACHE_DIR = 'OPTIMUS_CACHE_DIR'
+ENV_CACHE_MAX_MB = 'OPTIMUS_CACHE_MAX_MB'
+
+
+class AnalysisCache:
+    """Cache LRU mémoire + disque des données extraites et des analyses"""
+
+    def __init__(self,
+                 max_memory_entries: int = 128,
+                 max_memory_bytes: int = 32 * 1024 * 1024,
+                 disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        self.stats = {'hits_memory': 0, 'hits_disk': 0, 'misses': 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Clés
+    # ------------------------------------------------------------------
+    @staticmethod
+    def hash_bytes(content) -> str:
+        """Empreinte SHA-256 du contenu (bytes, bytearray ou memoryview)"""
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def _data_key(file_hash: str) -> str:
+        return f"v{CACHE_VERSION}-data-{file_hash}"
+
+    @staticmethod
+    def _norms_tag() -> str:
+        """Empreinte courte des normes courantes (version et signature du fichier)"""
+        norms = get_norms()
+        return hashlib.sha256(f"{norms.version}|{norms.signature}".encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def _analysis_key(cls, file_hash: str, secteur: Optional[str]) -> str:
+        return f"v{CACHE_VERSION}-analysis-{file_hash}-{secteur or 'aucun'}-{cls._norms_tag()}"
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+    def get_data(self, file_hash: str) -> Optional[Dict[str, float]]:
+        """Données extraites d'un fichier déjà chargé, ou None"""
+        return self._get(self._data_key(file_hash))
+
+    def put_data(self, file_hash: str, data: Dict[str, float]):
+        """Mémorise les données extraites d'un fichier"""
+        self._put(self._data_key(file_hash), data)
+
+    def get_analysis(self, file_hash: str, secteur: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Ratios et scores d'un fichier pour un secteur et les normes courantes, ou None"""
+        return self._get(self._analysis_key(file_hash, secteur))
+
+    def put_analysis(self, file_hash: str, secteur: Optional[str], analysis: Dict[str, Any]):
+        """Mémorise les ratios et scores d'un fichier pour un secteur"""
+        self._put(self._analysis_key(file_hash, secteur), analysis)
+
+    def get_or_compute_data(self, file_hash: str,
+                            compute: Callable[[], Optional[Dict[str, float]]]) -> Optional[Dict[str, float]]:
+        """Retourne les données en cache ou les calcule (un résultat None n'est pas mémorisé)"""
+        data = self.get_data(file_hash)
+        if data is None:
+            data = compute()
+            if data is not None:
+                self.put_data(file_hash, data)
+        return data
+
+    def get_or_compute_analysis(self, file_hash: str, secteur: Optional[str],
+                                compute: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Retourne l'analyse (ratios, scores) en cache ou la calcule"""
+        analysis = self.get_analysis(file_hash, secteur)
+        if analysis is None:
+            analysis = compute()
+            if analysis is not None:
+                self.put_analysis(file_hash, secteur, analysis)
+        return analysis
+
+    def clear(self):
+        """Vide les deux niveaux du cache"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for path in self._disk_files():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # ------------------------------------------------------------------
+    # Niveau mémoire
+    # ------------------------------------------------------------------
+    def _get(self, key: str):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats['hits_memory'] += 1
+                return copy.deepcopy(entry[0])
+
+            payload = self._disk_read(key)
+            if payload is None:
+                self.stats['misses'] += 1
+                return None
+
+            value = json.loads(payload)
+            self._memory_store(key, value, len(payload))
+            self.stats['hits_disk'] += 1
+            return copy.deepcopy(value)
+
+    def _put(self, key: str, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        value = json.loads(payload)  # copie détachée de l'appelant
+
+        with self._lock:
+            self._memory_store(key, value, len(payload))
+            self._disk_write(key, payload)
+
+    def _memory_store(self, key: str, value, size: int):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[1]
+
+        if size > self.max_memory_bytes:
+            return
+
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+
+        while (len(self._memory) > self.max_memory_entries or
+               self._memory_bytes > self.max_memory_bytes):
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    # ------------------------------------------------------------------
+    # Niveau disque
+    # ------------------------------------------------------------------
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_files(self):
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return []
+        return [os.path.join(self.disk_dir, name)
+                for name in os.listdir(self.disk_dir) if name.endswith('.json')]
+
+    def _disk_read(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = f.read()
+            os.utime(path)  # marque l'entrée comme récemment utilisée
+            return payload
+        except (OSError, ValueError):
+            return None
+
+    def _disk_write(self, key: str, payload: str):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Écriture du cache impossible ({path}): {e}")
+            return
+        self._disk_evict()
+
+    def _disk_evict(self):
+        """Supprime les entrées les plus anciennes au-delà de max_disk_bytes"""
+        entries = []
+        total = 0
+        for path in self._disk_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_disk_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+            if total <= self.max_disk_bytes:
+                break
+
+
+_default_cache: Optional[AnalysisCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """
+    Cache partagé par le processus
+
+    Le niveau disque est activé si la variable d'environnement
+    OPTIMUS_CACHE_DIR est définie ; OPTIMUS_CACHE_MAX_MB fixe sa taille maximale.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            disk_dir = os.environ.get(ENV_CACHE_DIR) or None
+            max_mb = float(os.environ.get(ENV_CACHE_MAX_MB, 256))
+            _default_cache = AnalysisCache(disk_dir=disk_dir,
+                                           max_disk_bytes=int(max_mb * 1024 * 1024))
+        return _default_cache
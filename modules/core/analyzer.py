@@ -7,39 +7,110 @@ import numpy as np
 import openpyxl
 from datetime import datetime
 import json
+from functools import partial
+
+from modules.core.xlsx_stream import open_mapped_workbook
+from modules.core.sources import as_readable, describe_source, detach_source
+from modules.core.readers import FORMAT_XLSX, reader_for
+from modules.core.numeric_coercion import coerce_grid, parse_number
+from modules.core.concurrent_decode import DECODE_PROCESS, decode_sheets, resolve_decode_mode
+from modules.core.cell_mapping import MAX_PERIOD_OFFSET, PERIOD_LABELS, TEMPLATE_SCHEMA, read_sheet_grid
+from modules.core.preflight import preflight_workbook
+from modules.core.template_variants import get_template_registry
+from modules.core.anchor_index import ANCHOR_ROW_MARGIN, SheetAnchorIndex, resolve_compiled
+from modules.core.ratios import MODE_ANALYSE, RATIO_GRAPHS, get_ratio_engine
+from modules.core.attribution import ScoreAttribution
+from modules.core.norms import get_norms
+from modules.core.scoring import (SCORE_ABSOLU, SCORE_INTERPRETATIONS, SCORE_MODES, SectorTables, get_score_grid,
+                                  score_class)
+from modules.core.statement import json_default
+
+# Cellules lues par load_excel_template, par feuille (lecture en flux XLSX)
+TEMPLATE_CELLS = TEMPLATE_SCHEMA.cells_by_sheet()
+
+# Lignes lues par feuille : étendue du modèle officiel et marge pour les modèles décalés
+TEMPLATE_READ_ROWS = {
+    sheet: compiled.shape[0] + ANCHOR_ROW_MARGIN for sheet, compiled in TEMPLATE_SCHEMA.sheets.items()
+}
+
+# Charges d'exploitation cumulées (en valeur absolue) dans 'charges_exploitation'
+CHARGES_EXPLOITATION_FIELDS = (
+    'achats_marchandises', 'achats_matieres_premieres', 'autres_achats', 'transports',
+    'services_exterieurs', 'impots_taxes', 'autres_charges', 'charges_personnel',
+    'dotations_amortissements'
+)
+
+
+def cell_to_float(cell_value):
+    """Convertit une valeur de cellule en nombre (0 si vide ou non numérique)"""
+    if cell_value is None:
+        return 0
+    if isinstance(cell_value, (int, float)):
+        return float(cell_value)
+    if isinstance(cell_value, str):
+        # Format français : « 12 000 », « 1.234.567,89 », « (12 000) »
+        value = parse_number(cell_value)
+        return 0 if np.isnan(value) else value
+    return 0
+
+
+def open_template_workbook(file_path, use_streaming=True):
+    """
+    Ouvre le classeur avec le lecteur de son format (reconnu par son contenu)
+
+    XLSX : en flux si possible, sinon via openpyxl. XLS et ODS : lecteur du
+    registre (readers.py), qui expose les mêmes grilles.
+    """
+    reader_cls = reader_for(file_path)
+    if reader_cls is None:
+        raise ValueError(f"Format de classeur non reconnu: {describe_source(file_path)}")
+    if reader_cls.format != FORMAT_XLSX:
+        return reader_cls(file_path)
+    if use_streaming:
+        workbook = open_mapped_workbook(file_path, TEMPLATE_CELLS)
+        if workbook is not None:
+            return workbook
+    return openpyxl.load_workbook(as_readable(file_path), data_only=True)
+
+
+def decode_template_grid(source, use_streaming, extra_columns, sheet_name):
+    """
+    Ouvre le classeur et lit la grille d'une feuille du modèle
+
+    Tâche du décodage concurrent en mode 'process' : chaque processus ouvre
+    sa propre copie du classeur (chemin ou bytes).
+    """
+    workbook = open_template_workbook(source, use_streaming)
+    try:
+        return read_sheet_grid(workbook, TEMPLATE_SCHEMA.sheet(sheet_name), extra_columns, ANCHOR_ROW_MARGIN)
+    finally:
+        workbook.close()
+
+
+def _read_open_grid(workbook, extra_columns, sheet_name):
+    """Lit la grille d'une feuille d'un classeur déjà ouvert (modes séquentiel et thread)"""
+    return read_sheet_grid(workbook, TEMPLATE_SCHEMA.sheet(sheet_name), extra_columns, ANCHOR_ROW_MARGIN)
+
 
 class FinancialAnalyzer:
     def __init__(self):
-        self.ratios_bceao = {
-            'solvabilite': {
-                'ratio_fonds_propres_base': {'min': 5.0, 'objectif': 7.0, 'poids': 0.25},
-                'ratio_fonds_propres_tier1': {'min': 6.625, 'objectif': 8.5, 'poids': 0.20},
-                'ratio_solvabilite_global': {'min': 8.625, 'objectif': 11.5, 'poids': 0.30},
-                'coussin_conservation': {'min': 2.5, 'objectif': 2.5, 'poids': 0.15},
-                'coussin_contracyclique': {'min': 0.0, 'objectif': 2.5, 'poids': 0.10}
-            },
-            'liquidite': {
-                'ratio_liquidite_court_terme': {'min': 75.0, 'objectif': 100.0, 'poids': 0.40},
-                'coeff_couverture_emplois_mlt': {'min': 100.0, 'objectif': 120.0, 'poids': 0.35},
-                'ratio_transformation': {'max': 100.0, 'objectif': 80.0, 'poids': 0.25}
-            },
-            'division_risques': {
-                'ratio_division_risques': {'max': 65.0, 'objectif': 50.0, 'poids': 0.40},
-                'limite_grands_risques': {'max': 8.0, 'objectif': 6.0, 'poids': 0.35},
-                'engagements_apparentes': {'max': 20.0, 'objectif': 15.0, 'poids': 0.25}
-            },
-            'qualite_portefeuille': {
-                'taux_creances_douteuses': {'max': 5.0, 'objectif': 3.0, 'poids': 0.40},
-                'taux_provisionnement': {'min': 80.0, 'objectif': 100.0, 'poids': 0.35},
-                'taux_creances_irrecouvrables': {'max': 2.0, 'objectif': 1.0, 'poids': 0.25}
-            },
-            'rentabilite': {
-                'roa': {'min': 1.0, 'objectif': 2.0, 'poids': 0.25},
-                'roe': {'min': 10.0, 'objectif': 15.0, 'poids': 0.25},
-                'coefficient_exploitation': {'max': 65.0, 'objectif': 55.0, 'poids': 0.30},
-                'marge_nette': {'min': 10.0, 'objectif': 15.0, 'poids': 0.20}
-            }
-        }
+        # Mode du moteur de ratios et son graphe (dépendances déclarées, recalcul incrémental)
+        self.ratio_mode = MODE_ANALYSE
+        self.ratio_graph = RATIO_GRAPHS[self.ratio_mode]
+        
+        # Variantes connues du modèle (data/template_variants.json)
+        self.template_registry = get_template_registry()
+        self.template_match = None
+        self.unanchored_fields = {}
+        
+        # Cellules saisies en texte et converties en montant lors du dernier chargement
+        self.coerced_cells = {}
+        
+        # Décodage des feuilles : None = OPTIMUS_DECODE_MODE ou séquentiel ('thread', 'process')
+        self.decode_mode = None
+        
+        # Notation par défaut : 'absolu' (seuils BCEAO) ou 'sectoriel' (quartiles du secteur)
+        self.score_mode = SCORE_ABSOLU
         
         # Ratios sectoriels basés sur les documents
         self.ratios_sectoriels = {
@@ -85,724 +156,273 @@ class FinancialAnalyzer:
                 'marge_nette': {'q1': 0.5, 'median': 1.5, 'q3': 3}
             }
         }
+        
+        # Tables d'interpolation des quartiles par (secteur, ratio), pour la notation sectorielle
+        self.sector_tables = SectorTables(self.ratios_sectoriels)
+
+    @property
+    def score_grid(self):
+        """Grille du score (seuils et points par ratio), suit les normes rechargées"""
+        return get_score_grid()
+
+    @property
+    def ratios_bceao(self):
+        """Normes prudentielles BCEAO (section normes_prudentielles de data/bceao_norms.json)"""
+        return get_norms().prudential
+
+    def load_excel_template(self, file_path, use_streaming=True, decode_mode=None):
+        """
+        Charge le modèle Excel avec tous les détails des états financiers
+
+        Args:
+            file_path: Chemin, bytes, memoryview (``uploaded_file.getbuffer()``)
+                ou objet fichier ; le contenu en mémoire n'est pas recopié
+            use_streaming (bool): Lire les fichiers XLSX en flux (cellules mappées
+                uniquement). Si False, ou pour un format non XLSX, openpyxl est utilisé.
+            decode_mode (str): 'sequential', 'thread' ou 'process' pour décoder
+                Bilan, CR et TFT en parallèle (défaut : self.decode_mode)
+        """
+        periods = self._load_periods(file_path, use_streaming, all_periods=False, decode_mode=decode_mode)
+        return periods['N'] if periods else None
+
+    def load_excel_periods(self, file_path, use_streaming=True, decode_mode=None):
+        """
+        Charge tous les exercices présents dans la liasse (N, N-1, N-2) en une lecture
+
+        Les exercices antérieurs sont lus dans les colonnes adjacentes (F au
+        lieu de E, J au lieu de I) lorsque leurs en-têtes mentionnent « N-1 »
+        ou « N-2 ».
+
+        Args:
+            file_path: Chemin, bytes, memoryview ou objet fichier du classeur
+            use_streaming (bool): Lire les fichiers XLSX en flux
+            decode_mode (str): Décodage concurrent des feuilles (voir load_excel_template)
+
+        Returns:
+            dict: {'N': data, 'N-1': data, ...} au format de load_excel_template,
+                ou None en cas d'erreur
+        """
+        return self._load_periods(file_path, use_streaming, all_periods=True, decode_mode=decode_mode)
+
+    def calculate_ratios_by_period(self, periods_data):
+        """Calcule les ratios de chaque exercice : {'N': ratios, 'N-1': ratios, ...}"""
+        return {period: self.calculate_ratios(data) for period, data in periods_data.items()}
 
-    def load_excel_template(self, file_path):
-        """Charge le modèle Excel avec tous les détails des états financiers"""
+    def _load_periods(self, file_path, use_streaming=True, all_periods=True, decode_mode=None):
+        """Lit chaque feuille une fois et extrait les exercices demandés"""
         try:
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
-            
-            # Extraction détaillée du bilan
-            bilan_sheet = workbook['Bilan']
-            
-            # ACTIFS DÉTAILLÉS
-            # Immobilisations incorporelles
-            frais_dev_prospection = self.get_cell_value(bilan_sheet, 'E6')
-            brevets_licences = self.get_cell_value(bilan_sheet, 'E7')
-            fond_commercial = self.get_cell_value(bilan_sheet, 'E8')
-            autres_immob_incorp = self.get_cell_value(bilan_sheet, 'E9')
-            
-            # Immobilisations corporelles
-            terrains = self.get_cell_value(bilan_sheet, 'E11')
-            batiments = self.get_cell_value(bilan_sheet, 'E12')
-            agencements = self.get_cell_value(bilan_sheet, 'E13')
-            materiel_mobilier = self.get_cell_value(bilan_sheet, 'E14')
-            materiel_transport = self.get_cell_value(bilan_sheet, 'E15')
-            avances_immobilisations = self.get_cell_value(bilan_sheet, 'E16')
-            
-            # Immobilisations financières
-            titres_participation = self.get_cell_value(bilan_sheet, 'E19')
-            autres_immob_financieres = self.get_cell_value(bilan_sheet, 'E20')
-            
-            # Totaux immobilisations
-            total_actif_immobilise = self.get_cell_value(bilan_sheet, 'E21')
-            
-            # Actif circulant
-            actif_circulant_hao = self.get_cell_value(bilan_sheet, 'E22')
-            stocks_et_encours = self.get_cell_value(bilan_sheet, 'E23')
-            fournisseurs_avances = self.get_cell_value(bilan_sheet, 'E25')
-            clients = self.get_cell_value(bilan_sheet, 'E26')
-            autres_creances = self.get_cell_value(bilan_sheet, 'E27')
-            total_actif_circulant = self.get_cell_value(bilan_sheet, 'E28')
-            
-            # Trésorerie actif
-            titres_placement = self.get_cell_value(bilan_sheet, 'E30')
-            valeurs_encaisser = self.get_cell_value(bilan_sheet, 'E31')
-            banques_caisses = self.get_cell_value(bilan_sheet, 'E32')
-            total_tresorerie_actif = self.get_cell_value(bilan_sheet, 'E33')
+            decode_mode = resolve_decode_mode(decode_mode or self.decode_mode)
+            extra_columns = MAX_PERIOD_OFFSET if all_periods else 0
             
-            # Ecart de conversion
-            ecart_conversion_actif = self.get_cell_value(bilan_sheet, 'E34')
-            
-            # Total général actif
-            total_general_actif = self.get_cell_value(bilan_sheet, 'E35')
-            
-            # PASSIFS DÉTAILLÉS
-            # Capitaux propres
-            capital = self.get_cell_value(bilan_sheet, 'I5')
-            actionnaires_capital_non_appele = self.get_cell_value(bilan_sheet, 'I6')
-            primes_capital = self.get_cell_value(bilan_sheet, 'I7')
-            ecarts_reevaluation = self.get_cell_value(bilan_sheet, 'I8')
-            reserves_indisponibles = self.get_cell_value(bilan_sheet, 'I9')
-            reserves_libres = self.get_cell_value(bilan_sheet, 'I10')
-            report_nouveau = self.get_cell_value(bilan_sheet, 'I11')
-            resultat_net_bilan = self.get_cell_value(bilan_sheet, 'I12')
-            subventions_investissement = self.get_cell_value(bilan_sheet, 'I13')
-            provisions_reglementees = self.get_cell_value(bilan_sheet, 'I14')
-            total_capitaux_propres = self.get_cell_value(bilan_sheet, 'I15')
-            
-            # Dettes financières
-            emprunts_dettes_financieres = self.get_cell_value(bilan_sheet, 'I17')
-            dettes_location_acquisition = self.get_cell_value(bilan_sheet, 'I18')
-            provisions_financieres = self.get_cell_value(bilan_sheet, 'I19')
-            total_dettes_financieres = self.get_cell_value(bilan_sheet, 'I20')
-            
-            # Ressources stables
-            total_ressources_stables = self.get_cell_value(bilan_sheet, 'I21')
-            
-            # Passif circulant
-            dettes_circulantes_hao = self.get_cell_value(bilan_sheet, 'I22')
-            clients_avances_recues = self.get_cell_value(bilan_sheet, 'I23')
-            fournisseurs_exploitation = self.get_cell_value(bilan_sheet, 'I24')
-            dettes_sociales_fiscales = self.get_cell_value(bilan_sheet, 'I25')
-            autres_dettes = self.get_cell_value(bilan_sheet, 'I26')
-            provisions_risques_ct = self.get_cell_value(bilan_sheet, 'I27')
-            total_passif_circulant = self.get_cell_value(bilan_sheet, 'I28')
-            
-            # Trésorerie passif
-            banques_credits_escompte = self.get_cell_value(bilan_sheet, 'I30')
-            banques_credits_tresorerie = self.get_cell_value(bilan_sheet, 'I31')
-            total_tresorerie_passif = self.get_cell_value(bilan_sheet, 'I33')
-            
-            # Ecart de conversion passif
-            ecart_conversion_passif = self.get_cell_value(bilan_sheet, 'I34')
-            
-            # Total général passif
-            total_general_passif = self.get_cell_value(bilan_sheet, 'I35')
-            
-            # Extraction détaillée du compte de résultat
-            cr_sheet = workbook['CR']
-            
-            # CHIFFRE D'AFFAIRES DÉTAILLÉ
-            ventes_marchandises = self.get_cell_value(cr_sheet, 'E5')
-            achats_marchandises = self.get_cell_value(cr_sheet, 'E6')
-            variation_stocks_marchandises = self.get_cell_value(cr_sheet, 'E7')
-            marge_commerciale = self.get_cell_value(cr_sheet, 'E8')
-            
-            ventes_produits_fabriques = self.get_cell_value(cr_sheet, 'E9')
-            travaux_services_vendus = self.get_cell_value(cr_sheet, 'E10')
-            produits_accessoires = self.get_cell_value(cr_sheet, 'E11')
-            chiffre_affaires = self.get_cell_value(cr_sheet, 'E12')
-            
-            # PRODUCTION ET CHARGES
-            production_stockee = self.get_cell_value(cr_sheet, 'E13')
-            production_immobilisee = self.get_cell_value(cr_sheet, 'E14')
-            subventions_exploitation = self.get_cell_value(cr_sheet, 'E15')
-            autres_produits = self.get_cell_value(cr_sheet, 'E16')
-            transferts_charges_exploitation = self.get_cell_value(cr_sheet, 'E17')
-            
-            achats_matieres_premieres = self.get_cell_value(cr_sheet, 'E18')
-            variation_stocks_mp = self.get_cell_value(cr_sheet, 'E19')
-            autres_achats = self.get_cell_value(cr_sheet, 'E20')
-            variation_stocks_autres = self.get_cell_value(cr_sheet, 'E21')
-            transports = self.get_cell_value(cr_sheet, 'E22')
-            services_exterieurs = self.get_cell_value(cr_sheet, 'E23')
-            impots_taxes = self.get_cell_value(cr_sheet, 'E24')
-            autres_charges = self.get_cell_value(cr_sheet, 'E25')
-            
-            # SOLDES INTERMÉDIAIRES DE GESTION
-            valeur_ajoutee = self.get_cell_value(cr_sheet, 'E26')
-            charges_personnel = self.get_cell_value(cr_sheet, 'E27')
-            excedent_brut = self.get_cell_value(cr_sheet, 'E28')
-            
-            reprises_amortissements = self.get_cell_value(cr_sheet, 'E29')
-            dotations_amortissements = self.get_cell_value(cr_sheet, 'E30')
-            resultat_exploitation = self.get_cell_value(cr_sheet, 'E31')
-            
-            # RÉSULTAT FINANCIER
-            revenus_financiers = self.get_cell_value(cr_sheet, 'E32')
-            reprises_provisions_financieres = self.get_cell_value(cr_sheet, 'E33')
-            transferts_charges_financieres = self.get_cell_value(cr_sheet, 'E34')
-            frais_financiers = self.get_cell_value(cr_sheet, 'E35')
-            dotations_provisions_financieres = self.get_cell_value(cr_sheet, 'E36')
-            resultat_financier = self.get_cell_value(cr_sheet, 'E37')
-            
-            # RÉSULTATS FINAUX
-            resultat_activites_ordinaires = self.get_cell_value(cr_sheet, 'E38')
-            
-            produits_cessions_immob = self.get_cell_value(cr_sheet, 'E39')
-            autres_produits_hao = self.get_cell_value(cr_sheet, 'E40')
-            valeurs_comptables_cessions = self.get_cell_value(cr_sheet, 'E41')
-            autres_charges_hao = self.get_cell_value(cr_sheet, 'E42')
-            resultat_hao = self.get_cell_value(cr_sheet, 'E43')
-            
-            participation_travailleurs = self.get_cell_value(cr_sheet, 'E44')
-            impots_resultat = self.get_cell_value(cr_sheet, 'E45')
-            resultat_net_cr = self.get_cell_value(cr_sheet, 'E46')
-            
-            # Extraction du tableau de flux de trésorerie (TFT)
+            workbook = None
             try:
-                tft_sheet = workbook['TFT']
-                
-                # FLUX DE TRÉSORERIE
-                tresorerie_ouverture = self.get_cell_value(tft_sheet, 'E3')
-                cafg = self.get_cell_value(tft_sheet, 'E5')
-                flux_activites_operationnelles = self.get_cell_value(tft_sheet, 'E11')
-                flux_activites_investissement = self.get_cell_value(tft_sheet, 'E18')
-                flux_capitaux_propres = self.get_cell_value(tft_sheet, 'E24')
-                flux_capitaux_etrangers = self.get_cell_value(tft_sheet, 'E29')
-                flux_activites_financement = self.get_cell_value(tft_sheet, 'E30')
-                variation_tresorerie = self.get_cell_value(tft_sheet, 'E31')
-                tresorerie_cloture = self.get_cell_value(tft_sheet, 'E32')
-            except:
-                # Valeurs par défaut si TFT n'existe pas
-                tresorerie_ouverture = 0
-                cafg = excedent_brut + dotations_amortissements
-                flux_activites_operationnelles = cafg
-                flux_activites_investissement = 0
-                flux_capitaux_propres = 0
-                flux_capitaux_etrangers = 0
-                flux_activites_financement = 0
-                variation_tresorerie = 0
-                tresorerie_cloture = total_tresorerie_actif - total_tresorerie_passif
-            
-            # Calculs dérivés et contrôles
-            charges_exploitation_totales = (
-                abs(achats_marchandises or 0) + 
-                abs(achats_matieres_premieres or 0) + 
-                abs(autres_achats or 0) + 
-                abs(transports or 0) + 
-                abs(services_exterieurs or 0) + 
-                abs(impots_taxes or 0) + 
-                abs(autres_charges or 0) + 
-                abs(charges_personnel or 0) + 
-                abs(dotations_amortissements or 0)
-            )
+                if decode_mode == DECODE_PROCESS:
+                    # Chaque processus ouvre sa copie du classeur et décode une feuille
+                    decode = partial(decode_template_grid, detach_source(file_path), use_streaming, extra_columns)
+                else:
+                    workbook = self._open_workbook(file_path, use_streaming)
+                    decode = partial(_read_open_grid, workbook, extra_columns)
+            
+                # Lecture de chaque feuille en une passe (grille des colonnes utiles) ;
+                # Bilan et CR sont obligatoires, le TFT peut être absent
+                grids = decode_sheets(decode, ('Bilan', 'CR', 'TFT'), decode_mode, required=('Bilan', 'CR'))
+            
+                # Variante du modèle : empreinte des libellés -> adresses de chaque feuille
+                self.template_match = self.template_registry.identify(grids)
+                sheets = dict(self.template_match.sheets)
+            
+                # Variante inconnue : lignes retrouvées par codes REF et libellés
+                self.unanchored_fields = {}
+                for sheet_name in self.template_match.unknown_sheets:
+                    compiled, missing = resolve_compiled(sheets[sheet_name], SheetAnchorIndex.from_grid(grids[sheet_name]))
+                    if compiled is not sheets[sheet_name]:
+                        print(f"🔎 Feuille {sheet_name} : postes relocalisés par codes REF / libellés")
+                    sheets[sheet_name] = compiled
+                    self.unanchored_fields[sheet_name] = missing
+            
+                for sheet_name, compiled in sheets.items():
+                    if compiled.shape[0] > grids[sheet_name].shape[0] or \
+                            compiled.shape[1] + extra_columns > grids[sheet_name].shape[1]:
+                        # Variante plus étendue que le modèle officiel (lignes insérées)
+                        if workbook is None:
+                            workbook = self._open_workbook(file_path, use_streaming)
+                        grids[sheet_name] = read_sheet_grid(workbook, compiled, extra_columns)
+            finally:
+                # Fermé aussi en cas d'erreur (workers du traitement par lot de longue durée)
+                if workbook is not None:
+                    workbook.close()
+            
+            # Exercices annoncés dans les en-têtes (union des feuilles)
+            offsets = {0}
+            if all_periods:
+                for sheet_name, grid in grids.items():
+                    offsets.update(sheets[sheet_name].detect_period_offsets(grid))
+            offsets = sorted(offsets)
+            
+            # Conversion de chaque grille en float64 en une passe (montants saisis en texte compris)
+            numeric = {sheet_name: coerce_grid(grid) for sheet_name, grid in grids.items()}
+            self.coerced_cells = {sheet_name: grid.coerced_cells() for sheet_name, grid in numeric.items()}
+            
+            # Extraction vectorisée : une indexation par feuille pour tous les exercices
+            values_by_offset = {offset: {} for offset in offsets}
+            for sheet_name, grid in numeric.items():
+                extracted = sheets[sheet_name].extract_periods(grid.values, offsets)
+                for offset, values in extracted.items():
+                    values_by_offset[offset].update(values)
             
-            # Construction du dictionnaire de données complet
-            data = {
-                # ACTIFS DÉTAILLÉS
-                'total_actif': total_general_actif,
-                
-                # Immobilisations incorporelles
-                'frais_dev_prospection': frais_dev_prospection,
-                'brevets_licences': brevets_licences,
-                'fond_commercial': fond_commercial,
-                'autres_immob_incorp': autres_immob_incorp,
-                
-                # Immobilisations corporelles
-                'terrains': terrains,
-                'batiments': batiments,
-                'agencements': agencements,
-                'materiel_mobilier': materiel_mobilier,
-                'materiel_transport': materiel_transport,
-                'avances_immobilisations': avances_immobilisations,
-                
-                # Immobilisations financières
-                'titres_participation': titres_participation,
-                'autres_immob_financieres': autres_immob_financieres,
-                'immobilisations_nettes': total_actif_immobilise,
-                
-                # Actif circulant
-                'actif_circulant_hao': actif_circulant_hao,
-                'stocks': stocks_et_encours,
-                'fournisseurs_avances_versees': fournisseurs_avances,
-                'creances_clients': clients,
-                'autres_creances': autres_creances,
-                'total_actif_circulant': total_actif_circulant,
-                
-                # Trésorerie actif
-                'titres_placement': titres_placement,
-                'valeurs_encaisser': valeurs_encaisser,
-                'banques_caisses': banques_caisses,
-                'tresorerie': total_tresorerie_actif,
-                
-                # Ecarts
-                'ecart_conversion_actif': ecart_conversion_actif,
-                
-                # PASSIFS DÉTAILLÉS
-                # Capitaux propres
-                'capital': capital,
-                'actionnaires_capital_non_appele': actionnaires_capital_non_appele,
-                'primes_capital': primes_capital,
-                'ecarts_reevaluation': ecarts_reevaluation,
-                'reserves_indisponibles': reserves_indisponibles,
-                'reserves_libres': reserves_libres,
-                'reserves': (reserves_indisponibles or 0) + (reserves_libres or 0),
-                'report_nouveau': report_nouveau,
-                'resultat_net_bilan': resultat_net_bilan,
-                'subventions_investissement': subventions_investissement,
-                'provisions_reglementees': provisions_reglementees,
-                'capitaux_propres': total_capitaux_propres,
-                
-                # Dettes financières
-                'emprunts_dettes_financieres': emprunts_dettes_financieres,
-                'dettes_location_acquisition': dettes_location_acquisition,
-                'provisions_financieres': provisions_financieres,
-                'dettes_financieres': total_dettes_financieres,
-                'ressources_stables': total_ressources_stables,
-                
-                # Passif circulant
-                'dettes_circulantes_hao': dettes_circulantes_hao,
-                'clients_avances_recues': clients_avances_recues,
-                'fournisseurs_exploitation': fournisseurs_exploitation,
-                'dettes_sociales_fiscales': dettes_sociales_fiscales,
-                'autres_dettes': autres_dettes,
-                'provisions_risques_ct': provisions_risques_ct,
-                'dettes_court_terme': total_passif_circulant,
-                
-                # Trésorerie passif
-                'banques_credits_escompte': banques_credits_escompte,
-                'banques_credits_tresorerie': banques_credits_tresorerie,
-                'tresorerie_passif': total_tresorerie_passif,
-                
-                # Ecarts
-                'ecart_conversion_passif': ecart_conversion_passif,
-                
-                # COMPTE DE RÉSULTAT DÉTAILLÉ
-                # Chiffre d'affaires
-                'ventes_marchandises': ventes_marchandises,
-                'achats_marchandises': achats_marchandises,
-                'variation_stocks_marchandises': variation_stocks_marchandises,
-                'marge_commerciale': marge_commerciale,
-                'ventes_produits_fabriques': ventes_produits_fabriques,
-                'travaux_services_vendus': travaux_services_vendus,
-                'produits_accessoires': produits_accessoires,
-                'chiffre_affaires': chiffre_affaires,
-                
-                # Production et autres produits
-                'production_stockee': production_stockee,
-                'production_immobilisee': production_immobilisee,
-                'subventions_exploitation': subventions_exploitation,
-                'autres_produits': autres_produits,
-                'transferts_charges_exploitation': transferts_charges_exploitation,
-                
-                # Achats et charges externes
-                'achats_matieres_premieres': achats_matieres_premieres,
-                'variation_stocks_mp': variation_stocks_mp,
-                'autres_achats': autres_achats,
-                'variation_stocks_autres': variation_stocks_autres,
-                'transports': transports,
-                'services_exterieurs': services_exterieurs,
-                'impots_taxes': impots_taxes,
-                'autres_charges': autres_charges,
-                
-                # Soldes intermédiaires
-                'valeur_ajoutee': valeur_ajoutee,
-                'charges_personnel': charges_personnel,
-                'excedent_brut': excedent_brut,
-                'reprises_amortissements': reprises_amortissements,
-                'dotations_amortissements': dotations_amortissements,
-                'resultat_exploitation': resultat_exploitation,
-                
-                # Résultat financier
-                'revenus_financiers': revenus_financiers,
-                'reprises_provisions_financieres': reprises_provisions_financieres,
-                'transferts_charges_financieres': transferts_charges_financieres,
-                'frais_financiers': frais_financiers,
-                'dotations_provisions_financieres': dotations_provisions_financieres,
-                'resultat_financier': resultat_financier,
-                
-                # Résultats finaux
-                'resultat_activites_ordinaires': resultat_activites_ordinaires,
-                'produits_cessions_immob': produits_cessions_immob,
-                'autres_produits_hao': autres_produits_hao,
-                'valeurs_comptables_cessions': valeurs_comptables_cessions,
-                'autres_charges_hao': autres_charges_hao,
-                'resultat_hao': resultat_hao,
-                'participation_travailleurs': participation_travailleurs,
-                'impots_resultat': impots_resultat,
-                'resultat_net': resultat_net_cr or resultat_net_bilan,
-                
-                # Charges d'exploitation totales (calculé)
-                'charges_exploitation': charges_exploitation_totales,
-                
-                # FLUX DE TRÉSORERIE
-                'tresorerie_ouverture': tresorerie_ouverture,
-                'cafg': cafg,
-                'flux_activites_operationnelles': flux_activites_operationnelles,
-                'flux_activites_investissement': flux_activites_investissement,
-                'flux_capitaux_propres': flux_capitaux_propres,
-                'flux_capitaux_etrangers': flux_capitaux_etrangers,
-                'flux_activites_financement': flux_activites_financement,
-                'variation_tresorerie': variation_tresorerie,
-                'tresorerie_cloture': tresorerie_cloture
+            return {
+                PERIOD_LABELS[offset]: self._derive_data(values, has_tft='TFT' in grids)
+                for offset, values in values_by_offset.items()
             }
             
-            workbook.close()
-            return data
-            
         except Exception as e:
             print(f"Erreur lors du chargement du fichier Excel: {e}")
             return None
 
+    def _derive_data(self, values, has_tft=True):
+        """Complète les postes extraits d'un exercice (TFT par défaut, agrégats)"""
+        if not has_tft:
+            # Valeurs par défaut si TFT n'existe pas
+            cafg = values['excedent_brut'] + values['dotations_amortissements']
+            values.update({
+                'tresorerie_ouverture': 0,
+                'cafg': cafg,
+                'flux_activites_operationnelles': cafg,
+                'flux_activites_investissement': 0,
+                'flux_capitaux_propres': 0,
+                'flux_capitaux_etrangers': 0,
+                'flux_activites_financement': 0,
+                'variation_tresorerie': 0,
+                'tresorerie_cloture': values['tresorerie'] - values['tresorerie_passif']
+            })
+        
+        # Calculs dérivés et contrôles
+        resultat_net_cr = values.pop('resultat_net_cr')
+        data = values
+        data['reserves'] = data['reserves_indisponibles'] + data['reserves_libres']
+        data['resultat_net'] = resultat_net_cr or data['resultat_net_bilan']
+        data['charges_exploitation'] = sum(abs(data[field]) for field in CHARGES_EXPLOITATION_FIELDS)
+        return data
+
+    def _open_workbook(self, file_path, use_streaming=True):
+        """Ouvre le classeur en flux si possible, sinon via openpyxl"""
+        return open_template_workbook(file_path, use_streaming)
+
     def get_cell_value(self, sheet, cell_ref):
         """Extrait la valeur d'une cellule Excel"""
         try:
-            cell_value = sheet[cell_ref].value
-            if cell_value is None:
-                return 0
-            if isinstance(cell_value, (int, float)):
-                return float(cell_value)
-            if isinstance(cell_value, str):
-                cleaned_value = cell_value.replace(' ', '').replace(',', '.')
-                try:
-                    return float(cleaned_value)
-                except ValueError:
-                    return 0
-            return 0
+            return cell_to_float(sheet[cell_ref].value)
         except Exception:
             return 0
 
     def calculate_ratios(self, data):
-        """Calcule les ratios financiers détaillés"""
-        ratios = {}
-        
-        # Ratios de liquidité
-        if data.get('dettes_court_terme', 0) > 0:
-            actif_circulant_total = (data.get('stocks', 0) + data.get('creances_clients', 0) + 
-                                   data.get('autres_creances', 0) + data.get('tresorerie', 0))
-            ratios['ratio_liquidite_generale'] = actif_circulant_total / data['dettes_court_terme']
-            
-            actif_liquide_immediat = (data.get('creances_clients', 0) + data.get('autres_creances', 0) + data.get('tresorerie', 0))
-            ratios['ratio_liquidite_immediate'] = actif_liquide_immediat / data['dettes_court_terme']
-            
-            ratios['ratio_liquidite_absolue'] = data.get('tresorerie', 0) / data['dettes_court_terme']
-        
-        # Ratios de solvabilité
-        if data.get('total_actif', 0) > 0:
-            dettes_totales = data.get('dettes_financieres', 0) + data.get('dettes_court_terme', 0)
-            ratios['ratio_endettement'] = dettes_totales / data['total_actif'] * 100
-            ratios['ratio_autonomie_financiere'] = data.get('capitaux_propres', 0) / data['total_actif'] * 100
-            
-            if data.get('dettes_financieres', 0) > 0 and data.get('frais_financiers', 0) != 0:
-                ratios['ratio_couverture_charges_financieres'] = data.get('excedent_brut', 0) / abs(data.get('frais_financiers', 1))
-        
-        # Ratios d'activité et de rotation
-        if data.get('chiffre_affaires', 0) > 0:
-            ratios['rotation_actif'] = data['chiffre_affaires'] / data.get('total_actif', 1)
-            
-            if data.get('stocks', 0) > 0:
-                ratios['rotation_stocks'] = data['chiffre_affaires'] / data['stocks']
-                ratios['duree_ecoulement_stocks'] = 365 / ratios['rotation_stocks']
-            
-            if data.get('creances_clients', 0) > 0:
-                ratios['rotation_creances'] = data['chiffre_affaires'] / data['creances_clients']
-                ratios['delai_recouvrement_clients'] = 365 / ratios['rotation_creances']
-            
-            if data.get('fournisseurs_exploitation', 0) > 0:
-                achats_totaux = (data.get('achats_matieres_premieres', 0) + data.get('autres_achats', 0))
-                if achats_totaux > 0:
-                    ratios['rotation_fournisseurs'] = achats_totaux / data['fournisseurs_exploitation']
-                    ratios['delai_paiement_fournisseurs'] = 365 / ratios['rotation_fournisseurs']
-        
-        # Ratios de structure financière
-        if data.get('immobilisations_nettes', 0) > 0:
-            ratios['financement_immobilisations'] = data.get('ressources_stables', 0) / data['immobilisations_nettes'] * 100
-        
-        if data.get('capitaux_propres', 0) > 0:
-            ratios['ratio_endettement_financier'] = data.get('dettes_financieres', 0) / data['capitaux_propres']
-        
-        # Ratios de rentabilité
-        if data.get('total_actif', 0) > 0:
-            ratios['roa'] = data.get('resultat_net', 0) / data['total_actif'] * 100
-            ratios['roa_exploitation'] = data.get('resultat_exploitation', 0) / data['total_actif'] * 100
-        
-        if data.get('capitaux_propres', 0) > 0:
-            ratios['roe'] = data.get('resultat_net', 0) / data['capitaux_propres'] * 100
-            ratios['roe_exploitation'] = data.get('resultat_exploitation', 0) / data['capitaux_propres'] * 100
+        """
+        Calcule les ratios financiers détaillés
+
+        Moteur de ratios partagé, mode analyse : un ratio n'est produit que
+        si ses dénominateurs sont strictement positifs.
+        """
+        return get_ratio_engine().calculate(data, self.ratio_mode)
+
+    def _score_tables(self, mode):
+        """Tables sectorielles du mode demandé (None : seuils absolus)"""
+        mode = mode or self.score_mode
+        if mode not in SCORE_MODES:
+            raise ValueError(f"Mode de notation inconnu: {mode} (attendu: {', '.join(SCORE_MODES)})")
+        return None if mode == SCORE_ABSOLU else self.sector_tables
+
+    def calculate_score(self, ratios, secteur=None, mode=None):
+        """
+        Calcule le score global basé sur les ratios détaillés (grille du service des normes)
         
-        if data.get('chiffre_affaires', 0) > 0:
-            ratios['marge_commerciale_pct'] = data.get('marge_commerciale', 0) / data['chiffre_affaires'] * 100
-            
-            cout_marchandises = data.get('achats_matieres_premieres', 0) + data.get('autres_achats', 0)
-            ratios['marge_brute'] = (data['chiffre_affaires'] - cout_marchandises) / data['chiffre_affaires'] * 100
-            
-            ratios['marge_valeur_ajoutee'] = data.get('valeur_ajoutee', 0) / data['chiffre_affaires'] * 100
-            ratios['marge_excedent_brut'] = data.get('excedent_brut', 0) / data['chiffre_affaires'] * 100
-            ratios['marge_exploitation'] = data.get('resultat_exploitation', 0) / data['chiffre_affaires'] * 100
-            ratios['marge_nette'] = data.get('resultat_net', 0) / data['chiffre_affaires'] * 100
-            
-            if data.get('charges_exploitation', 0) > 0:
-                ratios['coefficient_exploitation'] = data['charges_exploitation'] / data['chiffre_affaires'] * 100
+        Args:
+            ratios (dict): Ratios de l'entreprise
+            secteur (str): Secteur d'activité (clé de ratios_sectoriels)
+            mode (str): 'absolu' ou 'sectoriel' (défaut : self.score_mode). En mode
+                sectoriel, les ratios dont le secteur publie les quartiles sont notés
+                selon leur position dans la distribution du secteur ; les autres
+                ratios, ou un secteur inconnu, restent notés sur les seuils absolus.
+        """
+        return self.score_grid.score(ratios, self._score_tables(mode), secteur)
+
+    def score_tables(self, secteur=None, mode=None):
+        """Tables par ratio du secteur pour la notation demandée (None : seuils absolus)"""
+        sector_tables = self._score_tables(mode)
+        return (sector_tables.for_sector(secteur) if sector_tables is not None else None) or None
+
+    def calculate_score_batch(self, ratios_frame, secteur=None, mode=None):
+        """
+        Scores d'un portefeuille de ratios (une ligne par entreprise/exercice)
+
+        Args:
+            secteur: secteur de tout le portefeuille, ou un secteur par ligne
+            mode (str): 'absolu' ou 'sectoriel' (voir calculate_score)
+
+        Returns:
+            pd.DataFrame: points par composante et score global
+        """
+        return self.score_grid.score_frame(ratios_frame, self._score_tables(mode), secteur)
+
+    def _score_attribution(self):
+        """Attribution sur la grille courante (reconstruite si les normes ont été rechargées)"""
+        grid = self.score_grid
+        attribution = getattr(self, '_attribution', None)
+        if attribution is None or attribution.grid is not grid:
+            attribution = self._attribution = ScoreAttribution(grid, self.ratio_graph)
+        return attribution
+
+    def explain_score(self, ratios, secteur=None, mode=None, data=None):
+        """
+        Attribution du score : contribution de chaque ratio et postes derrière lui
         
-        # Ratios de productivité
-        if data.get('valeur_ajoutee', 0) > 0:
-            ratios['taux_charges_personnel'] = data.get('charges_personnel', 0) / data['valeur_ajoutee'] * 100
+        Args:
+            ratios (dict): Ratios de l'entreprise
+            secteur, mode: comme pour calculate_score
+            data (dict): Postes des états financiers (valeurs jointes à l'attribution)
             
-            if data.get('charges_personnel', 0) > 0:
-                ratios['productivite_personnel'] = data['valeur_ajoutee'] / data['charges_personnel']
-        
-        # Ratios de flux de trésorerie
-        if data.get('chiffre_affaires', 0) > 0:
-            ratios['ratio_cafg_ca'] = data.get('cafg', 0) / data['chiffre_affaires'] * 100
-        
-        if data.get('dettes_financieres', 0) > 0 and data.get('cafg', 0) > 0:
-            ratios['capacite_remboursement'] = data['dettes_financieres'] / data['cafg']
-        
-        # Besoin en fonds de roulement
-        bfr_exploitation = (data.get('stocks', 0) + data.get('creances_clients', 0) + data.get('autres_creances', 0) + 
-                           data.get('fournisseurs_avances_versees', 0) - data.get('fournisseurs_exploitation', 0) - 
-                           data.get('dettes_sociales_fiscales', 0) - data.get('autres_dettes', 0))
-        ratios['bfr'] = bfr_exploitation
-        
-        if data.get('chiffre_affaires', 0) > 0:
-            ratios['bfr_jours_ca'] = (bfr_exploitation / data['chiffre_affaires']) * 365
-        
-        # Fonds de roulement
-        fonds_roulement = data.get('ressources_stables', 0) - data.get('immobilisations_nettes', 0)
-        ratios['fonds_roulement'] = fonds_roulement
-        
-        # Trésorerie nette
-        tresorerie_nette = data.get('tresorerie', 0) - data.get('tresorerie_passif', 0)
-        ratios['tresorerie_nette'] = tresorerie_nette
-        
-        return ratios
+        Returns:
+            dict: voir ScoreAttribution.explain
+        """
+        return self._score_attribution().explain(ratios, self._score_tables(mode), secteur, data)
 
-    def calculate_score(self, ratios, secteur=None):
-        """Calcule le score global basé sur les ratios détaillés"""
-        scores = {}
-        
-        # Score de liquidité (40 points)
-        liquidite_score = 0
-        
-        # Liquidité générale (15 points)
-        if 'ratio_liquidite_generale' in ratios:
-            if ratios['ratio_liquidite_generale'] >= 2.0:
-                liquidite_score += 15
-            elif ratios['ratio_liquidite_generale'] >= 1.5:
-                liquidite_score += 12
-            elif ratios['ratio_liquidite_generale'] >= 1.0:
-                liquidite_score += 8
-            else:
-                liquidite_score += 3
-        
-        # Liquidité immédiate (10 points)
-        if 'ratio_liquidite_immediate' in ratios:
-            if ratios['ratio_liquidite_immediate'] >= 1.0:
-                liquidite_score += 10
-            elif ratios['ratio_liquidite_immediate'] >= 0.8:
-                liquidite_score += 8
-            elif ratios['ratio_liquidite_immediate'] >= 0.6:
-                liquidite_score += 5
-            else:
-                liquidite_score += 2
-        
-        # BFR en jours de CA (10 points)
-        if 'bfr_jours_ca' in ratios:
-            if ratios['bfr_jours_ca'] <= 30:
-                liquidite_score += 10
-            elif ratios['bfr_jours_ca'] <= 60:
-                liquidite_score += 7
-            elif ratios['bfr_jours_ca'] <= 90:
-                liquidite_score += 4
-            else:
-                liquidite_score += 1
-        
-        # Trésorerie nette (5 points)
-        if 'tresorerie_nette' in ratios:
-            if ratios['tresorerie_nette'] > 0:
-                liquidite_score += 5
-            else:
-                liquidite_score += 1
-        
-        scores['liquidite'] = liquidite_score
-        
-        # Score de solvabilité (40 points)
-        solvabilite_score = 0
-        
-        # Autonomie financière (20 points)
-        if 'ratio_autonomie_financiere' in ratios:
-            if ratios['ratio_autonomie_financiere'] >= 50:
-                solvabilite_score += 20
-            elif ratios['ratio_autonomie_financiere'] >= 40:
-                solvabilite_score += 16
-            elif ratios['ratio_autonomie_financiere'] >= 30:
-                solvabilite_score += 12
-            elif ratios['ratio_autonomie_financiere'] >= 20:
-                solvabilite_score += 8
-            else:
-                solvabilite_score += 3
-        
-        # Endettement global (15 points)
-        if 'ratio_endettement' in ratios:
-            if ratios['ratio_endettement'] <= 50:
-                solvabilite_score += 15
-            elif ratios['ratio_endettement'] <= 65:
-                solvabilite_score += 12
-            elif ratios['ratio_endettement'] <= 80:
-                solvabilite_score += 8
-            else:
-                solvabilite_score += 3
-        
-        # Capacité de remboursement (5 points)
-        if 'capacite_remboursement' in ratios:
-            if ratios['capacite_remboursement'] <= 3:
-                solvabilite_score += 5
-            elif ratios['capacite_remboursement'] <= 5:
-                solvabilite_score += 3
-            else:
-                solvabilite_score += 1
-        
-        scores['solvabilite'] = solvabilite_score
-        
-        # Score de rentabilité (30 points)
-        rentabilite_score = 0
-        
-        # ROE (10 points)
-        if 'roe' in ratios:
-            if ratios['roe'] >= 15:
-                rentabilite_score += 10
-            elif ratios['roe'] >= 10:
-                rentabilite_score += 8
-            elif ratios['roe'] >= 5:
-                rentabilite_score += 5
-            else:
-                rentabilite_score += 2
-        
-        # ROA (8 points)
-        if 'roa' in ratios:
-            if ratios['roa'] >= 5:
-                rentabilite_score += 8
-            elif ratios['roa'] >= 3:
-                rentabilite_score += 6
-            elif ratios['roa'] >= 1:
-                rentabilite_score += 4
-            else:
-                rentabilite_score += 1
-        
-        # Marge nette (7 points)
-        if 'marge_nette' in ratios:
-            if ratios['marge_nette'] >= 10:
-                rentabilite_score += 7
-            elif ratios['marge_nette'] >= 5:
-                rentabilite_score += 5
-            elif ratios['marge_nette'] >= 2:
-                rentabilite_score += 3
-            else:
-                rentabilite_score += 1
-        
-        # Marge d'exploitation (5 points)
-        if 'marge_exploitation' in ratios:
-            if ratios['marge_exploitation'] >= 10:
-                rentabilite_score += 5
-            elif ratios['marge_exploitation'] >= 5:
-                rentabilite_score += 4
-            elif ratios['marge_exploitation'] >= 2:
-                rentabilite_score += 2
-            else:
-                rentabilite_score += 1
-        
-        scores['rentabilite'] = rentabilite_score
-        
-        # Score d'activité (15 points)
-        activite_score = 0
-        
-        # Rotation de l'actif (5 points)
-        if 'rotation_actif' in ratios:
-            if ratios['rotation_actif'] >= 2.0:
-                activite_score += 5
-            elif ratios['rotation_actif'] >= 1.5:
-                activite_score += 4
-            elif ratios['rotation_actif'] >= 1.0:
-                activite_score += 3
-            else:
-                activite_score += 1
-        
-        # Rotation des stocks (5 points)
-        if 'rotation_stocks' in ratios:
-            if ratios['rotation_stocks'] >= 8:
-                activite_score += 5
-            elif ratios['rotation_stocks'] >= 6:
-                activite_score += 4
-            elif ratios['rotation_stocks'] >= 4:
-                activite_score += 3
-            else:
-                activite_score += 1
-        
-        # Délai de recouvrement (5 points)
-        if 'delai_recouvrement_clients' in ratios:
-            if ratios['delai_recouvrement_clients'] <= 30:
-                activite_score += 5
-            elif ratios['delai_recouvrement_clients'] <= 45:
-                activite_score += 4
-            elif ratios['delai_recouvrement_clients'] <= 60:
-                activite_score += 3
-            else:
-                activite_score += 1
-        
-        scores['activite'] = activite_score
-        
-        # Score de gestion (15 points)
-        gestion_score = 0
-        
-        # Productivité du personnel (5 points)
-        if 'productivite_personnel' in ratios:
-            if ratios['productivite_personnel'] >= 3:
-                gestion_score += 5
-            elif ratios['productivite_personnel'] >= 2:
-                gestion_score += 4
-            elif ratios['productivite_personnel'] >= 1.5:
-                gestion_score += 3
-            else:
-                gestion_score += 1
-        
-        # Taux de charges personnel / VA (5 points)
-        if 'taux_charges_personnel' in ratios:
-            if ratios['taux_charges_personnel'] <= 40:
-                gestion_score += 5
-            elif ratios['taux_charges_personnel'] <= 50:
-                gestion_score += 4
-            elif ratios['taux_charges_personnel'] <= 60:
-                gestion_score += 3
-            else:
-                gestion_score += 1
-        
-        # CAFG / CA (5 points)
-        if 'ratio_cafg_ca' in ratios:
-            if ratios['ratio_cafg_ca'] >= 10:
-                gestion_score += 5
-            elif ratios['ratio_cafg_ca'] >= 7:
-                gestion_score += 4
-            elif ratios['ratio_cafg_ca'] >= 5:
-                gestion_score += 3
-            else:
-                gestion_score += 1
-        
-        scores['gestion'] = gestion_score
-        
-        # Score global sur 140 points, ramené à 100
-        score_brut = sum(scores.values())
-        scores['global'] = min(100, int(score_brut * 100 / 140))
-        
-        return scores
+    def explain_score_batch(self, ratios_frame, secteur=None, mode=None):
+        """
+        Attribution du score d'un portefeuille (une ligne par entreprise et par ratio noté)
+
+        Returns:
+            pd.DataFrame: voir ScoreAttribution.explain_frame
+        """
+        return self._score_attribution().explain_frame(ratios_frame, self._score_tables(mode), secteur)
 
     def get_interpretation(self, score):
-        """Interprétation du score"""
-        if score >= 85:
-            return "Excellente", "green"
-        elif score >= 70:
-            return "Très bonne", "lightgreen"
-        elif score >= 55:
-            return "Bonne", "yellow"
-        elif score >= 40:
-            return "Acceptable", "orange"
-        elif score >= 25:
-            return "Faible", "red"
-        else:
-            return "Très faible", "darkred"
+        """Interprétation du score (libellé, couleur)"""
+        return SCORE_INTERPRETATIONS[score_class(score)]
 
     def analyze_excel_file(self, file_path, secteur=None):
         """
         Analyse complète d'un fichier Excel
         
         Args:
-            file_path (str): Chemin vers le fichier Excel
+            file_path: Chemin, bytes, memoryview ou objet fichier du classeur
             secteur (str): Secteur d'activité pour comparaison
             
         Returns:
             dict: Dictionnaire contenant data, ratios, scores et recommandations
         """
         try:
+            # Contrôle préalable (répertoire zip, feuilles attendues), sans décoder de feuille
+            preflight = preflight_workbook(file_path)
+            if not preflight.ok:
+                print(f"❌ {preflight.reason}")
+                return {
+                    'success': False,
+                    'error': preflight.reason,
+                    'data': None,
+                    'ratios': None,
+                    'scores': None,
+                    'recommendations': None
+                }
+            
             # Charger les données du fichier Excel
             data = self.load_excel_template(file_path)
             
@@ -832,7 +452,8 @@ class FinancialAnalyzer:
                 'ratios': ratios,
                 'scores': scores,
                 'recommendations': recommendations,
-                'secteur': secteur
+                'secteur': secteur,
+                'variante_modele': self.template_match.variants if self.template_match else None
             }
             
         except Exception as e:
@@ -1026,7 +647,7 @@ class FinancialAnalyzer:
             'interpretation': self.get_interpretation(analysis_result.get('scores', {}).get('global', 0))[0]
         }
         
-        return json.dumps(export_data, indent=2, ensure_ascii=False)
+        return json.dumps(export_data, indent=2, ensure_ascii=False, default=json_default)
 
     def validate_data(self, data):
         """
@@ -0,0 +1,260 @@
+"""
+Index d'ancrage des feuilles : codes REF SYSCOHADA et libellés -> lignes
+
+Les chargeurs ne dépendent plus seulement d'adresses absolues (``E21``,
+``I35``) : chaque poste du schéma porte son code REF SYSCOHADA (AD, AZ, BK,
+CP, DZ, XA...) et le libellé du modèle officiel. Une feuille est indexée en une
+passe (code REF ou libellé normalisé -> numéro de ligne) ; la ligne d'un poste
+est ensuite une simple recherche dans un dict, quel que soit le décalage du
+modèle reçu. La colonne de chaque poste reste celle du modèle officiel.
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modules.core.cell_mapping import CompiledSheet
+
+# Lignes lues sous le dernier poste du modèle officiel pour retrouver un modèle décalé
+ANCHOR_ROW_MARGIN = 30
+
+# Nombre maximal de feuilles adaptées conservées (une par disposition rencontrée)
+RESOLVED_CACHE_SIZE = 256
+
+REF_PATTERN = re.compile(r'^[A-Z]{2}$')
+_PARENTHESES = re.compile(r'\([^)]*\)?')
+_NON_ALNUM = re.compile(r'[^A-Z0-9]+')
+
+# Libellés du modèle officiel (assets/template_excel.xlsx) par feuille et code REF
+ANCHOR_LABELS: Dict[str, Dict[str, str]] = {
+    'Bilan': {
+        'AD': 'IMMOBILISATIONS INCORPORELLES',
+        'AE': 'Frais de développement et de prospection',
+        'AF': 'Brevets, Licences, logiciels et droit similaire',
+        'AG': 'Fond commercial et droit au bail',
+        'AH': 'Autres immobilisations incorporelles',
+        'AI': 'IMMOBILISATIONS CORPORELLES',
+        'AJ': 'Terrains',
+        'AK': 'Batiments',
+        'AL': 'Agencements, amenagement et Installations',
+        'AM': 'Matériel mobilier et actifs biologiques',
+        'AN': 'Matériel de transport',
+        'AP': 'Avances et acomptes versées sur immobilisations',
+        'AQ': 'IMMOBILISATIONS FINANCIERES',
+        'AR': 'Titres de Participation',
+        'AS': 'Autres Immobilisations Financières',
+        'AZ': 'TOTAL ACTIF IMMOBILISE',
+        'BA': 'ACTIF CIRCULANT HAO',
+        'BB': 'STOCKS ET ENCOURS',
+        'BG': 'CREANCES ET EMPLOIS ASSIMILES',
+        'BH': 'Founisseurs avances versées',
+        'BI': 'Clients',
+        'BJ': 'Autres créances',
+        'BK': 'TOTAL ACTIF CIRCULANT',
+        'BQ': 'Titres de placement',
+        'BR': 'Valeurs à encaisser',
+        'BS': 'Banques, chèques postaux, caisses et assimilés',
+        'BT': 'TOTAL TRESORERIE ACTIF',
+        'BU': 'Ecart de conversion actif',
+        'BZ': 'TOTAL GENERAL',
+        'CA': 'Capital',
+        'CB': 'Actionnaires capital non appelé',
+        'CD': 'Primes liées au capital',
+        'CE': 'Ecarts de Réévaluation',
+        'CF': 'Réserves Indisponibles',
+        'CG': 'Réserves Libres',
+        'CH': 'Report à nouveau',
+        'CJ': "Résultat Net de l'exercice",
+        'CL': "Subventions d'Investissement",
+        'CM': 'Provision Réglementées',
+        'CP': 'TOTAL CAPITAUX PROPRES ET RESSOURCES ASSIMILEES',
+        'DA': 'Emprunts et Dettes Financières',
+        'DB': 'Dettes de location acquistion',
+        'DC': 'Provisions financières pour Risques et Charges',
+        'DD': 'TOTAL DETTES FINANCIERES ET RESSOURCES ASSIMILEES',
+        'DF': 'TOTAL RESSOURCES STABLES',
+        'DH': 'Dettes circulantes HAO',
+        'DI': 'Clients Avances Reçues',
+        'DJ': "Fournisseurs d'Exploitation",
+        'DK': 'Dettes Sociales et Fiscales',
+        'DM': 'Autres Dettes',
+        'DN': 'Provision pour risques à court termes',
+        'DP': 'TOTAL PASSIF CIRCULANT',
+        'DQ': "Banques, Crédits d'escompte et de tréorerie",
+        'DR': 'Banques, établissement financiers et crédit de trésorerie',
+        'DT': 'TOTAL TRESORERIE PASSIF',
+        'DV': 'Ecart de conversion passif',
+        'DZ': 'TOTAL GENERAL',
+    },
+    'CR': {
+        'TA': 'Ventes de marchandises',
+        'RA': 'Achats de marchandises',
+        'RB': '- Variation de stocks',
+        'XA': 'MARGE COMMERCIALE',
+        'TB': 'Ventes de produits fabriqués',
+        'TC': 'Travaux, services vendus',
+        'TD': 'Produits accessoires',
+        'XB': "CHIFFRE D'AFFAIRES (A+B+C+D)",
+        'TE': 'Production stockée (ou destockage)',
+        'TF': 'Production immobilisée',
+        'TG': "Subvention d'exploitation",
+        'TH': 'Autres produits',
+        'TI': "Transferts de charges d'exploitation",
+        'RC': 'Achats de matières premières et autres fournitures liées',
+        'RD': '- Variation de stocks de matieres premieres et fournitures liées',
+        'RE': 'Autres achats',
+        'RF': "- Variation de stocks d'autres approvisionnements",
+        'RG': 'Transports',
+        'RH': 'Services extérieurs',
+        'RI': 'Impôts et taxes',
+        'RJ': 'Autres charges',
+        'XC': 'VALEUR AJOUTEE (XB+A+RB)+ (somme TE à RJ)',
+        'RK': 'Charges de personnel',
+        'XD': "EXCEDENT BRUT D'EXPLOITATION ( XC+RK)",
+        'TJ': "Reprises d'amortissements, de provisions et dépreciations",
+        'RL': 'Dotations aux amortissements, aux provisions et dépreciations',
+        'XE': "RESULTAT D'EXPLOITATION ( XD+TJ+RL)",
+        'TK': 'Revenus financiers et assimilés',
+        'TL': 'Reprise de provisions et dépreciations financieres',
+        'TM': 'Transferts de charges financieres',
+        'RM': 'Frais financiers et charges assimilées',
+        'RN': 'Dotations aux provisions et aux dépreciations financieres',
+        'XF': 'RESULTAT FINANCIER ( somme TK à RM)',
+        'XG': 'RESULTAT DES ACTIVITES ORDINAIRES ( XE + XF)',
+        'TN': "Produits des cessions d'immobilisations",
+        'TO': 'Autres produits HAO',
+        'RO': "Valeurs comptables des cessions d'immobilisations",
+        'RP': 'Autres charges HAO',
+        'XH': 'RESULTAT HORS ACTIVITES ORDINAIRES ( somme TN à RP)',
+        'RQ': 'Participation des travailleurs',
+        'RS': 'Impots sur le résultat',
+        'XI': 'RESULTAT NET ( XG + XH +RQ + RS)',
+    },
+    'TFT': {
+        'ZA': 'Trésorerie nette au 1er Janvier (Trésorerie actif N-1 - Trésorerie passif N-1)',
+        'FA': "Capacité d'autofinancement Global (CAFG)",
+        'ZB': 'Flux de trésorerie provenant des activités opérationnelles (Somme FA à FE)',
+        'ZC': "Flux de trésorerie provenant des opérations d'investissement (somme FE à FJ)",
+        'ZD': 'Flux de trésorerie provenant des capitaux propres (somme FK à FN)',
+        'ZE': 'Flux de trésorerie provenant des capitaux étrangers (somme FO à FQ)',
+        'ZF': 'Flux de trésorerie provenant des actvités de financement ( D+E)',
+        'ZG': 'VARIATION DE LA TRESORERIE NETTE DE LA PERIODE ( B+C+F)',
+        'ZH': 'Trésorerie nette au 31 Décembre (G +A)',
+    },
+}
+
+
+def anchor_label(value) -> str:
+    """
+    Libellé d'ancrage : sans accents, formules entre parenthèses ni ponctuation
+
+    "VALEUR AJOUTEE (XB+A+RB)" et "Valeur ajoutée" donnent "VALEUR AJOUTEE".
+    """
+    if not isinstance(value, str):
+        return ''
+    text = unicodedata.normalize('NFKD', value)
+    text = ''.join(char for char in text if not unicodedata.combining(char)).upper()
+    text = _PARENTHESES.sub(' ', text)
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+_NORMALIZED_LABELS: Dict[str, Dict[str, str]] = {
+    sheet: {ref: anchor_label(label) for ref, label in labels.items()}
+    for sheet, labels in ANCHOR_LABELS.items()
+}
+
+
+class SheetAnchorIndex:
+    """Index d'une feuille : code REF -> ligne et libellé normalisé -> ligne (base 1)"""
+
+    __slots__ = ('refs', 'labels')
+
+    def __init__(self, refs: Optional[Dict[str, int]] = None, labels: Optional[Dict[str, int]] = None):
+        self.refs = refs or {}
+        self.labels = labels or {}
+
+    @classmethod
+    def from_grid(cls, grid: np.ndarray) -> 'SheetAnchorIndex':
+        """
+        Construit l'index en une passe sur les cellules texte de la grille
+
+        Une cellule de deux majuscules est un code REF ; tout autre texte est
+        un libellé. En cas de doublon, la première ligne l'emporte.
+        """
+        refs, labels = {}, {}
+        for row_number, row in enumerate(grid.tolist(), start=1):
+            for value in row:
+                if not isinstance(value, str):
+                    continue
+                code = value.strip()
+                if REF_PATTERN.match(code):
+                    refs.setdefault(code, row_number)
+                else:
+                    label = anchor_label(value)
+                    if label:
+                        labels.setdefault(label, row_number)
+        return cls(refs, labels)
+
+    def __len__(self) -> int:
+        return len(self.refs) + len(self.labels)
+
+    def row_of(self, sheet: str, ref: str) -> Optional[int]:
+        """Ligne d'un poste : par son code REF, sinon par le libellé officiel associé"""
+        row = self.refs.get(ref)
+        if row is None:
+            label = _NORMALIZED_LABELS.get(sheet, {}).get(ref)
+            if label:
+                row = self.labels.get(label)
+        return row
+
+
+_resolved_sheets: Dict[Tuple, CompiledSheet] = {}
+_resolved_sheets_lock = threading.Lock()
+
+
+def resolve_compiled(compiled: CompiledSheet, index: SheetAnchorIndex) -> Tuple[CompiledSheet, List[str]]:
+    """
+    Adapte les lignes d'une feuille compilée aux ancres trouvées
+
+    Un poste sans ancre suit le décalage du poste ancré le plus proche
+    au-dessus de lui (ligne insérée plus haut), ou garde sa ligne officielle.
+
+    Returns:
+        tuple: (feuille compilée, champs sans ancre). La feuille d'origine est
+            retournée telle quelle si aucune ligne ne change ; les feuilles
+            adaptées sont mises en cache par jeu d'adresses.
+    """
+    official_rows = (compiled.rows + 1).tolist()
+    columns = compiled.cols.tolist()
+    found = [index.row_of(compiled.sheet, ref) if ref else None for ref in compiled.refs]
+    missing = [field for field, row in zip(compiled.fields, found) if row is None]
+
+    # Décalages observés par colonne (actif et passif du bilan évoluent séparément)
+    anchored: Dict[int, List[Tuple[int, int]]] = {}
+    for official, row, col in zip(official_rows, found, columns):
+        if row is not None:
+            anchored.setdefault(col, []).append((official, row - official))
+
+    rows = []
+    for official, row, col in zip(official_rows, found, columns):
+        if row is None:
+            above = [(anchor_row, delta) for anchor_row, delta in anchored.get(col, ()) if anchor_row <= official]
+            row = official + (max(above)[1] if above else 0)
+        rows.append(row)
+
+    if rows == official_rows:
+        return compiled, missing
+
+    cells = tuple(f"{cell.rstrip('0123456789')}{row}" for cell, row in zip(compiled.cells, rows))
+    key = (compiled.sheet, compiled.fields, cells, compiled.refs, tuple(compiled.signs.tolist()))
+    with _resolved_sheets_lock:
+        resolved = _resolved_sheets.get(key)
+        if resolved is None:
+            if len(_resolved_sheets) >= RESOLVED_CACHE_SIZE:
+                _resolved_sheets.clear()
+            resolved = compiled.with_cells(cells)
+            _resolved_sheets[key] = resolved
+    return resolved, missing
@@ -0,0 +1,186 @@
+"""
+Attribution du score BCEAO : quels ratios, et quels postes derrière eux, font le score
+
+Pour chaque composante et pour le score global, la contribution de chaque
+ratio est lue dans la grille du score, sans relancer le calcul :
+
+- points obtenus (palier du barème, ou position dans la distribution du
+  secteur en notation sectorielle) et points maximum du ratio ;
+- part dans le score global : points × 100 / total de la grille ;
+- palier suivant : seuil exact à franchir et points gagnés (les paliers sont
+  des fonctions en escalier, l'écart est exact).
+
+Les postes des états financiers derrière chaque ratio viennent du graphe de
+dépendances des ratios (``RatioGraph.required_fields``).
+
+``explain_frame`` produit la même attribution pour tout un portefeuille en un
+appel vectorisé : une ligne par (entreprise, ratio noté).
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from modules.core.ratio_graph import RatioGraph
+from modules.core.scoring import ScoreGrid, SectorTables
+
+
+class RatioContribution(NamedTuple):
+    """Contribution d'un ratio au score"""
+    ratio: str
+    component: str
+    value: Optional[float]
+    points: int
+    max_points: int
+    global_points: float
+    next_threshold: Optional[float]
+    next_points: int
+    fields: Tuple[str, ...]
+
+
+class ScoreAttribution:
+    """Attribution du score d'une grille aux ratios et aux postes des états financiers"""
+
+    def __init__(self, grid: ScoreGrid, graph: RatioGraph):
+        self.grid = grid
+        self.graph = graph
+        outputs = set(graph.outputs())
+        # Postes lus par chaque ratio noté (via ses intermédiaires)
+        self.fields: Dict[str, Tuple[str, ...]] = {
+            rule.ratio: tuple(graph.required_fields([rule.ratio])) if rule.ratio in outputs else ()
+            for rule in grid.rules
+        }
+
+    def field_ratios(self) -> Dict[str, Tuple[str, ...]]:
+        """Ratios notés qui lisent chaque poste"""
+        result: Dict[str, Tuple[str, ...]] = {}
+        for ratio, fields in self.fields.items():
+            for field in fields:
+                result[field] = result.get(field, ()) + (ratio,)
+        return result
+
+    # ------------------------------------------------------------------
+    # Une analyse
+    # ------------------------------------------------------------------
+    def explain(self, ratios: Mapping, sector_tables: Optional[SectorTables] = None,
+                sector: Optional[str] = None, data: Optional[Mapping] = None) -> Dict[str, Any]:
+        """
+        Attribution du score d'une analyse
+
+        Args:
+            ratios: ratios de l'analyse
+            sector_tables, sector: notation sectorielle (voir ScoreGrid.score)
+            data: postes des états financiers, pour joindre leurs valeurs
+
+        Returns:
+            dict: 'composantes' (score, maximum et contributions par ratio),
+            'global' (score, score brut avant troncature, contributions triées)
+            et 'champs' (ratios et points qui dépendent de chaque poste)
+        """
+        tables = sector_tables.for_sector(sector) if sector_tables is not None else None
+        scale = 100 / self.grid.total_points
+
+        components = {}
+        contributions = []
+        for component, rules in self.grid.components.items():
+            entries = []
+            for rule in rules:
+                value = ratios.get(rule.ratio)
+                points = self.grid.rule_score(rule, value, tables)
+                produced = value is not None and value == value
+                if produced and not (tables and rule.ratio in tables):
+                    next_threshold, next_points = rule.next_step(rule.step(value))
+                else:
+                    next_threshold, next_points = None, 0
+                entries.append(RatioContribution(rule.ratio, component, value, points, max(rule.points),
+                                                 points * scale, next_threshold, next_points,
+                                                 self.fields[rule.ratio]))
+            components[component] = {
+                'score': sum(entry.points for entry in entries),
+                'max': sum(entry.max_points for entry in entries),
+                'contributions': entries,
+            }
+            contributions += entries
+
+        scores = {component: detail['score'] for component, detail in components.items()}
+        points_by_ratio = {entry.ratio: entry.points for entry in contributions}
+        fields = {}
+        for field, field_ratios in self.field_ratios().items():
+            fields[field] = {
+                'ratios': field_ratios,
+                'points': sum(points_by_ratio[ratio] for ratio in field_ratios),
+            }
+            if data is not None:
+                fields[field]['valeur'] = data.get(field)
+
+        return {
+            'composantes': components,
+            'global': {
+                'score': self.grid.global_score(scores),
+                'brut': sum(scores.values()) * scale,
+                'contributions': sorted(contributions, key=lambda entry: entry.global_points, reverse=True),
+            },
+            'champs': fields,
+        }
+
+    # ------------------------------------------------------------------
+    # Portefeuille
+    # ------------------------------------------------------------------
+    def explain_frame(self, ratios: pd.DataFrame, sector_tables: Optional[SectorTables] = None,
+                      sectors: Union[str, Sequence, None] = None) -> pd.DataFrame:
+        """
+        Attribution d'un portefeuille, en un appel vectorisé
+
+        Args:
+            ratios: une colonne par ratio, une ligne par entreprise/exercice
+            sector_tables, sectors: notation sectorielle (voir ScoreGrid.score_frame)
+
+        Returns:
+            pd.DataFrame: une ligne par (ligne du portefeuille, ratio noté), index
+            répété du portefeuille ; colonnes 'composante', 'ratio', 'valeur',
+            'points', 'points_max', 'contribution_globale', 'seuil_suivant' (NaN au
+            meilleur palier, pour un ratio non produit ou noté en sectoriel),
+            'points_suivants' et 'champs'
+        """
+        n_rows = len(ratios)
+        rules = self.grid.rules
+        groups = self.grid.sector_groups(n_rows, sector_tables, sectors)
+        points = self.grid.rule_points_frame(ratios, sector_tables, sectors)
+
+        values = np.empty((n_rows, len(rules)))
+        thresholds = np.empty((n_rows, len(rules)))
+        gains = np.empty((n_rows, len(rules)), dtype=np.int64)
+        for position, rule in enumerate(rules):
+            column = self.grid.rule_values(ratios, rule)
+            next_threshold, next_points = rule.next_step_column(rule.step_column(column))
+            # Pas de palier pour un ratio non produit ou positionné dans son secteur
+            stepless = np.isnan(column)
+            for tables, rows in groups:
+                if rule.ratio in tables:
+                    stepless |= rows
+            next_threshold[stepless] = np.nan
+            next_points[stepless] = 0
+            values[:, position] = column
+            thresholds[:, position] = next_threshold
+            gains[:, position] = next_points
+        points = np.column_stack(points) if rules else np.empty((n_rows, 0), dtype=np.int64)
+
+        def repeated(labels):
+            # Une étiquette par ratio, répétée pour chaque ligne du portefeuille
+            categories = list(dict.fromkeys(labels))
+            codes = np.array([categories.index(label) for label in labels], dtype=np.int32)
+            return pd.Categorical.from_codes(np.tile(codes, n_rows), categories)
+
+        return pd.DataFrame({
+            'composante': repeated([rule.component for rule in rules]),
+            'ratio': repeated([rule.ratio for rule in rules]),
+            'valeur': values.ravel(),
+            'points': points.ravel(),
+            'points_max': np.tile([max(rule.points) for rule in rules], n_rows),
+            'contribution_globale': points.ravel() * (100 / self.grid.total_points),
+            'seuil_suivant': thresholds.ravel(),
+            'points_suivants': gains.ravel(),
+            'champs': repeated([', '.join(self.fields[rule.ratio]) for rule in rules]),
+        }, index=ratios.index.repeat(len(rules)))
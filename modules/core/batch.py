@@ -0,0 +1,203 @@
+"""
+Analyse en lot de liasses Excel (sans interface Streamlit)
+
+Chaque fichier est analysé par FinancialAnalyzer.analyze_excel_file dans un
+pool de processus. Les résultats (données, ratios, scores, erreurs) sont
+consolidés dans un tableau unique exportable en CSV, Parquet ou JSON lines.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.core.analyzer import FinancialAnalyzer
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'erreur'
+STATUS_TIMEOUT = 'timeout'
+
+_worker_analyzer: Optional[FinancialAnalyzer] = None
+
+
+class FileTimeout(Exception):
+    """Levée lorsqu'un fichier dépasse le délai d'analyse autorisé"""
+
+
+def discover_files(directory: str, recursive: bool = False) -> List[str]:
+    """Liste les classeurs Excel d'un répertoire (fichiers verrou ~$ exclus)"""
+    root = Path(directory)
+    pattern = '**/*' if recursive else '*'
+    return sorted(
+        str(path) for path in root.glob(pattern)
+        if path.is_file()
+        and path.suffix.lower() in EXCEL_EXTENSIONS
+        and not path.name.startswith('~$')
+    )
+
+
+def _get_worker_analyzer() -> FinancialAnalyzer:
+    """Un analyseur par processus, réutilisé pour tous ses fichiers"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = FinancialAnalyzer()
+    return _worker_analyzer
+
+
+def _raise_timeout(signum, frame):
+    raise FileTimeout()
+
+
+@contextlib.contextmanager
+def _time_limit(seconds: Optional[float]):
+    """Interrompt le bloc après ``seconds`` secondes (SIGALRM, POSIX uniquement)"""
+    if not seconds or not hasattr(signal, 'setitimer'):
+        yield
+        return
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def analyze_file_record(file_path: str, secteur: Optional[str] = None,
+                        timeout: Optional[float] = None, verbose: bool = False) -> Dict[str, Any]:
+    """
+    Analyse un fichier et retourne un enregistrement à plat
+
+    Les colonnes sont préfixées par ``data.``, ``ratio.`` et ``score.``.
+    Une erreur ou un dépassement de délai n'interrompt jamais le lot.
+    """
+    record = {
+        'fichier': os.path.basename(file_path),
+        'chemin': file_path,
+        'statut': STATUS_OK,
+        'erreur': None,
+    }
+    start = time.perf_counter()
+
+    try:
+        quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with _time_limit(timeout), quiet:
+            result = _get_worker_analyzer().analyze_excel_file(file_path, secteur)
+
+        if result.get('success'):
+            for prefix, key in (('data', 'data'), ('ratio', 'ratios'), ('score', 'scores')):
+                for name, value in (result.get(key) or {}).items():
+                    record[f"{prefix}.{name}"] = value
+        else:
+            record['statut'] = STATUS_ERROR
+            record['erreur'] = result.get('error') or 'Erreur inconnue'
+    except FileTimeout:
+        record['statut'] = STATUS_TIMEOUT
+        record['erreur'] = f"Délai dépassé ({timeout:g} s)"
+    except Exception as e:
+        record['statut'] = STATUS_ERROR
+        record['erreur'] = str(e)
+
+    record['duree_s'] = time.perf_counter() - start
+    if timeout and record['statut'] == STATUS_OK and record['duree_s'] > timeout:
+        # Plateformes sans SIGALRM : le délai est constaté a posteriori
+        record['statut'] = STATUS_TIMEOUT
+        record['erreur'] = f"Délai dépassé ({timeout:g} s)"
+    return record
+
+
+def run_batch(files: Iterable[str], secteur: Optional[str] = None, workers: Optional[int] = None,
+              timeout: Optional[float] = None, verbose: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Analyse une liste de fichiers dans un pool de processus
+
+    Args:
+        files: Chemins des classeurs
+        secteur: Secteur d'activité appliqué à tous les fichiers
+        workers: Nombre de processus (1 = exécution dans le processus courant)
+        timeout: Délai maximal par fichier, en secondes
+
+    Returns:
+        tuple: (enregistrements dans l'ordre des fichiers, résumé de débit)
+    """
+    files = list(files)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    if workers == 1 or len(files) <= 1:
+        records = [analyze_file_record(path, secteur, timeout, verbose) for path in files]
+    else:
+        records = [None] * len(files)
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor:
+            futures = {
+                executor.submit(analyze_file_record, path, secteur, timeout, verbose): index
+                for index, path in enumerate(files)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    records[index] = future.result()
+                except Exception as e:
+                    # Processus de travail interrompu (mémoire, crash natif...)
+                    records[index] = {
+                        'fichier': os.path.basename(files[index]),
+                        'chemin': files[index],
+                        'statut': STATUS_ERROR,
+                        'erreur': f"Processus interrompu: {e}",
+                        'duree_s': float('nan'),
+                    }
+
+    return records, summarize(records, time.perf_counter() - start)
+
+
+def summarize(records: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """Résumé de débit : fichiers/s et latences p50/p95"""
+    durations = np.array([r['duree_s'] for r in records], dtype=float)
+    durations = durations[~np.isnan(durations)]
+    statuses = [r['statut'] for r in records]
+
+    return {
+        'fichiers': len(records),
+        'succes': statuses.count(STATUS_OK),
+        'erreurs': statuses.count(STATUS_ERROR),
+        'timeouts': statuses.count(STATUS_TIMEOUT),
+        'duree_totale_s': elapsed,
+        'fichiers_par_s': len(records) / elapsed if elapsed > 0 else 0.0,
+        'latence_p50_s': float(np.percentile(durations, 50)) if durations.size else 0.0,
+        'latence_p95_s': float(np.percentile(durations, 95)) if durations.size else 0.0,
+    }
+
+
+def write_results(records: List[Dict[str, Any]], output_path: str) -> str:
+    """
+    Écrit les résultats consolidés ; le format suit l'extension du fichier
+
+    Formats : .csv, .parquet (nécessite pyarrow ou fastparquet), .jsonl
+    """
+    suffix = Path(output_path).suffix.lower()
+
+    if suffix in ('.jsonl', '.json'):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=float) + '\n')
+        return output_path
+
+    frame = pd.DataFrame.from_records(records)
+    if suffix == '.csv':
+        frame.to_csv(output_path, index=False, encoding='utf-8')
+    elif suffix == '.parquet':
+        frame.to_parquet(output_path, index=False)
+    else:
+        raise ValueError(f"Format de sortie non supporté: {suffix} (csv, parquet ou jsonl)")
+    return output_path
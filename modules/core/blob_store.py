@@ -0,0 +1,270 @@
+"""
+Magasin des fichiers importés, adressé par contenu (SHA-256)
+
+Un fichier importé est écrit une seule fois sur disque, sous son empreinte ;
+l'état de session ne conserve que cette empreinte (le « handle »), et non une
+copie des octets. Plusieurs sessions qui importent le même classeur partagent
+le même fichier.
+
+Cycle de vie :
+- ``put`` écrit le contenu s'il est absent et prend une référence
+- ``release`` rend la référence ; le fichier est supprimé à la dernière
+- un balayage périodique supprime les fichiers inutilisés depuis plus de
+  ``ttl_seconds`` (sessions abandonnées sans libération)
+
+L'empreinte est celle d'AnalysisCache.hash_bytes : elle sert aussi de clé au
+cache des analyses, sans second hachage.
+
+Les compteurs de références sont propres au processus.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, MutableMapping, Optional
+
+ENV_BLOB_DIR = 'OPTIMUS_BLOB_DIR'
+ENV_BLOB_TTL = 'OPTIMUS_BLOB_TTL'
+
+BLOB_SUFFIX = '.blob'
+DEFAULT_TTL_SECONDS = 6 * 3600
+
+
+class BlobStore:
+    """Fichiers importés sur disque, nommés par leur SHA-256 et comptés par référence"""
+
+    def __init__(self, root_dir: str, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.root_dir = root_dir
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.RLock()
+        self._refcounts: Dict[str, int] = {}
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Contenu
+    # ------------------------------------------------------------------
+    @staticmethod
+    def hash_bytes(content) -> str:
+        """Empreinte SHA-256 du contenu (bytes, bytearray ou memoryview)"""
+        return hashlib.sha256(content).hexdigest()
+
+    def _blob_path(self, handle: str) -> str:
+        if not handle or not all(char in '0123456789abcdef' for char in handle):
+            raise KeyError(handle)
+        return os.path.join(self.root_dir, f"{handle}{BLOB_SUFFIX}")
+
+    def put(self, content) -> str:
+        """
+        Écrit le contenu (s'il n'est pas déjà présent) et prend une référence
+
+        Args:
+            content: bytes, bytearray ou memoryview (``uploaded_file.getbuffer()``)
+
+        Returns:
+            str: handle (SHA-256) à conserver en session
+        """
+        handle = self.hash_bytes(content)
+        path = self._blob_path(handle)
+
+        with self._lock:
+            if os.path.exists(path):
+                os.utime(path)
+            else:
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            self._refcounts[handle] = self._refcounts.get(handle, 0) + 1
+        return handle
+
+    def acquire(self, handle: str) -> bool:
+        """Prend une référence supplémentaire sur un fichier existant"""
+        with self._lock:
+            if not self.exists(handle):
+                return False
+            self._refcounts[handle] = self._refcounts.get(handle, 0) + 1
+            return True
+
+    def release(self, handle: str):
+        """Rend une référence ; le fichier est supprimé à la dernière"""
+        with self._lock:
+            count = self._refcounts.get(handle, 0) - 1
+            if count > 0:
+                self._refcounts[handle] = count
+                return
+            self._refcounts.pop(handle, None)
+            self._remove(handle)
+
+    def refcount(self, handle: str) -> int:
+        """Nombre de références détenues dans ce processus"""
+        with self._lock:
+            return self._refcounts.get(handle, 0)
+
+    def exists(self, handle: str) -> bool:
+        try:
+            return os.path.exists(self._blob_path(handle))
+        except KeyError:
+            return False
+
+    def path(self, handle: str) -> str:
+        """
+        Chemin du fichier, utilisable directement par les chargeurs
+
+        Chaque accès repousse l'expiration du fichier.
+
+        Raises:
+            KeyError: si le fichier est inconnu ou a expiré
+        """
+        path = self._blob_path(handle)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            raise KeyError(handle) from None
+        return path
+
+    def size(self, handle: str) -> int:
+        """Taille du fichier en octets (KeyError s'il est absent)"""
+        try:
+            return os.path.getsize(self._blob_path(handle))
+        except FileNotFoundError:
+            raise KeyError(handle) from None
+
+    def read(self, handle: str) -> bytes:
+        """Contenu complet du fichier"""
+        with open(self.path(handle), 'rb') as f:
+            return f.read()
+
+    def _remove(self, handle: str):
+        try:
+            os.remove(self._blob_path(handle))
+        except (OSError, KeyError):
+            pass
+
+    # ------------------------------------------------------------------
+    # Expiration
+    # ------------------------------------------------------------------
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Supprime les fichiers inutilisés depuis plus de ttl_seconds
+
+        Les références encore détenues sur un fichier expiré sont abandonnées :
+        la session correspondante est inactive depuis plus longtemps que le TTL.
+
+        Returns:
+            int: nombre de fichiers supprimés
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            for name in os.listdir(self.root_dir):
+                path = os.path.join(self.root_dir, name)
+                try:
+                    expired = now - os.path.getmtime(path) > self.ttl_seconds
+                except OSError:
+                    continue
+                if not expired:
+                    continue
+                if name.endswith(BLOB_SUFFIX):
+                    self._refcounts.pop(name[:-len(BLOB_SUFFIX)], None)
+                elif not name.endswith('.tmp'):
+                    continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def start_sweeper(self, interval_seconds: Optional[float] = None):
+        """Lance le balayage périodique dans un thread démon (une seule fois)"""
+        interval = interval_seconds or max(60.0, self.ttl_seconds / 4)
+        with self._lock:
+            if self._sweeper is not None and self._sweeper.is_alive():
+                return
+            self._stop.clear()
+
+            def run():
+                while not self._stop.wait(interval):
+                    removed = self.sweep()
+                    if removed:
+                        print(f"🧹 {removed} fichier(s) importé(s) expiré(s) supprimé(s)")
+
+            self._sweeper = threading.Thread(target=run, name='blob-sweeper', daemon=True)
+            self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Arrête le balayage périodique"""
+        self._stop.set()
+        sweeper = self._sweeper
+        if sweeper is not None:
+            sweeper.join()
+        self._sweeper = None
+
+
+_default_store: Optional[BlobStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """
+    Magasin partagé par le processus, balayage périodique démarré
+
+    Répertoire : OPTIMUS_BLOB_DIR (par défaut un sous-dossier du répertoire
+    temporaire) ; OPTIMUS_BLOB_TTL fixe la durée de vie en secondes.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            root_dir = (os.environ.get(ENV_BLOB_DIR) or
+                        os.path.join(tempfile.gettempdir(), 'optimus_uploads'))
+            ttl = float(os.environ.get(ENV_BLOB_TTL, DEFAULT_TTL_SECONDS))
+            _default_store = BlobStore(root_dir, ttl_seconds=ttl)
+            _default_store.start_sweeper()
+        return _default_store
+
+
+# ----------------------------------------------------------------------
+# Handles en état de session
+# ----------------------------------------------------------------------
+def store_upload(session_state: MutableMapping, key: str, content,
+                 store: Optional[BlobStore] = None) -> str:
+    """
+    Écrit un fichier importé dans le magasin et conserve son handle en session
+
+    Le handle précédemment conservé sous ``key`` est libéré ; réimporter le
+    même contenu sous la même clé ne prend pas de référence supplémentaire.
+    """
+    store = store or get_blob_store()
+    previous = session_state.get(key)
+    handle = store.put(content)
+    if previous:
+        # Même contenu : la référence prise par put remplace la précédente
+        store.release(previous)
+    session_state[key] = handle
+    return handle
+
+
+def release_upload(session_state: MutableMapping, key: str, store: Optional[BlobStore] = None):
+    """Libère le fichier référencé par la session et retire le handle"""
+    handle = session_state.get(key)
+    if key in session_state:
+        del session_state[key]
+    if handle:
+        (store or get_blob_store()).release(handle)
+
+
+def upload_path(session_state: MutableMapping, key: str, store: Optional[BlobStore] = None) -> Optional[str]:
+    """Chemin du fichier référencé par la session, ou None (aucun fichier ou expiré)"""
+    handle = session_state.get(key)
+    if not handle:
+        return None
+    try:
+        return (store or get_blob_store()).path(handle)
+    except KeyError:
+        return None
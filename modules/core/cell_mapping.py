@@ -0,0 +1,356 @@
+"""
+Schéma unique de correspondance cellules -> postes du modèle BCEAO
+
+Chaque poste est déclaré une seule fois (feuille, cellule, champ, convention
+de signe). Le schéma est compilé à l'import en tableaux d'indices NumPy par
+feuille : l'extraction d'une feuille est alors une seule indexation vectorisée
+de sa grille, partagée par FinancialAnalyzer et ExcelDataLoader.
+"""
+
+import re
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.core.xlsx_stream import split_cell_ref
+
+# Convention de signe du modèle (colonne C du compte de résultat)
+SIGN_LIBRE = 0      # signe tel que saisi (soldes, variations, postes du bilan)
+SIGN_POSITIF = 1    # produit : toujours positif
+SIGN_NEGATIF = -1   # charge : toujours négative
+
+# Exercices : N en colonne de référence, N-1 et N-2 dans les colonnes suivantes
+PERIOD_LABELS = ('N', 'N-1', 'N-2')
+MAX_PERIOD_OFFSET = len(PERIOD_LABELS) - 1
+HEADER_ROWS = (1, 2, 3, 4)
+
+
+class CellField(NamedTuple):
+    """Déclaration d'un poste : feuille, cellule, champ, convention de signe et code REF SYSCOHADA"""
+    sheet: str
+    cell: str
+    field: str
+    sign: int = SIGN_LIBRE
+    ref: str = ''
+
+
+TEMPLATE_FIELDS: Tuple[CellField, ...] = (
+    # === BILAN - ACTIF (colonne E, net exercice N) ===
+    CellField('Bilan', 'E5', 'immobilisations_incorporelles', ref='AD'),
+    CellField('Bilan', 'E6', 'frais_dev_prospection', ref='AE'),
+    CellField('Bilan', 'E7', 'brevets_licences', ref='AF'),
+    CellField('Bilan', 'E8', 'fond_commercial', ref='AG'),
+    CellField('Bilan', 'E9', 'autres_immob_incorp', ref='AH'),
+    CellField('Bilan', 'E10', 'immobilisations_corporelles', ref='AI'),
+    CellField('Bilan', 'E11', 'terrains', ref='AJ'),
+    CellField('Bilan', 'E12', 'batiments', ref='AK'),
+    CellField('Bilan', 'E13', 'agencements', ref='AL'),
+    CellField('Bilan', 'E14', 'materiel_mobilier', ref='AM'),
+    CellField('Bilan', 'E15', 'materiel_transport', ref='AN'),
+    CellField('Bilan', 'E16', 'avances_immobilisations', ref='AP'),
+    CellField('Bilan', 'E18', 'immobilisations_financieres', ref='AQ'),
+    CellField('Bilan', 'E19', 'titres_participation', ref='AR'),
+    CellField('Bilan', 'E20', 'autres_immob_financieres', ref='AS'),
+    CellField('Bilan', 'E21', 'immobilisations_nettes', ref='AZ'),
+    CellField('Bilan', 'E22', 'actif_circulant_hao', ref='BA'),
+    CellField('Bilan', 'E23', 'stocks', ref='BB'),
+    CellField('Bilan', 'E24', 'creances_et_emplois', ref='BG'),
+    CellField('Bilan', 'E25', 'fournisseurs_avances_versees', ref='BH'),
+    CellField('Bilan', 'E26', 'creances_clients', ref='BI'),
+    CellField('Bilan', 'E27', 'autres_creances', ref='BJ'),
+    CellField('Bilan', 'E28', 'total_actif_circulant', ref='BK'),
+    CellField('Bilan', 'E30', 'titres_placement', ref='BQ'),
+    CellField('Bilan', 'E31', 'valeurs_encaisser', ref='BR'),
+    CellField('Bilan', 'E32', 'banques_caisses', ref='BS'),
+    CellField('Bilan', 'E33', 'tresorerie', ref='BT'),
+    CellField('Bilan', 'E34', 'ecart_conversion_actif', ref='BU'),
+    CellField('Bilan', 'E35', 'total_actif', ref='BZ'),
+
+    # === BILAN - PASSIF (colonne I, net exercice N) ===
+    CellField('Bilan', 'I5', 'capital', ref='CA'),
+    CellField('Bilan', 'I6', 'actionnaires_capital_non_appele', ref='CB'),
+    CellField('Bilan', 'I7', 'primes_capital', ref='CD'),
+    CellField('Bilan', 'I8', 'ecarts_reevaluation', ref='CE'),
+    CellField('Bilan', 'I9', 'reserves_indisponibles', ref='CF'),
+    CellField('Bilan', 'I10', 'reserves_libres', ref='CG'),
+    CellField('Bilan', 'I11', 'report_nouveau', ref='CH'),
+    CellField('Bilan', 'I12', 'resultat_net_bilan', ref='CJ'),
+    CellField('Bilan', 'I13', 'subventions_investissement', ref='CL'),
+    CellField('Bilan', 'I14', 'provisions_reglementees', ref='CM'),
+    CellField('Bilan', 'I15', 'capitaux_propres', ref='CP'),
+    CellField('Bilan', 'I17', 'emprunts_dettes_financieres', ref='DA'),
+    CellField('Bilan', 'I18', 'dettes_location_acquisition', ref='DB'),
+    CellField('Bilan', 'I19', 'provisions_financieres', ref='DC'),
+    CellField('Bilan', 'I20', 'dettes_financieres', ref='DD'),
+    CellField('Bilan', 'I21', 'ressources_stables', ref='DF'),
+    CellField('Bilan', 'I22', 'dettes_circulantes_hao', ref='DH'),
+    CellField('Bilan', 'I23', 'clients_avances_recues', ref='DI'),
+    CellField('Bilan', 'I24', 'fournisseurs_exploitation', ref='DJ'),
+    CellField('Bilan', 'I25', 'dettes_sociales_fiscales', ref='DK'),
+    CellField('Bilan', 'I26', 'autres_dettes', ref='DM'),
+    CellField('Bilan', 'I27', 'provisions_risques_ct', ref='DN'),
+    CellField('Bilan', 'I28', 'dettes_court_terme', ref='DP'),
+    CellField('Bilan', 'I30', 'banques_credits_escompte', ref='DQ'),
+    CellField('Bilan', 'I31', 'banques_credits_tresorerie', ref='DR'),
+    CellField('Bilan', 'I33', 'tresorerie_passif', ref='DT'),
+    CellField('Bilan', 'I34', 'ecart_conversion_passif', ref='DV'),
+    CellField('Bilan', 'I35', 'total_passif', ref='DZ'),
+
+    # === COMPTE DE RÉSULTAT (colonne E, exercice N) ===
+    CellField('CR', 'E5', 'ventes_marchandises', SIGN_POSITIF, ref='TA'),
+    CellField('CR', 'E6', 'achats_marchandises', SIGN_NEGATIF, ref='RA'),
+    CellField('CR', 'E7', 'variation_stocks_marchandises', ref='RB'),
+    CellField('CR', 'E8', 'marge_commerciale', ref='XA'),
+    CellField('CR', 'E9', 'ventes_produits_fabriques', SIGN_POSITIF, ref='TB'),
+    CellField('CR', 'E10', 'travaux_services_vendus', SIGN_POSITIF, ref='TC'),
+    CellField('CR', 'E11', 'produits_accessoires', SIGN_POSITIF, ref='TD'),
+    CellField('CR', 'E12', 'chiffre_affaires', ref='XB'),
+    CellField('CR', 'E13', 'production_stockee', ref='TE'),
+    CellField('CR', 'E14', 'production_immobilisee', SIGN_POSITIF, ref='TF'),
+    CellField('CR', 'E15', 'subventions_exploitation', SIGN_POSITIF, ref='TG'),
+    CellField('CR', 'E16', 'autres_produits', SIGN_POSITIF, ref='TH'),
+    CellField('CR', 'E17', 'transferts_charges_exploitation', SIGN_POSITIF, ref='TI'),
+    CellField('CR', 'E18', 'achats_matieres_premieres', SIGN_NEGATIF, ref='RC'),
+    CellField('CR', 'E19', 'variation_stocks_mp', ref='RD'),
+    CellField('CR', 'E20', 'autres_achats', SIGN_NEGATIF, ref='RE'),
+    CellField('CR', 'E21', 'variation_stocks_autres', ref='RF'),
+    CellField('CR', 'E22', 'transports', SIGN_NEGATIF, ref='RG'),
+    CellField('CR', 'E23', 'services_exterieurs', SIGN_NEGATIF, ref='RH'),
+    CellField('CR', 'E24', 'impots_taxes', SIGN_NEGATIF, ref='RI'),
+    CellField('CR', 'E25', 'autres_charges', SIGN_NEGATIF, ref='RJ'),
+    CellField('CR', 'E26', 'valeur_ajoutee', ref='XC'),
+    CellField('CR', 'E27', 'charges_personnel', SIGN_NEGATIF, ref='RK'),
+    CellField('CR', 'E28', 'excedent_brut', ref='XD'),
+    CellField('CR', 'E29', 'reprises_amortissements', SIGN_POSITIF, ref='TJ'),
+    CellField('CR', 'E30', 'dotations_amortissements', SIGN_NEGATIF, ref='RL'),
+    CellField('CR', 'E31', 'resultat_exploitation', ref='XE'),
+    CellField('CR', 'E32', 'revenus_financiers', SIGN_POSITIF, ref='TK'),
+    CellField('CR', 'E33', 'reprises_provisions_financieres', SIGN_POSITIF, ref='TL'),
+    CellField('CR', 'E34', 'transferts_charges_financieres', SIGN_POSITIF, ref='TM'),
+    CellField('CR', 'E35', 'frais_financiers', SIGN_NEGATIF, ref='RM'),
+    CellField('CR', 'E36', 'dotations_provisions_financieres', SIGN_NEGATIF, ref='RN'),
+    CellField('CR', 'E37', 'resultat_financier', ref='XF'),
+    CellField('CR', 'E38', 'resultat_activites_ordinaires', ref='XG'),
+    CellField('CR', 'E39', 'produits_cessions_immob', SIGN_POSITIF, ref='TN'),
+    CellField('CR', 'E40', 'autres_produits_hao', SIGN_POSITIF, ref='TO'),
+    CellField('CR', 'E41', 'valeurs_comptables_cessions', SIGN_NEGATIF, ref='RO'),
+    CellField('CR', 'E42', 'autres_charges_hao', SIGN_NEGATIF, ref='RP'),
+    CellField('CR', 'E43', 'resultat_hao', ref='XH'),
+    CellField('CR', 'E44', 'participation_travailleurs', SIGN_NEGATIF, ref='RQ'),
+    CellField('CR', 'E45', 'impots_resultat', SIGN_NEGATIF, ref='RS'),
+    CellField('CR', 'E46', 'resultat_net_cr', ref='XI'),
+
+    # === TABLEAU DES FLUX DE TRÉSORERIE (colonne E, exercice N) ===
+    CellField('TFT', 'E3', 'tresorerie_ouverture', ref='ZA'),
+    CellField('TFT', 'E5', 'cafg', ref='FA'),
+    CellField('TFT', 'E11', 'flux_activites_operationnelles', ref='ZB'),
+    CellField('TFT', 'E18', 'flux_activites_investissement', ref='ZC'),
+    CellField('TFT', 'E24', 'flux_capitaux_propres', ref='ZD'),
+    CellField('TFT', 'E29', 'flux_capitaux_etrangers', ref='ZE'),
+    CellField('TFT', 'E30', 'flux_activites_financement', ref='ZF'),
+    CellField('TFT', 'E31', 'variation_tresorerie', ref='ZG'),
+    CellField('TFT', 'E32', 'tresorerie_cloture', ref='ZH'),
+)
+
+
+class CompiledSheet:
+    """Postes d'une feuille compilés en tableaux d'indices (base 0)"""
+
+    def __init__(self, sheet: str, fields: Iterable[CellField]):
+        fields = list(fields)
+        self.sheet = sheet
+        self.fields = tuple(f.field for f in fields)
+        self.cells = tuple(f.cell for f in fields)
+        self.refs = tuple(f.ref for f in fields)
+
+        positions = [split_cell_ref(f.cell) for f in fields]
+        self.rows = np.array([row - 1 for row, _ in positions], dtype=np.intp)
+        self.cols = np.array([col - 1 for _, col in positions], dtype=np.intp)
+        self.signs = np.array([f.sign for f in fields], dtype=np.int8)
+
+        # Étendue minimale de grille couvrant tous les postes
+        self.shape = (int(self.rows.max()) + 1, int(self.cols.max()) + 1) if fields else (0, 0)
+        self.row_numbers = tuple(sorted({row for row, _ in positions}))
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def with_cells(self, cells: Sequence[str]) -> 'CompiledSheet':
+        """Même feuille compilée avec d'autres adresses (modèle décalé)"""
+        return CompiledSheet(self.sheet, [
+            CellField(self.sheet, cell, field, int(sign), ref)
+            for cell, field, sign, ref in zip(cells, self.fields, self.signs, self.refs)
+        ])
+
+    def take(self, grid: np.ndarray, col_offsets: Sequence[int] = (0,)) -> np.ndarray:
+        """
+        Valeurs brutes des postes (indexation vectorisée, hors limites -> vide)
+
+        Args:
+            col_offsets: Décalages de colonne à lire (0 = exercice N, 1 = N-1...)
+
+        Returns:
+            numpy.ndarray: une ligne par décalage, une colonne par poste
+        """
+        offsets = np.asarray(col_offsets, dtype=np.intp)
+        rows = np.broadcast_to(self.rows, (len(offsets), len(self.rows)))
+        cols = self.cols[np.newaxis, :] + offsets[:, np.newaxis]
+
+        in_bounds = (rows < grid.shape[0]) & (cols < grid.shape[1])
+        if in_bounds.all():
+            return grid[rows, cols]
+
+        empty = None if grid.dtype == object else np.nan
+        raw = np.full(rows.shape, empty, dtype=grid.dtype)
+        raw[in_bounds] = grid[rows[in_bounds], cols[in_bounds]]
+        return raw
+
+    def extract(self, grid: np.ndarray, coerce: Optional[Callable[[object], float]] = None,
+                apply_signs: bool = False) -> Dict[str, float]:
+        """
+        Extrait les postes de la feuille depuis sa grille
+
+        Args:
+            grid: Grille de la feuille (float64, ou objets bruts avec ``coerce``)
+            coerce: Conversion d'une valeur brute en float (grilles d'objets)
+            apply_signs: Imposer la convention de signe (charges négatives,
+                produits positifs) quelle que soit la saisie
+
+        Returns:
+            dict: {champ: valeur}, 0.0 pour une cellule vide ou absente
+        """
+        return self.extract_periods(grid, (0,), coerce, apply_signs)[0]
+
+    def extract_periods(self, grid: np.ndarray, col_offsets: Sequence[int],
+                        coerce: Optional[Callable[[object], float]] = None,
+                        apply_signs: bool = False) -> Dict[int, Dict[str, float]]:
+        """
+        Extrait les postes de plusieurs exercices en une seule indexation
+
+        Les exercices antérieurs occupent les colonnes adjacentes à droite
+        (Bilan : E/F à l'actif, I/J au passif ; CR et TFT : E/F).
+
+        Returns:
+            dict: {décalage: {champ: valeur}}
+        """
+        raw = self.take(grid, col_offsets)
+        if coerce is None:
+            values = raw.astype(np.float64)
+        else:
+            values = np.fromiter((coerce(value) for value in raw.ravel()),
+                                 dtype=np.float64, count=raw.size).reshape(raw.shape)
+        values[np.isnan(values)] = 0.0
+
+        if apply_signs:
+            signed = self.signs != SIGN_LIBRE
+            values[:, signed] = np.abs(values[:, signed]) * self.signs[signed]
+
+        return {
+            int(offset): dict(zip(self.fields, row.tolist()))
+            for offset, row in zip(col_offsets, values)
+        }
+
+    def detect_period_offsets(self, grid: np.ndarray, max_offset: int = MAX_PERIOD_OFFSET) -> List[int]:
+        """
+        Décalages des exercices antérieurs annoncés dans les en-têtes de la feuille
+
+        Une colonne située ``k`` colonnes à droite d'une colonne de postes est un
+        exercice N-k si l'une de ses cellules d'en-tête mentionne « N-k ».
+        """
+        header = grid[:min(len(HEADER_ROWS), grid.shape[0])]
+        offsets = []
+        for offset in range(1, max_offset + 1):
+            pattern = re.compile(rf'N\s*-\s*{offset}(?!\d)')
+            for base_col in np.unique(self.cols):
+                col = int(base_col) + offset
+                if col < header.shape[1] and any(
+                        isinstance(value, str) and pattern.search(value) for value in header[:, col]):
+                    offsets.append(offset)
+                    break
+        return offsets
+
+
+class CellMappingSchema:
+    """Schéma compilé : accès par feuille et par champ"""
+
+    def __init__(self, fields: Iterable[CellField]):
+        self.fields: Tuple[CellField, ...] = tuple(fields)
+        self._by_field: Dict[str, CellField] = {}
+        by_sheet: Dict[str, List[CellField]] = {}
+
+        for cell_field in self.fields:
+            if cell_field.field in self._by_field:
+                raise ValueError(f"Champ déclaré deux fois dans le schéma: {cell_field.field}")
+            self._by_field[cell_field.field] = cell_field
+            by_sheet.setdefault(cell_field.sheet, []).append(cell_field)
+
+        self.sheets: Dict[str, CompiledSheet] = {
+            sheet: CompiledSheet(sheet, sheet_fields) for sheet, sheet_fields in by_sheet.items()
+        }
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self.sheets)
+
+    def sheet(self, sheet_name: str) -> CompiledSheet:
+        return self.sheets[sheet_name]
+
+    def field(self, field_name: str) -> CellField:
+        return self._by_field[field_name]
+
+    def location(self, field_name: str) -> Tuple[str, str]:
+        """(feuille, cellule) d'un champ"""
+        cell_field = self._by_field[field_name]
+        return cell_field.sheet, cell_field.cell
+
+    def compile_subset(self, sheet_name: str, aliases: Dict[str, str]) -> CompiledSheet:
+        """
+        Compile une sélection de champs d'une feuille sous d'autres noms
+
+        Args:
+            aliases: {nom retourné: champ du schéma}
+        """
+        fields = []
+        for alias, field_name in aliases.items():
+            cell_field = self._by_field[field_name]
+            if cell_field.sheet != sheet_name:
+                raise ValueError(f"Le champ {field_name} n'appartient pas à la feuille {sheet_name}")
+            fields.append(cell_field._replace(field=alias))
+        return CompiledSheet(sheet_name, fields)
+
+    def cells_by_sheet(self) -> Dict[str, Tuple[str, ...]]:
+        """Adresses à lire par feuille (lecture en flux XLSX)"""
+        return {sheet: compiled.cells for sheet, compiled in self.sheets.items()}
+
+
+def read_sheet_grid(workbook, compiled: CompiledSheet, extra_columns: int = 0,
+                    row_margin: int = 0) -> np.ndarray:
+    """
+    Lit l'étendue utile d'une feuille en grille d'objets bruts
+
+    Toutes les lignes jusqu'au dernier poste sont lues (en-têtes et libellés
+    compris) : la grille sert aussi à la détection des exercices et à
+    l'empreinte du modèle. Accepte un classeur en flux (StreamedWorkbook) ou openpyxl.
+
+    Args:
+        extra_columns: Colonnes supplémentaires à droite (exercices antérieurs)
+        row_margin: Lignes supplémentaires sous le dernier poste (modèles décalés)
+
+    Raises:
+        KeyError: si la feuille n'existe pas
+    """
+    n_rows, n_cols = compiled.shape
+    shape = (n_rows + row_margin, n_cols + extra_columns)
+
+    if hasattr(workbook, 'read_grid'):
+        return workbook.read_grid(compiled.sheet, shape)
+
+    sheet = workbook[compiled.sheet]
+    grid = np.full(shape, None, dtype=object)
+    for row_index, row in enumerate(sheet.iter_rows(min_row=1, max_row=shape[0], max_col=shape[1],
+                                                   values_only=True)):
+        grid[row_index, :len(row)] = row
+    return grid
+
+
+TEMPLATE_SCHEMA = CellMappingSchema(TEMPLATE_FIELDS)
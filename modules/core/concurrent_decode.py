@@ -0,0 +1,111 @@
+"""
+Décodage concurrent des feuilles d'un classeur (Bilan, CR, TFT)
+
+Mode optionnel : le décodage reste séquentiel par défaut. En mode 'thread'
+ou 'process', chaque feuille est décodée dans un pool borné partagé par le
+processus, puis les résultats sont fusionnés. Le mode par défaut peut être
+fixé par la variable d'environnement OPTIMUS_DECODE_MODE.
+
+Le mode 'process' contourne le GIL pour les feuilles volumineuses ; la
+fonction de décodage doit alors être sérialisable (fonction de module ou
+functools.partial d'une fonction de module).
+"""
+
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, Iterable, Optional, TypeVar
+
+DECODE_SEQUENTIAL = 'sequential'
+DECODE_THREAD = 'thread'
+DECODE_PROCESS = 'process'
+DECODE_MODES = (DECODE_SEQUENTIAL, DECODE_THREAD, DECODE_PROCESS)
+
+ENV_DECODE_MODE = 'OPTIMUS_DECODE_MODE'
+
+# Une tâche par état financier
+MAX_DECODE_WORKERS = 3
+
+T = TypeVar('T')
+
+_executors: Dict[str, Executor] = {}
+_executors_lock = threading.Lock()
+
+
+def resolve_decode_mode(mode: Optional[str] = None) -> str:
+    """
+    Mode de décodage effectif (None : variable d'environnement, sinon séquentiel)
+
+    Raises:
+        ValueError: si le mode n'est pas reconnu
+    """
+    if mode is None:
+        mode = os.environ.get(ENV_DECODE_MODE) or DECODE_SEQUENTIAL
+    mode = mode.lower()
+    if mode not in DECODE_MODES:
+        raise ValueError(f"Mode de décodage inconnu: {mode} ({', '.join(DECODE_MODES)})")
+    return mode
+
+
+def get_executor(mode: str) -> Executor:
+    """Pool borné partagé par le processus, créé au premier usage"""
+    with _executors_lock:
+        executor = _executors.get(mode)
+        if executor is None:
+            if mode == DECODE_PROCESS:
+                # 'spawn' : l'application Streamlit est multi-thread, fork y est risqué
+                executor = ProcessPoolExecutor(max_workers=MAX_DECODE_WORKERS, mp_context=get_context('spawn'))
+            else:
+                executor = ThreadPoolExecutor(max_workers=MAX_DECODE_WORKERS, thread_name_prefix='decode')
+            _executors[mode] = executor
+        return executor
+
+
+def shutdown_executors():
+    """Arrête les pools de décodage (tests, fin de traitement en lot)"""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+
+def decode_sheets(decode: Callable[[str], T], sheet_names: Iterable[str], mode: Optional[str] = None,
+                  required: Iterable[str] = ()) -> Dict[str, T]:
+    """
+    Décode plusieurs feuilles, séquentiellement ou dans un pool
+
+    Args:
+        decode: Fonction feuille -> résultat ; lève KeyError si la feuille est absente
+        sheet_names: Feuilles à décoder
+        mode: 'sequential', 'thread' ou 'process' (None : mode par défaut)
+        required: Feuilles obligatoires ; leur absence propage le KeyError
+
+    Returns:
+        dict: {feuille: résultat} pour les feuilles présentes, dans l'ordre demandé
+    """
+    sheet_names = list(sheet_names)
+    required = set(required)
+    mode = resolve_decode_mode(mode)
+
+    if mode == DECODE_SEQUENTIAL or len(sheet_names) <= 1:
+        outcomes = {}
+        for sheet_name in sheet_names:
+            try:
+                outcomes[sheet_name] = decode(sheet_name)
+            except KeyError:
+                if sheet_name in required:
+                    raise
+        return outcomes
+
+    executor = get_executor(mode)
+    futures = {sheet_name: executor.submit(decode, sheet_name) for sheet_name in sheet_names}
+    outcomes = {}
+    for sheet_name, future in futures.items():
+        try:
+            outcomes[sheet_name] = future.result()
+        except KeyError:
+            if sheet_name in required:
+                raise
+    return outcomes
@@ -4,121 +4,262 @@ Module de chargement Excel avec extraction précise par cellules
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
-from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from functools import partial
+
+from modules.core.sources import describe_source, detach_source, is_path
+from modules.core.readers import SheetReader, open_sheet_reader, supported_extensions
+from modules.core.concurrent_decode import DECODE_SEQUENTIAL, DECODE_THREAD, decode_sheets, resolve_decode_mode
+from modules.core.cell_mapping import TEMPLATE_SCHEMA
+from modules.core.anchor_index import SheetAnchorIndex, resolve_compiled
+from modules.core.numeric_coercion import CoercedGrid, coerce_grid
+
+# Noms des champs du chargeur -> champs du schéma commun (modules.core.cell_mapping)
+LOADER_BILAN_FIELDS = {
+    # === ACTIF ===
+    'immobilisations_incorporelles': 'immobilisations_incorporelles',
+    'immobilisations_corporelles': 'immobilisations_corporelles',
+    'immobilisations_financieres': 'immobilisations_financieres',
+    'total_actif_immobilise': 'immobilisations_nettes',
+    'stocks_et_encours': 'stocks',
+    'creances_et_emplois': 'creances_et_emplois',
+    'clients': 'creances_clients',
+    'autres_creances': 'autres_creances',
+    'total_actif_circulant': 'total_actif_circulant',
+    'titres_de_placement': 'titres_placement',
+    'valeurs_a_encaisser': 'valeurs_encaisser',
+    'banques_caisses': 'banques_caisses',
+    'total_tresorerie_actif': 'tresorerie',
+    'ecart_conversion_actif': 'ecart_conversion_actif',
+    'total_general_actif': 'total_actif',
+    
+    # === PASSIF ===
+    'capital': 'capital',
+    'reserves_indisponibles': 'reserves_indisponibles',
+    'reserves_libres': 'reserves_libres',
+    'report_nouveau': 'report_nouveau',
+    'resultat_net_exercice': 'resultat_net_bilan',
+    'total_capitaux_propres': 'capitaux_propres',
+    'emprunts_dettes_financieres': 'emprunts_dettes_financieres',
+    'dettes_location': 'dettes_location_acquisition',
+    'provisions_financieres': 'provisions_financieres',
+    'total_dettes_financieres': 'dettes_financieres',
+    'total_ressources_stables': 'ressources_stables',
+    'clients_avances_recues': 'clients_avances_recues',
+    'fournisseurs_exploitation': 'fournisseurs_exploitation',
+    'dettes_sociales_fiscales': 'dettes_sociales_fiscales',
+    'autres_dettes': 'autres_dettes',
+    'provisions_court_terme': 'provisions_risques_ct',
+    'total_passif_circulant': 'dettes_court_terme',
+    'banques_credits_escompte': 'banques_credits_escompte',
+    'banques_credits_tresorerie': 'banques_credits_tresorerie',
+    'total_tresorerie_passif': 'tresorerie_passif',
+    'ecart_conversion_passif': 'ecart_conversion_passif',
+    'total_general_passif': 'total_passif'
+}
+
+LOADER_CR_FIELDS = {
+    'chiffre_affaires': 'chiffre_affaires',
+    'resultat_net': 'resultat_net_cr',
+    'marge_commerciale': 'marge_commerciale',
+    'valeur_ajoutee': 'valeur_ajoutee',
+    'excedent_brut_exploitation': 'excedent_brut',
+    'resultat_exploitation': 'resultat_exploitation'
+}
+
+LOADER_TFT_FIELDS = {
+    'tresorerie_ouverture': 'tresorerie_ouverture',
+    'flux_activites_operationnelles': 'flux_activites_operationnelles',
+    'flux_activites_investissement': 'flux_activites_investissement',
+    'flux_activites_financement': 'flux_activites_financement',
+    'tresorerie_cloture': 'tresorerie_cloture'
+}
+
+# Compilés une fois : une indexation vectorisée par feuille
+_COMPILED_BILAN = TEMPLATE_SCHEMA.compile_subset('Bilan', LOADER_BILAN_FIELDS)
+_COMPILED_CR = TEMPLATE_SCHEMA.compile_subset('CR', LOADER_CR_FIELDS)
+_COMPILED_TFT = TEMPLATE_SCHEMA.compile_subset('TFT', LOADER_TFT_FIELDS)
+
+
+def decode_sheet_grid(source, sheet_name: str) -> Tuple[np.ndarray, SheetAnchorIndex, List[str]]:
+    """
+    Décode une feuille en grille float64, index d'ancrage et cellules texte converties
+
+    Fonction de module : tâche du décodage concurrent (thread ou processus).
+    Lève KeyError si la feuille est absente.
+    """
+    with open_sheet_reader(source) as reader:
+        df = sheet_frame(reader, sheet_name)
+    numeric = SheetGridCache._to_numeric_grid(df)
+    return numeric.values, SheetGridCache._build_anchor_index(df), numeric.coerced_cells()
+
+
+def sheet_frame(reader: SheetReader, sheet_name: str) -> pd.DataFrame:
+    """Feuille entière en DataFrame sans en-tête, colonnes typées comme pd.read_excel"""
+    return pd.DataFrame(reader.read_sheet(sheet_name)).infer_objects()
+
+
+class SheetGridCache:
+    """
+    Cache des feuilles d'un classeur pour un chargement
+
+    Chaque feuille est décodée une seule fois en grille numérique dense
+    (float64, NaN pour les cellules vides ou non numériques) puis partagée
+    par toutes les extractions. Les montants saisis en texte sont convertis
+    dans la même passe (numeric_coercion) et leurs adresses conservées dans
+    ``coerced``, de même que l'index des codes REF et libellés.
+    """
+
+    def __init__(self, excel_file):
+        # SheetReader du registre (readers.py) ou pd.ExcelFile
+        self.excel_file = excel_file
+        self.sheet_names = list(excel_file.sheet_names)
+        self.decode_counts: Dict[str, int] = {}
+        self.coerced: Dict[str, List[str]] = {}
+        self._grids: Dict[str, np.ndarray] = {}
+        self._anchors: Dict[str, SheetAnchorIndex] = {}
+
+    def __contains__(self, sheet_name: str) -> bool:
+        return sheet_name in self.sheet_names
+
+    def get(self, sheet_name: str) -> np.ndarray:
+        """Retourne la grille de la feuille, décodée au premier accès"""
+        grid = self._grids.get(sheet_name)
+        if grid is None:
+            if isinstance(self.excel_file, SheetReader):
+                df = sheet_frame(self.excel_file, sheet_name)
+            else:
+                df = pd.read_excel(self.excel_file, sheet_name=sheet_name, header=None)
+            numeric = self._to_numeric_grid(df)
+            grid = numeric.values
+            self._grids[sheet_name] = grid
+            self.coerced[sheet_name] = numeric.coerced_cells()
+            self._anchors[sheet_name] = self._build_anchor_index(df)
+            self.decode_counts[sheet_name] = self.decode_counts.get(sheet_name, 0) + 1
+        return grid
+
+    def anchors(self, sheet_name: str) -> SheetAnchorIndex:
+        """Index REF / libellés -> lignes de la feuille, construit au décodage"""
+        self.get(sheet_name)
+        return self._anchors[sheet_name]
+
+    def prefetch(self, sheet_names: Iterable[str], source, mode: Optional[str] = None):
+        """
+        Décode d'avance plusieurs feuilles, en parallèle selon ``mode``
+
+        Chaque tâche relit le classeur depuis ``source`` (chemin ou bytes) :
+        l'ExcelFile partagé n'est pas sûr entre threads.
+        """
+        pending = [name for name in sheet_names if name in self.sheet_names and name not in self._grids]
+        if mode == DECODE_THREAD and (is_path(source) or isinstance(source, (bytes, bytearray, memoryview))):
+            task_source = source
+        else:
+            task_source = detach_source(source)
+        decoded = decode_sheets(partial(decode_sheet_grid, task_source), pending, mode)
+        for sheet_name, (grid, anchors, coerced) in decoded.items():
+            self._grids[sheet_name] = grid
+            self.coerced[sheet_name] = coerced
+            self._anchors[sheet_name] = anchors
+            self.decode_counts[sheet_name] = self.decode_counts.get(sheet_name, 0) + 1
+
+    @staticmethod
+    def _build_anchor_index(df: pd.DataFrame) -> SheetAnchorIndex:
+        """Indexe les colonnes texte de la feuille (aucune pour une feuille numérique)"""
+        text_columns = [col for col, dtype in df.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+        if not text_columns:
+            return SheetAnchorIndex()
+        return SheetAnchorIndex.from_grid(df[text_columns].to_numpy(dtype=object))
+
+    @staticmethod
+    def _to_numeric_grid(df: pd.DataFrame) -> CoercedGrid:
+        """Convertit une feuille brute en grille float64 (textes au format français compris)"""
+        if all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+            values = df.to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(values)
+            return CoercedGrid(values, missing, np.zeros_like(missing))
+        return coerce_grid(df.to_numpy(dtype=object))
+
 
 class ExcelDataLoader:
     """Chargeur de données Excel pour l'analyse financière BCEAO - Extraction précise"""
     
     def __init__(self):
-        self.supported_formats = ['.xlsx', '.xls']
+        # Formats du registre des lecteurs ; le format effectif est reconnu au contenu
+        self.supported_formats = supported_extensions()
         self.required_sheets = ['Bilan', 'CR', 'TFT']
         
-        # MAPPING PRÉCIS DES CELLULES selon votre document
+        # Nombre de décodages par feuille lors du dernier chargement
+        self.sheet_decode_counts: Dict[str, int] = {}
+        
+        # Cellules saisies en texte et converties en montant, par feuille
+        self.coerced_cells: Dict[str, List[str]] = {}
+        
+        # MAPPING DES CELLULES : dérivé du schéma commun avec FinancialAnalyzer
         self.bilan_mapping = {
-            # === ACTIF ===
-            'immobilisations_incorporelles': 'E5',
-            'immobilisations_corporelles': 'E10', 
-            'immobilisations_financieres': 'E18',
-            'total_actif_immobilise': 'E21',
-            'stocks_et_encours': 'E23',
-            'creances_et_emplois': 'E24',
-            'clients': 'E26',
-            'autres_creances': 'E27',
-            'total_actif_circulant': 'E28',
-            'titres_de_placement': 'E30',
-            'valeurs_a_encaisser': 'E31',
-            'banques_caisses': 'E32',
-            'total_tresorerie_actif': 'E33',
-            'ecart_conversion_actif': 'E34',
-            'total_general_actif': 'E35',
-            
-            # === PASSIF ===
-            'capital': 'I5',
-            'reserves_indisponibles': 'I9',
-            'reserves_libres': 'I10',
-            'report_nouveau': 'I11',
-            'resultat_net_exercice': 'I12',
-            'total_capitaux_propres': 'I15',
-            'emprunts_dettes_financieres': 'I17',
-            'dettes_location': 'I18',
-            'provisions_financieres': 'I19',
-            'total_dettes_financieres': 'I20',
-            'total_ressources_stables': 'I21',
-            'clients_avances_recues': 'I23',
-            'fournisseurs_exploitation': 'I24',
-            'dettes_sociales_fiscales': 'I25',
-            'autres_dettes': 'I26',
-            'provisions_court_terme': 'I27',
-            'total_passif_circulant': 'I28',
-            'banques_credits_escompte': 'I30',
-            'banques_credits_tresorerie': 'I31',
-            'total_tresorerie_passif': 'I33',
-            'ecart_conversion_passif': 'I34',
-            'total_general_passif': 'I35'
+            name: TEMPLATE_SCHEMA.location(field)[1] for name, field in LOADER_BILAN_FIELDS.items()
         }
-        
-        # Note: Le CR et TFT sont aussi dans la feuille Bilan selon votre document
         self.cr_mapping = {
-            'ventes_marchandises': ('Bilan', 'E5'),  # En fait feuille CR mais référencée dans Bilan
-            'achats_marchandises': ('Bilan', 'E6'),
-            'marge_commerciale': ('Bilan', 'E8'),
-            'chiffre_affaires': ('Bilan', 'E12'),
-            'valeur_ajoutee': ('Bilan', 'E27'),
-            'charges_personnel': ('Bilan', 'E28'),
-            'excedent_brut_exploitation': ('Bilan', 'E30'),
-            'resultat_exploitation': ('Bilan', 'E34'),
-            'resultat_financier': ('Bilan', 'E35'),
-            'resultat_activites_ordinaires': ('Bilan', 'E35'),
-            'resultat_net': ('Bilan', 'E35')
+            name: TEMPLATE_SCHEMA.location(field) for name, field in LOADER_CR_FIELDS.items()
         }
-        
         self.tft_mapping = {
-            'tresorerie_ouverture': ('Bilan', 'E5'),
-            'flux_activites_operationnelles': ('Bilan', 'E13'),
-            'flux_activites_investissement': ('Bilan', 'E21'),
-            'flux_activites_financement': ('Bilan', 'E35'),
-            'variation_tresorerie': ('Bilan', 'E35'),
-            'tresorerie_cloture': ('Bilan', 'E35')
+            name: TEMPLATE_SCHEMA.location(field) for name, field in LOADER_TFT_FIELDS.items()
         }
     
-    def load_excel_template(self, file_path: str) -> Optional[Dict[str, float]]:
-        """Charge un fichier Excel et extrait les données financières avec précision"""
+    def load_excel_template(self, file_path, decode_mode: Optional[str] = None) -> Optional[Dict[str, float]]:
+        """
+        Charge un fichier Excel et extrait les données financières avec précision
+
+        Args:
+            file_path: Chemin, bytes, memoryview ou objet fichier du classeur
+            decode_mode: 'sequential', 'thread' ou 'process' pour décoder Bilan,
+                CR et TFT en parallèle (None : OPTIMUS_DECODE_MODE ou séquentiel)
+        """
         
         try:
-            print(f"📂 Chargement du fichier: {file_path}")
-            
-            # Vérifier l'extension du fichier
-            file_ext = Path(file_path).suffix.lower()
-            if file_ext not in self.supported_formats:
-                raise ValueError(f"Format non supporté: {file_ext}")
-            
-            # Charger le fichier Excel
-            excel_file = pd.ExcelFile(file_path)
-            available_sheets = excel_file.sheet_names
-            print(f"📋 Feuilles trouvées: {available_sheets}")
-            
-            # Initialiser le dictionnaire des données
-            financial_data = {}
-            
-            # === EXTRACTION BILAN ===
-            if 'Bilan' in available_sheets:
-                bilan_data = self._extract_bilan_precise(excel_file)
-                financial_data.update(bilan_data)
-                print(f"✅ Bilan: {len(bilan_data)} éléments extraits")
-            else:
-                print("❌ Feuille 'Bilan' non trouvée")
-                return None
-            
-            # === EXTRACTION CR ET TFT ===
-            # Selon votre document, CR et TFT sont référencés dans la feuille Bilan
-            cr_data = self._extract_cr_precise(excel_file)
-            financial_data.update(cr_data)
-            print(f"✅ CR: {len(cr_data)} éléments extraits")
+            print(f"📂 Chargement du fichier: {describe_source(file_path)}")
             
-            tft_data = self._extract_tft_precise(excel_file)
-            financial_data.update(tft_data)
-            print(f"✅ TFT: {len(tft_data)} éléments extraits")
+            # Lecteur choisi d'après le contenu (ValueError si aucun ne le reconnaît) ;
+            # chaque feuille sera décodée une seule fois
+            reader = open_sheet_reader(file_path)
+            try:
+                sheets = SheetGridCache(reader)
+                self.sheet_decode_counts = sheets.decode_counts
+                self.coerced_cells = sheets.coerced
+                available_sheets = sheets.sheet_names
+                print(f"📋 Feuilles trouvées: {available_sheets}")
+            
+                decode_mode = resolve_decode_mode(decode_mode)
+                if decode_mode != DECODE_SEQUENTIAL and 'Bilan' in available_sheets:
+                    sheets.prefetch(('Bilan', 'CR', 'TFT'), file_path, decode_mode)
+            
+                # Initialiser le dictionnaire des données
+                financial_data = {}
+            
+                # === EXTRACTION BILAN ===
+                if 'Bilan' in available_sheets:
+                    bilan_data = self._extract_bilan_precise(sheets)
+                    financial_data.update(bilan_data)
+                    print(f"✅ Bilan: {len(bilan_data)} éléments extraits")
+                else:
+                    print("❌ Feuille 'Bilan' non trouvée")
+                    return None
+            
+                # === EXTRACTION CR ET TFT ===
+                # Selon votre document, CR et TFT sont référencés dans la feuille Bilan
+                cr_data = self._extract_cr_precise(sheets)
+                financial_data.update(cr_data)
+                print(f"✅ CR: {len(cr_data)} éléments extraits")
+            
+                tft_data = self._extract_tft_precise(sheets)
+                financial_data.update(tft_data)
+                print(f"✅ TFT: {len(tft_data)} éléments extraits")
+            finally:
+                # Fermé aussi en cas d'erreur d'extraction
+                reader.close()
+            
+            for sheet_name, cells in self.coerced_cells.items():
+                if cells:
+                    print(f"🔢 {sheet_name}: {len(cells)} montant(s) saisi(s) en texte converti(s)")
             
             # CORRECTION : Calculer les agrégats financiers
             financial_data = self._calculate_financial_aggregates(financial_data)
@@ -133,28 +274,18 @@ class ExcelDataLoader:
             print(f"❌ Erreur lors du chargement Excel: {e}")
             return None
     
-    def _extract_bilan_precise(self, excel_file) -> Dict[str, float]:
+    def _extract_bilan_precise(self, sheets: SheetGridCache) -> Dict[str, float]:
         """Extraction précise du bilan selon les coordonnées exactes"""
         
         try:
-            # Charger la feuille Bilan
-            df = pd.read_excel(excel_file, sheet_name='Bilan', header=None)
-            print(f"📊 Dimensions feuille Bilan: {df.shape}")
-            
-            bilan_data = {}
+            # Grille de la feuille Bilan
+            grid = sheets.get('Bilan')
+            print(f"📊 Dimensions feuille Bilan: {grid.shape}")
             
-            # Extraire chaque valeur selon le mapping précis
-            for field_name, cell_address in self.bilan_mapping.items():
-                try:
-                    value = self._get_cell_value(df, cell_address)
-                    if value is not None and value != 0:
-                        bilan_data[field_name] = float(value)
-                        print(f"  ✓ {field_name}: {value:,.0f} (cellule {cell_address})")
-                    else:
-                        bilan_data[field_name] = 0.0
-                except Exception as e:
-                    print(f"  ❌ Erreur extraction {field_name} ({cell_address}): {e}")
-                    bilan_data[field_name] = 0.0
+            # Lignes retrouvées par codes REF / libellés, puis une indexation de la grille
+            compiled, _ = resolve_compiled(_COMPILED_BILAN, sheets.anchors('Bilan'))
+            bilan_data = compiled.extract(grid)
+            print(f"  ✓ {sum(1 for v in bilan_data.values() if v != 0)} postes non nuls")
             
             return bilan_data
             
@@ -162,49 +293,26 @@ class ExcelDataLoader:
             print(f"❌ Erreur extraction bilan: {e}")
             return {}
     
-    def _extract_cr_precise(self, excel_file) -> Dict[str, float]:
+    def _extract_cr_precise(self, sheets: SheetGridCache) -> Dict[str, float]:
         """Extraction précise du compte de résultat"""
         
         try:
-            # Selon votre document, les données CR sont dans la feuille Bilan
-            df = pd.read_excel(excel_file, sheet_name='Bilan', header=None)
-            
             cr_data = {}
             
-            # Extraire les valeurs spécifiques du CR
-            # Note: Votre document montre que beaucoup de valeurs CR sont en E35
-            # Il faut probablement chercher dans une feuille CR séparée
-            
             # Tentative d'extraction depuis une feuille CR si elle existe
-            if 'CR' in excel_file.sheet_names:
-                df_cr = pd.read_excel(excel_file, sheet_name='CR', header=None)
-                print(f"📊 Dimensions feuille CR: {df_cr.shape}")
+            if 'CR' in sheets:
+                grid_cr = sheets.get('CR')
+                print(f"📊 Dimensions feuille CR: {grid_cr.shape}")
                 
-                # Mapping pour la feuille CR
-                cr_specific_mapping = {
-                    'chiffre_affaires': 'E12',
-                    'resultat_net': 'E35',  # Dernière ligne généralement
-                    'marge_commerciale': 'E8',
-                    'valeur_ajoutee': 'E27',
-                    'excedent_brut_exploitation': 'E30',
-                    'resultat_exploitation': 'E34'
-                }
-                
-                for field_name, cell_address in cr_specific_mapping.items():
-                    try:
-                        value = self._get_cell_value(df_cr, cell_address)
-                        if value is not None:
-                            cr_data[field_name] = float(value)
-                            print(f"  ✓ {field_name}: {value:,.0f} (CR-{cell_address})")
-                    except Exception as e:
-                        print(f"  ❌ Erreur extraction CR {field_name}: {e}")
-            
-            # Si pas de feuille CR séparée, utiliser les données du bilan
+                compiled, _ = resolve_compiled(_COMPILED_CR, sheets.anchors('CR'))
+                cr_data = compiled.extract(grid_cr)
+                for (field_name, value), cell in zip(cr_data.items(), compiled.cells):
+                    print(f"  ✓ {field_name}: {value:,.0f} (CR-{cell})")
+            
+            # Si pas de feuille CR séparée, le résultat net du bilan sera utilisé
+            # lors du calcul des agrégats (resultat_net_exercice)
             if not cr_data:
                 print("⚠️ Utilisation des données CR depuis la feuille Bilan")
-                # Valeurs par défaut basées sur les données du bilan
-                if 'resultat_net_exercice' in excel_file:
-                    cr_data['resultat_net'] = excel_file.get('resultat_net_exercice', 0)
             
             return cr_data
             
@@ -212,34 +320,21 @@ class ExcelDataLoader:
             print(f"❌ Erreur extraction CR: {e}")
             return {}
     
-    def _extract_tft_precise(self, excel_file) -> Dict[str, float]:
+    def _extract_tft_precise(self, sheets: SheetGridCache) -> Dict[str, float]:
         """Extraction précise du tableau des flux de trésorerie"""
         
         try:
             tft_data = {}
             
             # Tentative d'extraction depuis une feuille TFT si elle existe
-            if 'TFT' in excel_file.sheet_names:
-                df_tft = pd.read_excel(excel_file, sheet_name='TFT', header=None)
-                print(f"📊 Dimensions feuille TFT: {df_tft.shape}")
-                
-                # Mapping pour la feuille TFT
-                tft_specific_mapping = {
-                    'tresorerie_ouverture': 'E5',
-                    'flux_activites_operationnelles': 'E13',
-                    'flux_activites_investissement': 'E21',
-                    'flux_activites_financement': 'E35',
-                    'tresorerie_cloture': 'E35'  # Dernière ligne
-                }
+            if 'TFT' in sheets:
+                grid_tft = sheets.get('TFT')
+                print(f"📊 Dimensions feuille TFT: {grid_tft.shape}")
                 
-                for field_name, cell_address in tft_specific_mapping.items():
-                    try:
-                        value = self._get_cell_value(df_tft, cell_address)
-                        if value is not None:
-                            tft_data[field_name] = float(value)
-                            print(f"  ✓ {field_name}: {value:,.0f} (TFT-{cell_address})")
-                    except Exception as e:
-                        print(f"  ❌ Erreur extraction TFT {field_name}: {e}")
+                compiled, _ = resolve_compiled(_COMPILED_TFT, sheets.anchors('TFT'))
+                tft_data = compiled.extract(grid_tft)
+                for (field_name, value), cell in zip(tft_data.items(), compiled.cells):
+                    print(f"  ✓ {field_name}: {value:,.0f} (TFT-{cell})")
             
             return tft_data
             
@@ -247,8 +342,8 @@ class ExcelDataLoader:
             print(f"❌ Erreur extraction TFT: {e}")
             return {}
     
-    def _get_cell_value(self, df, cell_address):
-        """Extrait la valeur d'une cellule spécifique (ex: 'E5')"""
+    def _get_cell_value(self, grid: np.ndarray, cell_address: str) -> float:
+        """Extrait la valeur d'une cellule spécifique (ex: 'E5') depuis la grille numérique"""
         
         try:
             # Convertir l'adresse de cellule en coordonnées
@@ -265,28 +360,13 @@ class ExcelDataLoader:
             row_index = row_number - 1
             
             # Vérifier que les coordonnées sont valides
-            if row_index >= len(df) or col_index >= len(df.columns):
+            if row_index >= grid.shape[0] or col_index >= grid.shape[1]:
                 print(f"  ⚠️ Cellule {cell_address} hors limites ({row_index}, {col_index})")
                 return 0.0
             
-            # Extraire la valeur
-            value = df.iloc[row_index, col_index]
-            
-            # Convertir en numérique si possible
-            if pd.isna(value):
-                return 0.0
-            
-            # Essayer de convertir en float
-            try:
-                return float(value)
-            except (ValueError, TypeError):
-                # Si ce n'est pas un nombre, chercher un nombre dans la chaîne
-                import re
-                if isinstance(value, str):
-                    numbers = re.findall(r'-?\d+(?:\.\d+)?', value.replace(',', '.'))
-                    if numbers:
-                        return float(numbers[0])
-                return 0.0
+            # Les valeurs sont déjà converties en float lors du décodage de la feuille
+            value = grid[row_index, col_index]
+            return 0.0 if np.isnan(value) else float(value)
                 
         except Exception as e:
             print(f"  ❌ Erreur lecture cellule {cell_address}: {e}")
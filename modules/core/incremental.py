@@ -0,0 +1,115 @@
+"""
+Recalcul incrémental des ratios et du score pendant la saisie manuelle
+
+À chaque modification d'un champ du formulaire, seuls les ratios qui
+dépendent (directement ou via un intermédiaire) des postes modifiés sont
+recalculés, puis seules les composantes du score qui lisent un ratio modifié.
+Le résultat est identique à un calcul complet (calculate_ratios puis
+calculate_score avec le même secteur et le même mode de notation).
+
+Un changement de grille (normes rechargées), de secteur ou de mode fait
+renoter toutes les composantes.
+"""
+
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.ratio_graph import ScalarOps
+from modules.core.scoring import QuartileTable, ScoreGrid
+
+
+class IncrementalUpdate(NamedTuple):
+    """Résultat d'une mise à jour : ratios et scores à jour, et ce qui a été recalculé"""
+    ratios: Dict[str, float]
+    scores: Dict[str, int]
+    changed_fields: Tuple[str, ...]
+    changed_nodes: Tuple[str, ...]
+    rescored: Tuple[str, ...]
+
+
+class IncrementalAnalysis:
+    """
+    État de calcul d'un formulaire : valeurs du graphe des ratios et points
+    par composante, mis à jour à partir des seuls postes modifiés
+    """
+
+    def __init__(self, analyzer: Optional[FinancialAnalyzer] = None):
+        self.analyzer = analyzer or FinancialAnalyzer()
+        self.graph = self.analyzer.ratio_graph
+        self.reset()
+
+    def reset(self):
+        """Oublie l'état : la prochaine mise à jour est un calcul complet"""
+        self.data: Dict[str, Any] = {}
+        self.values: Optional[Dict[str, Any]] = None
+        self.ratios: Dict[str, float] = {}
+        self.scores: Dict[str, int] = {}
+        # Grille et tables sectorielles des points en place
+        self.grid: Optional[ScoreGrid] = None
+        self.tables: Optional[Mapping[str, QuartileTable]] = None
+
+    def _set_grid(self, grid: ScoreGrid):
+        """Composantes de la grille et composantes qui lisent chaque ratio"""
+        self.grid = grid
+        self.components = grid.ratios_by_component()
+        self.component_of: Dict[str, List[str]] = {}
+        for component, ratio_names in self.components.items():
+            for ratio_name in ratio_names:
+                self.component_of.setdefault(ratio_name, []).append(component)
+
+    def changed_fields(self, data: Dict[str, Any]) -> List[str]:
+        """Postes dont la valeur ou la présence diffère de la dernière saisie"""
+        changed = [name for name, value in data.items()
+                   if name not in self.data or self.data[name] != value]
+        changed.extend(name for name in self.data if name not in data)
+        return changed
+
+    def update(self, data: Dict[str, Any], secteur: Optional[str] = None,
+               mode: Optional[str] = None) -> IncrementalUpdate:
+        """
+        Met à jour ratios et scores pour la saisie courante
+
+        Args:
+            data: postes du formulaire (dict complet, tel que reconstruit à chaque rerun)
+            secteur, mode: notation (voir FinancialAnalyzer.calculate_score)
+
+        Returns:
+            IncrementalUpdate
+        """
+        data = dict(data)
+        ops = ScalarOps(data, None)
+        # Instantané de la grille pour toute la mise à jour
+        grid = self.analyzer.score_grid
+        tables = self.analyzer.score_tables(secteur, mode)
+        try:
+            if self.values is None:
+                changed_fields = list(data)
+                self.values = self.graph.evaluate_values(ops)
+                changed_nodes = list(self.graph.outputs())
+                rescored = []
+            else:
+                changed_fields = self.changed_fields(data)
+                changed_nodes = self.graph.reevaluate(ops, self.values, changed_fields)
+                rescored = [component for component in self.components
+                            if any(component in self.component_of.get(name, ()) for name in changed_nodes)]
+            self.data = data
+
+            if changed_nodes:
+                self.ratios = self.graph.results(self.values)
+            if grid is not self.grid or tables is not self.tables:
+                # Normes rechargées, autre secteur ou autre mode : tout renoter
+                self._set_grid(grid)
+                self.tables = tables
+                rescored = list(self.components)
+            scores = {component: self.scores.get(component, 0) for component in self.components}
+            for component in rescored:
+                scores[component] = grid.score_component(component, self.ratios, tables)
+            scores['global'] = grid.global_score(scores)
+            self.scores = scores
+        except Exception:
+            # Valeurs partiellement mises à jour : repartir d'un calcul complet
+            self.reset()
+            raise
+
+        return IncrementalUpdate(dict(self.ratios), dict(self.scores), tuple(changed_fields),
+                                 tuple(changed_nodes), tuple(rescored))
@@ -0,0 +1,237 @@
+"""
+Service des normes BCEAO : data/bceao_norms.json lu une fois, recompilé à chaud
+
+Les seuils étaient dupliqués entre l'analyseur (normes prudentielles), le
+validateur de ratios (conformité), l'interprétation des ratios et la grille
+du score. Le fichier est désormais la seule source :
+
+- ``conformite_ratios`` : opérateur, cible et seuil d'alerte par ratio ;
+- ``interpretation_ratios`` : niveaux [min, max[ par ratio ;
+- ``normes_prudentielles`` : normes prudentielles bancaires ;
+- ``grille_score`` : barèmes du score (voir scoring.py).
+
+Le service compile le fichier en un instantané immuable (``CompiledNorms``)
+de tables indexées par ratio. ``current()`` compare au plus une fois par
+``check_interval`` la date de modification et la taille du fichier ; en cas
+de changement, le fichier est relu et l'instantané remplacé d'un bloc, sous
+verrou. Une session en cours de calcul garde l'instantané qu'elle a obtenu.
+Un fichier illisible ou invalide laisse en place l'instantané précédent.
+"""
+
+import json
+import operator
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from modules.core.scoring import ScoreGrid
+
+NORMS_PATH = Path(__file__).parent.parent.parent / "data" / "bceao_norms.json"
+
+# Statuts de conformité
+STATUS_CONFORME = "✅ Conforme"
+STATUS_LIMITE = "⚠️ Limite"
+STATUS_NON_CONFORME = "❌ Non conforme"
+STATUS_A_ANALYSER = "ℹ️ À analyser"
+STATUSES = (STATUS_CONFORME, STATUS_LIMITE, STATUS_NON_CONFORME, STATUS_A_ANALYSER)
+
+OPERATORS = {'>=': operator.ge, '>': operator.gt, '<=': operator.le, '<': operator.lt}
+
+
+class ConformityTable:
+    """Normes de conformité compilées, une position par ratio"""
+
+    def __init__(self, section: Dict[str, Dict[str, Any]]):
+        self.ratios: Tuple[str, ...] = tuple(section)
+        self.index: Dict[str, int] = {name: position for position, name in enumerate(self.ratios)}
+        for name, entry in section.items():
+            if entry['operateur'] not in OPERATORS:
+                raise ValueError(f"Opérateur inconnu pour {name}: {entry['operateur']}")
+
+        self.operators: Tuple[str, ...] = tuple(entry['operateur'] for entry in section.values())
+        self.targets = np.array([float(entry['cible']) for entry in section.values()])
+        # Seuil d'alerte absent ou nul : pas de zone « Limite »
+        self.warnings = np.array([float(entry['alerte']) if entry.get('alerte') else np.nan
+                                  for entry in section.values()])
+        self.norms: Tuple[str, ...] = tuple(entry.get('norme', 'Non définie') for entry in section.values())
+        self.categories: Tuple[str, ...] = tuple(entry.get('categorie', 'autre') for entry in section.values())
+        self.descriptions: Tuple[str, ...] = tuple(entry.get('description', '') for entry in section.values())
+
+    def status(self, ratio: str, value) -> str:
+        """Statut d'une valeur ; « À analyser » pour un ratio sans norme ou une valeur non numérique"""
+        position = self.index.get(ratio)
+        if position is None:
+            return STATUS_A_ANALYSER
+        compare = OPERATORS[self.operators[position]]
+        warning = self.warnings.item(position)
+        try:
+            if compare(value, self.targets.item(position)):
+                return STATUS_CONFORME
+            if warning == warning and compare(value, warning):
+                return STATUS_LIMITE
+            return STATUS_NON_CONFORME
+        except (ValueError, TypeError):
+            return STATUS_A_ANALYSER
+
+    def status_column(self, ratio: str, values: np.ndarray) -> np.ndarray:
+        """Statuts d'une colonne de valeurs (un ratio, tout un portefeuille)"""
+        values = np.asarray(values, dtype=np.float64)
+        position = self.index.get(ratio)
+        if position is None:
+            return np.full(values.shape, STATUS_A_ANALYSER, dtype=object)
+        compare = OPERATORS[self.operators[position]]
+        codes = np.full(values.shape, 2, dtype=np.int8)
+        warning = self.warnings[position]
+        if warning == warning:
+            codes[compare(values, warning)] = 1
+        codes[compare(values, self.targets[position])] = 0
+        return np.array(STATUSES, dtype=object)[codes]
+
+    def norm(self, ratio: str) -> str:
+        position = self.index.get(ratio)
+        return 'Non définie' if position is None else self.norms[position]
+
+    def category(self, ratio: str) -> str:
+        position = self.index.get(ratio)
+        return 'autre' if position is None else self.categories[position]
+
+
+class InterpretationTable:
+    """Niveaux d'interprétation par ratio : premier intervalle [min, max[ contenant la valeur"""
+
+    def __init__(self, section: Dict[str, list]):
+        self.levels: Dict[str, Tuple[Tuple[str, ...], np.ndarray, np.ndarray]] = {}
+        for name, entries in section.items():
+            levels = tuple(entry['niveau'] for entry in entries)
+            lower = np.array([-np.inf if entry.get('min') is None else float(entry['min']) for entry in entries])
+            upper = np.array([np.inf if entry.get('max') is None else float(entry['max']) for entry in entries])
+            self.levels[name] = (levels, lower, upper)
+
+    def __contains__(self, ratio: str) -> bool:
+        return ratio in self.levels
+
+    def level(self, ratio: str, value) -> Optional[str]:
+        """Niveau d'une valeur ; None si le ratio n'est pas référencé ou la valeur hors intervalles"""
+        entry = self.levels.get(ratio)
+        if entry is None:
+            return None
+        levels, lower, upper = entry
+        for level, min_val, max_val in zip(levels, lower.tolist(), upper.tolist()):
+            if min_val <= value < max_val:
+                return level
+        return None
+
+    def level_column(self, ratio: str, values: np.ndarray) -> np.ndarray:
+        """Niveaux d'une colonne de valeurs (None hors intervalles ou ratio non référencé)"""
+        values = np.asarray(values, dtype=np.float64)
+        if ratio not in self.levels:
+            return np.full(values.shape, None, dtype=object)
+        levels, lower, upper = self.levels[ratio]
+        conditions = [(values >= min_val) & (values < max_val) for min_val, max_val in zip(lower, upper)]
+        return np.select(conditions, np.array(levels, dtype=object), default=None)
+
+
+class CompiledNorms(NamedTuple):
+    """Instantané immuable des normes, remplacé d'un bloc au rechargement"""
+    version: str
+    signature: Optional[Tuple[int, int]]
+    raw: Dict[str, Any]
+    conformity: ConformityTable
+    interpretation: InterpretationTable
+    prudential: Dict[str, Any]
+    score_grid: ScoreGrid
+
+    @classmethod
+    def compile(cls, config: Dict[str, Any], signature=None) -> 'CompiledNorms':
+        return cls(
+            version=config.get('metadata', {}).get('version', ''),
+            signature=signature,
+            raw=config,
+            conformity=ConformityTable(config.get('conformite_ratios', {})),
+            interpretation=InterpretationTable(config.get('interpretation_ratios', {})),
+            prudential=config.get('normes_prudentielles', {}),
+            score_grid=ScoreGrid.from_config(config['grille_score']),
+        )
+
+
+class NormsService:
+    """Normes compilées d'un fichier, rechargées quand il change"""
+
+    def __init__(self, path=NORMS_PATH, check_interval: float = 1.0):
+        """
+        Args:
+            path: fichier des normes (format de data/bceao_norms.json)
+            check_interval: délai minimal en secondes entre deux contrôles du fichier
+        """
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._norms: Optional[CompiledNorms] = None
+        self._checked_at = 0.0
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def current(self) -> CompiledNorms:
+        """Instantané courant, rechargé si le fichier a changé depuis le dernier contrôle"""
+        norms = self._norms
+        if norms is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return norms
+
+        with self._lock:
+            now = time.monotonic()
+            if self._norms is not None and now - self._checked_at < self.check_interval:
+                return self._norms
+            self._checked_at = now
+            signature = self._signature()
+            if self._norms is None or (signature is not None and signature != self._norms.signature):
+                self._load(signature)
+            return self._norms
+
+    def reload(self) -> CompiledNorms:
+        """Relit le fichier sans attendre le prochain contrôle"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._load(self._signature())
+            return self._norms
+
+    def _load(self, signature):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                norms = CompiledNorms.compile(json.load(f), signature)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if self._norms is None:
+                raise
+            print(f"⚠️ Normes non rechargées ({self.path.name}), version {self._norms.version} conservée: {e}")
+            # Ne pas relire le même fichier invalide à chaque contrôle
+            self._norms = self._norms._replace(signature=signature)
+            return
+        self._norms = norms
+        self.reloads += 1
+
+
+_default_service: Optional[NormsService] = None
+_default_service_lock = threading.Lock()
+
+
+def get_norms_service() -> NormsService:
+    """Service partagé par le processus, sur data/bceao_norms.json"""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = NormsService()
+        return _default_service
+
+
+def get_norms() -> CompiledNorms:
+    """Normes courantes du service partagé"""
+    return get_norms_service().current()
@@ -0,0 +1,188 @@
+"""
+Conversion vectorisée des grilles de feuilles en float64 (nombres au format français)
+
+Les liasses saisies à la main contiennent des montants en texte : « 12 000 »
+(espace ou espace insécable comme séparateur de milliers), « 1.234.567,89 »,
+« (12 000) » pour un montant négatif, « 1 500 FCFA ». Une grille entière est
+convertie une fois avec les fonctions vectorisées de numpy.strings :
+l'extraction lit ensuite des float64 sans analyser de texte par poste.
+
+Règles (identiques pour ``parse_number`` et ``coerce_grid``) :
+- espaces, espaces insécables et apostrophes ignorés ; mentions FCFA / XOF / EUR retirées
+- parenthèses ou signe moins typographique : montant négatif
+- virgule et point présents : le dernier est la décimale, l'autre sépare les milliers
+- un seul séparateur présent une fois : décimale ; répété : séparateur de milliers
+- tout autre texte (libellés, « N-1 », dates) : NaN
+"""
+
+from typing import List, NamedTuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+from modules.core.preview import column_letter
+
+# Séparateurs de milliers ignorés (espace, insécable, fine insécable, fine, apostrophe)
+_IGNORED_CHARS = (' ', '\t', '\u00a0', '\u202f', '\u2009', "'")
+# Mentions monétaires, comparées en minuscules (la plus longue d'abord)
+_CURRENCIES = ('f.cfa', 'fcfa', 'xof', 'eur', '€')
+_MINUS_CHARS = ('\u2212', '\u2012', '\u2013')
+# Caractères d'un montant une fois le texte nettoyé
+_NUMBER_CHARS = '0123456789.,+-'
+
+# Tout autre caractère (lettres d'un libellé, '/', '%') exclut d'emblée le texte
+_ALLOWED_CHARS = ''.join(sorted(set(_NUMBER_CHARS + '()' + ''.join(_IGNORED_CHARS + _MINUS_CHARS)
+                                    + ''.join(_CURRENCIES) + ''.join(_CURRENCIES).upper())))
+
+_STRING = np.dtypes.StringDType()
+
+# Colonnes sans texte, converties par transtypage direct
+_NUMERIC_KINDS = frozenset(('empty', 'floating', 'integer', 'mixed-integer-float', 'boolean'))
+
+
+class CoercedGrid(NamedTuple):
+    """Grille convertie et masques associés (même forme que la grille brute)"""
+    values: np.ndarray
+    missing: np.ndarray
+    coerced: np.ndarray
+
+    def coerced_cells(self) -> List[str]:
+        """Adresses des cellules texte converties en nombre, ligne par ligne"""
+        return [f"{column_letter(col + 1)}{row + 1}" for row, col in zip(*np.nonzero(self.coerced))]
+
+
+def parse_number(text: str) -> float:
+    """Montant d'un texte au format français, NaN s'il ne s'agit pas d'un nombre"""
+    for char in _IGNORED_CHARS:
+        text = text.replace(char, '')
+    text = text.lower()
+    for currency in _CURRENCIES:
+        text = text.replace(currency, '')
+    for char in _MINUS_CHARS:
+        text = text.replace(char, '-')
+    if text.startswith('(') and text.endswith(')'):
+        text = '-' + text.strip('()')
+    if text.strip(_NUMBER_CHARS):
+        return np.nan
+
+    n_comma, n_dot = text.count(','), text.count('.')
+    last_comma, last_dot = text.rfind(','), text.rfind('.')
+    if n_comma == 1 and (n_dot == 0 or last_comma > last_dot):
+        text = text.replace('.', '').replace(',', '.')
+    elif n_dot == 1 and (n_comma == 0 or last_dot > last_comma):
+        text = text.replace(',', '')
+    else:
+        text = text.replace(',', '').replace('.', '')
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def _replace(text: np.ndarray, old: str, new: str) -> np.ndarray:
+    """np.strings.replace, évité si aucun texte ne contient ``old``"""
+    if not (np.strings.find(text, old) >= 0).any():
+        return text
+    return np.strings.replace(text, old, new)
+
+
+def parse_numbers(texts) -> np.ndarray:
+    """
+    Version vectorisée de ``parse_number`` (fonctions numpy.strings, sans boucle Python)
+
+    Args:
+        texts: Séquence ou tableau de textes
+
+    Returns:
+        numpy.ndarray: float64, NaN pour un texte non numérique
+    """
+    text = np.asarray(texts, dtype=_STRING)
+    values = np.full(text.shape, np.nan)
+    allowed = np.strings.strip(text, _ALLOWED_CHARS) == ''
+    if not allowed.all():
+        # Libellés écartés en une opération : seuls les montants possibles sont analysés
+        values[allowed] = parse_numbers(text[allowed])
+        return values
+
+    for char in _IGNORED_CHARS:
+        text = _replace(text, char, '')
+
+    # Mentions monétaires et signes typographiques : seulement sur les textes qui en contiennent
+    other = np.strings.strip(text, _NUMBER_CHARS + '()') != ''
+    if other.any():
+        cleaned = np.strings.lower(text[other])
+        for currency in _CURRENCIES:
+            cleaned = _replace(cleaned, currency, '')
+        for char in _MINUS_CHARS:
+            cleaned = _replace(cleaned, char, '-')
+        text[other] = cleaned
+
+    negative = np.strings.startswith(text, '(') & np.strings.endswith(text, ')')
+    if negative.any():
+        text[negative] = np.strings.add('-', np.strings.strip(text[negative], '()'))
+    candidate = np.strings.strip(text, _NUMBER_CHARS) == ''
+
+    n_comma, n_dot = np.strings.count(text, ','), np.strings.count(text, '.')
+    separated = (n_comma > 0) | (n_dot > 0)
+    if separated.any():
+        part, n_comma, n_dot = text[separated], n_comma[separated], n_dot[separated]
+        last_comma, last_dot = np.strings.rfind(part, ','), np.strings.rfind(part, '.')
+        comma_decimal = (n_comma == 1) & ((n_dot == 0) | (last_comma > last_dot))
+        dot_decimal = ~comma_decimal & (n_dot == 1) & ((n_comma == 0) | (last_dot > last_comma))
+
+        without_dots = _replace(part, '.', '')
+        part = np.where(comma_decimal, _replace(without_dots, ',', '.'),
+                        np.where(dot_decimal, _replace(part, ',', ''), _replace(without_dots, ',', '')))
+        text[separated] = part
+
+    # Montant valide : un signe en tête au plus, des chiffres, un point décimal au plus
+    n_signs = np.strings.count(text, '-') + np.strings.count(text, '+')
+    signed = np.strings.startswith(text, '-') | np.strings.startswith(text, '+')
+    body = np.strings.lstrip(text, '+-')
+    valid = (candidate & ((n_signs == 0) | ((n_signs == 1) & signed))
+             & (np.strings.count(text, '.') <= 1) & (body != '') & (body != '.'))
+
+    values[valid] = text[valid].astype(np.float64)
+    return values
+
+
+def coerce_grid(grid: np.ndarray) -> CoercedGrid:
+    """
+    Convertit une grille brute (objets) en float64, colonne par colonne
+
+    Une colonne sans texte (nombres et cellules vides) est convertie par un
+    simple transtypage ; les textes passent par les règles du format français.
+    Cellules vides et textes non numériques donnent NaN.
+
+    Returns:
+        CoercedGrid: valeurs, masque des NaN, masque des textes convertis
+    """
+    raw = np.asarray(grid, dtype=object)
+    if raw.ndim == 1:
+        raw = raw.reshape(-1, 1)
+    values = np.full(raw.shape, np.nan)
+    is_text = np.zeros(raw.shape, dtype=bool)
+
+    for col in range(raw.shape[1]):
+        column = raw[:, col]
+        kind = infer_dtype(column, skipna=True)
+        if kind in _NUMERIC_KINDS:
+            values[:, col] = column.astype(np.float64)
+            continue
+
+        if kind == 'string':
+            text = np.ones(len(column), dtype=bool)
+        else:
+            text = np.fromiter((type(value) is str for value in column), dtype=bool, count=len(column))
+            others = ~text
+            if others.any():
+                # Dates et autres objets : NaN
+                values[others, col] = pd.to_numeric(column[others], errors='coerce')
+        values[text, col] = parse_numbers(column[text])
+        is_text[:, col] = text
+
+    values = values.reshape(np.shape(grid))
+    missing = np.isnan(values)
+    coerced = is_text.reshape(missing.shape) & ~missing
+    return CoercedGrid(values, missing, coerced)
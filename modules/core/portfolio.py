@@ -0,0 +1,195 @@
+"""
+Notation d'un portefeuille de contreparties (mode débit, sans interface Streamlit)
+
+Le fichier d'entrée (CSV ou Parquet) contient une ligne par entreprise et
+une colonne par poste des états financiers (noms de ``calculate_ratios``),
+plus d'éventuelles colonnes d'identification reprises telles quelles.
+
+Le fichier est lu par blocs de ``chunk_rows`` lignes : la mémoire reste
+bornée par la taille d'un bloc, quelle que soit la taille du portefeuille.
+Chaque bloc est traité par colonnes entières :
+
+- ratios : moteur de ratios en mode analyse (``RatioEngine.calculate_batch``) ;
+- scores : grille du score (``calculate_score_batch``, absolu ou sectoriel) ;
+- interprétation (``FinancialAnalyzer.get_interpretation``) et classe
+  financière (``SessionManager.get_financial_class``) : recherche de la
+  classe du score global dans ``SCORE_CLASS_BOUNDS``.
+
+Les résultats sont écrits bloc par bloc (CSV, Parquet ou JSON lines), ou
+rassemblés en un DataFrame si aucun fichier de sortie n'est donné.
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.ratios import get_ratio_engine
+from modules.core.scoring import FINANCIAL_CLASSES, SCORE_INTERPRETATIONS, score_class_column
+from modules.core.statement import STATEMENT_SCHEMA
+
+PORTFOLIO_EXTENSIONS = ('.csv', '.parquet')
+DEFAULT_CHUNK_ROWS = 50_000
+
+_INTERPRETATION_LABELS = np.array([label for label, _ in SCORE_INTERPRETATIONS], dtype=object)
+_INTERPRETATION_COLORS = np.array([color for _, color in SCORE_INTERPRETATIONS], dtype=object)
+_FINANCIAL_CLASSES = np.array(FINANCIAL_CLASSES, dtype=object)
+
+
+def read_chunks(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Lit un portefeuille par blocs de ``chunk_rows`` lignes
+
+    Formats : .csv, .parquet (nécessite pyarrow)
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        with pd.read_csv(path, chunksize=chunk_rows, encoding='utf-8') as reader:
+            yield from reader
+    elif suffix == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Lecture Parquet : pyarrow est requis (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Format de portefeuille non supporté: {suffix} (csv ou parquet)")
+
+
+class ChunkWriter:
+    """Écrit les résultats bloc par bloc ; le format suit l'extension du fichier"""
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.suffix = Path(output_path).suffix.lower()
+        if self.suffix not in ('.csv', '.parquet', '.jsonl', '.json'):
+            raise ValueError(f"Format de sortie non supporté: {self.suffix} (csv, parquet ou jsonl)")
+        self._parquet_writer = None
+        self._first = True
+
+    def write(self, frame: pd.DataFrame):
+        mode = 'w' if self._first else 'a'
+        if self.suffix == '.csv':
+            frame.to_csv(self.output_path, mode=mode, header=self._first, index=False, encoding='utf-8')
+        elif self.suffix == '.parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            with open(self.output_path, mode, encoding='utf-8') as f:
+                frame.to_json(f, orient='records', lines=True, force_ascii=False, double_precision=15)
+        self._first = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+class PortfolioScorer:
+    """Ratios, scores, interprétations et classes d'un portefeuille, par colonnes"""
+
+    def __init__(self, analyzer: Optional[FinancialAnalyzer] = None, secteur: Optional[str] = None,
+                 sector_column: Optional[str] = None, mode: Optional[str] = None):
+        """
+        Args:
+            analyzer: analyseur (mode du moteur de ratios, grille, tables sectorielles)
+            secteur: secteur de tout le portefeuille
+            sector_column: colonne donnant le secteur de chaque ligne (prioritaire)
+            mode: 'absolu' ou 'sectoriel' (défaut : analyzer.score_mode)
+        """
+        self.analyzer = analyzer or FinancialAnalyzer()
+        self.secteur = secteur
+        self.sector_column = sector_column
+        self.mode = mode
+
+    def score_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Traite un bloc du portefeuille
+
+        Returns:
+            pd.DataFrame: colonnes d'identification, ``ratio.*``, ``score.*``,
+            'interpretation', 'couleur' et 'classe', même index que ``chunk``
+        """
+        ratios = get_ratio_engine().calculate_batch(chunk, self.analyzer.ratio_mode)
+        sectors = self.secteur
+        if self.sector_column and self.sector_column in chunk.columns:
+            sectors = chunk[self.sector_column].to_numpy(dtype=object)
+        scores = self.analyzer.calculate_score_batch(ratios, sectors, self.mode)
+
+        classes = score_class_column(scores['global'].to_numpy())
+        # Colonnes hors postes (identifiants, secteur...) reprises telles quelles
+        passthrough = [name for name in chunk.columns if name not in STATEMENT_SCHEMA.index]
+        parts = [
+            chunk[passthrough],
+            ratios.add_prefix('ratio.'),
+            scores.add_prefix('score.'),
+            pd.DataFrame({
+                'interpretation': _INTERPRETATION_LABELS[classes],
+                'couleur': _INTERPRETATION_COLORS[classes],
+                'classe': _FINANCIAL_CLASSES[classes],
+            }, index=chunk.index),
+        ]
+        return pd.concat(parts, axis=1)
+
+
+def score_portfolio(source: str, output_path: Optional[str] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    secteur: Optional[str] = None, sector_column: Optional[str] = None,
+                    mode: Optional[str] = None,
+                    analyzer: Optional[FinancialAnalyzer] = None) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+    """
+    Note un portefeuille par blocs de taille bornée
+
+    Args:
+        source: fichier CSV ou Parquet des postes, une ligne par entreprise
+        output_path: fichier de résultats (.csv, .parquet ou .jsonl), écrit bloc
+            par bloc ; si None, les résultats sont rassemblés en mémoire
+        chunk_rows: lignes par bloc
+        secteur, sector_column, mode: notation sectorielle (voir PortfolioScorer)
+
+    Returns:
+        tuple: (résultats si ``output_path`` est None, sinon None ; résumé de débit)
+    """
+    if chunk_rows <= 0:
+        raise ValueError(f"chunk_rows doit être positif: {chunk_rows}")
+    scorer = PortfolioScorer(analyzer, secteur, sector_column, mode)
+    writer = ChunkWriter(output_path) if output_path else None
+    results: List[pd.DataFrame] = []
+    classes: Dict[str, int] = dict.fromkeys(FINANCIAL_CLASSES, 0)
+    n_rows = n_chunks = 0
+    start = time.perf_counter()
+
+    try:
+        for chunk in read_chunks(source, chunk_rows):
+            scored = scorer.score_chunk(chunk)
+            n_rows += len(scored)
+            n_chunks += 1
+            for grade, count in scored['classe'].value_counts().items():
+                classes[grade] += int(count)
+            if writer is not None:
+                writer.write(scored)
+            else:
+                results.append(scored)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        'lignes': n_rows,
+        'blocs': n_chunks,
+        'duree_totale_s': elapsed,
+        'lignes_par_minute': n_rows * 60 / elapsed if elapsed > 0 else 0.0,
+        'classes': classes,
+    }
+    if writer is not None:
+        return None, summary
+    frame = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+    return frame, summary
@@ -0,0 +1,175 @@
+"""
+Contrôle préalable d'un classeur importé, sans décodage des feuilles
+
+Avant toute analyse, seuls le répertoire central de l'archive zip et
+xl/workbook.xml sont lus : un fichier corrompu, une archive anormalement
+compressée (bombe zip), un classeur trop volumineux ou un modèle sans les
+feuilles 'Bilan' et 'CR' est refusé en quelques millisecondes, avec un motif
+précis à afficher à l'utilisateur.
+
+Les formats sans archive zip (xls, csv) ne sont contrôlés que sur leur taille.
+"""
+
+import io
+import os
+import zipfile
+from typing import List, NamedTuple, Optional, Sequence
+
+from modules.core.readers import FORMAT_ODS, FORMAT_XLSX, MAGIC_ZIP, reader_for, source_signature
+from modules.core.sources import ExcelSource, as_readable, is_path
+from modules.core.xlsx_stream import is_buffer, workbook_sheet_paths
+
+REQUIRED_SHEETS = ('Bilan', 'CR')
+
+MB = 1024 * 1024
+
+
+class PreflightPolicy(NamedTuple):
+    """Limites appliquées à un classeur importé"""
+    max_file_bytes: int = 50 * MB
+    max_uncompressed_bytes: int = 300 * MB
+    max_member_bytes: int = 150 * MB
+    max_compression_ratio: float = 100.0
+    # Le taux de compression n'est contrôlé qu'au-delà de cette taille décompressée
+    ratio_threshold_bytes: int = 1 * MB
+    max_members: int = 5000
+
+
+DEFAULT_POLICY = PreflightPolicy()
+
+
+class PreflightReport(NamedTuple):
+    """Résultat du contrôle préalable"""
+    ok: bool
+    code: str
+    reason: str
+    format: Optional[str] = None
+    sheets: List[str] = []
+    file_bytes: int = 0
+    uncompressed_bytes: int = 0
+
+
+def _source_size(source: ExcelSource) -> int:
+    """Taille de la source en octets, sans la lire"""
+    if is_path(source):
+        return os.path.getsize(source)
+    if is_buffer(source):
+        return memoryview(source).nbytes
+    readable = as_readable(source)
+    size = readable.seek(0, io.SEEK_END)
+    readable.seek(0)
+    return size
+
+
+def _mb(size: int) -> str:
+    return f"{size / MB:.1f} Mo"
+
+
+def preflight_workbook(source: ExcelSource,
+                       policy: PreflightPolicy = DEFAULT_POLICY,
+                       required_sheets: Sequence[str] = REQUIRED_SHEETS,
+                       file_name: Optional[str] = None) -> PreflightReport:
+    """
+    Vérifie un classeur à partir de son répertoire zip, sans décoder de feuille
+
+    Args:
+        source: Chemin, bytes, memoryview ou objet fichier du classeur
+        policy: Limites de taille et de compression
+        required_sheets: Feuilles attendues ('Bilan' et 'CR' pour le modèle BCEAO)
+        file_name: Nom d'origine (fichiers importés), pour les messages et le format
+
+    Returns:
+        PreflightReport: ``ok`` et, en cas de refus, un code et un motif en clair
+    """
+    try:
+        file_bytes = _source_size(source)
+    except (OSError, TypeError) as e:
+        return PreflightReport(False, 'fichier_illisible', f"Fichier illisible : {e}")
+
+    if file_bytes > policy.max_file_bytes:
+        return PreflightReport(False, 'fichier_trop_volumineux',
+                               f"Fichier trop volumineux ({_mb(file_bytes)}) : "
+                               f"la limite est de {_mb(policy.max_file_bytes)}.",
+                               file_bytes=file_bytes)
+
+    signature = source_signature(source, file_name)
+    if signature.head.startswith(MAGIC_ZIP) and not signature.members:
+        # En-tête zip mais répertoire central illisible : fichier tronqué ou altéré
+        return PreflightReport(False, 'archive_corrompue',
+                               "Fichier Excel corrompu ou tronqué : l'archive est illisible.",
+                               file_bytes=file_bytes)
+
+    reader_cls = reader_for(source, file_name)
+    file_format = reader_cls.format if reader_cls is not None else None
+    if file_format is None:
+        return PreflightReport(False, 'format_inconnu',
+                               "Format de fichier non reconnu : importez le modèle Excel (.xlsx).",
+                               file_bytes=file_bytes)
+    if file_format not in (FORMAT_XLSX, FORMAT_ODS):
+        # Pas d'archive zip à inspecter : les feuilles sont vérifiées au chargement
+        return PreflightReport(True, 'ok', '', file_format, file_bytes=file_bytes)
+
+    try:
+        with zipfile.ZipFile(as_readable(source)) as archive:
+            members = archive.infolist()
+            if len(members) > policy.max_members:
+                return PreflightReport(False, 'bombe_zip',
+                                       f"Archive anormale : {len(members)} éléments "
+                                       f"(limite {policy.max_members}).",
+                                       file_format, file_bytes=file_bytes)
+
+            uncompressed = 0
+            for member in members:
+                uncompressed += member.file_size
+                if member.file_size > policy.max_member_bytes:
+                    return PreflightReport(False, 'feuille_trop_volumineuse',
+                                           f"Élément '{member.filename}' trop volumineux une fois "
+                                           f"décompressé ({_mb(member.file_size)}, limite "
+                                           f"{_mb(policy.max_member_bytes)}).",
+                                           file_format, file_bytes=file_bytes,
+                                           uncompressed_bytes=member.file_size)
+                ratio = member.file_size / max(member.compress_size, 1)
+                if member.file_size > policy.ratio_threshold_bytes and ratio > policy.max_compression_ratio:
+                    return PreflightReport(False, 'bombe_zip',
+                                           f"Archive anormalement compressée : '{member.filename}' "
+                                           f"se décompresse {ratio:.0f} fois "
+                                           f"(limite {policy.max_compression_ratio:.0f}).",
+                                           file_format, file_bytes=file_bytes,
+                                           uncompressed_bytes=member.file_size)
+            if uncompressed > policy.max_uncompressed_bytes:
+                return PreflightReport(False, 'bombe_zip',
+                                       f"Classeur trop volumineux une fois décompressé "
+                                       f"({_mb(uncompressed)}, limite {_mb(policy.max_uncompressed_bytes)}).",
+                                       file_format, file_bytes=file_bytes, uncompressed_bytes=uncompressed)
+
+            if file_format != FORMAT_XLSX:
+                return PreflightReport(True, 'ok', '', file_format, file_bytes=file_bytes,
+                                       uncompressed_bytes=uncompressed)
+
+            try:
+                sheet_paths = workbook_sheet_paths(archive)
+            except KeyError:
+                return PreflightReport(False, 'modele_invalide',
+                                       "Classeur invalide : xl/workbook.xml est absent.",
+                                       file_format, file_bytes=file_bytes, uncompressed_bytes=uncompressed)
+    except zipfile.BadZipFile as e:
+        return PreflightReport(False, 'archive_corrompue',
+                               f"Fichier Excel corrompu ou tronqué ({e}).",
+                               file_format, file_bytes=file_bytes)
+    except Exception as e:
+        return PreflightReport(False, 'archive_corrompue',
+                               f"Structure du classeur illisible ({e}).",
+                               file_format, file_bytes=file_bytes)
+
+    sheets = list(sheet_paths)
+    names = {member.filename for member in members}
+    missing = [sheet for sheet in required_sheets
+               if sheet not in sheet_paths or sheet_paths[sheet] not in names]
+    if missing:
+        found = ', '.join(f"'{sheet}'" for sheet in sheets) or 'aucune'
+        expected = ', '.join(f"'{sheet}'" for sheet in missing)
+        return PreflightReport(False, 'feuilles_manquantes',
+                               f"Feuille(s) {expected} introuvable(s). Feuilles présentes : {found}.",
+                               file_format, sheets, file_bytes, uncompressed)
+
+    return PreflightReport(True, 'ok', '', file_format, sheets, file_bytes, uncompressed)
@@ -0,0 +1,68 @@
+"""
+Aperçu borné des fichiers importés
+
+Seules les premières lignes de chaque feuille sont décodées : un classeur de
+plusieurs Mo s'affiche sans matérialiser ses feuilles complètes. Le lecteur est
+choisi d'après le contenu (readers.py) ; les classeurs XLSX en mémoire passent
+par le lecteur en flux partagé, de sorte que l'analyse lancée juste après
+l'aperçu réutilise les lignes déjà décodées.
+"""
+
+from typing import Dict, Optional
+
+import pandas as pd
+
+from modules.core.readers import FORMAT_CSV, open_sheet_reader
+
+PREVIEW_ROWS = 10
+
+
+def column_letter(index: int) -> str:
+    """Convertit un numéro de colonne (base 1) en lettres Excel : 1 -> 'A', 27 -> 'AA'"""
+    letters = ''
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _grid_to_frame(grid) -> pd.DataFrame:
+    """Grille brute -> DataFrame indexé comme la feuille (lignes 1..n, colonnes A, B...)"""
+    n_rows, n_cols = grid.shape
+    frame = pd.DataFrame(grid, index=range(1, n_rows + 1),
+                         columns=[column_letter(col) for col in range(1, n_cols + 1)])
+    return frame.infer_objects()
+
+
+def read_preview(source, max_rows: int = PREVIEW_ROWS, file_name: Optional[str] = None,
+                 prefetch_rows: Optional[Dict[str, int]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Lit au plus ``max_rows`` lignes de chaque feuille
+
+    Args:
+        source: Chemin, bytes, memoryview ou objet fichier
+        max_rows: Nombre de lignes affichées par feuille
+        file_name: Nom du fichier importé (distingue un CSV d'un texte quelconque)
+        prefetch_rows: Nombre de lignes par feuille que l'analyse lira ensuite ;
+            elles sont décodées dans la même passe et gardées par le lecteur partagé
+
+    Returns:
+        dict: {nom de feuille: DataFrame des premières lignes}
+
+    Raises:
+        ValueError: si le contenu n'est reconnu par aucun lecteur
+    """
+    with open_sheet_reader(source, file_name) as reader:
+        if reader.format == FORMAT_CSV:
+            # Export à plat : la première ligne donne les en-têtes de colonnes
+            grid = reader.read_head(reader.sheet_names[0], max_rows + 1)
+            header = list(grid[0]) if len(grid) else []
+            return {reader.sheet_names[0]: pd.DataFrame(grid[1:], columns=header).infer_objects()}
+
+        prefetch_rows = prefetch_rows or {}
+        previews = {}
+        for sheet_name in reader.sheet_names:
+            if prefetch_rows.get(sheet_name, 0) > max_rows:
+                reader.prefetch_rows(sheet_name, prefetch_rows[sheet_name])
+            previews[sheet_name] = _grid_to_frame(reader.read_head(sheet_name, max_rows))
+        return previews
@@ -0,0 +1,316 @@
+"""
+Graphe des ratios : intermédiaires nommés et ratios déclarés avec leurs dépendances
+
+Chaque nœud déclare ses entrées (autres nœuds ou postes des états
+financiers) et une fonction de calcul. Pour un ensemble de ratios demandés,
+seuls leurs ancêtres sont évalués, chacun une seule fois, dans l'ordre
+topologique : le BFR, les ressources stables ou l'actif circulant sont
+calculés une fois et partagés par tous les ratios qui en dépendent.
+
+Le même graphe s'évalue sur un jeu de données (dict, ``ScalarOps``) ou sur
+un portefeuille entier en colonnes NumPy (``ArrayOps``).
+
+En saisie interactive, ``reevaluate`` ne recalcule que les descendants des
+postes modifiés, et s'arrête sur une branche dont la valeur est inchangée.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Valeur d'un ratio non produit (condition non remplie) en évaluation scalaire
+ABSENT = object()
+
+
+class RatioNode(NamedTuple):
+    """
+    Nœud du graphe
+
+    ``compute(ops, *valeurs_des_entrées)`` ; ``when`` nomme un nœud booléen :
+    le nœud n'est produit que là où il est vrai. Un intermédiaire
+    (``output=False``) n'apparaît pas dans les résultats.
+    """
+    name: str
+    inputs: Tuple[str, ...]
+    compute: Callable[..., Any]
+    category: str = ''
+    when: Optional[str] = None
+    output: bool = True
+
+
+class BatchColumns:
+    """
+    Postes d'un portefeuille exposés en colonnes float64
+
+    Une colonne absente ou une cellule vide (NaN) correspond à un poste absent
+    du dict de ``calculate_all_ratios`` : la valeur par défaut s'applique.
+    """
+
+    def __init__(self, frame: Union[pd.DataFrame, np.ndarray]):
+        if not isinstance(frame, pd.DataFrame):
+            # Tableau structuré NumPy : un champ par poste
+            frame = pd.DataFrame(frame)
+        self.frame = frame
+        self.index = frame.index
+        self.n_rows = len(frame)
+        self._values: Dict[str, np.ndarray] = {}
+        self._filled: Dict[tuple, np.ndarray] = {}
+
+    def _raw(self, name: str) -> np.ndarray:
+        values = self._values.get(name)
+        if values is None:
+            if name in self.frame.columns:
+                values = pd.to_numeric(self.frame[name], errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                values = np.full(self.n_rows, np.nan)
+            self._values[name] = values
+        return values
+
+    def get(self, name: str, default=0) -> np.ndarray:
+        """Équivalent de ``data.get(name, default)`` ; ``default`` peut être une colonne"""
+        if isinstance(default, np.ndarray):
+            values = self._raw(name)
+            return np.where(np.isnan(values), default, values)
+        # Colonne complétée une fois par valeur par défaut (lecture seule, partagée)
+        key = (name, default)
+        filled = self._filled.get(key)
+        if filled is None:
+            values = self._raw(name)
+            filled = np.where(np.isnan(values), default, values)
+            filled.flags.writeable = False
+            self._filled[key] = filled
+        return filled
+
+
+class ScalarOps:
+    """Évaluation sur un dict de postes (valeurs Python)"""
+
+    def __init__(self, data: Dict[str, float], divide: Callable[..., float]):
+        self.data = data
+        self.div = divide
+
+    def field(self, name: str):
+        return self.data.get(name, 0)
+
+    def fields(self, names: Sequence[str]) -> List[Any]:
+        # Enregistrement à schéma fixe (statement.py) : lecture positionnelle
+        gather = getattr(self.data, 'gather', None)
+        if gather is not None:
+            return gather(names, 0)
+        get = self.data.get
+        return [get(name, 0) for name in names]
+
+    def get(self, name: str, default):
+        return self.data.get(name, default)
+
+    @staticmethod
+    def where(condition, value, otherwise):
+        return value if condition else otherwise
+
+    def conditional(self, condition, compute: Callable[..., Any], args: List[Any]):
+        return compute(self, *args) if condition else ABSENT
+
+
+class ArrayOps:
+    """Évaluation sur des colonnes NumPy (une ligne par entreprise/exercice)"""
+
+    def __init__(self, columns: BatchColumns, divide: Callable[..., np.ndarray]):
+        self.columns = columns
+        self.div = divide
+
+    def field(self, name: str) -> np.ndarray:
+        return self.columns.get(name)
+
+    def fields(self, names: Sequence[str]) -> List[np.ndarray]:
+        return [self.columns.get(name) for name in names]
+
+    def get(self, name: str, default) -> np.ndarray:
+        return self.columns.get(name, default)
+
+    @staticmethod
+    def where(condition, value, otherwise) -> np.ndarray:
+        return np.where(condition, value, otherwise)
+
+    def conditional(self, condition, compute: Callable[..., np.ndarray], args: List[Any]) -> np.ndarray:
+        return np.where(condition, compute(self, *args), np.nan)
+
+
+class EvaluationPlan(NamedTuple):
+    """Plan compilé : postes lus, puis nœuds dans l'ordre topologique"""
+    fields: Tuple[str, ...]
+    # (nom, entrées, calcul, condition, une entrée peut être absente)
+    steps: Tuple[Tuple[str, Tuple[str, ...], Callable[..., Any], Optional[str], bool], ...]
+
+    @property
+    def node_names(self) -> List[str]:
+        return [step[0] for step in self.steps]
+
+
+class RatioGraph:
+    """Ensemble de nœuds et plans d'évaluation (ancêtres triés topologiquement)"""
+
+    def __init__(self, nodes: Iterable[RatioNode]):
+        self.nodes: Dict[str, RatioNode] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Nœud de ratio dupliqué: {node.name}")
+            self.nodes[node.name] = node
+
+        self._plans: Dict[Tuple[str, ...], EvaluationPlan] = {}
+        self._lock = threading.Lock()
+        self._all_outputs = tuple(self.outputs())
+        self.plan(self._all_outputs)  # détecte les cycles dès la déclaration
+
+    def outputs(self, category: Optional[str] = None) -> List[str]:
+        """Ratios produits, dans l'ordre de déclaration (éventuellement d'une catégorie)"""
+        return [node.name for node in self.nodes.values()
+                if node.output and (category is None or node.category == category)]
+
+    def plan(self, names: Sequence[str]) -> EvaluationPlan:
+        """
+        Plan d'évaluation de ``names`` : leurs ancêtres, chacun une fois, dans
+        l'ordre topologique, et les postes à lire (plan mémorisé par demande)
+
+        Raises:
+            KeyError: ratio inconnu
+            ValueError: dépendance circulaire
+        """
+        key = tuple(names)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+
+        ordered: List[RatioNode] = []
+        state: Dict[str, int] = {}  # 1 : en cours de visite, 2 : visité
+
+        def visit(name: str):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Dépendance circulaire sur le ratio: {name}")
+            node = self.nodes[name]
+            state[name] = 1
+            dependencies = node.inputs + ((node.when,) if node.when else ())
+            for dependency in dependencies:
+                if dependency in self.nodes:
+                    visit(dependency)
+            state[name] = 2
+            ordered.append(node)
+
+        for name in key:
+            if name not in self.nodes:
+                raise KeyError(f"Ratio inconnu: {name}")
+            visit(name)
+
+        fields: List[str] = []
+        maybe_absent = set()
+        steps = []
+        for node in ordered:
+            for dependency in node.inputs:
+                if dependency not in self.nodes and dependency not in fields:
+                    fields.append(dependency)
+            # Un nœud conditionnel peut être absent, et avec lui ses descendants
+            check = any(dependency in maybe_absent for dependency in node.inputs)
+            if check or node.when is not None:
+                maybe_absent.add(node.name)
+            steps.append((node.name, node.inputs, node.compute, node.when, check))
+
+        plan = EvaluationPlan(tuple(fields), tuple(steps))
+        with self._lock:
+            self._plans[key] = plan
+        return plan
+
+    def required_fields(self, names: Sequence[str]) -> List[str]:
+        """Postes des états financiers lus pour produire ``names``"""
+        return list(self.plan(names).fields)
+
+    def evaluate(self, ops, names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Évalue les ratios demandés (tous par défaut)
+
+        Returns:
+            dict: ratio -> valeur, dans l'ordre de ``names`` ; en évaluation
+            scalaire, un ratio dont la condition n'est pas remplie est omis
+        """
+        names = self._all_outputs if names is None else names
+        return self.results(self.evaluate_values(ops, names), names)
+
+    def evaluate_values(self, ops, names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Valeurs de tous les nœuds et postes du plan (``ABSENT`` compris)
+
+        À conserver pour les recalculs incrémentaux (``reevaluate``).
+        """
+        plan = self.plan(self._all_outputs if names is None else names)
+        values: Dict[str, Any] = dict(zip(plan.fields, ops.fields(plan.fields)))
+        for step in plan.steps:
+            values[step[0]] = self._compute_step(ops, values, step)
+        return values
+
+    def results(self, values: Dict[str, Any], names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Ratios demandés extraits des valeurs du plan, ratios non produits omis"""
+        names = self._all_outputs if names is None else names
+        return {name: values[name] for name in names if values[name] is not ABSENT}
+
+    def reevaluate(self, ops, values: Dict[str, Any], changed_fields: Iterable[str],
+                   names: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Met à jour ``values`` après modification de postes
+
+        Seuls les nœuds dont une entrée (ou la condition) a changé de valeur
+        sont recalculés : un intermédiaire recalculé à l'identique ne
+        propage rien.
+
+        Args:
+            ops: opérations sur les données à jour
+            values: valeurs issues d'``evaluate_values`` pour les mêmes ``names``
+            changed_fields: postes modifiés depuis la dernière évaluation
+
+        Returns:
+            list: nœuds dont la valeur a changé, dans l'ordre du plan
+        """
+        plan = self.plan(self._all_outputs if names is None else names)
+        # Postes signalés modifiés (valeur ou présence dans les données)
+        dirty = set()
+        for name in changed_fields:
+            if name in values and name not in self.nodes:
+                values[name] = ops.field(name)
+                dirty.add(name)
+
+        changed: List[str] = []
+        if not dirty:
+            return changed
+        for step in plan.steps:
+            name, inputs, _, when, _ = step
+            if when not in dirty and dirty.isdisjoint(inputs):
+                continue
+            value = self._compute_step(ops, values, step)
+            if not _same_value(values[name], value):
+                values[name] = value
+                dirty.add(name)
+                changed.append(name)
+        return changed
+
+    @staticmethod
+    def _compute_step(ops, values: Dict[str, Any], step) -> Any:
+        name, inputs, compute, when, check = step
+        args = [values[dependency] for dependency in inputs]
+        if check and any(arg is ABSENT for arg in args):
+            return ABSENT
+        if when is None:
+            return compute(ops, *args)
+        return ops.conditional(values[when], compute, args)
+
+
+def _same_value(previous, value) -> bool:
+    """Valeur inchangée (identité, ou égalité scalaire)"""
+    if previous is value:
+        return True
+    if previous is ABSENT or value is ABSENT:
+        return False
+    try:
+        return bool(previous == value)
+    except (TypeError, ValueError):
+        return False
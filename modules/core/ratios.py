@@ -1,42 +1,386 @@
 """
 Calculateur de ratios financiers conforme aux normes BCEAO
+
+Les ratios sont déclarés une fois dans ``RATIO_GRAPH`` : intermédiaires
+nommés (actif circulant, BFR, ressources stables...) et ratios, avec leurs
+dépendances. ``calculate_ratios`` n'évalue que les ancêtres des ratios
+demandés, chacun une fois ; ``calculate_all_ratios`` traite un jeu de données
+(dict) et ``calculate_all_ratios_batch`` un portefeuille entier (DataFrame,
+une ligne par entreprise et exercice) par opérations NumPy sur des colonnes
+complètes.
+
+Deux modes de calcul, un seul moteur :
+- ``MODE_ANALYSE`` (``ANALYSIS_RATIO_GRAPH``) : ratios de l'analyse et du
+  score, produits seulement si leurs dénominateurs sont strictement positifs
+- ``MODE_COMPLET`` (``RATIO_GRAPH``) : tous les ratios, divisions sécurisées
+  (``safe_divide``) et valeurs par défaut ; le BFR y déduit les avances
+  clients reçues
+
+Pages, rapports et calcul par lots passent par ``compute_ratios`` /
+``get_ratio_engine()``, qui mémorise les derniers calculs.
 """
 
+import threading
+from collections import OrderedDict
+
 import numpy as np
-from typing import Dict, Any, Optional
+import pandas as pd
+from typing import Dict, Optional, Sequence, Union
+
+from modules.core.norms import get_norms
+from modules.core.ratio_graph import ArrayOps, BatchColumns, RatioGraph, RatioNode, ScalarOps
+
+LIQUIDITE = 'liquidite'
+SOLVABILITE = 'solvabilite'
+RENTABILITE = 'rentabilite'
+ACTIVITE = 'activite'
+GESTION = 'gestion'
+STRUCTURE = 'structure'
+BCEAO = 'bceao'
+
+
+def _intermediate(name: str, inputs, compute) -> RatioNode:
+    return RatioNode(name, tuple(inputs), compute, output=False)
+
+
+# Intermédiaires communs aux deux graphes
+ACTIF_CIRCULANT = _intermediate('actif_circulant', ('stocks', 'creances_clients', 'autres_creances', 'tresorerie'),
+                                lambda op, stocks, clients, autres, tresorerie: stocks + clients + autres + tresorerie)
+# Actif liquide (sans stocks)
+ACTIF_LIQUIDE = _intermediate('actif_liquide', ('creances_clients', 'autres_creances', 'tresorerie'),
+                              lambda op, clients, autres, tresorerie: clients + autres + tresorerie)
+DETTES_TOTALES = _intermediate('dettes_totales', ('dettes_financieres', 'dettes_court_terme'),
+                               lambda op, financieres, court_terme: financieres + court_terme)
+ACHATS_TOTAUX = _intermediate('achats_totaux', ('achats_matieres_premieres', 'autres_achats'),
+                              lambda op, matieres, autres: matieres + autres)
+HAS_CA = _intermediate('has_ca', ('chiffre_affaires',), lambda op, ca: ca > 0)
+HAS_ACTIF = _intermediate('has_actif', ('total_actif',), lambda op, actif: actif > 0)
+HAS_VA = _intermediate('has_va', ('valeur_ajoutee',), lambda op, va: va > 0)
+TRESORERIE_NETTE = RatioNode('tresorerie_nette', ('tresorerie', 'tresorerie_passif'),
+                             lambda op, tresorerie, passif: tresorerie - passif, LIQUIDITE)
+
+
+RATIO_GRAPH = RatioGraph([
+    # ------------------------------------------------------------------
+    # Intermédiaires partagés
+    # ------------------------------------------------------------------
+    ACTIF_CIRCULANT,
+    ACTIF_LIQUIDE,
+    DETTES_TOTALES,
+    # Ressources stables déclarées, à défaut capitaux propres + dettes financières
+    # (le poste déclaré figure dans les entrées pour le suivi des dépendances)
+    _intermediate('ressources_stables_retenues', ('ressources_stables', 'capitaux_propres', 'dettes_financieres'),
+                  lambda op, declarees, capitaux, dettes: op.get('ressources_stables', capitaux + dettes)),
+    ACHATS_TOTAUX,
+    _intermediate('creances_totales', ('creances_clients', 'autres_creances'),
+                  lambda op, clients, autres: clients + autres),
+    # Conditions de production des ratios
+    HAS_CA,
+    HAS_ACTIF,
+    _intermediate('has_stocks', ('stocks',), lambda op, stocks: stocks > 0),
+    _intermediate('has_creances', ('creances_clients',), lambda op, clients: clients > 0),
+    _intermediate('has_fournisseurs', ('fournisseurs_exploitation', 'achats_totaux'),
+                  lambda op, fournisseurs, achats: (fournisseurs > 0) & (achats > 0)),
+    _intermediate('has_bfr', ('bfr',), lambda op, bfr: bfr > 0),
+    _intermediate('has_personnel', ('charges_personnel',), lambda op, personnel: personnel > 0),
+    HAS_VA,
+    _intermediate('has_creances_totales', ('creances_totales',), lambda op, creances: creances > 0),
+
+    # ------------------------------------------------------------------
+    # Liquidité
+    # ------------------------------------------------------------------
+    RatioNode('ratio_liquidite_generale', ('actif_circulant', 'dettes_court_terme'),
+              lambda op, actif, dettes: op.div(actif, dettes, 0), LIQUIDITE),
+    # Quick ratio
+    RatioNode('ratio_liquidite_immediate', ('actif_liquide', 'dettes_court_terme'),
+              lambda op, actif, dettes: op.div(actif, dettes, 0), LIQUIDITE),
+    RatioNode('ratio_liquidite_absolue', ('tresorerie', 'dettes_court_terme'),
+              lambda op, tresorerie, dettes: op.div(tresorerie, dettes, 0), LIQUIDITE),
+    # Besoin en Fonds de Roulement d'exploitation
+    RatioNode('bfr', ('stocks', 'creances_clients', 'autres_creances', 'fournisseurs_avances_versees',
+                      'fournisseurs_exploitation', 'dettes_sociales_fiscales', 'autres_dettes',
+                      'clients_avances_recues'),
+              lambda op, stocks, clients, autres, avances_versees, fournisseurs, sociales, autres_dettes,
+              avances_recues: (stocks + clients + autres + avances_versees - fournisseurs - sociales
+                               - autres_dettes - avances_recues), LIQUIDITE),
+    RatioNode('bfr_jours_ca', ('bfr', 'chiffre_affaires'),
+              lambda op, bfr, ca: (bfr / ca) * 365, LIQUIDITE, when='has_ca'),
+    RatioNode('bfr_pourcentage_ca', ('bfr', 'chiffre_affaires'),
+              lambda op, bfr, ca: (bfr / ca) * 100, LIQUIDITE, when='has_ca'),
+    TRESORERIE_NETTE,
+
+    # ------------------------------------------------------------------
+    # Solvabilité
+    # ------------------------------------------------------------------
+    RatioNode('ratio_autonomie_financiere', ('capitaux_propres', 'total_actif'),
+              lambda op, capitaux, actif: op.div(capitaux, actif, 0) * 100, SOLVABILITE),
+    RatioNode('ratio_endettement', ('dettes_totales', 'total_actif'),
+              lambda op, dettes, actif: op.div(dettes, actif, 0) * 100, SOLVABILITE),
+    RatioNode('ratio_endettement_financier', ('dettes_financieres', 'capitaux_propres'),
+              lambda op, dettes, capitaux: op.div(dettes, capitaux, 0), SOLVABILITE),
+    RatioNode('ratio_structure_financiere', ('dettes_financieres', 'dettes_totales'),
+              lambda op, financieres, totales: op.div(financieres, totales, 0) * 100, SOLVABILITE),
+    RatioNode('financement_immobilisations', ('ressources_stables_retenues', 'immobilisations_nettes'),
+              lambda op, ressources, immobilisations: op.div(ressources, immobilisations, 0) * 100, SOLVABILITE),
+    RatioNode('capacite_remboursement', ('dettes_financieres', 'cafg'),
+              lambda op, dettes, cafg: op.where(cafg > 0, op.div(dettes, cafg, 999), 999), SOLVABILITE),
+    RatioNode('couverture_charges_financieres', ('excedent_brut', 'frais_financiers'),
+              lambda op, ebe, frais: op.div(ebe, abs(frais), 0), SOLVABILITE),
+
+    # ------------------------------------------------------------------
+    # Rentabilité
+    # ------------------------------------------------------------------
+    RatioNode('roa', ('resultat_net', 'total_actif'),
+              lambda op, resultat, actif: op.div(resultat, actif, 0) * 100, RENTABILITE),
+    RatioNode('roa_exploitation', ('resultat_exploitation', 'total_actif'),
+              lambda op, resultat, actif: op.div(resultat, actif, 0) * 100, RENTABILITE),
+    RatioNode('roe', ('resultat_net', 'capitaux_propres'),
+              lambda op, resultat, capitaux: op.div(resultat, capitaux, 0) * 100, RENTABILITE),
+    RatioNode('roe_exploitation', ('resultat_exploitation', 'capitaux_propres'),
+              lambda op, resultat, capitaux: op.div(resultat, capitaux, 0) * 100, RENTABILITE),
+    RatioNode('marge_commerciale_pct', ('marge_commerciale', 'chiffre_affaires'),
+              lambda op, marge, ca: op.div(marge, ca, 0) * 100, RENTABILITE, when='has_ca'),
+    RatioNode('marge_valeur_ajoutee', ('valeur_ajoutee', 'chiffre_affaires'),
+              lambda op, va, ca: op.div(va, ca, 0) * 100, RENTABILITE, when='has_ca'),
+    RatioNode('marge_excedent_brut', ('excedent_brut', 'chiffre_affaires'),
+              lambda op, ebe, ca: op.div(ebe, ca, 0) * 100, RENTABILITE, when='has_ca'),
+    RatioNode('marge_exploitation', ('resultat_exploitation', 'chiffre_affaires'),
+              lambda op, resultat, ca: op.div(resultat, ca, 0) * 100, RENTABILITE, when='has_ca'),
+    RatioNode('marge_nette', ('resultat_net', 'chiffre_affaires'),
+              lambda op, resultat, ca: op.div(resultat, ca, 0) * 100, RENTABILITE, when='has_ca'),
+    # Marge brute (approximation : achats comme coûts directs)
+    RatioNode('marge_brute', ('chiffre_affaires', 'achats_totaux'),
+              lambda op, ca, couts: op.div(ca - couts, ca, 0) * 100, RENTABILITE, when='has_ca'),
+    RatioNode('coefficient_exploitation', ('charges_exploitation', 'chiffre_affaires'),
+              lambda op, charges, ca: op.div(charges, ca, 0) * 100, RENTABILITE, when='has_ca'),
+    RatioNode('rentabilite_economique', ('resultat_exploitation', 'frais_financiers', 'total_actif', 'tresorerie'),
+              lambda op, resultat, frais, actif, tresorerie: op.div(resultat + abs(frais), actif - tresorerie, 0) * 100,
+              RENTABILITE),
+
+    # ------------------------------------------------------------------
+    # Activité
+    # ------------------------------------------------------------------
+    RatioNode('rotation_actif', ('chiffre_affaires', 'total_actif'),
+              lambda op, ca, actif: op.div(ca, actif, 0), ACTIVITE),
+    RatioNode('rotation_immobilisations', ('chiffre_affaires', 'immobilisations_nettes'),
+              lambda op, ca, immobilisations: op.div(ca, immobilisations, 0), ACTIVITE),
+    RatioNode('rotation_stocks', ('chiffre_affaires', 'stocks'),
+              lambda op, ca, stocks: op.div(ca, stocks, 0), ACTIVITE, when='has_stocks'),
+    RatioNode('duree_ecoulement_stocks', ('rotation_stocks',),
+              lambda op, rotation: op.div(365, rotation, 0), ACTIVITE, when='has_stocks'),
+    RatioNode('rotation_creances', ('chiffre_affaires', 'creances_clients'),
+              lambda op, ca, clients: op.div(ca, clients, 0), ACTIVITE, when='has_creances'),
+    RatioNode('delai_recouvrement_clients', ('rotation_creances',),
+              lambda op, rotation: op.div(365, rotation, 0), ACTIVITE, when='has_creances'),
+    RatioNode('rotation_fournisseurs', ('achats_totaux', 'fournisseurs_exploitation'),
+              lambda op, achats, fournisseurs: op.div(achats, fournisseurs, 0), ACTIVITE, when='has_fournisseurs'),
+    RatioNode('delai_paiement_fournisseurs', ('rotation_fournisseurs',),
+              lambda op, rotation: op.div(365, rotation, 0), ACTIVITE, when='has_fournisseurs'),
+    RatioNode('rotation_bfr', ('chiffre_affaires', 'bfr'),
+              lambda op, ca, bfr: op.div(ca, bfr, 0), ACTIVITE, when='has_bfr'),
+
+    # ------------------------------------------------------------------
+    # Gestion
+    # ------------------------------------------------------------------
+    RatioNode('productivite_personnel', ('valeur_ajoutee', 'charges_personnel'),
+              lambda op, va, personnel: op.div(va, personnel, 0), GESTION, when='has_personnel'),
+    RatioNode('ca_par_employe', ('chiffre_affaires', 'charges_personnel'),
+              lambda op, ca, personnel: op.div(ca, personnel, 0) * 50000, GESTION, when='has_ca'),  # Approximation
+    RatioNode('taux_charges_personnel', ('charges_personnel', 'valeur_ajoutee'),
+              lambda op, personnel, va: op.div(personnel, va, 0) * 100, GESTION, when='has_va'),
+    RatioNode('intensite_capitalistique', ('immobilisations_nettes', 'charges_personnel'),
+              lambda op, immobilisations, personnel: op.div(immobilisations, personnel, 0), GESTION,
+              when='has_personnel'),
+    RatioNode('ratio_cafg_ca', ('cafg', 'chiffre_affaires'),
+              lambda op, cafg, ca: op.div(cafg, ca, 0) * 100, GESTION, when='has_ca'),
+    RatioNode('ratio_cafg_actif', ('cafg', 'total_actif'),
+              lambda op, cafg, actif: op.div(cafg, actif, 0) * 100, GESTION, when='has_actif'),
+    RatioNode('taux_ebe_va', ('excedent_brut', 'valeur_ajoutee'),
+              lambda op, ebe, va: op.div(ebe, va, 0) * 100, GESTION, when='has_va'),
+
+    # ------------------------------------------------------------------
+    # Structure
+    # ------------------------------------------------------------------
+    RatioNode('fonds_roulement', ('ressources_stables_retenues', 'immobilisations_nettes'),
+              lambda op, ressources, immobilisations: ressources - immobilisations, STRUCTURE),
+    RatioNode('fonds_roulement_jours_ca', ('fonds_roulement', 'chiffre_affaires'),
+              lambda op, fonds, ca: op.div(fonds, ca, 0) * 365, STRUCTURE, when='has_ca'),
+    # Structure de l'actif
+    RatioNode('pct_immobilisations', ('immobilisations_nettes', 'total_actif'),
+              lambda op, immobilisations, actif: op.div(immobilisations, actif, 0) * 100, STRUCTURE,
+              when='has_actif'),
+    RatioNode('pct_actif_circulant', ('total_actif_circulant', 'total_actif'),
+              lambda op, circulant, actif: op.div(circulant, actif, 0) * 100, STRUCTURE, when='has_actif'),
+    RatioNode('pct_tresorerie', ('tresorerie', 'total_actif'),
+              lambda op, tresorerie, actif: op.div(tresorerie, actif, 0) * 100, STRUCTURE, when='has_actif'),
+    # Structure du passif
+    RatioNode('pct_capitaux_propres', ('capitaux_propres', 'total_actif'),
+              lambda op, capitaux, actif: op.div(capitaux, actif, 0) * 100, STRUCTURE, when='has_actif'),
+    RatioNode('pct_dettes_financieres', ('dettes_financieres', 'total_actif'),
+              lambda op, dettes, actif: op.div(dettes, actif, 0) * 100, STRUCTURE, when='has_actif'),
+    RatioNode('pct_dettes_court_terme', ('dettes_court_terme', 'total_actif'),
+              lambda op, dettes, actif: op.div(dettes, actif, 0) * 100, STRUCTURE, when='has_actif'),
+
+    # ------------------------------------------------------------------
+    # BCEAO (adaptation banques/entreprises)
+    # ------------------------------------------------------------------
+    RatioNode('ratio_fonds_propres_base', ('capitaux_propres', 'total_actif'),
+              lambda op, capitaux, actif: op.div(capitaux, actif, 0) * 100, BCEAO, when='has_actif'),
+    # Couverture des emplois MLT : même calcul que le financement des immobilisations
+    RatioNode('coeff_couverture_emplois_mlt', ('financement_immobilisations',),
+              lambda op, financement: financement, BCEAO),
+    RatioNode('ratio_transformation', ('immobilisations_nettes', 'ressources_stables_retenues'),
+              lambda op, emplois, ressources: op.div(emplois, ressources, 0) * 100, BCEAO),
+    # Approximation des créances douteuses par les provisions clients
+    RatioNode('taux_creances_douteuses', ('provisions_clients', 'creances_totales'),
+              lambda op, douteuses, creances: op.div(douteuses, creances, 0) * 100, BCEAO,
+              when='has_creances_totales'),
+])
+
+
+# Ratios de l'analyse (FinancialAnalyzer) : chaque ratio n'est produit que si
+# ses dénominateurs sont strictement positifs, divisions sans epsilon
+ANALYSIS_RATIO_GRAPH = RatioGraph([
+    ACTIF_CIRCULANT,
+    ACTIF_LIQUIDE,
+    DETTES_TOTALES,
+    ACHATS_TOTAUX,
+    HAS_CA,
+    HAS_ACTIF,
+    HAS_VA,
+    _intermediate('has_dettes_ct', ('dettes_court_terme',), lambda op, dettes: dettes > 0),
+    _intermediate('has_capitaux', ('capitaux_propres',), lambda op, capitaux: capitaux > 0),
+    _intermediate('has_immobilisations', ('immobilisations_nettes',), lambda op, immobilisations: immobilisations > 0),
+    _intermediate('has_couverture', ('has_actif', 'dettes_financieres', 'frais_financiers'),
+                  lambda op, actif, dettes, frais: actif & (dettes > 0) & (frais != 0)),
+    # Total actif absent : 1 (calcul historique) ; total nul : rotation non produite
+    _intermediate('actif_rotation', ('total_actif',), lambda op, actif: op.get('total_actif', 1)),
+    _intermediate('has_rotation_actif', ('has_ca', 'actif_rotation'), lambda op, ca, actif: ca & (actif != 0)),
+    _intermediate('has_stocks_ca', ('has_ca', 'stocks'), lambda op, ca, stocks: ca & (stocks > 0)),
+    _intermediate('has_creances_ca', ('has_ca', 'creances_clients'), lambda op, ca, clients: ca & (clients > 0)),
+    _intermediate('has_fournisseurs_ca', ('has_ca', 'fournisseurs_exploitation', 'achats_totaux'),
+                  lambda op, ca, fournisseurs, achats: ca & (fournisseurs > 0) & (achats > 0)),
+    _intermediate('has_charges_ca', ('has_ca', 'charges_exploitation'), lambda op, ca, charges: ca & (charges > 0)),
+    _intermediate('has_personnel_va', ('has_va', 'charges_personnel'), lambda op, va, personnel: va & (personnel > 0)),
+    _intermediate('has_remboursement', ('dettes_financieres', 'cafg'),
+                  lambda op, dettes, cafg: (dettes > 0) & (cafg > 0)),
+
+    # Liquidité
+    RatioNode('ratio_liquidite_generale', ('actif_circulant', 'dettes_court_terme'),
+              lambda op, actif, dettes: actif / dettes, LIQUIDITE, when='has_dettes_ct'),
+    RatioNode('ratio_liquidite_immediate', ('actif_liquide', 'dettes_court_terme'),
+              lambda op, actif, dettes: actif / dettes, LIQUIDITE, when='has_dettes_ct'),
+    RatioNode('ratio_liquidite_absolue', ('tresorerie', 'dettes_court_terme'),
+              lambda op, tresorerie, dettes: tresorerie / dettes, LIQUIDITE, when='has_dettes_ct'),
+    # Solvabilité
+    RatioNode('ratio_endettement', ('dettes_totales', 'total_actif'),
+              lambda op, dettes, actif: dettes / actif * 100, SOLVABILITE, when='has_actif'),
+    RatioNode('ratio_autonomie_financiere', ('capitaux_propres', 'total_actif'),
+              lambda op, capitaux, actif: capitaux / actif * 100, SOLVABILITE, when='has_actif'),
+    RatioNode('ratio_couverture_charges_financieres', ('excedent_brut', 'frais_financiers'),
+              lambda op, ebe, frais: ebe / abs(frais), SOLVABILITE, when='has_couverture'),
+    # Activité et rotation
+    RatioNode('rotation_actif', ('chiffre_affaires', 'actif_rotation'),
+              lambda op, ca, actif: ca / actif, ACTIVITE, when='has_rotation_actif'),
+    RatioNode('rotation_stocks', ('chiffre_affaires', 'stocks'),
+              lambda op, ca, stocks: ca / stocks, ACTIVITE, when='has_stocks_ca'),
+    RatioNode('duree_ecoulement_stocks', ('rotation_stocks',),
+              lambda op, rotation: 365 / rotation, ACTIVITE, when='has_stocks_ca'),
+    RatioNode('rotation_creances', ('chiffre_affaires', 'creances_clients'),
+              lambda op, ca, clients: ca / clients, ACTIVITE, when='has_creances_ca'),
+    RatioNode('delai_recouvrement_clients', ('rotation_creances',),
+              lambda op, rotation: 365 / rotation, ACTIVITE, when='has_creances_ca'),
+    RatioNode('rotation_fournisseurs', ('achats_totaux', 'fournisseurs_exploitation'),
+              lambda op, achats, fournisseurs: achats / fournisseurs, ACTIVITE, when='has_fournisseurs_ca'),
+    RatioNode('delai_paiement_fournisseurs', ('rotation_fournisseurs',),
+              lambda op, rotation: 365 / rotation, ACTIVITE, when='has_fournisseurs_ca'),
+    # Structure financière (ressources stables non renseignées : 0)
+    RatioNode('financement_immobilisations', ('ressources_stables', 'immobilisations_nettes'),
+              lambda op, ressources, immobilisations: ressources / immobilisations * 100, STRUCTURE,
+              when='has_immobilisations'),
+    RatioNode('ratio_endettement_financier', ('dettes_financieres', 'capitaux_propres'),
+              lambda op, dettes, capitaux: dettes / capitaux, SOLVABILITE, when='has_capitaux'),
+    # Rentabilité
+    RatioNode('roa', ('resultat_net', 'total_actif'),
+              lambda op, resultat, actif: resultat / actif * 100, RENTABILITE, when='has_actif'),
+    RatioNode('roa_exploitation', ('resultat_exploitation', 'total_actif'),
+              lambda op, resultat, actif: resultat / actif * 100, RENTABILITE, when='has_actif'),
+    RatioNode('roe', ('resultat_net', 'capitaux_propres'),
+              lambda op, resultat, capitaux: resultat / capitaux * 100, RENTABILITE, when='has_capitaux'),
+    RatioNode('roe_exploitation', ('resultat_exploitation', 'capitaux_propres'),
+              lambda op, resultat, capitaux: resultat / capitaux * 100, RENTABILITE, when='has_capitaux'),
+    RatioNode('marge_commerciale_pct', ('marge_commerciale', 'chiffre_affaires'),
+              lambda op, marge, ca: marge / ca * 100, RENTABILITE, when='has_ca'),
+    RatioNode('marge_brute', ('chiffre_affaires', 'achats_totaux'),
+              lambda op, ca, couts: (ca - couts) / ca * 100, RENTABILITE, when='has_ca'),
+    RatioNode('marge_valeur_ajoutee', ('valeur_ajoutee', 'chiffre_affaires'),
+              lambda op, va, ca: va / ca * 100, RENTABILITE, when='has_ca'),
+    RatioNode('marge_excedent_brut', ('excedent_brut', 'chiffre_affaires'),
+              lambda op, ebe, ca: ebe / ca * 100, RENTABILITE, when='has_ca'),
+    RatioNode('marge_exploitation', ('resultat_exploitation', 'chiffre_affaires'),
+              lambda op, resultat, ca: resultat / ca * 100, RENTABILITE, when='has_ca'),
+    RatioNode('marge_nette', ('resultat_net', 'chiffre_affaires'),
+              lambda op, resultat, ca: resultat / ca * 100, RENTABILITE, when='has_ca'),
+    RatioNode('coefficient_exploitation', ('charges_exploitation', 'chiffre_affaires'),
+              lambda op, charges, ca: charges / ca * 100, RENTABILITE, when='has_charges_ca'),
+    # Productivité
+    RatioNode('taux_charges_personnel', ('charges_personnel', 'valeur_ajoutee'),
+              lambda op, personnel, va: personnel / va * 100, GESTION, when='has_va'),
+    RatioNode('productivite_personnel', ('valeur_ajoutee', 'charges_personnel'),
+              lambda op, va, personnel: va / personnel, GESTION, when='has_personnel_va'),
+    # Flux de trésorerie
+    RatioNode('ratio_cafg_ca', ('cafg', 'chiffre_affaires'),
+              lambda op, cafg, ca: cafg / ca * 100, GESTION, when='has_ca'),
+    RatioNode('capacite_remboursement', ('dettes_financieres', 'cafg'),
+              lambda op, dettes, cafg: dettes / cafg, SOLVABILITE, when='has_remboursement'),
+    # BFR d'exploitation (sans les avances clients reçues)
+    RatioNode('bfr', ('stocks', 'creances_clients', 'autres_creances', 'fournisseurs_avances_versees',
+                      'fournisseurs_exploitation', 'dettes_sociales_fiscales', 'autres_dettes'),
+              lambda op, stocks, clients, autres, avances_versees, fournisseurs, sociales, autres_dettes:
+              stocks + clients + autres + avances_versees - fournisseurs - sociales - autres_dettes, LIQUIDITE),
+    RatioNode('bfr_jours_ca', ('bfr', 'chiffre_affaires'),
+              lambda op, bfr, ca: (bfr / ca) * 365, LIQUIDITE, when='has_ca'),
+    RatioNode('fonds_roulement', ('ressources_stables', 'immobilisations_nettes'),
+              lambda op, ressources, immobilisations: ressources - immobilisations, STRUCTURE),
+    TRESORERIE_NETTE,
+])
+
+
+MODE_ANALYSE = 'analyse'
+MODE_COMPLET = 'complet'
+
+# Graphe évalué par mode
+RATIO_GRAPHS = {
+    MODE_ANALYSE: ANALYSIS_RATIO_GRAPH,
+    MODE_COMPLET: RATIO_GRAPH,
+}
+
 
 class RatiosCalculator:
     """Calculateur de tous les ratios financiers"""
     
-    def __init__(self):
+    def __init__(self, mode: str = MODE_COMPLET):
+        if mode not in RATIO_GRAPHS:
+            raise ValueError(f"Mode de calcul inconnu: {mode} (attendu: {', '.join(RATIO_GRAPHS)})")
         self.epsilon = 1e-6  # Pour éviter les divisions par zéro
+        self.mode = mode
+        self.graph = RATIO_GRAPHS[mode]
     
     def calculate_all_ratios(self, data: Dict[str, float]) -> Dict[str, float]:
         """Calcule tous les ratios financiers"""
-        ratios = {}
-        
-        # Ratios de liquidité
-        ratios.update(self.calculate_liquidite_ratios(data))
-        
-        # Ratios de solvabilité
-        ratios.update(self.calculate_solvabilite_ratios(data))
-        
-        # Ratios de rentabilité
-        ratios.update(self.calculate_rentabilite_ratios(data))
-        
-        # Ratios d'activité
-        ratios.update(self.calculate_activite_ratios(data))
-        
-        # Ratios de gestion
-        ratios.update(self.calculate_gestion_ratios(data))
-        
-        # Ratios de structure
-        ratios.update(self.calculate_structure_ratios(data))
+        return self.calculate_ratios(data)
+    
+    def calculate_ratios(self, data: Dict[str, float], names: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """
+        Calcule les ratios demandés (tous par défaut)
         
-        # Ratios BCEAO spécifiques
-        ratios.update(self.calculate_bceao_ratios(data))
+        Seuls les intermédiaires nécessaires à ``names`` sont évalués, chacun une fois.
         
-        return ratios
+        Args:
+            data: Postes des états financiers
+            names: Ratios à produire (voir ``RATIO_GRAPH.outputs()``)
+        """
+        return self.graph.evaluate(ScalarOps(data, self.safe_divide), names)
     
     def safe_divide(self, numerator: float, denominator: float, default: float = 0) -> float:
         """Division sécurisée pour éviter les erreurs"""
@@ -46,329 +390,81 @@ class RatiosCalculator:
     
     def calculate_liquidite_ratios(self, data: Dict[str, float]) -> Dict[str, float]:
         """Calcule les ratios de liquidité"""
-        ratios = {}
-        
-        # Actif circulant total
-        actif_circulant = (
-            data.get('stocks', 0) + 
-            data.get('creances_clients', 0) + 
-            data.get('autres_creances', 0) + 
-            data.get('tresorerie', 0)
-        )
-        
-        # Actif liquide (sans stocks)
-        actif_liquide = (
-            data.get('creances_clients', 0) + 
-            data.get('autres_creances', 0) + 
-            data.get('tresorerie', 0)
-        )
-        
-        dettes_ct = data.get('dettes_court_terme', 0)
-        
-        # Ratio de liquidité générale
-        ratios['ratio_liquidite_generale'] = self.safe_divide(actif_circulant, dettes_ct, 0)
-        
-        # Ratio de liquidité immédiate (quick ratio)
-        ratios['ratio_liquidite_immediate'] = self.safe_divide(actif_liquide, dettes_ct, 0)
-        
-        # Ratio de liquidité absolue
-        ratios['ratio_liquidite_absolue'] = self.safe_divide(data.get('tresorerie', 0), dettes_ct, 0)
-        
-        # BFR et ratios associés
-        bfr = self.calculate_bfr(data)
-        ratios['bfr'] = bfr
-        
-        if data.get('chiffre_affaires', 0) > 0:
-            ratios['bfr_jours_ca'] = (bfr / data['chiffre_affaires']) * 365
-            ratios['bfr_pourcentage_ca'] = (bfr / data['chiffre_affaires']) * 100
-        
-        # Trésorerie nette
-        tresorerie_nette = data.get('tresorerie', 0) - data.get('tresorerie_passif', 0)
-        ratios['tresorerie_nette'] = tresorerie_nette
-        
-        return ratios
+        return self.calculate_ratios(data, self.graph.outputs(LIQUIDITE))
     
     def calculate_solvabilite_ratios(self, data: Dict[str, float]) -> Dict[str, float]:
         """Calcule les ratios de solvabilité"""
-        ratios = {}
-        
-        total_actif = data.get('total_actif', 0)
-        capitaux_propres = data.get('capitaux_propres', 0)
-        dettes_financieres = data.get('dettes_financieres', 0)
-        dettes_ct = data.get('dettes_court_terme', 0)
-        
-        # Dettes totales
-        dettes_totales = dettes_financieres + dettes_ct
-        
-        # Ratio d'autonomie financière
-        ratios['ratio_autonomie_financiere'] = self.safe_divide(capitaux_propres, total_actif, 0) * 100
-        
-        # Ratio d'endettement global
-        ratios['ratio_endettement'] = self.safe_divide(dettes_totales, total_actif, 0) * 100
-        
-        # Ratio d'endettement financier
-        ratios['ratio_endettement_financier'] = self.safe_divide(dettes_financieres, capitaux_propres, 0)
-        
-        # Ratio de structure financière
-        ratios['ratio_structure_financiere'] = self.safe_divide(dettes_financieres, dettes_totales, 0) * 100
-        
-        # Financement des immobilisations
-        ressources_stables = data.get('ressources_stables', capitaux_propres + dettes_financieres)
-        immobilisations = data.get('immobilisations_nettes', 0)
-        ratios['financement_immobilisations'] = self.safe_divide(ressources_stables, immobilisations, 0) * 100
-        
-        # Capacité de remboursement
-        cafg = data.get('cafg', 0)
-        if cafg > 0:
-            ratios['capacite_remboursement'] = self.safe_divide(dettes_financieres, cafg, 999)
-        else:
-            ratios['capacite_remboursement'] = 999
-        
-        # Couverture des charges financières
-        ebe = data.get('excedent_brut', 0)
-        frais_financiers = abs(data.get('frais_financiers', 0))
-        ratios['couverture_charges_financieres'] = self.safe_divide(ebe, frais_financiers, 0)
-        
-        return ratios
+        return self.calculate_ratios(data, self.graph.outputs(SOLVABILITE))
     
     def calculate_rentabilite_ratios(self, data: Dict[str, float]) -> Dict[str, float]:
         """Calcule les ratios de rentabilité"""
-        ratios = {}
-        
-        total_actif = data.get('total_actif', 0)
-        capitaux_propres = data.get('capitaux_propres', 0)
-        chiffre_affaires = data.get('chiffre_affaires', 0)
-        resultat_net = data.get('resultat_net', 0)
-        resultat_exploitation = data.get('resultat_exploitation', 0)
-        
-        # ROA (Return on Assets)
-        ratios['roa'] = self.safe_divide(resultat_net, total_actif, 0) * 100
-        ratios['roa_exploitation'] = self.safe_divide(resultat_exploitation, total_actif, 0) * 100
-        
-        # ROE (Return on Equity)
-        ratios['roe'] = self.safe_divide(resultat_net, capitaux_propres, 0) * 100
-        ratios['roe_exploitation'] = self.safe_divide(resultat_exploitation, capitaux_propres, 0) * 100
-        
-        # Marges
-        if chiffre_affaires > 0:
-            ratios['marge_commerciale_pct'] = self.safe_divide(data.get('marge_commerciale', 0), chiffre_affaires, 0) * 100
-            ratios['marge_valeur_ajoutee'] = self.safe_divide(data.get('valeur_ajoutee', 0), chiffre_affaires, 0) * 100
-            ratios['marge_excedent_brut'] = self.safe_divide(data.get('excedent_brut', 0), chiffre_affaires, 0) * 100
-            ratios['marge_exploitation'] = self.safe_divide(resultat_exploitation, chiffre_affaires, 0) * 100
-            ratios['marge_nette'] = self.safe_divide(resultat_net, chiffre_affaires, 0) * 100
-            
-            # Marge brute (approximation)
-            couts_directs = data.get('achats_matieres_premieres', 0) + data.get('autres_achats', 0)
-            marge_brute_montant = chiffre_affaires - couts_directs
-            ratios['marge_brute'] = self.safe_divide(marge_brute_montant, chiffre_affaires, 0) * 100
-        
-        # Coefficient d'exploitation
-        charges_exploitation = data.get('charges_exploitation', 0)
-        if chiffre_affaires > 0:
-            ratios['coefficient_exploitation'] = self.safe_divide(charges_exploitation, chiffre_affaires, 0) * 100
-        
-        # Rentabilité économique
-        resultat_economique = resultat_exploitation + abs(data.get('frais_financiers', 0))
-        actif_economique = total_actif - data.get('tresorerie', 0)
-        ratios['rentabilite_economique'] = self.safe_divide(resultat_economique, actif_economique, 0) * 100
-        
-        return ratios
+        return self.calculate_ratios(data, self.graph.outputs(RENTABILITE))
     
     def calculate_activite_ratios(self, data: Dict[str, float]) -> Dict[str, float]:
         """Calcule les ratios d'activité"""
-        ratios = {}
-        
-        chiffre_affaires = data.get('chiffre_affaires', 0)
-        total_actif = data.get('total_actif', 0)
-        
-        # Rotation de l'actif total
-        ratios['rotation_actif'] = self.safe_divide(chiffre_affaires, total_actif, 0)
-        
-        # Rotation des immobilisations
-        immobilisations = data.get('immobilisations_nettes', 0)
-        ratios['rotation_immobilisations'] = self.safe_divide(chiffre_affaires, immobilisations, 0)
-        
-        # Rotation des stocks
-        stocks = data.get('stocks', 0)
-        if stocks > 0:
-            ratios['rotation_stocks'] = self.safe_divide(chiffre_affaires, stocks, 0)
-            ratios['duree_ecoulement_stocks'] = self.safe_divide(365, ratios['rotation_stocks'], 0)
-        
-        # Rotation des créances clients
-        creances_clients = data.get('creances_clients', 0)
-        if creances_clients > 0:
-            ratios['rotation_creances'] = self.safe_divide(chiffre_affaires, creances_clients, 0)
-            ratios['delai_recouvrement_clients'] = self.safe_divide(365, ratios['rotation_creances'], 0)
-        
-        # Rotation des fournisseurs
-        fournisseurs = data.get('fournisseurs_exploitation', 0)
-        achats_totaux = data.get('achats_matieres_premieres', 0) + data.get('autres_achats', 0)
-        if fournisseurs > 0 and achats_totaux > 0:
-            ratios['rotation_fournisseurs'] = self.safe_divide(achats_totaux, fournisseurs, 0)
-            ratios['delai_paiement_fournisseurs'] = self.safe_divide(365, ratios['rotation_fournisseurs'], 0)
-        
-        # Vitesse de rotation du BFR
-        bfr = self.calculate_bfr(data)
-        if bfr > 0:
-            ratios['rotation_bfr'] = self.safe_divide(chiffre_affaires, bfr, 0)
-        
-        return ratios
+        return self.calculate_ratios(data, self.graph.outputs(ACTIVITE))
     
     def calculate_gestion_ratios(self, data: Dict[str, float]) -> Dict[str, float]:
         """Calcule les ratios de gestion"""
-        ratios = {}
-        
-        valeur_ajoutee = data.get('valeur_ajoutee', 0)
-        charges_personnel = data.get('charges_personnel', 0)
-        chiffre_affaires = data.get('chiffre_affaires', 0)
-        
-        # Productivité du personnel
-        if charges_personnel > 0:
-            ratios['productivite_personnel'] = self.safe_divide(valeur_ajoutee, charges_personnel, 0)
-            
-        if chiffre_affaires > 0:
-            ratios['ca_par_employe'] = self.safe_divide(chiffre_affaires, charges_personnel, 0) * 50000  # Approximation
-        
-        # Taux de charges de personnel
-        if valeur_ajoutee > 0:
-            ratios['taux_charges_personnel'] = self.safe_divide(charges_personnel, valeur_ajoutee, 0) * 100
-        
-        # Intensité capitalistique
-        immobilisations = data.get('immobilisations_nettes', 0)
-        if charges_personnel > 0:
-            ratios['intensite_capitalistique'] = self.safe_divide(immobilisations, charges_personnel, 0)
-        
-        # Ratios de flux de trésorerie
-        cafg = data.get('cafg', 0)
-        if chiffre_affaires > 0:
-            ratios['ratio_cafg_ca'] = self.safe_divide(cafg, chiffre_affaires, 0) * 100
-        
-        if data.get('total_actif', 0) > 0:
-            ratios['ratio_cafg_actif'] = self.safe_divide(cafg, data['total_actif'], 0) * 100
-        
-        # Efficacité opérationnelle
-        ebe = data.get('excedent_brut', 0)
-        if valeur_ajoutee > 0:
-            ratios['taux_ebe_va'] = self.safe_divide(ebe, valeur_ajoutee, 0) * 100
-        
-        return ratios
+        return self.calculate_ratios(data, self.graph.outputs(GESTION))
     
     def calculate_structure_ratios(self, data: Dict[str, float]) -> Dict[str, float]:
         """Calcule les ratios de structure"""
-        ratios = {}
-        
-        # Fonds de roulement
-        ressources_stables = data.get('ressources_stables', 
-                                    data.get('capitaux_propres', 0) + data.get('dettes_financieres', 0))
-        immobilisations = data.get('immobilisations_nettes', 0)
-        fonds_roulement = ressources_stables - immobilisations
-        ratios['fonds_roulement'] = fonds_roulement
-        
-        # Ratio de fonds de roulement
-        if data.get('chiffre_affaires', 0) > 0:
-            ratios['fonds_roulement_jours_ca'] = self.safe_divide(fonds_roulement, data['chiffre_affaires'], 0) * 365
-        
-        # Structure de l'actif
-        total_actif = data.get('total_actif', 0)
-        if total_actif > 0:
-            ratios['pct_immobilisations'] = self.safe_divide(immobilisations, total_actif, 0) * 100
-            ratios['pct_actif_circulant'] = self.safe_divide(data.get('total_actif_circulant', 0), total_actif, 0) * 100
-            ratios['pct_tresorerie'] = self.safe_divide(data.get('tresorerie', 0), total_actif, 0) * 100
-        
-        # Structure du passif
-        if total_actif > 0:
-            ratios['pct_capitaux_propres'] = self.safe_divide(data.get('capitaux_propres', 0), total_actif, 0) * 100
-            ratios['pct_dettes_financieres'] = self.safe_divide(data.get('dettes_financieres', 0), total_actif, 0) * 100
-            ratios['pct_dettes_court_terme'] = self.safe_divide(data.get('dettes_court_terme', 0), total_actif, 0) * 100
-        
-        return ratios
+        return self.calculate_ratios(data, self.graph.outputs(STRUCTURE))
     
     def calculate_bceao_ratios(self, data: Dict[str, float]) -> Dict[str, float]:
         """Calcule les ratios spécifiques BCEAO (adaptation banques/entreprises)"""
-        ratios = {}
-        
-        # Adaptation des ratios BCEAO pour les entreprises
-        total_actif = data.get('total_actif', 0)
-        capitaux_propres = data.get('capitaux_propres', 0)
-        
-        # Ratio de fonds propres de base (adapté)
-        if total_actif > 0:
-            ratios['ratio_fonds_propres_base'] = self.safe_divide(capitaux_propres, total_actif, 0) * 100
-        
-        # Ratio de couverture des emplois MLT
-        ressources_stables = data.get('ressources_stables', capitaux_propres + data.get('dettes_financieres', 0))
-        emplois_mlt = data.get('immobilisations_nettes', 0)
-        ratios['coeff_couverture_emplois_mlt'] = self.safe_divide(ressources_stables, emplois_mlt, 0) * 100
-        
-        # Ratio de transformation (adapté)
-        emplois_long_terme = emplois_mlt
-        ressources_long_terme = ressources_stables
-        ratios['ratio_transformation'] = self.safe_divide(emplois_long_terme, ressources_long_terme, 0) * 100
-        
-        # Indicateurs de qualité (adapté)
-        creances_totales = data.get('creances_clients', 0) + data.get('autres_creances', 0)
-        if creances_totales > 0:
-            # Approximation des créances douteuses (si données disponibles)
-            creances_douteuses = data.get('provisions_clients', 0)  # Si disponible
-            ratios['taux_creances_douteuses'] = self.safe_divide(creances_douteuses, creances_totales, 0) * 100
-        
-        return ratios
+        return self.calculate_ratios(data, self.graph.outputs(BCEAO))
     
     def calculate_bfr(self, data: Dict[str, float]) -> float:
         """Calcule le Besoin en Fonds de Roulement"""
-        bfr_exploitation = (
-            data.get('stocks', 0) + 
-            data.get('creances_clients', 0) + 
-            data.get('autres_creances', 0) + 
-            data.get('fournisseurs_avances_versees', 0) -
-            data.get('fournisseurs_exploitation', 0) - 
-            data.get('dettes_sociales_fiscales', 0) - 
-            data.get('autres_dettes', 0) -
-            data.get('clients_avances_recues', 0)
-        )
-        return bfr_exploitation
+        return self.calculate_ratios(data, ('bfr',))['bfr']
+    
+    # ------------------------------------------------------------------
+    # Calcul par lots (portefeuille)
+    # ------------------------------------------------------------------
+    def safe_divide_array(self, numerator: np.ndarray, denominator: np.ndarray,
+                          default: float = 0) -> np.ndarray:
+        """Division sécurisée colonne par colonne (mêmes epsilon et défaut que safe_divide)"""
+        numerator, denominator = np.broadcast_arrays(np.asarray(numerator, dtype=np.float64),
+                                                     np.asarray(denominator, dtype=np.float64))
+        result = np.full(numerator.shape, default, dtype=np.float64)
+        valid = ~(np.abs(denominator) < self.epsilon)
+        np.divide(numerator, denominator, out=result, where=valid)
+        return result
+    
+    def calculate_all_ratios_batch(self, frame: Union[pd.DataFrame, np.ndarray],
+                                   names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Calcule les ratios d'un portefeuille, par colonnes entières
+        
+        Args:
+            frame: DataFrame ou tableau structuré, une ligne par entreprise/exercice
+                et une colonne par poste (noms de ``calculate_all_ratios``)
+            names: Ratios à produire (tous par défaut)
+        
+        Returns:
+            pd.DataFrame: une colonne par ratio, même index que ``frame`` ; NaN
+            lorsque ``calculate_all_ratios`` n'aurait pas produit le ratio
+        """
+        columns = BatchColumns(frame)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = self.graph.evaluate(ArrayOps(columns, self.safe_divide_array), names)
+        return pd.DataFrame(ratios, index=columns.index)
     
     def get_ratio_interpretation(self, ratio_name: str, value: float, sector: str = None) -> Dict[str, str]:
-        """Retourne l'interprétation d'un ratio"""
-        interpretations = {
-            'ratio_liquidite_generale': {
-                'excellent': (2.0, float('inf')),
-                'bon': (1.5, 2.0),
-                'acceptable': (1.0, 1.5),
-                'faible': (0, 1.0)
-            },
-            'ratio_autonomie_financiere': {
-                'excellent': (50, 100),
-                'bon': (30, 50),
-                'acceptable': (20, 30),
-                'faible': (0, 20)
-            },
-            'roe': {
-                'excellent': (15, float('inf')),
-                'bon': (10, 15),
-                'acceptable': (5, 10),
-                'faible': (-float('inf'), 5)
-            },
-            'marge_nette': {
-                'excellent': (10, float('inf')),
-                'bon': (5, 10),
-                'acceptable': (2, 5),
-                'faible': (-float('inf'), 2)
-            }
-        }
-        
-        if ratio_name not in interpretations:
+        """Retourne l'interprétation d'un ratio (niveaux de data/bceao_norms.json)"""
+        interpretation = get_norms().interpretation
+        if ratio_name not in interpretation:
             return {'level': 'unknown', 'description': 'Ratio non référencé'}
         
-        ranges = interpretations[ratio_name]
-        
-        for level, (min_val, max_val) in ranges.items():
-            if min_val <= value < max_val:
-                return {
-                    'level': level,
-                    'description': f'{level.title()} ({value:.2f})',
-                    'color': self._get_color_for_level(level)
-                }
+        level = interpretation.level(ratio_name, value)
+        if level is not None:
+            return {
+                'level': level,
+                'description': f'{level.title()} ({value:.2f})',
+                'color': self._get_color_for_level(level)
+            }
         
         return {'level': 'unknown', 'description': 'Valeur hors norme'}
     
@@ -382,4 +478,92 @@ class RatiosCalculator:
             'unknown': '#6b7280'     # Gris
         }
         return colors.get(level, '#6b7280')
-        
\ No newline at end of file
+
+
+class RatioEngine:
+    """
+    Point d'entrée unique du calcul des ratios, tous modes confondus
+
+    Les derniers résultats scalaires sont mémorisés (LRU) par mode, ratios
+    demandés et contenu des données : une page qui recalcule les mêmes
+    ratios à chaque rerun ne les évalue qu'une fois.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.calculators = {mode: RatiosCalculator(mode) for mode in RATIO_GRAPHS}
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, Dict[str, float]]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def calculator(self, mode: str = MODE_ANALYSE) -> RatiosCalculator:
+        """Calculateur du mode demandé"""
+        try:
+            return self.calculators[mode]
+        except KeyError:
+            raise ValueError(f"Mode de calcul inconnu: {mode} (attendu: {', '.join(RATIO_GRAPHS)})") from None
+
+    def calculate(self, data: Dict[str, float], mode: str = MODE_ANALYSE,
+                  names: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """
+        Ratios d'un jeu de données (copie du résultat mémorisé le cas échéant)
+
+        Args:
+            data: Postes des états financiers
+            mode: MODE_ANALYSE ou MODE_COMPLET
+            names: Ratios à produire (tous ceux du mode par défaut)
+        """
+        calculator = self.calculator(mode)
+        try:
+            # Enregistrement à schéma fixe : empreinte du tableau plutôt que des items
+            fingerprint = getattr(data, 'fingerprint', None)
+            content = fingerprint() if fingerprint is not None else frozenset(data.items())
+            key = (mode, None if names is None else tuple(names), content)
+            hash(key)
+        except TypeError:
+            # Valeur non hachable dans les données : calcul sans mémorisation
+            return calculator.calculate_ratios(data, names)
+
+        with self._lock:
+            ratios = self._cache.get(key)
+            if ratios is not None:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return dict(ratios)
+            self.stats['misses'] += 1
+
+        ratios = calculator.calculate_ratios(data, names)
+        with self._lock:
+            self._cache[key] = ratios
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return dict(ratios)
+
+    def calculate_batch(self, frame: Union[pd.DataFrame, np.ndarray], mode: str = MODE_ANALYSE,
+                        names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Ratios d'un portefeuille (voir ``RatiosCalculator.calculate_all_ratios_batch``)"""
+        return self.calculator(mode).calculate_all_ratios_batch(frame, names)
+
+    def clear(self):
+        """Vide la mémoire des calculs"""
+        with self._lock:
+            self._cache.clear()
+
+
+_default_engine: Optional[RatioEngine] = None
+_default_engine_lock = threading.Lock()
+
+
+def get_ratio_engine() -> RatioEngine:
+    """Moteur de ratios partagé par le processus"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = RatioEngine()
+        return _default_engine
+
+
+def compute_ratios(data: Dict[str, float], mode: str = MODE_ANALYSE,
+                   names: Optional[Sequence[str]] = None) -> Dict[str, float]:
+    """Ratios d'un jeu de données par le moteur partagé"""
+    return get_ratio_engine().calculate(data, mode, names)
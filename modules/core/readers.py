@@ -0,0 +1,409 @@
+"""
+Registre des lecteurs de classeurs, choisis par signature du contenu
+
+Le format est déduit des premiers octets (archive zip, conteneur OLE2, texte)
+et non de l'extension : un « .xls » qui est en réalité un XLSX est lu par le
+lecteur XLSX. Chaque lecteur produit la même abstraction - des grilles
+d'objets bruts par feuille (``None`` pour une cellule vide) - de sorte que
+l'extraction en aval ne dépend pas du format :
+
+- xlsx : lecteur XML en flux (xlsx_stream), lignes décodées à la demande
+- xls : xlrd (dépendance optionnelle)
+- ods : pandas / odfpy (dépendance optionnelle)
+- csv : module csv, séparateur détecté et cellules typées
+
+Un nouveau format s'ajoute avec ``register_reader``.
+"""
+
+import csv
+import io
+import os
+import sys
+import zipfile
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from modules.core.sources import ExcelSource, as_readable, describe_source, is_path
+from modules.core.xlsx_stream import XlsxStreamReader, is_buffer, release_shared_reader, shared_reader
+
+FORMAT_XLSX = 'xlsx'
+FORMAT_XLS = 'xls'
+FORMAT_ODS = 'ods'
+FORMAT_CSV = 'csv'
+
+MAGIC_ZIP = b'PK\x03\x04'
+MAGIC_OLE2 = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+ODS_MIMETYPE = b'application/vnd.oasis.opendocument.spreadsheet'
+
+# Octets lus pour reconnaître un fichier texte
+SNIFF_BYTES = 4096
+
+# Lecture d'une feuille entière par le lecteur en flux
+ALL_ROWS = sys.maxsize
+
+CSV_SHEET = 'CSV'
+CSV_DELIMITERS = ';,\t|'
+
+
+class SourceSignature(NamedTuple):
+    """Ce qu'un lecteur examine pour reconnaître son format"""
+    head: bytes
+    members: FrozenSet[str]
+    extension: str
+    mimetype: bytes = b''
+
+
+def _read_head(source: ExcelSource, size: int) -> bytes:
+    """Premiers octets de la source, sans déplacer la position d'un objet fichier"""
+    if is_path(source):
+        with open(source, 'rb') as f:
+            return f.read(size)
+    if is_buffer(source):
+        return memoryview(source).cast('B')[:size].tobytes()
+    readable = as_readable(source)
+    head = readable.read(size)
+    readable.seek(0)
+    return head
+
+
+def source_signature(source: ExcelSource, file_name: Optional[str] = None) -> SourceSignature:
+    """Signature d'une source : en-tête, membres de l'archive zip éventuelle, extension"""
+    name = file_name or (os.fspath(source) if is_path(source) else getattr(source, 'name', None)) or ''
+    extension = os.path.splitext(str(name))[1].lower()
+    head = _read_head(source, SNIFF_BYTES)
+
+    members, mimetype = frozenset(), b''
+    if head.startswith(MAGIC_ZIP):
+        try:
+            with zipfile.ZipFile(as_readable(source)) as archive:
+                members = frozenset(archive.namelist())
+                if 'mimetype' in members:
+                    mimetype = archive.read('mimetype').strip()
+        except zipfile.BadZipFile:
+            pass
+    return SourceSignature(head, members, extension, mimetype)
+
+
+class SheetReader:
+    """
+    Classeur en lecture seule exposé en grilles d'objets bruts
+
+    Les sous-classes déclarent ``format``, ``extensions`` et ``sniff`` et
+    implémentent ``sheet_names`` et ``_decode_sheet``. Chaque feuille est
+    décodée une fois puis conservée.
+    """
+
+    format = ''
+    extensions: Tuple[str, ...] = ()
+
+    def __init__(self, source: ExcelSource):
+        self.source = source
+        self._grids: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def sniff(cls, signature: SourceSignature) -> bool:
+        raise NotImplementedError
+
+    @property
+    def sheet_names(self) -> List[str]:
+        raise NotImplementedError
+
+    @property
+    def sheetnames(self) -> List[str]:
+        """Alias openpyxl"""
+        return self.sheet_names
+
+    def __contains__(self, sheet_name: str) -> bool:
+        return sheet_name in self.sheet_names
+
+    def _decode_sheet(self, sheet_name: str) -> np.ndarray:
+        raise NotImplementedError
+
+    def read_sheet(self, sheet_name: str) -> np.ndarray:
+        """
+        Feuille entière en grille d'objets (ligne 1 / colonne A en [0, 0])
+
+        Raises:
+            KeyError: si la feuille n'existe pas
+        """
+        grid = self._grids.get(sheet_name)
+        if grid is None:
+            if sheet_name not in self.sheet_names:
+                raise KeyError(f"Worksheet {sheet_name} does not exist.")
+            grid = self._decode_sheet(sheet_name)
+            self._grids[sheet_name] = grid
+        return grid
+
+    def read_head(self, sheet_name: str, max_rows: int) -> np.ndarray:
+        """Au plus ``max_rows`` premières lignes de la feuille"""
+        return self.read_sheet(sheet_name)[:max_rows]
+
+    def read_grid(self, sheet_name: str, shape: Tuple[int, int],
+                  rows: Optional[Iterable[int]] = None) -> np.ndarray:
+        """Bloc supérieur gauche de la feuille, complété par ``None`` (voir XlsxStreamReader.read_grid)"""
+        sheet = self.read_sheet(sheet_name)
+        n_rows, n_cols = shape
+        grid = np.full(shape, None, dtype=object)
+        block = sheet[:n_rows, :n_cols]
+        grid[:block.shape[0], :block.shape[1]] = block
+        if rows is not None:
+            keep = np.zeros(n_rows, dtype=bool)
+            keep[[row - 1 for row in rows if 1 <= row <= n_rows]] = True
+            grid[~keep] = None
+        return grid
+
+    def prefetch_rows(self, sheet_name: str, last_row: int):
+        """Décode dès maintenant les ``last_row`` premières lignes"""
+        self.read_head(sheet_name, last_row)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class XlsxSheetReader(SheetReader):
+    """XLSX : lecteur XML en flux, partagé pour un contenu en mémoire"""
+
+    format = FORMAT_XLSX
+    extensions = ('.xlsx', '.xlsm')
+
+    def __init__(self, source: ExcelSource):
+        super().__init__(source)
+        reader = shared_reader(source) if is_buffer(source) else None
+        self._owns_reader = reader is None
+        self._released = False
+        self._reader = reader if reader is not None else XlsxStreamReader(as_readable(source))
+
+    @classmethod
+    def sniff(cls, signature: SourceSignature) -> bool:
+        return 'xl/workbook.xml' in signature.members
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return self._reader.sheetnames
+
+    def read_sheet(self, sheet_name: str) -> np.ndarray:
+        return self._reader.read_head(sheet_name, ALL_ROWS)
+
+    def read_head(self, sheet_name: str, max_rows: int) -> np.ndarray:
+        return self._reader.read_head(sheet_name, max_rows)
+
+    def read_grid(self, sheet_name: str, shape: Tuple[int, int],
+                  rows: Optional[Iterable[int]] = None) -> np.ndarray:
+        return self._reader.read_grid(sheet_name, shape, rows)
+
+    def prefetch_rows(self, sheet_name: str, last_row: int):
+        self._reader.prefetch_rows(sheet_name, last_row)
+
+    def close(self):
+        if self._owns_reader:
+            self._reader.close()
+        elif not self._released:
+            self._released = True
+            release_shared_reader(self._reader)
+
+
+class XlsSheetReader(SheetReader):
+    """XLS (Excel 97-2003) : xlrd, feuilles chargées à la demande"""
+
+    format = FORMAT_XLS
+    extensions = ('.xls',)
+
+    def __init__(self, source: ExcelSource):
+        super().__init__(source)
+        try:
+            import xlrd
+        except ImportError as e:
+            raise ImportError("xlrd est requis pour lire les fichiers .xls (pip install xlrd)") from e
+        self._xlrd = xlrd
+        if is_path(source):
+            self._book = xlrd.open_workbook(os.fspath(source), on_demand=True)
+        else:
+            content = bytes(source) if is_buffer(source) else as_readable(source).read()
+            self._book = xlrd.open_workbook(file_contents=content, on_demand=True)
+
+    @classmethod
+    def sniff(cls, signature: SourceSignature) -> bool:
+        return signature.head.startswith(MAGIC_OLE2)
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return self._book.sheet_names()
+
+    def _decode_sheet(self, sheet_name: str) -> np.ndarray:
+        xlrd = self._xlrd
+        sheet = self._book.sheet_by_name(sheet_name)
+        grid = np.full((sheet.nrows, sheet.ncols), None, dtype=object)
+        for row_index in range(sheet.nrows):
+            types = sheet.row_types(row_index)
+            values = sheet.row_values(row_index)
+            for col_index, (cell_type, value) in enumerate(zip(types, values)):
+                if cell_type in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                    continue
+                if cell_type == xlrd.XL_CELL_DATE:
+                    value = xlrd.xldate_as_datetime(value, self._book.datemode)
+                elif cell_type == xlrd.XL_CELL_BOOLEAN:
+                    value = bool(value)
+                grid[row_index, col_index] = value
+        self._book.unload_sheet(sheet_name)
+        return grid
+
+    def close(self):
+        self._book.release_resources()
+
+
+class OdsSheetReader(SheetReader):
+    """ODS (LibreOffice) : pandas avec le moteur odf (odfpy)"""
+
+    format = FORMAT_ODS
+    extensions = ('.ods',)
+
+    def __init__(self, source: ExcelSource):
+        super().__init__(source)
+        frames = pd.read_excel(as_readable(source), sheet_name=None, header=None, engine='odf')
+        for sheet_name, frame in frames.items():
+            grid = frame.to_numpy(dtype=object)
+            grid[pd.isna(grid)] = None
+            self._grids[sheet_name] = grid
+
+    @classmethod
+    def sniff(cls, signature: SourceSignature) -> bool:
+        return signature.mimetype == ODS_MIMETYPE
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self._grids)
+
+
+def _typed_cell(text: str):
+    """Valeur typée d'une cellule CSV : entier, flottant, texte, ou None si vide"""
+    if not text or text.isspace():
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+class CsvSheetReader(SheetReader):
+    """CSV : une feuille 'CSV', séparateur détecté, cellules typées"""
+
+    format = FORMAT_CSV
+    extensions = ('.csv', '.txt')
+
+    def __init__(self, source: ExcelSource):
+        super().__init__(source)
+        if is_path(source):
+            with open(source, 'rb') as f:
+                raw = f.read()
+        elif is_buffer(source):
+            raw = memoryview(source).cast('B').tobytes()
+        else:
+            raw = as_readable(source).read()
+        self._text = self._decode_text(raw)
+
+    @staticmethod
+    def _decode_text(raw: bytes) -> str:
+        """UTF-8 (avec ou sans BOM), sinon Windows-1252 des exports Excel français"""
+        try:
+            return raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            return raw.decode('cp1252', errors='replace')
+
+    @classmethod
+    def sniff(cls, signature: SourceSignature) -> bool:
+        # Un texte n'a pas de signature : l'extension, si elle est connue, doit être celle d'un CSV
+        if signature.extension and signature.extension not in cls.extensions:
+            return False
+        return bool(signature.head) and b'\x00' not in signature.head and not signature.members
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return [CSV_SHEET]
+
+    def _decode_sheet(self, sheet_name: str) -> np.ndarray:
+        sample = self._text[:SNIFF_BYTES]
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS)
+        except csv.Error:
+            dialect = csv.excel
+        rows = [[_typed_cell(cell) for cell in row] for row in csv.reader(io.StringIO(self._text), dialect)]
+        n_cols = max((len(row) for row in rows), default=0)
+        grid = np.full((len(rows), n_cols), None, dtype=object)
+        for row_index, row in enumerate(rows):
+            grid[row_index, :len(row)] = row
+        return grid
+
+
+_readers: List[Type[SheetReader]] = []
+
+
+def register_reader(reader_cls: Type[SheetReader], first: bool = False) -> Type[SheetReader]:
+    """
+    Ajoute un lecteur au registre (utilisable comme décorateur)
+
+    Les lecteurs sont essayés dans l'ordre d'enregistrement ; ``first`` place
+    le lecteur avant les autres (format plus spécifique qu'un format existant).
+    """
+    if reader_cls in _readers:
+        _readers.remove(reader_cls)
+    if first:
+        _readers.insert(0, reader_cls)
+    else:
+        _readers.append(reader_cls)
+    return reader_cls
+
+
+for _reader_cls in (XlsxSheetReader, OdsSheetReader, XlsSheetReader, CsvSheetReader):
+    register_reader(_reader_cls)
+
+
+def reader_for(source: ExcelSource, file_name: Optional[str] = None) -> Optional[Type[SheetReader]]:
+    """Classe de lecteur reconnaissant la source, ou None"""
+    signature = source_signature(source, file_name)
+    for reader_cls in _readers:
+        if reader_cls.sniff(signature):
+            return reader_cls
+    return None
+
+
+def sniff_format(source: ExcelSource, file_name: Optional[str] = None) -> Optional[str]:
+    """Format reconnu d'après le contenu ('xlsx', 'xls', 'ods', 'csv') ou None"""
+    reader_cls = reader_for(source, file_name)
+    return reader_cls.format if reader_cls is not None else None
+
+
+def open_sheet_reader(source: ExcelSource, file_name: Optional[str] = None) -> SheetReader:
+    """
+    Ouvre la source avec le lecteur de son format
+
+    Args:
+        source: Chemin, bytes, memoryview ou objet fichier
+        file_name: Nom du fichier importé (distingue un CSV d'un texte quelconque)
+
+    Raises:
+        ValueError: si aucun lecteur ne reconnaît le contenu
+    """
+    reader_cls = reader_for(source, file_name)
+    if reader_cls is None:
+        raise ValueError(f"Format de fichier non reconnu: {file_name or describe_source(source)}")
+    return reader_cls(source)
+
+
+def supported_extensions() -> List[str]:
+    """Extensions des formats enregistrés (filtres d'import)"""
+    extensions = []
+    for reader_cls in _readers:
+        extensions.extend(ext for ext in reader_cls.extensions if ext not in extensions)
+    return extensions
@@ -0,0 +1,351 @@
+"""
+Score BCEAO piloté par une grille de seuils (section grille_score de data/bceao_norms.json)
+
+Chaque ratio noté déclare des seuils croissants et les points associés ;
+la notation d'un ratio est une recherche dans ses seuils (``np.searchsorted``
+sur une colonne entière d'entreprises, ``bisect`` pour une seule analyse).
+Les points sont additionnés par composante, puis le total (140 points) est
+ramené sur 100.
+
+Modifier un seuil ou un barème ne demande que d'éditer la grille ; le
+service des normes (norms.py) la recompile sans redémarrage.
+
+Mode sectoriel : un ratio pour lequel le secteur publie ses quartiles
+(q1, médiane, q3) est noté selon sa position dans la distribution du
+secteur plutôt que selon les seuils absolus. La position (0 à 1) est
+interpolée linéairement par morceaux (``np.interp``) sur des tables
+précalculées par (secteur, ratio) ; les points vont du minimum au maximum du
+barème du ratio. Les ratios sans quartiles restent notés en absolu.
+"""
+
+import json
+import math
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+SECTORAL_NORMS_PATH = Path(__file__).parent.parent.parent / "data" / "sectoral_norms.json"
+
+# Modes de notation
+SCORE_ABSOLU = 'absolu'
+SCORE_SECTORIEL = 'sectoriel'
+SCORE_MODES = (SCORE_ABSOLU, SCORE_SECTORIEL)
+
+# Noms des ratios de data/sectoral_norms.json qui diffèrent de ceux du moteur
+SECTORAL_ALIASES = {
+    'liquidite_generale': 'ratio_liquidite_generale',
+    'liquidite_immediate': 'ratio_liquidite_immediate',
+    'autonomie_financiere': 'ratio_autonomie_financiere',
+    'endettement_global': 'ratio_endettement',
+    'delai_recouvrement': 'delai_recouvrement_clients',
+}
+
+# Position des nœuds d'interpolation : bornes (clôtures de Tukey), q1, médiane, q3
+QUARTILE_POSITIONS = (0.0, 0.25, 0.5, 0.75, 1.0)
+TUKEY_FENCE = 1.5
+
+# Classes du score global : borne basse incluse de chaque classe au-dessus de la dernière
+SCORE_CLASS_BOUNDS = (25, 40, 55, 70, 85)
+# Par classe : note financière (SessionManager.get_financial_class) et
+# interprétation avec sa couleur (FinancialAnalyzer.get_interpretation)
+FINANCIAL_CLASSES = ('E', 'D', 'C', 'B', 'A', 'A+')
+SCORE_INTERPRETATIONS = (
+    ('Très faible', 'darkred'),
+    ('Faible', 'red'),
+    ('Acceptable', 'orange'),
+    ('Bonne', 'yellow'),
+    ('Très bonne', 'lightgreen'),
+    ('Excellente', 'green'),
+)
+
+# Comparaison à chaque seuil : la valeur l'atteint (>=), le dépasse (>), ou
+# pour un ratio « plus bas est meilleur » (<=), le dépasse
+COMPARISONS = ('>=', '>', '<=')
+
+
+class ScoreRule(NamedTuple):
+    """Barème d'un ratio : points[k], k = nombre de seuils atteints ou dépassés"""
+    ratio: str
+    component: str
+    comparison: str
+    thresholds: Tuple[float, ...]
+    points: Tuple[int, ...]
+
+    @property
+    def side(self) -> str:
+        # Valeur égale au seuil : comptée pour >=, pas pour > ni <=
+        return 'right' if self.comparison == '>=' else 'left'
+
+    def step(self, value) -> int:
+        """Palier d'une valeur : nombre de seuils atteints ou dépassés"""
+        search = bisect_right if self.comparison == '>=' else bisect_left
+        return search(self.thresholds, value)
+
+    def step_column(self, values: np.ndarray) -> np.ndarray:
+        """Paliers d'une colonne de valeurs (NaN : dernier palier, à masquer)"""
+        return np.searchsorted(np.asarray(self.thresholds, dtype=np.float64), values, side=self.side)
+
+    def score_value(self, value) -> int:
+        """Points d'une valeur ; 0 si le ratio n'est pas produit (None ou NaN)"""
+        if value is None or value != value:
+            return 0
+        return self.points[self.step(value)]
+
+    def score_column(self, values: np.ndarray) -> np.ndarray:
+        """Points d'une colonne de valeurs (NaN : ratio non produit, 0 point)"""
+        points = np.asarray(self.points, dtype=np.int64)[self.step_column(values)]
+        points[np.isnan(values)] = 0
+        return points
+
+    def next_step(self, step: int) -> Tuple[Optional[float], int]:
+        """
+        Seuil à franchir depuis le palier ``step`` pour gagner des points, et le gain
+
+        Le seuil est à atteindre (>=), à dépasser (>) ou à ne plus dépasser (<=) ;
+        (None, 0) au meilleur palier.
+        """
+        target = step - 1 if self.comparison == '<=' else step + 1
+        if not 0 <= target < len(self.points):
+            return None, 0
+        return self.thresholds[min(step, target)], self.points[target] - self.points[step]
+
+    def next_step_column(self, steps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Seuils suivants (NaN au meilleur palier) et gains d'une colonne de paliers"""
+        by_step = [self.next_step(step) for step in range(len(self.points))]
+        thresholds = np.array([np.nan if threshold is None else threshold for threshold, _ in by_step])
+        gains = np.array([gain for _, gain in by_step], dtype=np.int64)
+        return thresholds[steps], gains[steps]
+
+    def score_position(self, position: float) -> int:
+        """Points d'une position dans la distribution du secteur (0 : plus faible valeur)"""
+        if self.comparison == '<=':
+            position = 1.0 - position
+        low, high = min(self.points), max(self.points)
+        return int(math.floor(low + position * (high - low) + 0.5))
+
+    def score_position_column(self, positions: np.ndarray) -> np.ndarray:
+        """Points d'une colonne de positions (NaN : ratio non produit, 0 point)"""
+        if self.comparison == '<=':
+            positions = 1.0 - positions
+        low, high = min(self.points), max(self.points)
+        missing = np.isnan(positions)
+        points = np.floor(low + np.where(missing, 0.0, positions) * (high - low) + 0.5).astype(np.int64)
+        points[missing] = 0
+        return points
+
+
+class QuartileTable(NamedTuple):
+    """Table d'interpolation d'un (secteur, ratio) : valeur -> position dans la distribution"""
+    values: Tuple[float, ...]
+    positions: Tuple[float, ...] = QUARTILE_POSITIONS
+
+    @classmethod
+    def from_quartiles(cls, q1: float, median: float, q3: float) -> 'QuartileTable':
+        """Nœuds q1/médiane/q3, prolongés jusqu'aux clôtures de Tukey (position 0 et 1)"""
+        if not q1 <= median <= q3:
+            raise ValueError(f"Quartiles non croissants: {q1}, {median}, {q3}")
+        spread = (q3 - q1) or abs(median) or 1.0
+        return cls((q1 - TUKEY_FENCE * spread, float(q1), float(median), float(q3),
+                    q3 + TUKEY_FENCE * spread))
+
+    def position(self, value: float) -> float:
+        return float(np.interp(value, self.values, self.positions))
+
+    def position_column(self, values: np.ndarray) -> np.ndarray:
+        """Positions d'une colonne (NaN conservés)"""
+        return np.interp(values, self.values, self.positions)
+
+
+class SectorTables:
+    """Tables d'interpolation précalculées par secteur et par ratio"""
+
+    def __init__(self, quartiles: Mapping):
+        """
+        Args:
+            quartiles: {secteur: {ratio: {'q1', 'median', 'q3'}}} (format de ratios_sectoriels)
+        """
+        self.tables: Dict[str, Dict[str, QuartileTable]] = {
+            sector: {ratio: QuartileTable.from_quartiles(values['q1'], values['median'], values['q3'])
+                     for ratio, values in ratios.items()}
+            for sector, ratios in quartiles.items()
+        }
+
+    @classmethod
+    def from_json(cls, path=SECTORAL_NORMS_PATH) -> 'SectorTables':
+        """Tables de data/sectoral_norms.json (noms de ratios ramenés à ceux du moteur)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return cls({sector: {SECTORAL_ALIASES.get(ratio, ratio): values for ratio, values in ratios.items()}
+                    for sector, ratios in config.items() if sector != 'metadata'})
+
+    def __contains__(self, sector) -> bool:
+        return sector in self.tables
+
+    def sectors(self) -> Tuple[str, ...]:
+        return tuple(self.tables)
+
+    def for_sector(self, sector: Optional[str]) -> Dict[str, QuartileTable]:
+        """Tables du secteur ; vide pour un secteur inconnu (notation absolue)"""
+        return self.tables.get(sector, {})
+
+
+class ScoreGrid:
+    """Barèmes par composante et normalisation du score global"""
+
+    def __init__(self, rules: Iterable[ScoreRule], total_points: int = 140, cap: int = 100):
+        self.rules: Tuple[ScoreRule, ...] = tuple(rules)
+        self.total_points = total_points
+        self.cap = cap
+
+        self.components: Dict[str, Tuple[ScoreRule, ...]] = {}
+        for rule in self.rules:
+            self._check(rule)
+            self.components[rule.component] = self.components.get(rule.component, ()) + (rule,)
+
+    @staticmethod
+    def _check(rule: ScoreRule):
+        if rule.comparison not in COMPARISONS:
+            raise ValueError(f"Comparaison inconnue pour {rule.ratio}: {rule.comparison}")
+        if list(rule.thresholds) != sorted(rule.thresholds):
+            raise ValueError(f"Seuils non croissants pour {rule.ratio}: {rule.thresholds}")
+        if len(rule.points) != len(rule.thresholds) + 1:
+            raise ValueError(f"{rule.ratio}: {len(rule.thresholds) + 1} valeurs de points attendues, "
+                             f"{len(rule.points)} reçues")
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> 'ScoreGrid':
+        """Grille à partir de sa configuration (section grille_score des normes)"""
+        rules = []
+        for component, entries in config['composantes'].items():
+            for entry in entries:
+                rules.append(ScoreRule(
+                    ratio=entry['ratio'],
+                    component=component,
+                    comparison=entry['comparaison'],
+                    thresholds=tuple(float(value) for value in entry['seuils']),
+                    points=tuple(int(value) for value in entry['points']),
+                ))
+        normalisation = config.get('normalisation', {})
+        return cls(rules, normalisation.get('total', 140), normalisation.get('plafond', 100))
+
+    def ratios_by_component(self) -> Dict[str, Tuple[str, ...]]:
+        """Ratios lus par chaque composante"""
+        return {component: tuple(rule.ratio for rule in rules) for component, rules in self.components.items()}
+
+    # ------------------------------------------------------------------
+    # Une analyse
+    # ------------------------------------------------------------------
+    def score_component(self, component: str, ratios: Mapping,
+                        tables: Optional[Mapping[str, QuartileTable]] = None) -> int:
+        """
+        Points d'une composante pour un dict de ratios
+
+        Args:
+            tables: tables du secteur par ratio (mode sectoriel) ; None : seuils absolus
+        """
+        if not tables:
+            return sum(rule.score_value(ratios.get(rule.ratio)) for rule in self.components[component])
+        return sum(self.rule_score(rule, ratios.get(rule.ratio), tables) for rule in self.components[component])
+
+    @staticmethod
+    def rule_score(rule: ScoreRule, value, tables: Optional[Mapping[str, QuartileTable]] = None) -> int:
+        """Points d'un ratio : position sectorielle s'il a une table, sinon barème en escalier"""
+        table = tables.get(rule.ratio) if tables else None
+        if table is None:
+            return rule.score_value(value)
+        if value is None or value != value:
+            return 0
+        return rule.score_position(table.position(value))
+
+    def global_score(self, scores: Mapping) -> int:
+        """Score global : total des composantes ramené sur 100 (plafonné)"""
+        score_brut = sum(scores[component] for component in self.components)
+        return min(self.cap, int(score_brut * 100 / self.total_points))
+
+    def score(self, ratios: Mapping, sector_tables: Optional[SectorTables] = None,
+              sector: Optional[str] = None) -> Dict[str, int]:
+        """Points par composante et score global d'une analyse (mode sectoriel si ``sector_tables``)"""
+        tables = sector_tables.for_sector(sector) if sector_tables is not None else None
+        scores = {component: self.score_component(component, ratios, tables) for component in self.components}
+        scores['global'] = self.global_score(scores)
+        return scores
+
+    # ------------------------------------------------------------------
+    # Portefeuille
+    # ------------------------------------------------------------------
+    def score_frame(self, ratios: pd.DataFrame, sector_tables: Optional[SectorTables] = None,
+                    sectors: Union[str, Sequence, None] = None) -> pd.DataFrame:
+        """
+        Scores d'un portefeuille, une ligne par entreprise/exercice
+
+        Args:
+            ratios: une colonne par ratio (NaN ou colonne absente : ratio non produit)
+            sector_tables: tables sectorielles (mode sectoriel) ; None : seuils absolus
+            sectors: secteur de tout le portefeuille, ou de chaque ligne
+
+        Returns:
+            pd.DataFrame: une colonne par composante puis 'global' (entiers), même index
+        """
+        n_rows = len(ratios)
+        points = dict(zip(self.rules, self.rule_points_frame(ratios, sector_tables, sectors)))
+        columns: Dict[str, np.ndarray] = {}
+        for component, rules in self.components.items():
+            total = np.zeros(n_rows, dtype=np.int64)
+            for rule in rules:
+                total += points[rule]
+            columns[component] = total
+
+        score_brut = sum(columns.values()) if columns else np.zeros(n_rows, dtype=np.int64)
+        columns['global'] = np.minimum(self.cap, (score_brut * 100 / self.total_points).astype(np.int64))
+        return pd.DataFrame(columns, index=ratios.index)
+
+    def sector_groups(self, n_rows: int, sector_tables: Optional[SectorTables],
+                      sectors: Union[str, Sequence, None]) -> List[Tuple[Dict[str, QuartileTable], np.ndarray]]:
+        """(tables du secteur, masque des lignes) pour chaque secteur connu du portefeuille"""
+        if sector_tables is None:
+            return []
+        sectors = np.broadcast_to(np.asarray(sectors, dtype=object), (n_rows,))
+        return [(sector_tables.for_sector(sector), sectors == sector)
+                for sector in pd.unique(sectors) if sector in sector_tables]
+
+    @staticmethod
+    def rule_values(ratios: pd.DataFrame, rule: ScoreRule) -> np.ndarray:
+        """Colonne du ratio en float64 (NaN si absente ou non numérique)"""
+        if rule.ratio not in ratios.columns:
+            return np.full(len(ratios), np.nan)
+        return pd.to_numeric(ratios[rule.ratio], errors='coerce').to_numpy(dtype=np.float64)
+
+    def rule_points_frame(self, ratios: pd.DataFrame, sector_tables: Optional[SectorTables] = None,
+                          sectors: Union[str, Sequence, None] = None) -> List[np.ndarray]:
+        """Points de chaque ratio noté (ordre de ``rules``), une valeur par ligne du portefeuille"""
+        groups = self.sector_groups(len(ratios), sector_tables, sectors)
+        result = []
+        for rule in self.rules:
+            values = self.rule_values(ratios, rule)
+            points = rule.score_column(values)
+            for tables, rows in groups:
+                table = tables.get(rule.ratio)
+                if table is not None:
+                    points[rows] = rule.score_position_column(table.position_column(values[rows]))
+            result.append(points)
+        return result
+
+
+def score_class(score) -> int:
+    """Classe d'un score global (0 : la plus faible)"""
+    return bisect_right(SCORE_CLASS_BOUNDS, score)
+
+
+def score_class_column(scores: np.ndarray) -> np.ndarray:
+    """Classes d'une colonne de scores globaux"""
+    return np.searchsorted(np.asarray(SCORE_CLASS_BOUNDS), scores, side='right')
+
+
+def get_score_grid() -> ScoreGrid:
+    """Grille courante du service des normes (rechargée si data/bceao_norms.json change)"""
+    from modules.core.norms import get_norms
+    return get_norms().score_grid
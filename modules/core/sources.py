@@ -0,0 +1,124 @@
+"""
+Sources de classeurs : chemin, bytes, memoryview ou objet fichier
+
+Les fichiers importés via Streamlit sont analysés directement en mémoire,
+sans écriture dans un fichier temporaire. Un memoryview (``getbuffer()``) est
+lu sans copie intégrale : seules les plages demandées par le lecteur zip sont
+extraites.
+"""
+
+import io
+import os
+from typing import Union
+
+ExcelSource = Union[str, os.PathLike, bytes, bytearray, memoryview, io.IOBase]
+
+
+class BufferReader(io.RawIOBase):
+    """Objet fichier en lecture seule adossé à un buffer, sans copie du contenu"""
+
+    def __init__(self, buffer):
+        super().__init__()
+        view = memoryview(buffer)
+        self._view = view.cast('B')
+        view.release()
+        self._position = 0
+
+    def close(self):
+        """Libère la vue : le buffer d'origine peut de nouveau être redimensionné ou fermé"""
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"whence invalide: {whence}")
+        if position < 0:
+            raise ValueError(f"Position négative: {position}")
+        self._position = position
+        return position
+
+    def read(self, size: int = -1) -> bytes:
+        start = min(self._position, len(self._view))
+        end = len(self._view) if size is None or size < 0 else min(start + size, len(self._view))
+        self._position = end
+        return self._view[start:end].tobytes()
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, target) -> int:
+        chunk = self.read(len(target))
+        target[:len(chunk)] = chunk
+        return len(chunk)
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+
+def is_path(source) -> bool:
+    """Indique si la source est un chemin de fichier"""
+    return isinstance(source, (str, os.PathLike))
+
+
+def as_readable(source: ExcelSource):
+    """
+    Normalise une source de classeur pour pandas, openpyxl et zipfile
+
+    Returns:
+        Le chemin inchangé, ou un objet fichier positionné au début
+
+    Raises:
+        TypeError: si la source n'est ni un chemin, ni un buffer, ni un fichier
+    """
+    if is_path(source):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BufferReader(source)
+    if hasattr(source, 'read') and hasattr(source, 'seek'):
+        source.seek(0)
+        return source
+    raise TypeError(f"Source de classeur non supportée: {type(source).__name__}")
+
+
+def detach_source(source: ExcelSource):
+    """
+    Source transmissible à un autre processus ou thread
+
+    Un chemin reste un chemin (chaque lecteur ouvre son propre fichier) ; un
+    buffer ou un objet fichier est copié une fois en bytes immuables.
+    """
+    if is_path(source):
+        return os.fspath(source)
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    return as_readable(source).read()
+
+
+def describe_source(source: ExcelSource) -> str:
+    """Libellé d'une source pour les messages de chargement"""
+    if is_path(source):
+        return os.fspath(source)
+    name = getattr(source, 'name', None)
+    if isinstance(name, str):
+        return name
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<mémoire: {memoryview(source).nbytes} octets>"
+    return f"<{type(source).__name__}>"
@@ -0,0 +1,281 @@
+"""
+Enregistrements compacts à schéma fixe : postes des états financiers et ratios
+
+Une analyse conservait un dict d'environ 110 postes (clés str, valeurs float
+Python) et un dict d'environ 55 ratios, par session et dans chaque export.
+``FinancialStatement`` et ``RatioRecord`` stockent les mêmes valeurs dans un
+tableau float64 indexé par la position du champ dans un schéma partagé,
+avec un accès de type dict pour la compatibilité des pages :
+``data['chiffre_affaires']``, ``data.get(...)``, ``in``, ``items()``...
+
+Conventions :
+- un champ absent est un NaN (comme dans le calcul par lots) ;
+- une valeur numérique est relue en float (100 -> 100.0) ;
+- une clé hors schéma ou une valeur non numérique est conservée telle quelle
+  dans un petit dict annexe.
+
+``from_array`` et ``as_array`` ne copient pas le tableau ; ``stack_records``
+assemble un portefeuille pour ``calculate_all_ratios_batch``.
+"""
+
+import numbers
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.core.cell_mapping import TEMPLATE_FIELDS
+from modules.core.ratios import RATIO_GRAPHS
+
+
+class RecordSchema:
+    """Noms des champs et leur position dans le tableau des valeurs"""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: Tuple[str, ...] = tuple(dict.fromkeys(names))
+        self.index: Dict[str, int] = {name: position for position, name in enumerate(self.names)}
+        self._positions: Dict[Tuple[str, ...], tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def positions(self, names: Sequence[str]) -> tuple:
+        """(positions des champs du schéma, rang dans ``names``, champs hors schéma), mémorisé"""
+        key = tuple(names)
+        positions = self._positions.get(key)
+        if positions is None:
+            known = [rank for rank, name in enumerate(key) if name in self.index]
+            positions = (np.array([self.index[key[rank]] for rank in known], dtype=np.intp),
+                         known,
+                         [(rank, name) for rank, name in enumerate(key) if name not in self.index])
+            self._positions[key] = positions
+        return positions
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+class FixedRecord(MutableMapping):
+    """Valeurs float64 à positions fixes, accès par nom comme un dict"""
+
+    __slots__ = ('_values', '_extras', '_complete')
+    schema: RecordSchema = RecordSchema(())
+
+    def __init__(self, values: Optional[np.ndarray] = None, extras: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            values: tableau float64 de la taille du schéma (conservé sans copie) ;
+                par défaut, tous les champs absents
+            extras: clés hors schéma ou valeurs non numériques
+        """
+        if values is None:
+            values = np.full(len(self.schema), np.nan)
+        elif values.dtype != np.float64 or values.shape != (len(self.schema),):
+            raise ValueError(f"Tableau attendu: float64 de forme ({len(self.schema)},), "
+                             f"reçu {values.dtype} {values.shape}")
+        self._values = values
+        self._extras = extras or None
+        self._complete = None
+
+    # ------------------------------------------------------------------
+    # Conversions
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_mapping(cls, mapping: Mapping) -> 'FixedRecord':
+        """Enregistrement à partir d'un dict (ou le même objet s'il est déjà de ce type)"""
+        if type(mapping) is cls:
+            return mapping
+        index = cls.schema.index
+        values = np.full(len(cls.schema), np.nan)
+        extras = {}
+        for name, value in mapping.items():
+            position = index.get(name)
+            if position is not None and _is_number(value):
+                values[position] = value
+            else:
+                extras[name] = value
+        return cls(values, extras)
+
+    @classmethod
+    def from_array(cls, values: np.ndarray) -> 'FixedRecord':
+        """Enregistrement sur un tableau existant (ligne d'un portefeuille), sans copie"""
+        return cls(values)
+
+    def as_array(self) -> np.ndarray:
+        """Tableau des valeurs (vue, NaN pour les champs absents)"""
+        return self._values
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dict équivalent : champs présents dans l'ordre du schéma, puis champs annexes"""
+        result = {name: value for name, value in zip(self.schema.names, self._values.tolist())
+                  if value == value}
+        if self._extras:
+            result.update(self._extras)
+        return result
+
+    def copy(self) -> 'FixedRecord':
+        return type(self)(self._values.copy(), dict(self._extras) if self._extras else None)
+
+    def fingerprint(self) -> tuple:
+        """Clé hachable du contenu (mémorisation des calculs)"""
+        extras = frozenset(self._extras.items()) if self._extras else frozenset()
+        return type(self).__name__, self._values.tobytes(), extras
+
+    def gather(self, names: Sequence[str], default=0) -> List[Any]:
+        """Valeurs de ``names`` par accès positionnel, ``default`` pour les absents"""
+        positions, known, outside = self.schema.positions(names)
+        taken = self._values.take(positions)
+        if not self.is_complete():
+            taken = np.where(np.isnan(taken), default, taken)
+        taken = taken.tolist()
+        if not outside:
+            return taken
+        result = [default] * len(names)
+        for rank, value in zip(known, taken):
+            result[rank] = value
+        extras = self._extras or {}
+        for rank, name in outside:
+            result[rank] = extras.get(name, default)
+        return result
+
+    def is_complete(self) -> bool:
+        """Tous les champs du schéma sont renseignés"""
+        if self._complete is None:
+            self._complete = not np.isnan(self._values).any()
+        return self._complete
+
+    # ------------------------------------------------------------------
+    # Accès de type dict
+    # ------------------------------------------------------------------
+    def __getitem__(self, name: str):
+        position = self.schema.index.get(name)
+        if position is not None:
+            value = self._values.item(position)
+            if value == value:
+                return value
+        if self._extras and name in self._extras:
+            return self._extras[name]
+        raise KeyError(name)
+
+    def get(self, name: str, default=None):
+        position = self.schema.index.get(name)
+        if position is not None:
+            value = self._values.item(position)
+            if value == value:
+                return value
+        if self._extras:
+            return self._extras.get(name, default)
+        return default
+
+    def __contains__(self, name) -> bool:
+        position = self.schema.index.get(name)
+        if position is not None and self._values.item(position) == self._values.item(position):
+            return True
+        return bool(self._extras) and name in self._extras
+
+    def __setitem__(self, name: str, value):
+        position = self.schema.index.get(name)
+        if position is not None and _is_number(value):
+            self._values[position] = value
+            self._complete = None
+            if self._extras:
+                self._extras.pop(name, None)
+            return
+        if position is not None:
+            self._values[position] = np.nan
+            self._complete = False
+        if self._extras is None:
+            self._extras = {}
+        self._extras[name] = value
+
+    def __delitem__(self, name: str):
+        removed = False
+        position = self.schema.index.get(name)
+        if position is not None and self._values.item(position) == self._values.item(position):
+            self._values[position] = np.nan
+            self._complete = False
+            removed = True
+        if self._extras and name in self._extras:
+            del self._extras[name]
+            removed = True
+        if not removed:
+            raise KeyError(name)
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self._values))) + len(self._extras or ())
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def values(self):
+        return self.to_dict().values()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return type(self), (self._values, self._extras)
+
+
+def _statement_fields() -> List[str]:
+    # Postes du modèle (sans le résultat du CR, fusionné dans resultat_net), postes
+    # dérivés au chargement, puis postes lus par les ratios hors modèle
+    names = [cell_field.field for cell_field in TEMPLATE_FIELDS if cell_field.field != 'resultat_net_cr']
+    names += ['reserves', 'resultat_net', 'charges_exploitation']
+    for graph in RATIO_GRAPHS.values():
+        names += graph.required_fields(graph.outputs())
+    return names
+
+
+def _ratio_fields() -> List[str]:
+    names = []
+    for graph in RATIO_GRAPHS.values():
+        names += graph.outputs()
+    return names
+
+
+STATEMENT_SCHEMA = RecordSchema(_statement_fields())
+RATIO_SCHEMA = RecordSchema(_ratio_fields())
+
+
+class FinancialStatement(FixedRecord):
+    """Postes des états financiers d'une analyse"""
+    __slots__ = ()
+    schema = STATEMENT_SCHEMA
+
+
+class RatioRecord(FixedRecord):
+    """Ratios calculés d'une analyse (tous modes du moteur)"""
+    __slots__ = ()
+    schema = RATIO_SCHEMA
+
+
+def stack_records(records: Sequence[FixedRecord]) -> pd.DataFrame:
+    """Portefeuille (une ligne par enregistrement) pour le calcul par lots"""
+    if not records:
+        raise ValueError("Aucun enregistrement à assembler")
+    schema = type(records[0]).schema
+    matrix = np.vstack([record.as_array() for record in records])
+    return pd.DataFrame(matrix, columns=list(schema.names), copy=False)
+
+
+def json_default(value):
+    """Pour ``json.dumps(default=...)`` : enregistrements en dict, autres objets en texte"""
+    if isinstance(value, FixedRecord):
+        return value.to_dict()
+    return str(value)
@@ -0,0 +1,218 @@
+"""
+Variantes du modèle de liasse BCEAO - empreinte et correspondances précompilées
+
+Les clients envoient des modèles légèrement décalés (ligne insérée, libellé
+déplacé). L'empreinte d'une feuille est un hachage court de sa colonne de
+libellés, calculé sur la grille déjà décodée (quelques microsecondes). Elle est
+recherchée dans un registre de variantes connues (data/template_variants.json),
+chacune avec son propre schéma de cellules compilé. Une feuille inconnue est
+signalée et lue avec le schéma du modèle officiel.
+"""
+
+import hashlib
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.core.cell_mapping import CellField, CellMappingSchema, CompiledSheet, TEMPLATE_FIELDS, TEMPLATE_SCHEMA
+from modules.core.xlsx_stream import split_cell_ref
+
+VARIANTS_PATH = Path(__file__).parent.parent.parent / "data" / "template_variants.json"
+
+# Colonnes de libellés par feuille (Bilan : actif en A, passif en G ; TFT : codes REF)
+LABEL_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'Bilan': ('A', 'G'),
+    'CR': ('A',),
+    'TFT': ('A',),
+}
+
+
+def normalize_label(value) -> str:
+    """Libellé comparable : espaces réduits, majuscules, vide pour une cellule vide"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return ' '.join(str(value).split()).upper()
+
+
+def sheet_fingerprint(grid: np.ndarray, label_columns: Sequence[str], n_rows: int) -> str:
+    """
+    Empreinte des ``n_rows`` premières lignes des colonnes de libellés
+
+    Les textes viennent de sharedStrings.xml (résolus par le lecteur en flux) :
+    deux modèles aux libellés identiques ont la même empreinte.
+    """
+    cols = [split_cell_ref(f"{column}1")[1] - 1 for column in label_columns]
+    labels = []
+    for col in cols:
+        column = grid[:n_rows, col] if col < grid.shape[1] else ()
+        labels.extend(normalize_label(value) for value in column)
+        labels.extend([''] * (n_rows - len(column)))
+    return hashlib.blake2b('\x1f'.join(labels).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class TemplateVariant(NamedTuple):
+    """Variante connue : empreintes par feuille et schéma de cellules propre"""
+    name: str
+    description: str
+    fingerprints: Dict[str, Tuple[str, ...]]
+    schema: CellMappingSchema
+
+
+class VariantMatch(NamedTuple):
+    """Résultat de l'identification d'un classeur"""
+    fingerprints: Dict[str, str]
+    variants: Dict[str, Optional[str]]
+    sheets: Dict[str, CompiledSheet]
+
+    @property
+    def unknown_sheets(self) -> List[str]:
+        return [sheet for sheet, name in self.variants.items() if name is None]
+
+    @property
+    def known(self) -> bool:
+        return not self.unknown_sheets
+
+
+def shift_fields(fields: Iterable[CellField], row_shifts: Dict[str, Sequence[Sequence[int]]],
+                 cell_overrides: Optional[Dict[str, str]] = None) -> List[CellField]:
+    """
+    Déduit les cellules d'une variante à partir du modèle officiel
+
+    Args:
+        row_shifts: {feuille: [[à partir de la ligne, décalage], ...]} ; les
+            décalages se cumulent (ligne insérée : +1, ligne supprimée : -1)
+        cell_overrides: {champ: cellule} pour les postes déplacés isolément
+    """
+    cell_overrides = cell_overrides or {}
+    shifted = []
+    for cell_field in fields:
+        cell = cell_overrides.get(cell_field.field)
+        if cell is None:
+            row, col = split_cell_ref(cell_field.cell)
+            offset = sum(delta for start, delta in row_shifts.get(cell_field.sheet, ()) if row >= start)
+            column = cell_field.cell.rstrip('0123456789').replace('$', '')
+            cell = f"{column}{row + offset}"
+        shifted.append(cell_field._replace(cell=cell))
+    return shifted
+
+
+class TemplateVariantRegistry:
+    """
+    Registre des variantes de modèle, indexé par empreinte de feuille
+
+    La correspondance retenue pour un jeu d'empreintes est mise en cache :
+    un même modèle n'est résolu qu'une fois par processus.
+    """
+
+    def __init__(self, variants: Iterable[TemplateVariant] = (), base_schema: CellMappingSchema = TEMPLATE_SCHEMA):
+        self.base_schema = base_schema
+        self.variants: Dict[str, TemplateVariant] = {}
+        self._index: Dict[Tuple[str, str], TemplateVariant] = {}
+        self._resolved: Dict[Tuple[Tuple[str, str], ...], VariantMatch] = {}
+        self.unknown: Counter = Counter()
+        self._lock = threading.Lock()
+        for variant in variants:
+            self.register(variant)
+
+    @classmethod
+    def from_json(cls, path=VARIANTS_PATH) -> 'TemplateVariantRegistry':
+        """Charge le registre ; un fichier absent donne un registre vide"""
+        registry = cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            print(f"⚠️ Registre des variantes introuvable: {path}")
+            return registry
+
+        for entry in config.get('variants', []):
+            registry.register_config(entry)
+        return registry
+
+    def register_config(self, entry: Dict) -> TemplateVariant:
+        """Enregistre une variante décrite comme dans template_variants.json"""
+        fields = shift_fields(TEMPLATE_FIELDS, entry.get('row_shifts', {}), entry.get('cell_overrides'))
+        variant = TemplateVariant(
+            name=entry['name'],
+            description=entry.get('description', ''),
+            fingerprints={sheet: tuple(values) if isinstance(values, list) else (values,)
+                          for sheet, values in entry.get('fingerprints', {}).items()},
+            schema=CellMappingSchema(fields),
+        )
+        self.register(variant)
+        return variant
+
+    def register(self, variant: TemplateVariant):
+        """Ajoute une variante ; une empreinte ne peut désigner qu'une variante"""
+        with self._lock:
+            for sheet, fingerprints in variant.fingerprints.items():
+                for fingerprint in fingerprints:
+                    existing = self._index.get((sheet, fingerprint))
+                    if existing is not None and existing.name != variant.name:
+                        raise ValueError(f"Empreinte {sheet}:{fingerprint} déjà attribuée "
+                                         f"à la variante {existing.name}")
+                    self._index[(sheet, fingerprint)] = variant
+            self.variants[variant.name] = variant
+            self._resolved.clear()
+
+    def fingerprint(self, grids: Dict[str, np.ndarray]) -> Dict[str, str]:
+        """Empreinte de chaque feuille lue, sur l'étendue du modèle officiel"""
+        return {
+            sheet: sheet_fingerprint(grid, LABEL_COLUMNS.get(sheet, ('A',)),
+                                     self.base_schema.sheet(sheet).shape[0])
+            for sheet, grid in grids.items()
+        }
+
+    def resolve(self, fingerprints: Dict[str, str]) -> VariantMatch:
+        """Schéma compilé à utiliser pour chaque feuille (officiel si inconnue)"""
+        key = tuple(sorted(fingerprints.items()))
+        with self._lock:
+            match = self._resolved.get(key)
+            first_seen = match is None
+            if first_seen:
+                variants, sheets = {}, {}
+                for sheet, fingerprint in fingerprints.items():
+                    variant = self._index.get((sheet, fingerprint))
+                    variants[sheet] = variant.name if variant is not None else None
+                    schema = variant.schema if variant is not None else self.base_schema
+                    sheets[sheet] = schema.sheet(sheet)
+                match = VariantMatch(dict(fingerprints), variants, sheets)
+                self._resolved[key] = match
+
+            for sheet in match.unknown_sheets:
+                self.unknown[(sheet, fingerprints[sheet])] += 1
+
+        if first_seen:
+            for sheet in match.unknown_sheets:
+                print(f"⚠️ Variante de modèle inconnue pour la feuille {sheet} "
+                      f"(empreinte {fingerprints[sheet]}) : adresses du modèle officiel utilisées")
+        return match
+
+    def identify(self, grids: Dict[str, np.ndarray]) -> VariantMatch:
+        """Empreinte puis résolution des feuilles d'un classeur"""
+        return self.resolve(self.fingerprint(grids))
+
+    def unknown_report(self) -> List[Dict[str, object]]:
+        """Empreintes inconnues rencontrées, à ajouter au registre si la variante est légitime"""
+        with self._lock:
+            return [{'feuille': sheet, 'empreinte': fingerprint, 'occurrences': count}
+                    for (sheet, fingerprint), count in self.unknown.most_common()]
+
+
+_default_registry: Optional[TemplateVariantRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateVariantRegistry:
+    """Registre partagé par le processus, chargé depuis data/template_variants.json"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = TemplateVariantRegistry.from_json()
+        return _default_registry
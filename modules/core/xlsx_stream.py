@@ -0,0 +1,516 @@
+"""
+Lecture en flux des classeurs XLSX - extraction des seules cellules utiles
+
+Le XML des feuilles est lu directement depuis l'archive zip : seules les lignes
+contenant des cellules mappées sont décodées et la lecture s'arrête dès que la
+dernière ligne utile est atteinte. Les styles, liens externes et le reste des
+feuilles ne sont jamais analysés.
+
+Les lignes décodées sont conservées par le lecteur : un classeur importé en
+mémoire est décodé une seule fois (``shared_reader``) et l'aperçu puis
+l'analyse réutilisent les mêmes lignes et chaînes partagées.
+"""
+
+import hashlib
+import posixpath
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from xml.etree.ElementTree import iterparse, fromstring
+
+import numpy as np
+
+from modules.core.sources import BufferReader, as_readable
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_DOC_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_TAG_ROW = _NS_MAIN + 'row'
+_TAG_CELL = _NS_MAIN + 'c'
+_TAG_VALUE = _NS_MAIN + 'v'
+_TAG_INLINE = _NS_MAIN + 'is'
+_TAG_TEXT = _NS_MAIN + 't'
+_TAG_RUN_PHONETIC = _NS_MAIN + 'rPh'
+_TAG_SHARED_ITEM = _NS_MAIN + 'si'
+
+SHARED_READER_CAPACITY = 4
+
+
+def split_cell_ref(cell_ref: str) -> Tuple[int, int]:
+    """Convertit une adresse 'E26' en (ligne, colonne), toutes deux à partir de 1"""
+    col = 0
+    row = 0
+    for char in cell_ref:
+        if 'A' <= char <= 'Z':
+            col = col * 26 + (ord(char) - 64)
+        elif 'a' <= char <= 'z':
+            col = col * 26 + (ord(char) - 96)
+        elif '0' <= char <= '9':
+            row = row * 10 + (ord(char) - 48)
+        elif char == '$':
+            continue
+        else:
+            raise ValueError(f"Adresse de cellule invalide: {cell_ref}")
+    if row == 0 or col == 0:
+        raise ValueError(f"Adresse de cellule invalide: {cell_ref}")
+    return row, col
+
+
+class _SharedString:
+    """Référence différée vers une entrée de sharedStrings.xml"""
+
+    __slots__ = ('index',)
+
+    def __init__(self, index: int):
+        self.index = index
+
+
+class StreamedCell:
+    """Cellule minimale compatible avec l'accès ``sheet['E26'].value`` d'openpyxl"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value=None):
+        self.value = value
+
+
+class StreamedSheet:
+    """Feuille contenant uniquement les cellules extraites du flux XML"""
+
+    def __init__(self, title: str, cells: Dict[str, object]):
+        self.title = title
+        self._cells = cells
+
+    def __getitem__(self, cell_ref: str) -> StreamedCell:
+        return StreamedCell(self._cells.get(cell_ref.upper().replace('$', '')))
+
+    def values(self) -> Dict[str, object]:
+        """Retourne les valeurs extraites indexées par adresse"""
+        return dict(self._cells)
+
+
+class XlsxStreamReader:
+    """Lecteur XLSX qui ne décode que les lignes demandées"""
+
+    def __init__(self, source):
+        self._source = source
+        self._zip = zipfile.ZipFile(source)
+        self._shared_strings: Dict[int, str] = {}
+        # feuille -> (dernière ligne lue, {ligne: {colonne: valeur brute}}, feuille entière lue)
+        self._row_cache: Dict[str, Tuple[int, Dict[int, Dict[int, object]], bool]] = {}
+        # Un verrou par feuille : des threads peuvent décoder des feuilles différentes en parallèle
+        self._sheet_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._strings_lock = threading.Lock()
+        # Utilisateurs de ce lecteur partagé (voir shared_reader), sous _shared_readers_lock
+        self._leases = 0
+        self.sheet_paths = self._read_sheet_paths()
+
+    @property
+    def sheetnames(self):
+        return list(self.sheet_paths)
+
+    def close(self):
+        self._zip.close()
+
+    def _attach(self, source):
+        """Rouvre l'archive sur un contenu identique ; lignes et chaînes décodées conservées"""
+        self._source = source
+        self._zip = zipfile.ZipFile(source)
+
+    def _detach(self):
+        """Ferme l'archive et sa source (libère le buffer d'un contenu en mémoire)"""
+        self._zip.close()
+        self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_sheet_paths(self) -> Dict[str, str]:
+        """Associe chaque nom de feuille à son chemin dans l'archive"""
+        return workbook_sheet_paths(self._zip)
+
+    def read_cells(self, sheet_name: str, cell_refs: Iterable[str]) -> Dict[str, object]:
+        """
+        Extrait les valeurs des cellules demandées d'une feuille
+
+        Les valeurs retournées suivent la convention ``data_only=True`` d'openpyxl :
+        valeur en cache des formules, ``None`` pour une cellule vide.
+
+        Raises:
+            KeyError: si la feuille n'existe pas dans le classeur
+        """
+        wanted = {}
+        for ref in cell_refs:
+            row, col = split_cell_ref(ref)
+            wanted.setdefault(row, {})[col] = ref.upper().replace('$', '')
+
+        decoded = self._decoded_rows(sheet_name, max(wanted, default=0))
+        cells = {}
+        for row_index, columns in wanted.items():
+            row_cells = decoded.get(row_index)
+            if not row_cells:
+                continue
+            for col_index, ref in columns.items():
+                if col_index in row_cells:
+                    cells[ref] = row_cells[col_index]
+
+        self._resolve_shared_strings(cells)
+        return cells
+
+    def read_grid(self, sheet_name: str, shape: Tuple[int, int],
+                  rows: Optional[Iterable[int]] = None):
+        """
+        Extrait le bloc supérieur gauche d'une feuille en grille d'objets
+
+        Args:
+            sheet_name: Nom de la feuille
+            shape: (lignes, colonnes) de la grille retournée
+            rows: Numéros de lignes (base 1) à décoder ; toutes si None
+
+        Returns:
+            numpy.ndarray: valeurs brutes (``None`` pour une cellule vide)
+
+        Raises:
+            KeyError: si la feuille n'existe pas dans le classeur
+        """
+        n_rows, n_cols = shape
+        wanted = [row for row in (rows if rows is not None else range(1, n_rows + 1))
+                  if 1 <= row <= n_rows]
+
+        decoded = self._decoded_rows(sheet_name, max(wanted, default=0))
+        grid = np.full(shape, None, dtype=object)
+        for row_index in wanted:
+            for col_index, value in decoded.get(row_index, {}).items():
+                if col_index <= n_cols:
+                    grid[row_index - 1, col_index - 1] = value
+        return self._resolve_grid(grid)
+
+    def read_head(self, sheet_name: str, max_rows: int):
+        """
+        Extrait au plus ``max_rows`` premières lignes d'une feuille
+
+        La largeur de la grille est celle de la cellule la plus à droite
+        rencontrée dans ces lignes ; le reste de la feuille n'est pas lu.
+
+        Returns:
+            numpy.ndarray: valeurs brutes, lignes 1 à n (``None`` pour une cellule vide)
+
+        Raises:
+            KeyError: si la feuille n'existe pas dans le classeur
+        """
+        decoded = self._decoded_rows(sheet_name, max_rows)
+        rows = [row for row in decoded if row <= max_rows]
+        n_rows = max(rows, default=0)
+        n_cols = max((max(decoded[row]) for row in rows), default=0)
+
+        grid = np.full((n_rows, n_cols), None, dtype=object)
+        for row_index in rows:
+            for col_index, value in decoded[row_index].items():
+                grid[row_index - 1, col_index - 1] = value
+        return self._resolve_grid(grid)
+
+    def prefetch_rows(self, sheet_name: str, last_row: int):
+        """Décode dès maintenant les lignes 1 à ``last_row`` pour les lectures suivantes"""
+        self._decoded_rows(sheet_name, last_row)
+
+    def _resolve_grid(self, grid):
+        """Résout sur place les références sharedStrings d'une grille"""
+        shared = {position: value for position, value in np.ndenumerate(grid)
+                  if isinstance(value, _SharedString)}
+        if shared:
+            self._resolve_shared_strings(shared)
+            for position, value in shared.items():
+                grid[position] = value
+        return grid
+
+    def _decoded_rows(self, sheet_name: str, last_row: int) -> Dict[int, Dict[int, object]]:
+        """
+        Lignes 1 à ``last_row`` décodées : {ligne: {colonne: valeur brute}}
+
+        La lecture s'arrête après ``last_row`` ; le résultat est conservé et
+        sert toute demande ultérieure qui ne va pas plus loin dans la feuille.
+
+        Raises:
+            KeyError: si la feuille n'existe pas dans le classeur
+        """
+        if sheet_name not in self.sheet_paths:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+        with self._locks_guard:
+            sheet_lock = self._sheet_locks.setdefault(sheet_name, threading.Lock())
+
+        with sheet_lock:
+            cached = self._row_cache.get(sheet_name)
+            if cached is not None and (cached[0] >= last_row or cached[2]):
+                return cached[1]
+            if last_row <= 0:
+                return {}
+
+            rows, complete = self._parse_rows(sheet_name, last_row)
+            self._row_cache[sheet_name] = (last_row, rows, complete)
+            return rows
+
+    def _parse_rows(self, sheet_name: str, last_row: int) -> Tuple[Dict[int, Dict[int, object]], bool]:
+        """Décode le XML de la feuille jusqu'à ``last_row`` : (lignes, feuille entière lue)"""
+        rows = {}
+        with self._zip.open(self.sheet_paths[sheet_name]) as stream:
+            row_index = 0
+            for _, elem in iterparse(stream, events=('end',)):
+                if elem.tag != _TAG_ROW:
+                    continue
+
+                row_attr = elem.get('r')
+                row_index = int(row_attr) if row_attr else row_index + 1
+                if row_index > last_row:
+                    return rows, False
+
+                cells = {}
+                col_index = 0
+                for cell in elem.iter(_TAG_CELL):
+                    ref = cell.get('r')
+                    col_index = split_cell_ref(ref)[1] if ref else col_index + 1
+                    value = self._cell_value(cell)
+                    if value is not None:
+                        cells[col_index] = value
+                if cells:
+                    rows[row_index] = cells
+                elem.clear()
+        return rows, True
+
+    @staticmethod
+    def _cell_value(cell):
+        """Décode la valeur d'un élément <c> selon son type"""
+        cell_type = cell.get('t', 'n')
+
+        if cell_type == 'inlineStr':
+            inline = cell.find(_TAG_INLINE)
+            return _element_text(inline) if inline is not None else None
+
+        value = cell.findtext(_TAG_VALUE)
+        if not value:
+            return None
+        if cell_type == 'n':
+            return float(value)
+        if cell_type == 's':
+            return _SharedString(int(value))
+        if cell_type == 'b':
+            return value == '1'
+        # 'str' (résultat de formule), 'e' (erreur) et 'd' (date ISO)
+        return value
+
+    def _resolve_shared_strings(self, cells: Dict[object, object]):
+        """Remplace les références sharedStrings par leur texte (lecture partielle)"""
+        pending = [ref for ref, value in cells.items() if isinstance(value, _SharedString)]
+        if not pending:
+            return
+
+        needed = max(cells[ref].index for ref in pending)
+        with self._strings_lock:
+            if needed >= len(self._shared_strings):
+                self._load_shared_strings(needed)
+
+        for ref in pending:
+            cells[ref] = self._shared_strings.get(cells[ref].index)
+
+    def _load_shared_strings(self, up_to: int):
+        """Lit sharedStrings.xml jusqu'à l'index ``up_to`` inclus"""
+        try:
+            stream = self._zip.open('xl/sharedStrings.xml')
+        except KeyError:
+            return
+
+        with stream:
+            index = 0
+            for _, elem in iterparse(stream, events=('end',)):
+                if elem.tag != _TAG_SHARED_ITEM:
+                    continue
+                if index not in self._shared_strings:
+                    self._shared_strings[index] = _element_text(elem)
+                elem.clear()
+                index += 1
+                if index > up_to:
+                    break
+
+
+def workbook_sheet_paths(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """
+    Feuilles d'un classeur XLSX et leur chemin dans l'archive, dans l'ordre des onglets
+
+    Seuls xl/workbook.xml et ses relations sont lus, aucune feuille n'est décodée.
+
+    Raises:
+        KeyError: si l'archive n'est pas un classeur XLSX
+    """
+    workbook = fromstring(archive.read('xl/workbook.xml'))
+    rels = fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+
+    targets = {}
+    for rel in rels.iter(_NS_PKG_REL + 'Relationship'):
+        target = rel.get('Target', '')
+        if target.startswith('/'):
+            path = target.lstrip('/')
+        else:
+            path = posixpath.normpath(posixpath.join('xl', target))
+        targets[rel.get('Id')] = path
+
+    sheet_paths = {}
+    for sheet in workbook.iter(_NS_MAIN + 'sheet'):
+        rel_id = sheet.get(_NS_DOC_REL + 'id')
+        if rel_id in targets:
+            sheet_paths[sheet.get('name')] = targets[rel_id]
+    return sheet_paths
+
+
+def _element_text(elem) -> str:
+    """Concatène les textes d'un élément <si> ou <is> (hors phonétique)"""
+    direct = elem.find(_TAG_TEXT)
+    if direct is not None and len(elem) == 1:
+        return direct.text or ''
+
+    parts = []
+    for child in elem:
+        if child.tag == _TAG_RUN_PHONETIC:
+            continue
+        if child.tag == _TAG_TEXT:
+            parts.append(child.text or '')
+        else:
+            parts.extend(t.text or '' for t in child.iter(_TAG_TEXT))
+    return ''.join(parts)
+
+
+class StreamedWorkbook:
+    """
+    Classeur en lecture seule qui n'extrait que les cellules déclarées
+
+    S'utilise comme un classeur openpyxl : ``workbook['Bilan']['E26'].value``.
+    Chaque feuille est décodée au premier accès puis conservée.
+    """
+
+    def __init__(self, source, cells_by_sheet: Dict[str, Iterable[str]],
+                 reader: Optional[XlsxStreamReader] = None):
+        # Un lecteur partagé (shared_reader) est libéré, pas fermé
+        self._owns_reader = reader is None
+        self._released = False
+        self._reader = reader if reader is not None else XlsxStreamReader(source)
+        self._cells_by_sheet = cells_by_sheet
+        self._sheets: Dict[str, StreamedSheet] = {}
+
+    @property
+    def sheetnames(self):
+        return self._reader.sheetnames
+
+    def __contains__(self, sheet_name: str) -> bool:
+        return sheet_name in self._reader.sheet_paths
+
+    def __getitem__(self, sheet_name: str) -> StreamedSheet:
+        sheet = self._sheets.get(sheet_name)
+        if sheet is None:
+            cells = self._reader.read_cells(sheet_name, self._cells_by_sheet.get(sheet_name, ()))
+            sheet = StreamedSheet(sheet_name, cells)
+            self._sheets[sheet_name] = sheet
+        return sheet
+
+    def read_grid(self, sheet_name: str, shape: Tuple[int, int], rows: Optional[Iterable[int]] = None):
+        """Bloc supérieur gauche d'une feuille en grille d'objets (voir XlsxStreamReader.read_grid)"""
+        return self._reader.read_grid(sheet_name, shape, rows)
+
+    def close(self):
+        if self._owns_reader:
+            self._reader.close()
+        elif not self._released:
+            self._released = True
+            release_shared_reader(self._reader)
+
+
+_shared_readers: "OrderedDict[str, XlsxStreamReader]" = OrderedDict()
+_shared_readers_lock = threading.Lock()
+
+
+def is_buffer(source) -> bool:
+    """Vrai pour un contenu déjà en mémoire (bytes, bytearray, memoryview)"""
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def shared_reader(buffer) -> Optional[XlsxStreamReader]:
+    """
+    Lecteur en flux partagé pour un classeur en mémoire, indexé par empreinte
+
+    Les lignes et chaînes décodées des ``SHARED_READER_CAPACITY`` derniers
+    contenus restent en cache : l'aperçu et l'analyse d'un même fichier
+    réutilisent les lignes déjà décodées.
+
+    Le lecteur lit le buffer de l'appelant sans copie, et seulement tant
+    qu'il est utilisé : chaque appel doit être suivi de
+    ``release_shared_reader``. À la dernière libération, l'archive est fermée
+    et la vue sur le buffer relâchée (un ``getbuffer()`` d'un fichier importé
+    peut alors être fermé) ; l'appel suivant avec le même contenu rouvre
+    l'archive sur le nouveau buffer.
+
+    Returns:
+        XlsxStreamReader ou None si le contenu n'est pas une archive XLSX
+    """
+    key = hashlib.sha256(buffer).hexdigest()
+    with _shared_readers_lock:
+        reader = _shared_readers.get(key)
+        if reader is not None:
+            _shared_readers.move_to_end(key)
+            if reader._leases == 0:
+                reader._attach(BufferReader(buffer))
+            reader._leases += 1
+            return reader
+
+    source = BufferReader(buffer)
+    try:
+        reader = XlsxStreamReader(source) if zipfile.is_zipfile(source) else None
+    except (zipfile.BadZipFile, KeyError):
+        reader = None
+    if reader is None:
+        source.close()
+        return None
+
+    with _shared_readers_lock:
+        cached = _shared_readers.setdefault(key, reader)
+        if cached is not reader:
+            # Ouvert entre-temps par un autre thread
+            reader._detach()
+            reader = cached
+            if reader._leases == 0:
+                reader._attach(BufferReader(buffer))
+        _shared_readers.move_to_end(key)
+        reader._leases += 1
+        while len(_shared_readers) > SHARED_READER_CAPACITY:
+            # Un lecteur encore utilisé est fermé à sa dernière libération
+            _shared_readers.popitem(last=False)
+    return reader
+
+
+def release_shared_reader(reader: XlsxStreamReader):
+    """Libère un lecteur obtenu par ``shared_reader`` ; l'archive est fermée après le dernier utilisateur"""
+    with _shared_readers_lock:
+        reader._leases -= 1
+        if reader._leases == 0:
+            reader._detach()
+
+
+def clear_shared_readers():
+    """Oublie les lignes décodées des lecteurs partagés (tests, libération mémoire)"""
+    with _shared_readers_lock:
+        _shared_readers.clear()
+
+
+def open_mapped_workbook(source, cells_by_sheet: Dict[str, Iterable[str]]) -> Optional[StreamedWorkbook]:
+    """Ouvre un classeur XLSX en flux, ou retourne None si la source n'est pas une archive XLSX"""
+    if is_buffer(source):
+        reader = shared_reader(source)
+        return StreamedWorkbook(None, cells_by_sheet, reader=reader) if reader is not None else None
+
+    source = as_readable(source)
+    if not zipfile.is_zipfile(source):
+        return None
+    return StreamedWorkbook(source, cells_by_sheet)
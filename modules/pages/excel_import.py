@@ -3,8 +3,6 @@ Page d'import Excel - Version corrigée sans réinitialisation
 """
 
 import streamlit as st
-import tempfile
-import os
 from datetime import datetime
 
 # Import du gestionnaire de session centralisé
@@ -28,8 +26,8 @@ def show_excel_import_page():
     # ÉTAPE 2: Initialiser les variables de session
     if 'file_uploaded' not in st.session_state:
         st.session_state['file_uploaded'] = False
-    if 'file_content' not in st.session_state:
-        st.session_state['file_content'] = None
+    if 'file_blob' not in st.session_state:
+        st.session_state['file_blob'] = None
     if 'file_name' not in st.session_state:
         st.session_state['file_name'] = None
     if 'analysis_running' not in st.session_state:
@@ -40,7 +38,7 @@ def show_excel_import_page():
         st.success("🔄 Application réinitialisée! Vous pouvez importer un nouveau fichier.")
         # Nettoyer les variables locales
         st.session_state['file_uploaded'] = False
-        st.session_state['file_content'] = None
+        st.session_state['file_blob'] = None
         st.session_state['file_name'] = None
         st.session_state['analysis_running'] = False
         del st.session_state['complete_reset']
@@ -65,8 +63,9 @@ def show_file_upload_interface():
     )
     
     if uploaded_file is not None:
-        # Stocker le fichier immédiatement
-        st.session_state['file_content'] = uploaded_file.getbuffer()
+        # Écrire le fichier une fois dans le magasin : la session ne garde que son empreinte
+        from modules.core.blob_store import store_upload
+        store_upload(st.session_state, 'file_blob', uploaded_file.getbuffer())
         st.session_state['file_name'] = uploaded_file.name
         st.session_state['file_uploaded'] = True
         st.success(f"✅ Fichier '{uploaded_file.name}' chargé avec succès!")
@@ -80,10 +79,21 @@ def show_analysis_interface():
     
     st.header("📁 Fichier Sélectionné")
     
+    from modules.core.blob_store import get_blob_store, release_upload
+    
+    store = get_blob_store()
+    if not store.exists(st.session_state['file_blob']):
+        # Fichier expiré (session inactive au-delà de la durée de conservation)
+        st.warning("⚠️ Le fichier importé a expiré, veuillez le sélectionner à nouveau")
+        release_upload(st.session_state, 'file_blob')
+        st.session_state['file_uploaded'] = False
+        st.session_state['file_name'] = None
+        return
+    
     # Détails du fichier
     with st.expander("📋 Informations du fichier", expanded=True):
         st.write(f"**Nom :** {st.session_state['file_name']}")
-        st.write(f"**Taille :** {len(st.session_state['file_content']) / 1024:.1f} KB")
+        st.write(f"**Taille :** {store.size(st.session_state['file_blob']) / 1024:.1f} KB")
         st.success("✅ Fichier prêt pour l'analyse")
     
     # Sélection du secteur
@@ -114,7 +124,7 @@ def show_analysis_interface():
     if not st.session_state['analysis_running']:
         if st.button("🔍 Analyser le Fichier", type="primary", use_container_width=True):
             st.session_state['analysis_running'] = True
-            analyze_file(st.session_state['file_content'], st.session_state['file_name'], secteur)
+            analyze_file(st.session_state['file_blob'], st.session_state['file_name'], secteur)
     else:
         st.info("🔄 Analyse en cours... Veuillez patienter.")
     
@@ -124,8 +134,9 @@ def show_analysis_interface():
     
     with col1:
         if st.button("📄 Nouveau Fichier", key="new_file"):
+            release_upload(st.session_state, 'file_blob')
             st.session_state['file_uploaded'] = False
-            st.session_state['file_content'] = None
+            st.session_state['file_blob'] = None
             st.session_state['file_name'] = None
             st.session_state['analysis_running'] = False
             st.rerun()
@@ -135,57 +146,74 @@ def show_analysis_interface():
             SessionManager.set_current_page('home')
             st.rerun()
 
-def analyze_file(file_content, filename, secteur):
-    """Analyse le fichier Excel"""
+def analyze_file(file_blob, filename, secteur):
+    """Analyse le fichier Excel référencé par son empreinte dans le magasin"""
     
     try:
         with st.spinner("📊 Analyse du fichier en cours..."):
-            # Créer un fichier temporaire
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                tmp_file.write(file_content)
-                temp_path = tmp_file.name
+            # Importer l'analyseur
+            from modules.core.analyzer import FinancialAnalyzer
+            from modules.core.analysis_cache import get_analysis_cache
+            from modules.core.preflight import preflight_workbook
+            from modules.core.blob_store import get_blob_store
             
             try:
-                # Importer l'analyseur
-                from modules.core.analyzer import FinancialAnalyzer
-                
-                # Analyser le fichier
-                analyzer = FinancialAnalyzer()
-                data = analyzer.load_excel_template(temp_path)
-                
-                if data is None:
-                    st.error("❌ Erreur lors du chargement du fichier")
-                    st.error("Vérifiez que le fichier contient les feuilles 'Bilan' et 'CR'")
-                    st.session_state['analysis_running'] = False
-                    return
-                
-                # Calculer les ratios et scores
-                ratios = analyzer.calculate_ratios(data)
-                scores = analyzer.calculate_score(ratios, secteur)
-                
-                # Métadonnées
-                metadata = {
-                    'secteur': secteur,
-                    'fichier_nom': filename,
-                    'source': 'excel_import'
-                }
-                
-                # Stocker l'analyse
-                store_analysis(data, ratios, scores, metadata)
-                
-                st.success("✅ Analyse terminée avec succès!")
-                st.balloons()
-                
-                # Réinitialiser le flag
+                file_path = get_blob_store().path(file_blob)
+            except KeyError:
+                st.error("❌ Le fichier importé a expiré, veuillez le sélectionner à nouveau")
                 st.session_state['analysis_running'] = False
-                
-                # Rediriger vers l'analyse
-                st.rerun()
-                
-            finally:
-                # Nettoyer le fichier temporaire
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+                return
+            
+            # Modèle invalide, archive corrompue ou trop volumineuse : refus immédiat
+            preflight = preflight_workbook(file_path, file_name=filename)
+            if not preflight.ok:
+                st.error(f"❌ {preflight.reason}")
+                st.session_state['analysis_running'] = False
+                return
+            
+            analyzer = FinancialAnalyzer()
+            
+            # Un contenu déjà analysé est servi depuis le cache : l'empreinte du
+            # magasin est aussi la clé SHA-256 du cache
+            cache = get_analysis_cache()
+            file_hash = file_blob
+            
+            # Le fichier du magasin est lu directement par le chargeur
+            data = cache.get_or_compute_data(file_hash, lambda: analyzer.load_excel_template(file_path))
+            
+            if data is None:
+                st.error("❌ Erreur lors du chargement du fichier")
+                st.error("Vérifiez que le fichier contient les feuilles 'Bilan' et 'CR'")
+                st.session_state['analysis_running'] = False
+                return
+            
+            # Calculer les ratios et scores
+            def compute_analysis():
+                ratios = analyzer.calculate_ratios(data)
+                return {'ratios': ratios, 'scores': analyzer.calculate_score(ratios, secteur)}
+            
+            analysis = cache.get_or_compute_analysis(file_hash, secteur, compute_analysis)
+            ratios = analysis['ratios']
+            scores = analysis['scores']
+            
+            # Métadonnées
+            metadata = {
+                'secteur': secteur,
+                'fichier_nom': filename,
+                'source': 'excel_import'
+            }
+            
+            # Stocker l'analyse
+            store_analysis(data, ratios, scores, metadata)
+            
+            st.success("✅ Analyse terminée avec succès!")
+            st.balloons()
+            
+            # Réinitialiser le flag
+            st.session_state['analysis_running'] = False
+            
+            # Rediriger vers l'analyse
+            st.rerun()
     
     except Exception as e:
         st.error(f"❌ Erreur lors de l'analyse : {str(e)}")
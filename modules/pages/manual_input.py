@@ -453,6 +453,20 @@ def show_manual_input_page():
         for warning in warnings:
             st.warning(f"• {warning}")
     
+    # Aperçu du score : seuls les ratios dépendant des champs modifiés sont recalculés
+    from modules.core.incremental import IncrementalAnalysis
+    
+    if 'manual_incremental' not in st.session_state:
+        st.session_state['manual_incremental'] = IncrementalAnalysis()
+    incremental = st.session_state['manual_incremental']
+    
+    preview = incremental.update(data, secteur)
+    
+    if not errors:
+        score_apercu = preview.scores['global']
+        interpretation_apercu, _ = SessionManager.get_interpretation(score_apercu)
+        st.metric("Score BCEAO (aperçu)", f"{score_apercu}/100", help=interpretation_apercu)
+    
     # Bouton d'analyse
     if not errors:
         analyze_key = f"analyze_manual_{reset_counter}"
@@ -460,17 +474,10 @@ def show_manual_input_page():
             
             with st.spinner("📊 Analyse en cours..."):
                 try:
-                    # Importer l'analyseur
-                    from modules.core.analyzer import FinancialAnalyzer
-                    
-                    # Créer l'analyseur
-                    analyzer = FinancialAnalyzer()
-                    
-                    # Calculer les ratios
-                    ratios = analyzer.calculate_ratios(data)
-                    
-                    # Calculer les scores
-                    scores = analyzer.calculate_score(ratios, secteur)
+                    # Ratios et scores à jour (identiques à calculate_ratios puis calculate_score(ratios, secteur))
+                    result = incremental.update(data, secteur)
+                    ratios = result.ratios
+                    scores = result.scores
                     
                     # Métadonnées
                     metadata = {
@@ -7,6 +7,8 @@ import pandas as pd
 from datetime import datetime
 import json
 
+from modules.core.statement import json_default
+
 try:
     from session_manager import SessionManager
 except ImportError:
@@ -149,11 +151,11 @@ SCORE GLOBAL: {scores.get('global', 0)}/100
 
 DONNÉES FINANCIÈRES COMPLÈTES
 =============================
-{json.dumps(data, indent=2, ensure_ascii=False)}
+{json.dumps(data, indent=2, ensure_ascii=False, default=json_default)}
 
 RATIOS FINANCIERS COMPLETS
 ==========================
-{json.dumps(ratios, indent=2, ensure_ascii=False)}
+{json.dumps(ratios, indent=2, ensure_ascii=False, default=json_default)}
 
 SCORES DÉTAILLÉS
 ================
@@ -182,7 +184,7 @@ def generate_json_export(data, ratios, scores, metadata):
         'version': '2.1.0'
     }
     
-    json_data = json.dumps(export_data, indent=2, ensure_ascii=False)
+    json_data = json.dumps(export_data, indent=2, ensure_ascii=False, default=json_default)
     
     st.download_button(
         label="💾 Télécharger Données JSON",
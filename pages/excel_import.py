@@ -4,8 +4,6 @@ Version complète avec gestion anti-réinitialisation
 """
 
 import streamlit as st
-import tempfile
-import os
 from datetime import datetime
 
 # Import du gestionnaire de session centralisé
@@ -22,8 +20,8 @@ def show_excel_import_page():
     st.markdown("---")
     
     # Initialiser les variables de session pour la persistance
-    if 'uploaded_file_content' not in st.session_state:
-        st.session_state['uploaded_file_content'] = None
+    if 'uploaded_file_blob' not in st.session_state:
+        st.session_state['uploaded_file_blob'] = None
     if 'uploaded_file_name' not in st.session_state:
         st.session_state['uploaded_file_name'] = None
     if 'analysis_in_progress' not in st.session_state:
@@ -37,7 +35,7 @@ def show_excel_import_page():
     if st.session_state.get('complete_reset', False):
         st.success("🔄 Application complètement réinitialisée! Vous pouvez maintenant importer un nouveau fichier.")
         # Nettoyer les variables spécifiques à cette page
-        st.session_state['uploaded_file_content'] = None
+        st.session_state['uploaded_file_blob'] = None
         st.session_state['uploaded_file_name'] = None
         st.session_state['analysis_in_progress'] = False
         st.session_state['show_sectoral'] = False
@@ -46,8 +44,18 @@ def show_excel_import_page():
         del st.session_state['complete_reset']
         st.rerun()
     
+    from modules.core.blob_store import get_blob_store, release_upload, store_upload
+    
+    store = get_blob_store()
+    
     # Gérer l'état du fichier uploadé de manière persistante
-    file_uploaded = st.session_state['uploaded_file_content'] is not None
+    file_uploaded = st.session_state['uploaded_file_blob'] is not None
+    if file_uploaded and not store.exists(st.session_state['uploaded_file_blob']):
+        # Fichier expiré (session inactive au-delà de la durée de conservation)
+        st.warning("⚠️ Le fichier importé a expiré, veuillez le sélectionner à nouveau")
+        release_upload(st.session_state, 'uploaded_file_blob')
+        st.session_state['uploaded_file_blob'] = None
+        file_uploaded = False
     
     # Section de sélection du fichier SEULEMENT si pas déjà uploadé
     if not file_uploaded:
@@ -64,9 +72,9 @@ def show_excel_import_page():
             key=uploader_key
         )
         
-        # Stocker immédiatement le fichier en session_state
+        # Écrire le fichier une fois dans le magasin : la session ne garde que son empreinte
         if uploaded_file is not None:
-            st.session_state['uploaded_file_content'] = uploaded_file.getbuffer()
+            store_upload(st.session_state, 'uploaded_file_blob', uploaded_file.getbuffer(), store)
             st.session_state['uploaded_file_name'] = uploaded_file.name
             st.session_state['uploaded_file_type'] = uploaded_file.type
             st.rerun()
@@ -77,9 +85,9 @@ def show_excel_import_page():
         
         with st.expander("📋 Détails du fichier", expanded=True):
             st.write(f"**Nom du fichier:** {st.session_state['uploaded_file_name']}")
-            st.write(f"**Taille:** {len(st.session_state['uploaded_file_content']) / 1024:.1f} KB")
+            st.write(f"**Taille:** {store.size(st.session_state['uploaded_file_blob']) / 1024:.1f} KB")
             st.write(f"**Type:** {st.session_state.get('uploaded_file_type', 'Excel')}")
-            st.success("✅ Fichier en mémoire - Prêt pour l'analyse")
+            st.success("✅ Fichier conservé - Prêt pour l'analyse")
         
         # Sélection du secteur (PERSISTENT)
         st.header("🏭 Secteur d'Activité")
@@ -116,7 +124,7 @@ def show_excel_import_page():
             if st.button("🔍 Analyser le fichier", type="primary", use_container_width=True, key=analyze_key):
                 st.session_state['analysis_in_progress'] = True
                 analyze_uploaded_file(
-                    st.session_state['uploaded_file_content'], 
+                    st.session_state['uploaded_file_blob'], 
                     st.session_state['uploaded_file_name'], 
                     secteur
                 )
@@ -175,18 +183,11 @@ def show_excel_import_page():
     if not file_uploaded and not SessionManager.has_analysis_data():
         show_instructions()
 
-def analyze_uploaded_file(file_content, filename, secteur):
-    """Analyse le fichier uploadé stocké en mémoire"""
+def analyze_uploaded_file(file_blob, filename, secteur):
+    """Analyse le fichier uploadé, référencé par son empreinte dans le magasin"""
     
     with st.spinner("📊 Extraction et analyse des données en cours..."):
-        temp_file_path = None
-        
         try:
-            # Créer un fichier temporaire depuis le contenu en mémoire
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                tmp_file.write(file_content)
-                temp_file_path = tmp_file.name
-            
             # Importer l'analyseur
             try:
                 from modules.core.analyzer import FinancialAnalyzer
@@ -195,9 +196,27 @@ def analyze_uploaded_file(file_content, filename, secteur):
                 st.session_state['analysis_in_progress'] = False
                 return
             
+            from modules.core.preflight import preflight_workbook
+            from modules.core.blob_store import get_blob_store
+            
+            try:
+                file_path = get_blob_store().path(file_blob)
+            except KeyError:
+                st.error("❌ Le fichier importé a expiré, veuillez le sélectionner à nouveau")
+                st.session_state['analysis_in_progress'] = False
+                return
+            
+            # Modèle invalide, archive corrompue ou trop volumineuse : refus immédiat
+            preflight = preflight_workbook(file_path, file_name=filename)
+            if not preflight.ok:
+                st.error(f"❌ {preflight.reason}")
+                st.session_state['analysis_in_progress'] = False
+                return
+            
             # Créer l'analyseur et analyser
             analyzer = FinancialAnalyzer()
-            data = analyzer.load_excel_template(temp_file_path)
+            # Lecture directe du fichier conservé dans le magasin
+            data = analyzer.load_excel_template(file_path)
             
             if data is None:
                 st.error("❌ Erreur lors du chargement du fichier Excel")
@@ -225,14 +244,6 @@ def analyze_uploaded_file(file_content, filename, secteur):
         except Exception as e:
             st.error(f"❌ Erreur lors du traitement: {str(e)}")
             st.session_state['analysis_in_progress'] = False
-            
-        finally:
-            # Nettoyer le fichier temporaire
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                except:
-                    pass
 
 def show_persistent_analysis_summary():
     """Affiche un résumé persistant des résultats"""
@@ -8,6 +8,8 @@ import pandas as pd
 from datetime import datetime
 import json
 
+from modules.core.statement import json_default
+
 # Import du gestionnaire de session
 try:
     from session_manager import SessionManager
@@ -494,7 +496,7 @@ def download_json_data(analysis_data):
         }
     }
     
-    json_string = json.dumps(export_data, indent=2, ensure_ascii=False, default=str)
+    json_string = json.dumps(export_data, indent=2, ensure_ascii=False, default=json_default)
     
     st.download_button(
         label="📥 Télécharger les données JSON",
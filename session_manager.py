@@ -4,6 +4,7 @@ Ce module garantit la cohérence des données entre toutes les pages
 """
 
 import streamlit as st
+from collections.abc import Mapping
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 
@@ -14,6 +15,8 @@ class SessionManager:
     ANALYSIS_RESULTS = 'analysis_results'
     CURRENT_PAGE = 'current_page'
     RESET_COUNTER = 'reset_counter'
+    # Handles des fichiers importés (magasin adressé par contenu)
+    UPLOAD_BLOB_KEYS = ('uploaded_file_blob', 'file_blob')
     
     @staticmethod
     def initialize():
@@ -44,7 +47,7 @@ class SessionManager:
         
         # Vérifier que les ratios existent
         ratios = analysis_results.get('ratios', {})
-        if not isinstance(ratios, dict) or len(ratios) == 0:
+        if not isinstance(ratios, Mapping) or len(ratios) == 0:
             return False
         
         return True
@@ -81,10 +84,11 @@ class SessionManager:
         # Ajouter compteur de ratios
         metadata['ratios_count'] = len(ratios)
         
-        # Structure unifiée
+        # Structure unifiée ; postes et ratios en enregistrements compacts (accès de type dict)
+        from modules.core.statement import FinancialStatement, RatioRecord
         analysis_results = {
-            'data': data,
-            'ratios': ratios,
+            'data': FinancialStatement.from_mapping(data),
+            'ratios': RatioRecord.from_mapping(ratios),
             'scores': scores,
             'metadata': metadata,
             'version': '1.0.0',
@@ -101,16 +105,21 @@ class SessionManager:
     def clear_analysis_data():
         """Nettoie toutes les données d'analyse"""
         
+        # Libérer les fichiers importés référencés par la session
+        from modules.core.blob_store import release_upload
+        for key in SessionManager.UPLOAD_BLOB_KEYS:
+            release_upload(st.session_state, key)
+        
         # Liste des clés d'analyse à supprimer
         analysis_keys = [
             SessionManager.ANALYSIS_RESULTS,
             'analysis_completed',
-            'uploaded_file_content',
             'uploaded_file_name',
             'uploaded_file_type',
             'analysis_in_progress',
             'show_sectoral',
-            'show_charts'
+            'show_charts',
+            'manual_incremental'
         ]
         
         # Supprimer toutes les clés d'analyse
@@ -153,18 +162,8 @@ class SessionManager:
     @staticmethod
     def get_financial_class(score: int) -> str:
         """Retourne la classe financière selon le score BCEAO"""
-        if score >= 85:
-            return "A+"
-        elif score >= 70:
-            return "A"
-        elif score >= 55:
-            return "B"
-        elif score >= 40:
-            return "C"
-        elif score >= 25:
-            return "D"
-        else:
-            return "E"
+        from modules.core.scoring import FINANCIAL_CLASSES, score_class
+        return FINANCIAL_CLASSES[score_class(score)]
     
     @staticmethod
     def get_interpretation(score: int) -> Tuple[str, str]:
@@ -0,0 +1,132 @@
+"""
+Tests unitaires pour le module analysis_cache.py
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analysis_cache import AnalysisCache
+from modules.core.norms import get_norms
+
+
+class TestAnalysisCache(unittest.TestCase):
+    """Tests pour le cache des analyses adressé par contenu"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.content = b"PK\x03\x04 contenu du classeur"
+        self.data = {'total_actif': 1000000.0, 'chiffre_affaires': 750000.0}
+        self.analysis = {
+            'ratios': {'ratio_liquidite_generale': 1.5},
+            'scores': {'global': 72, 'liquidite': 30}
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_hash_is_content_addressed(self):
+        """Test que la clé dépend du contenu et non de l'objet"""
+        cache = AnalysisCache()
+        self.assertEqual(cache.hash_bytes(self.content),
+                         cache.hash_bytes(memoryview(bytearray(self.content))))
+        self.assertNotEqual(cache.hash_bytes(self.content), cache.hash_bytes(self.content + b"x"))
+
+    def test_compute_called_once(self):
+        """Test qu'un fichier déjà chargé n'est pas analysé une seconde fois"""
+        cache = AnalysisCache()
+        file_hash = cache.hash_bytes(self.content)
+        calls = []
+
+        def load():
+            calls.append(1)
+            return dict(self.data)
+
+        first = cache.get_or_compute_data(file_hash, load)
+        second = cache.get_or_compute_data(file_hash, load)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats['hits_memory'], 1)
+
+    def test_failed_load_not_cached(self):
+        """Test qu'un échec de chargement n'est pas mémorisé"""
+        cache = AnalysisCache()
+        file_hash = cache.hash_bytes(self.content)
+        self.assertIsNone(cache.get_or_compute_data(file_hash, lambda: None))
+        self.assertIsNone(cache.get_data(file_hash))
+
+    def test_analysis_keyed_by_sector(self):
+        """Test que l'analyse est mémorisée par couple (fichier, secteur)"""
+        cache = AnalysisCache()
+        file_hash = cache.hash_bytes(self.content)
+        cache.put_analysis(file_hash, 'commerce', self.analysis)
+
+        self.assertEqual(cache.get_analysis(file_hash, 'commerce'), self.analysis)
+        self.assertIsNone(cache.get_analysis(file_hash, 'industrie_manufacturiere'))
+
+    def test_analysis_invalidated_by_norms_reload(self):
+        """Test qu'un rechargement des normes n'est pas servi avec les anciens scores"""
+        cache = AnalysisCache(disk_dir=self.temp_dir)
+        cache.put_analysis('h', 'commerce', self.analysis)
+        cache.put_data('h', self.data)
+
+        reloaded = get_norms()._replace(signature=(0, 0))
+        with patch('modules.core.analysis_cache.get_norms', return_value=reloaded):
+            self.assertIsNone(cache.get_analysis('h', 'commerce'))
+            self.assertIsNone(AnalysisCache(disk_dir=self.temp_dir).get_analysis('h', 'commerce'))
+            # Les données extraites ne dépendent pas des normes
+            self.assertEqual(cache.get_data('h'), self.data)
+
+        self.assertEqual(cache.get_analysis('h', 'commerce'), self.analysis)
+
+    def test_returned_values_are_copies(self):
+        """Test que l'appelant ne peut pas altérer l'entrée en cache"""
+        cache = AnalysisCache()
+        cache.put_analysis('h', None, self.analysis)
+
+        result = cache.get_analysis('h', None)
+        result['scores']['global'] = 0
+
+        self.assertEqual(cache.get_analysis('h', None)['scores']['global'], 72)
+
+    def test_memory_lru_eviction(self):
+        """Test de l'éviction LRU du niveau mémoire"""
+        cache = AnalysisCache(max_memory_entries=2)
+        cache.put_data('a', {'x': 1.0})
+        cache.put_data('b', {'x': 2.0})
+        cache.get_data('a')  # 'a' devient la plus récente
+        cache.put_data('c', {'x': 3.0})
+
+        self.assertIsNotNone(cache.get_data('a'))
+        self.assertIsNone(cache.get_data('b'))
+        self.assertIsNotNone(cache.get_data('c'))
+
+    def test_disk_tier_shared_between_instances(self):
+        """Test que le niveau disque survit au redémarrage du processus"""
+        AnalysisCache(disk_dir=self.temp_dir).put_data('h', self.data)
+
+        cache = AnalysisCache(disk_dir=self.temp_dir)
+        self.assertEqual(cache.get_data('h'), self.data)
+        self.assertEqual(cache.stats['hits_disk'], 1)
+
+    def test_disk_size_eviction(self):
+        """Test que le niveau disque reste sous sa taille maximale"""
+        cache = AnalysisCache(disk_dir=self.temp_dir, max_disk_bytes=2000)
+        for index in range(20):
+            cache.put_data(f"h{index}", {f"poste_{i}": float(i) for i in range(10)})
+
+        total = sum(os.path.getsize(os.path.join(self.temp_dir, name))
+                    for name in os.listdir(self.temp_dir))
+        self.assertLessEqual(total, 2000)
+        self.assertIsNotNone(AnalysisCache(disk_dir=self.temp_dir).get_data('h19'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Tests unitaires pour l'index d'ancrage REF / libellés (anchor_index.py)
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer, TEMPLATE_CELLS
+from modules.core.anchor_index import (
+    ANCHOR_LABELS, ANCHOR_ROW_MARGIN, SheetAnchorIndex, anchor_label, resolve_compiled
+)
+from modules.core.cell_mapping import CellField, CompiledSheet, TEMPLATE_SCHEMA, read_sheet_grid
+from modules.core.excel_loader import ExcelDataLoader, SheetGridCache
+from modules.core.template_variants import TemplateVariantRegistry
+from modules.core.xlsx_stream import open_mapped_workbook, split_cell_ref
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'assets', 'template_excel.xlsx')
+
+
+def create_anchored_workbook(path, inserted_rows=None, with_labels=True, with_refs=False):
+    """
+    Classeur au format officiel : libellés (A, G au passif) et une valeur par poste
+
+    Args:
+        inserted_rows: {feuille: ligne} - une ligne vide est insérée à cette position
+        with_refs: Écrire les codes REF en colonne B (H au passif du bilan)
+    """
+    inserted_rows = inserted_rows or {}
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+
+    for sheet_index, (sheet_name, compiled) in enumerate(TEMPLATE_SCHEMA.sheets.items()):
+        sheet = workbook.create_sheet(sheet_name)
+        sheet['A1'] = f"Feuille {sheet_name}"
+        inserted = inserted_rows.get(sheet_name)
+
+        for position, (cell_ref, ref) in enumerate(zip(compiled.cells, compiled.refs)):
+            row, col = split_cell_ref(cell_ref)
+            if inserted and row >= inserted:
+                row += 1
+            passif = sheet_name == 'Bilan' and col >= 8
+            if with_labels:
+                sheet.cell(row=row, column=7 if passif else 1, value=ANCHOR_LABELS[sheet_name][ref])
+            if with_refs:
+                sheet.cell(row=row, column=8 if passif else 2, value=ref)
+            sheet.cell(row=row, column=col, value=(sheet_index + 1) * 100000 + position * 1000 + 0.5)
+
+    workbook.save(path)
+    workbook.close()
+
+
+class TestSheetAnchorIndex(unittest.TestCase):
+    """Tests pour la construction de l'index et la résolution des lignes"""
+
+    def test_anchor_label(self):
+        """Test de la normalisation des libellés d'ancrage"""
+        self.assertEqual(anchor_label("VALEUR AJOUTEE (XB+A+RB)+ (somme TE à RJ)"), "VALEUR AJOUTEE")
+        self.assertEqual(anchor_label("  Valeur ajoutée "), "VALEUR AJOUTEE")
+        self.assertEqual(anchor_label("Fournisseurs d'Exploitation"), "FOURNISSEURS D EXPLOITATION")
+        self.assertEqual(anchor_label(12.5), '')
+
+    def test_from_grid(self):
+        """Test de l'indexation des codes REF et des libellés en une passe"""
+        grid = np.array([['BILAN', None], ['AD', 'Immobilisations incorporelles'],
+                         ['Clients', 1.0], ['Clients', 2.0]], dtype=object)
+        index = SheetAnchorIndex.from_grid(grid)
+        self.assertEqual(index.refs, {'AD': 2})
+        self.assertEqual(index.labels['CLIENTS'], 3)
+        self.assertEqual(index.row_of('Bilan', 'AD'), 2)
+        self.assertEqual(index.row_of('Bilan', 'BI'), 3)
+        self.assertIsNone(index.row_of('Bilan', 'BJ'))
+
+    def test_official_template_resolves_to_official_cells(self):
+        """Test de cohérence de la table d'ancrage avec le modèle officiel"""
+        workbook = open_mapped_workbook(TEMPLATE_PATH, TEMPLATE_CELLS)
+        for sheet_name, compiled in TEMPLATE_SCHEMA.sheets.items():
+            with self.subTest(sheet=sheet_name):
+                grid = read_sheet_grid(workbook, compiled, row_margin=ANCHOR_ROW_MARGIN)
+                resolved, missing = resolve_compiled(compiled, SheetAnchorIndex.from_grid(grid))
+                self.assertIs(resolved, compiled)
+                self.assertEqual(missing, [])
+        workbook.close()
+
+    def test_unanchored_field_follows_neighbour(self):
+        """Test qu'un poste sans ancre suit le décalage du poste ancré au-dessus"""
+        compiled = CompiledSheet('CR', [CellField('CR', 'E5', 'ventes', ref='TA'),
+                                        CellField('CR', 'E6', 'sans_ancre', ref='ZZ'),
+                                        CellField('CR', 'E3', 'en_tete', ref='ZY')])
+        index = SheetAnchorIndex(refs={'TA': 8})
+        resolved, missing = resolve_compiled(compiled, index)
+        self.assertEqual(resolved.cells, ('E8', 'E9', 'E3'))
+        self.assertEqual(missing, ['sans_ancre', 'en_tete'])
+        self.assertIs(resolve_compiled(compiled, index)[0], resolved)
+
+
+class TestShiftedTemplates(unittest.TestCase):
+    """Tests des deux chargeurs sur des modèles décalés inconnus du registre"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.official_path = os.path.join(self.temp_dir, "officiel.xlsx")
+        create_anchored_workbook(self.official_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _path(self, name, **kwargs):
+        path = os.path.join(self.temp_dir, name)
+        create_anchored_workbook(path, **kwargs)
+        return path
+
+    def _analyzer(self):
+        analyzer = FinancialAnalyzer()
+        analyzer.template_registry = TemplateVariantRegistry()
+        return analyzer
+
+    def test_analyzer_relocates_by_labels(self):
+        """Test que l'analyseur retrouve les postes d'un modèle aux lignes insérées"""
+        shifted_path = self._path("decale.xlsx", inserted_rows={'Bilan': 12, 'CR': 20, 'TFT': 4})
+        analyzer = self._analyzer()
+        shifted = analyzer.load_excel_template(shifted_path)
+
+        self.assertEqual(shifted, self._analyzer().load_excel_template(self.official_path))
+        self.assertEqual(analyzer.unanchored_fields, {'Bilan': [], 'CR': [], 'TFT': []})
+        self.assertEqual(shifted, analyzer.load_excel_template(shifted_path, use_streaming=False))
+
+    def test_analyzer_relocates_by_ref_codes(self):
+        """Test que les codes REF suffisent en l'absence de libellés"""
+        shifted_path = self._path("codes_ref.xlsx", inserted_rows={'CR': 5}, with_labels=False, with_refs=True)
+        self.assertEqual(self._analyzer().load_excel_template(shifted_path),
+                         self._analyzer().load_excel_template(self.official_path))
+
+    def test_loader_uses_same_index(self):
+        """Test que ExcelDataLoader s'appuie sur le même index d'ancrage"""
+        shifted_path = self._path("decale.xlsx", inserted_rows={'Bilan': 30, 'CR': 9})
+        loader = ExcelDataLoader()
+        self.assertEqual(loader.load_excel_template(shifted_path), loader.load_excel_template(self.official_path))
+
+        sheets = SheetGridCache(pd.ExcelFile(shifted_path))
+        self.assertEqual(sheets.anchors('CR').row_of('CR', 'XB'), 13)
+        self.assertEqual(sheets.decode_counts, {'CR': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
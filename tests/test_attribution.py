@@ -0,0 +1,117 @@
+"""
+Tests unitaires pour l'attribution du score (attribution.py)
+"""
+
+import unittest
+import sys
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.scoring import SCORE_SECTORIEL
+from tests.test_scoring import random_ratios
+
+
+class TestScoreAttribution(unittest.TestCase):
+    """Tests de cohérence de l'attribution avec le score et entre les deux modes d'appel"""
+
+    def setUp(self):
+        self.analyzer = FinancialAnalyzer()
+
+    def test_contributions_sum_to_score(self):
+        """Test que les contributions redonnent les points par composante et le score global"""
+        for ratios in random_ratios(500, seed=4):
+            scores = self.analyzer.calculate_score(ratios)
+            explained = self.analyzer.explain_score(ratios)
+            for component, detail in explained['composantes'].items():
+                self.assertEqual(detail['score'], scores[component])
+                self.assertEqual(sum(entry.points for entry in detail['contributions']), scores[component])
+            self.assertEqual(explained['global']['score'], scores['global'])
+            self.assertAlmostEqual(sum(entry.global_points for entry in explained['global']['contributions']),
+                                   explained['global']['brut'])
+            self.assertEqual(min(100, int(explained['global']['brut'])), scores['global'])
+
+    def test_next_step_is_exact(self):
+        """Test que franchir le seuil indiqué rapporte exactement les points annoncés"""
+        for ratios in random_ratios(300, seed=5):
+            explained = self.analyzer.explain_score(ratios)
+            for entry in explained['global']['contributions']:
+                if entry.next_threshold is None:
+                    continue
+                rule = next(rule for rule in self.analyzer.score_grid.rules if rule.ratio == entry.ratio)
+                crossed = entry.next_threshold
+                if rule.comparison == '>':
+                    crossed = np.nextafter(crossed, np.inf)
+                moved = dict(ratios, **{entry.ratio: crossed})
+                gained = self.analyzer.calculate_score(moved)[entry.component] - \
+                    explained['composantes'][entry.component]['score']
+                self.assertEqual(gained, entry.next_points, entry)
+                self.assertGreater(entry.next_points, 0)
+
+    def test_fields_from_graph(self):
+        """Test que les postes de chaque ratio viennent du graphe de dépendances"""
+        data = {'capitaux_propres': 500.0, 'resultat_net': 60.0}
+        explained = self.analyzer.explain_score({'roe': 12.0}, data=data)
+        roe = next(entry for entry in explained['global']['contributions'] if entry.ratio == 'roe')
+        self.assertEqual(set(roe.fields), set(self.analyzer.ratio_graph.required_fields(['roe'])))
+        self.assertEqual(explained['champs']['resultat_net']['valeur'], 60.0)
+        self.assertIn('roe', explained['champs']['resultat_net']['ratios'])
+        self.assertEqual(explained['champs']['capitaux_propres']['points'], roe.points)
+
+    def test_frame_parity(self):
+        """Test que l'attribution d'un portefeuille égale l'attribution ligne par ligne"""
+        rows = random_ratios(400, seed=6)
+        sectors = list(self.analyzer.ratios_sectoriels) + ['inconnu']
+        rng = random.Random(6)
+        row_sectors = [rng.choice(sectors) for _ in rows]
+        frame = pd.DataFrame(rows, index=[f"E{row}" for row in range(len(rows))])
+
+        explained = self.analyzer.explain_score_batch(frame, row_sectors, mode=SCORE_SECTORIEL)
+        self.assertEqual(len(explained), len(frame) * len(self.analyzer.score_grid.rules))
+        expected = []
+        for name, ratios, sector in zip(frame.index, rows, row_sectors):
+            detail = self.analyzer.explain_score(ratios, sector, mode=SCORE_SECTORIEL)
+            for component in detail['composantes'].values():
+                for entry in component['contributions']:
+                    expected.append((name, entry.component, entry.ratio, entry.points,
+                                     np.nan if entry.next_threshold is None else entry.next_threshold,
+                                     entry.next_points))
+        expected = pd.DataFrame(expected, columns=['ligne', 'composante', 'ratio', 'points', 'seuil_suivant',
+                                                   'points_suivants']).set_index('ligne')
+        actual = explained[['composante', 'ratio', 'points', 'seuil_suivant', 'points_suivants']]
+        pd.testing.assert_frame_equal(actual.astype({'composante': str, 'ratio': str}), expected,
+                                      check_dtype=False, check_names=False)
+
+        # Les points de l'attribution redonnent les scores du portefeuille
+        scores = self.analyzer.calculate_score_batch(frame, row_sectors, mode=SCORE_SECTORIEL)
+        by_component = explained.groupby([explained.index, 'composante'], observed=True, sort=False)['points'].sum()
+        self.assertEqual(by_component.unstack()[list(scores.columns[:-1])].loc[frame.index].values.tolist(),
+                         scores.drop(columns='global').values.tolist())
+
+    def test_benchmark_batch(self):
+        """Benchmark : attribution d'un portefeuille contre attribution analyse par analyse"""
+        frame = pd.DataFrame(random_ratios(1000, seed=7) * 20)
+        start = time.perf_counter()
+        explained = self.analyzer.explain_score_batch(frame)
+        batch_rate = len(frame) / (time.perf_counter() - start)
+
+        sample = [{name: value for name, value in ratios.items() if value == value}
+                  for ratios in frame.head(1000).to_dict('records')]
+        start = time.perf_counter()
+        for ratios in sample:
+            self.analyzer.explain_score(ratios)
+        scalar_rate = len(sample) / (time.perf_counter() - start)
+
+        self.assertEqual(len(explained), len(frame) * len(self.analyzer.score_grid.rules))
+        self.assertGreater(batch_rate, 10 * scalar_rate)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Tests unitaires pour l'analyse en lot (modules/core/batch.py et batch_analysis.py)
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+from unittest.mock import patch
+
+import pandas as pd
+
+# Ajouter le dossier parent au path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from modules.core.batch import analyze_file_record, discover_files, run_batch, summarize, write_results
+from tests.test_xlsx_stream import create_template_workbook
+
+
+class TestBatchAnalysis(unittest.TestCase):
+    """Tests pour l'analyse en lot d'un répertoire"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, 'liasses')
+        os.makedirs(self.input_dir)
+        for index in range(3):
+            create_template_workbook(os.path.join(self.input_dir, f"client_{index}.xlsx"))
+        with open(os.path.join(self.input_dir, 'corrompu.xlsx'), 'w') as f:
+            f.write("pas un classeur")
+        with open(os.path.join(self.input_dir, 'notes.txt'), 'w') as f:
+            f.write("ignoré")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_discover_files(self):
+        """Test que seuls les classeurs Excel sont retenus"""
+        files = discover_files(self.input_dir)
+        self.assertEqual([os.path.basename(f) for f in files],
+                         ['client_0.xlsx', 'client_1.xlsx', 'client_2.xlsx', 'corrompu.xlsx'])
+
+    def test_run_batch_process_pool(self):
+        """Test du pool de processus : ordre conservé, erreurs isolées"""
+        files = discover_files(self.input_dir)
+        records, summary = run_batch(files, workers=2)
+
+        self.assertEqual([r['fichier'] for r in records], [os.path.basename(f) for f in files])
+        self.assertEqual(summary['fichiers'], 4)
+        self.assertEqual(summary['succes'], 3)
+        self.assertEqual(summary['erreurs'], 1)
+        self.assertEqual(records[3]['statut'], 'erreur')
+        self.assertIn('data.total_actif', records[0])
+        self.assertIn('score.global', records[0])
+        self.assertGreater(summary['fichiers_par_s'], 0)
+        self.assertGreaterEqual(summary['latence_p95_s'], summary['latence_p50_s'])
+
+    def test_per_file_timeout(self):
+        """Test qu'un fichier trop long est marqué en timeout sans bloquer le lot"""
+        def slow_analysis(*args, **kwargs):
+            time.sleep(2)
+
+        path = discover_files(self.input_dir)[0]
+        with patch('modules.core.analyzer.FinancialAnalyzer.analyze_excel_file', side_effect=slow_analysis):
+            record = analyze_file_record(path, timeout=0.2)
+
+        self.assertEqual(record['statut'], 'timeout')
+        self.assertLess(record['duree_s'], 1.5)
+
+    def test_write_results_formats(self):
+        """Test des sorties CSV et JSON lines"""
+        records, _ = run_batch(discover_files(self.input_dir), workers=1)
+
+        csv_path = write_results(records, os.path.join(self.temp_dir, 'out.csv'))
+        frame = pd.read_csv(csv_path)
+        self.assertEqual(len(frame), 4)
+        self.assertIn('ratio.roe', frame.columns)
+
+        jsonl_path = write_results(records, os.path.join(self.temp_dir, 'out.jsonl'))
+        with open(jsonl_path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 4)
+
+        with self.assertRaises(ValueError):
+            write_results(records, os.path.join(self.temp_dir, 'out.txt'))
+
+    def test_summarize_empty(self):
+        """Test du résumé sans fichier"""
+        summary = summarize([], 0.0)
+        self.assertEqual(summary['fichiers'], 0)
+        self.assertEqual(summary['latence_p95_s'], 0.0)
+
+    def test_cli_does_not_import_streamlit(self):
+        """Test de la ligne de commande : aucun import de Streamlit"""
+        output = os.path.join(self.temp_dir, 'out.jsonl')
+        script = (
+            "import sys, batch_analysis; "
+            f"code = batch_analysis.main([{self.input_dir!r}, '-o', {output!r}, '--workers', '2']); "
+            "print('STREAMLIT' if 'streamlit' in sys.modules else 'HEADLESS'); "
+        )
+        result = subprocess.run([sys.executable, '-c', script], cwd=ROOT_DIR,
+                                capture_output=True, text=True, timeout=120)
+
+        self.assertIn('HEADLESS', result.stdout)
+        self.assertIn('fichiers/s', result.stdout)
+        self.assertTrue(os.path.exists(output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests unitaires pour le magasin des fichiers importés (blob_store.py)
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analysis_cache import AnalysisCache
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.blob_store import BlobStore, release_upload, store_upload, upload_path
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'assets', 'template_excel.xlsx')
+
+
+class TestBlobStore(unittest.TestCase):
+    """Tests de l'adressage par contenu, des références et de l'expiration"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = BlobStore(os.path.join(self.temp_dir, 'blobs'), ttl_seconds=60)
+        with open(TEMPLATE_PATH, 'rb') as f:
+            self.content = f.read()
+
+    def tearDown(self):
+        self.store.stop_sweeper()
+        shutil.rmtree(self.temp_dir)
+
+    def blob_files(self):
+        return os.listdir(self.store.root_dir)
+
+    def test_same_content_stored_once(self):
+        """Test que deux imports du même contenu partagent un seul fichier"""
+        first = self.store.put(self.content)
+        second = self.store.put(memoryview(self.content))
+        self.assertEqual(first, second)
+        self.assertEqual(first, AnalysisCache.hash_bytes(self.content))
+        self.assertEqual(len(self.blob_files()), 1)
+        self.assertEqual(self.store.refcount(first), 2)
+        self.assertEqual(self.store.read(first), self.content)
+        self.assertEqual(self.store.size(first), len(self.content))
+
+    def test_last_release_removes_file(self):
+        """Test que le fichier est supprimé à la dernière référence rendue"""
+        handle = self.store.put(self.content)
+        self.assertTrue(self.store.acquire(handle))
+        self.store.release(handle)
+        self.assertTrue(self.store.exists(handle))
+        self.store.release(handle)
+        self.assertFalse(self.store.exists(handle))
+        self.assertFalse(self.store.acquire(handle))
+        with self.assertRaises(KeyError):
+            self.store.path(handle)
+        with self.assertRaises(KeyError):
+            self.store.path('../../etc/passwd')
+
+    def test_sweep_expired(self):
+        """Test que le balayage supprime les fichiers inutilisés au-delà du TTL"""
+        stale = self.store.put(b'ancien')
+        fresh = self.store.put(b'recent')
+        old = time.time() - 120
+        os.utime(os.path.join(self.store.root_dir, f"{stale}.blob"), (old, old))
+
+        self.assertEqual(self.store.sweep(), 1)
+        self.assertFalse(self.store.exists(stale))
+        self.assertEqual(self.store.refcount(stale), 0)
+        self.assertTrue(self.store.exists(fresh))
+        self.assertEqual(self.store.sweep(now=time.time() + 120), 1)
+        self.assertEqual(self.blob_files(), [])
+
+    def test_background_sweeper(self):
+        """Test du balayage périodique en thread démon"""
+        store = BlobStore(self.store.root_dir, ttl_seconds=0)
+        handle = store.put(b'contenu')
+        store.start_sweeper(interval_seconds=0.01)
+        deadline = time.time() + 5
+        while store.exists(handle) and time.time() < deadline:
+            time.sleep(0.01)
+        store.stop_sweeper()
+        self.assertFalse(store.exists(handle))
+
+
+class TestSessionHandles(unittest.TestCase):
+    """Tests des handles conservés en état de session"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = BlobStore(self.temp_dir)
+        with open(TEMPLATE_PATH, 'rb') as f:
+            self.content = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_session_keeps_only_handle(self):
+        """Test que la session ne conserve qu'une empreinte, pas les octets"""
+        session = {}
+        handle = store_upload(session, 'file_blob', memoryview(self.content), self.store)
+        self.assertEqual(session, {'file_blob': handle})
+        self.assertEqual(len(handle), 64)
+
+        # Relecture du même fichier (rerun) : pas de référence supplémentaire
+        store_upload(session, 'file_blob', self.content, self.store)
+        self.assertEqual(self.store.refcount(handle), 1)
+
+        # Nouveau fichier : l'ancien est libéré
+        other = store_upload(session, 'file_blob', b'autre contenu', self.store)
+        self.assertFalse(self.store.exists(handle))
+        self.assertEqual(self.store.refcount(other), 1)
+
+        release_upload(session, 'file_blob', self.store)
+        self.assertEqual(session, {})
+        self.assertFalse(self.store.exists(other))
+        self.assertIsNone(upload_path(session, 'file_blob', self.store))
+
+    def test_sessions_share_file(self):
+        """Test que deux sessions partagent le fichier jusqu'à la dernière libération"""
+        first, second = {}, {}
+        handle = store_upload(first, 'file_blob', self.content, self.store)
+        store_upload(second, 'uploaded_file_blob', self.content, self.store)
+        release_upload(first, 'file_blob', self.store)
+        self.assertTrue(self.store.exists(handle))
+        release_upload(second, 'uploaded_file_blob', self.store)
+        self.assertFalse(self.store.exists(handle))
+
+    def test_loader_reads_blob(self):
+        """Test que l'analyseur lit directement le fichier du magasin"""
+        session = {}
+        store_upload(session, 'file_blob', self.content, self.store)
+        path = upload_path(session, 'file_blob', self.store)
+        analyzer = FinancialAnalyzer()
+        self.assertEqual(analyzer.load_excel_template(path), analyzer.load_excel_template(TEMPLATE_PATH))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+"""
+Tests unitaires pour le schéma de cellules partagé (cell_mapping.py)
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import openpyxl
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer, TEMPLATE_CELLS
+from modules.core.cell_mapping import (
+    CellField, CellMappingSchema, CompiledSheet, SIGN_NEGATIF, SIGN_POSITIF, TEMPLATE_SCHEMA
+)
+from modules.core.xlsx_stream import XlsxStreamReader
+from modules.core.excel_loader import ExcelDataLoader, SheetGridCache, LOADER_CR_FIELDS, LOADER_TFT_FIELDS
+from unittest.mock import Mock, patch
+from tests.test_xlsx_stream import create_template_workbook
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'assets', 'template_excel.xlsx')
+
+
+class TestCellMappingSchema(unittest.TestCase):
+    """Tests pour la compilation et l'extraction du schéma"""
+
+    def test_compiled_indices(self):
+        """Test de la compilation des adresses en indices base 0"""
+        compiled = CompiledSheet('CR', [CellField('CR', 'E26', 'valeur_ajoutee'),
+                                        CellField('CR', 'B3', 'libelle')])
+        np.testing.assert_array_equal(compiled.rows, [25, 2])
+        np.testing.assert_array_equal(compiled.cols, [4, 1])
+        self.assertEqual(compiled.shape, (26, 5))
+        self.assertEqual(compiled.row_numbers, (3, 26))
+
+    def test_extract_out_of_bounds_and_nan(self):
+        """Test qu'une cellule vide ou hors grille vaut 0"""
+        compiled = CompiledSheet('CR', [CellField('CR', 'A1', 'a'), CellField('CR', 'B1', 'b'),
+                                        CellField('CR', 'E40', 'hors_grille')])
+        grid = np.array([[1.5, np.nan]])
+        self.assertEqual(compiled.extract(grid), {'a': 1.5, 'b': 0.0, 'hors_grille': 0.0})
+
+    def test_sign_convention(self):
+        """Test de l'application de la convention de signe charges / produits"""
+        compiled = CompiledSheet('CR', [CellField('CR', 'A1', 'ventes', SIGN_POSITIF),
+                                        CellField('CR', 'B1', 'achats', SIGN_NEGATIF),
+                                        CellField('CR', 'C1', 'variation')])
+        grid = np.array([[-100.0, 40.0, -5.0]])
+        self.assertEqual(compiled.extract(grid), {'ventes': -100.0, 'achats': 40.0, 'variation': -5.0})
+        self.assertEqual(compiled.extract(grid, apply_signs=True),
+                         {'ventes': 100.0, 'achats': -40.0, 'variation': -5.0})
+
+    def test_duplicate_field_rejected(self):
+        """Test qu'un champ ne peut être déclaré qu'une fois"""
+        with self.assertRaises(ValueError):
+            CellMappingSchema([CellField('CR', 'E5', 'x'), CellField('CR', 'E6', 'x')])
+
+    def test_template_cells_derived_from_schema(self):
+        """Test que la lecture en flux utilise les adresses du schéma"""
+        self.assertEqual(TEMPLATE_CELLS, TEMPLATE_SCHEMA.cells_by_sheet())
+        self.assertEqual(TEMPLATE_SCHEMA.location('valeur_ajoutee'), ('CR', 'E26'))
+
+    def test_schema_matches_template_labels(self):
+        """Test de cohérence des adresses avec les libellés du modèle officiel"""
+        workbook = openpyxl.load_workbook(TEMPLATE_PATH)
+        expected_labels = {
+            'valeur_ajoutee': ('CR', 'A26', 'VALEUR AJOUTEE'),
+            'excedent_brut': ('CR', 'A28', "EXCEDENT BRUT"),
+            'resultat_exploitation': ('CR', 'A31', "RESULTAT D'EXPLOITATION"),
+            'resultat_net_cr': ('CR', 'A46', 'RESULTAT NET'),
+            'creances_clients': ('Bilan', 'A26', 'Clients'),
+            'total_passif': ('Bilan', 'G35', 'TOTAL GENERAL'),
+            'tresorerie_cloture': ('TFT', 'A32', 'ZH'),
+        }
+        for field, (sheet, label_cell, label) in expected_labels.items():
+            with self.subTest(field=field):
+                self.assertEqual(TEMPLATE_SCHEMA.location(field)[0], sheet)
+                self.assertEqual(TEMPLATE_SCHEMA.location(field)[1][1:], label_cell[1:])
+                self.assertTrue(str(workbook[sheet][label_cell].value).startswith(label))
+        workbook.close()
+
+
+class TestLoadersShareSchema(unittest.TestCase):
+    """Tests que FinancialAnalyzer et ExcelDataLoader lisent les mêmes cellules"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "liasse.xlsx")
+        create_template_workbook(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_cr_and_tft_fields_agree(self):
+        """Test que les postes CR et TFT communs ont la même valeur dans les deux chargeurs"""
+        analyzer_data = FinancialAnalyzer().load_excel_template(self.path)
+        loader = ExcelDataLoader()
+        sheets = SheetGridCache(pd.ExcelFile(self.path))
+        cr_data = loader._extract_cr_precise(sheets)
+        tft_data = loader._extract_tft_precise(sheets)
+
+        for loader_name, field in LOADER_CR_FIELDS.items():
+            if field == 'resultat_net_cr':
+                field = 'resultat_net'
+            self.assertEqual(cr_data[loader_name], analyzer_data[field], loader_name)
+        for loader_name, field in LOADER_TFT_FIELDS.items():
+            self.assertEqual(tft_data[loader_name], analyzer_data[field], loader_name)
+
+    def test_loader_mappings_point_to_schema(self):
+        """Test que les mappings publics du chargeur sont dérivés du schéma"""
+        loader = ExcelDataLoader()
+        self.assertEqual(loader.bilan_mapping['clients'], 'E26')
+        self.assertEqual(loader.cr_mapping['valeur_ajoutee'], ('CR', 'E26'))
+        self.assertEqual(loader.tft_mapping['tresorerie_cloture'], ('TFT', 'E32'))
+
+
+def create_multi_period_workbook(path):
+    """Classeur avec exercices N (E/I) et N-1 (F/J), valeurs N-1 = N / 2"""
+    create_template_workbook(path)
+    workbook = openpyxl.load_workbook(path)
+    headers = {'Bilan': {'F2': 'EXERCICE  N-1', 'J2': 'EXERCICE  N-1', 'I2': 'EXERCICE  '},
+               'CR': {'E2': 'EXERCICE  ', 'F3': '31-12-N-1'},
+               'TFT': {'E2': 'Exercice N', 'F2': 'Exercice N-1'}}
+    for sheet_name, cells in TEMPLATE_CELLS.items():
+        sheet = workbook[sheet_name]
+        for cell_ref in cells:
+            row = sheet[cell_ref].row
+            column = sheet[cell_ref].column
+            sheet.cell(row=row, column=column + 1, value=sheet[cell_ref].value / 2)
+        for cell_ref, label in headers[sheet_name].items():
+            sheet[cell_ref] = label
+    workbook.save(path)
+    workbook.close()
+
+
+class TestMultiPeriodExtraction(unittest.TestCase):
+    """Tests de l'extraction des exercices N, N-1 en une passe"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "liasse_deux_exercices.xlsx")
+        create_multi_period_workbook(self.path)
+        self.analyzer = FinancialAnalyzer()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_detect_period_offsets(self):
+        """Test de la détection des exercices dans les en-têtes"""
+        compiled = CompiledSheet('CR', [CellField('CR', 'E5', 'ventes')])
+        grid = np.full((5, 8), None, dtype=object)
+        grid[1, 5] = 'EXERCICE N-1'
+        grid[2, 6] = '31-12-N-2'
+        grid[3, 7] = 'N-12'
+        self.assertEqual(compiled.detect_period_offsets(grid), [1, 2])
+        self.assertEqual(compiled.detect_period_offsets(grid[:, :6]), [1])
+
+    def test_load_periods(self):
+        """Test que N-1 est lu dans les colonnes adjacentes (F, J)"""
+        periods = self.analyzer.load_excel_periods(self.path)
+
+        self.assertEqual(list(periods), ['N', 'N-1'])
+        self.assertEqual(periods['N'], self.analyzer.load_excel_template(self.path))
+        for field in ('total_actif', 'capitaux_propres', 'chiffre_affaires', 'tresorerie_cloture'):
+            self.assertAlmostEqual(periods['N-1'][field], periods['N'][field] / 2, msg=field)
+
+    def test_load_periods_streaming_matches_openpyxl(self):
+        """Test de parité flux / openpyxl pour tous les exercices"""
+        self.assertEqual(self.analyzer.load_excel_periods(self.path),
+                         self.analyzer.load_excel_periods(self.path, use_streaming=False))
+
+    def test_single_pass_per_sheet(self):
+        """Test que chaque feuille est parcourue une seule fois pour tous les exercices"""
+        original = XlsxStreamReader._parse_rows
+        calls = []
+
+        def counting_parse(reader, sheet_name, last_row):
+            calls.append(sheet_name)
+            return original(reader, sheet_name, last_row)
+
+        with patch.object(XlsxStreamReader, '_parse_rows', counting_parse):
+            self.analyzer.load_excel_periods(self.path)
+        self.assertEqual(sorted(calls), ['Bilan', 'CR', 'TFT'])
+
+    def test_workbook_closed_on_error(self):
+        """Test que le classeur est fermé même si l'extraction échoue"""
+        opened = []
+        original = self.analyzer._open_workbook
+
+        def tracking_open(file_path, use_streaming=True):
+            workbook = original(file_path, use_streaming)
+            workbook.close = Mock(wraps=workbook.close)
+            opened.append(workbook)
+            return workbook
+
+        with patch.object(self.analyzer, '_open_workbook', tracking_open), \
+                patch.object(self.analyzer.template_registry, 'identify', side_effect=RuntimeError("variante")):
+            self.assertIsNone(self.analyzer.load_excel_periods(self.path))
+        self.assertEqual(len(opened), 1)
+        opened[0].close.assert_called_once_with()
+
+    def test_ratios_by_period(self):
+        """Test du calcul des ratios par exercice"""
+        periods = self.analyzer.load_excel_periods(self.path)
+        ratios = self.analyzer.calculate_ratios_by_period(periods)
+
+        self.assertEqual(set(ratios), {'N', 'N-1'})
+        self.assertEqual(ratios['N'], self.analyzer.calculate_ratios(periods['N']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Tests unitaires pour le décodage concurrent des feuilles (concurrent_decode.py)
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+import openpyxl
+import pandas as pd
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.concurrent_decode import (
+    DECODE_MODES, ENV_DECODE_MODE, decode_sheets, resolve_decode_mode, shutdown_executors
+)
+from modules.core.excel_loader import ExcelDataLoader, SheetGridCache, decode_sheet_grid
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'assets', 'template_excel.xlsx')
+
+
+def decode_or_missing(sheet_name):
+    """Tâche de test : la feuille 'TFT' est absente"""
+    if sheet_name == 'TFT':
+        raise KeyError(sheet_name)
+    return sheet_name.lower()
+
+
+def create_large_workbook(path, filler_rows=6000, filler_columns=20, with_tft=True):
+    """Modèle officiel dont chaque état est prolongé par un bloc de valeurs à décoder"""
+    workbook = openpyxl.load_workbook(TEMPLATE_PATH)
+    if not with_tft:
+        workbook.remove(workbook['TFT'])
+    for sheet in workbook.worksheets:
+        if sheet.title not in ('Bilan', 'CR', 'TFT'):
+            continue
+        start = sheet.max_row + 50
+        for row in range(start, start + filler_rows):
+            for col in range(1, filler_columns + 1):
+                sheet.cell(row=row, column=col, value=row * 0.5 + col)
+    workbook.save(path)
+    workbook.close()
+
+
+class TestDecodeSheets(unittest.TestCase):
+    """Tests pour la sélection du mode et la fusion des résultats"""
+
+    def tearDown(self):
+        shutdown_executors()
+
+    def test_resolve_mode(self):
+        """Test du mode par défaut, de la variable d'environnement et d'un mode inconnu"""
+        previous = os.environ.pop(ENV_DECODE_MODE, None)
+        try:
+            self.assertEqual(resolve_decode_mode(), 'sequential')
+            os.environ[ENV_DECODE_MODE] = 'THREAD'
+            self.assertEqual(resolve_decode_mode(), 'thread')
+            self.assertEqual(resolve_decode_mode('process'), 'process')
+            with self.assertRaises(ValueError):
+                resolve_decode_mode('gpu')
+        finally:
+            os.environ.pop(ENV_DECODE_MODE, None)
+            if previous is not None:
+                os.environ[ENV_DECODE_MODE] = previous
+
+    def test_missing_optional_sheet(self):
+        """Test qu'une feuille facultative absente est omise dans tous les modes"""
+        for mode in DECODE_MODES:
+            with self.subTest(mode=mode):
+                self.assertEqual(decode_sheets(decode_or_missing, ('Bilan', 'CR', 'TFT'), mode),
+                                 {'Bilan': 'bilan', 'CR': 'cr'})
+                with self.assertRaises(KeyError):
+                    decode_sheets(decode_or_missing, ('Bilan', 'TFT'), mode, required=('TFT',))
+
+
+class TestConcurrentLoaders(unittest.TestCase):
+    """Tests de parité des deux chargeurs entre décodage séquentiel et concurrent"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.no_tft_path = os.path.join(cls.temp_dir, "sans_tft.xlsx")
+        create_large_workbook(cls.no_tft_path, filler_rows=10, with_tft=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_executors()
+        shutil.rmtree(cls.temp_dir)
+
+    def test_analyzer_parity(self):
+        """Test que l'analyseur extrait les mêmes valeurs quel que soit le mode"""
+        analyzer = FinancialAnalyzer()
+        for path in (TEMPLATE_PATH, self.no_tft_path):
+            expected = analyzer.load_excel_periods(path, decode_mode='sequential')
+            self.assertIsNotNone(expected)
+            for mode in ('thread', 'process'):
+                with self.subTest(path=os.path.basename(path), mode=mode):
+                    self.assertEqual(analyzer.load_excel_periods(path, decode_mode=mode), expected)
+
+        with open(TEMPLATE_PATH, 'rb') as f:
+            content = f.read()
+        self.assertEqual(analyzer.load_excel_template(memoryview(content), decode_mode='process'),
+                         analyzer.load_excel_template(TEMPLATE_PATH))
+
+    def test_loader_parity(self):
+        """Test que ExcelDataLoader extrait les mêmes valeurs quel que soit le mode"""
+        loader = ExcelDataLoader()
+        for path in (TEMPLATE_PATH, self.no_tft_path):
+            expected = loader.load_excel_template(path, decode_mode='sequential')
+            self.assertIsNotNone(expected)
+            for mode in ('thread', 'process'):
+                with self.subTest(path=os.path.basename(path), mode=mode):
+                    self.assertEqual(loader.load_excel_template(path, decode_mode=mode), expected)
+                    self.assertTrue(all(count == 1 for count in loader.sheet_decode_counts.values()))
+
+    def test_missing_sheet_raises_key_error(self):
+        """Test que la tâche de décodage signale une feuille absente par KeyError"""
+        with self.assertRaises(KeyError):
+            decode_sheet_grid(self.no_tft_path, 'TFT')
+
+    @unittest.skipIf((os.cpu_count() or 1) < 3, "Benchmark significatif à partir de 3 cœurs")
+    def test_benchmark_concurrent_decode(self):
+        """Benchmark : décodage complet des trois feuilles, séquentiel contre processus"""
+        large_path = os.path.join(self.temp_dir, "volumineux.xlsx")
+        create_large_workbook(large_path)
+        timings = {}
+        for mode in ('sequential', 'thread', 'process'):
+            decode_sheets(len, ('a', 'b', 'c'), mode)  # démarrage du pool hors mesure
+            start = time.perf_counter()
+            sheets = SheetGridCache(pd.ExcelFile(large_path))
+            sheets.prefetch(('Bilan', 'CR', 'TFT'), large_path, mode)
+            timings[mode] = time.perf_counter() - start
+
+        self.assertLess(timings['process'], timings['sequential'])
+
+
+if __name__ == '__main__':
+    unittest.main()
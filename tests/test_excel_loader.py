@@ -662,6 +662,62 @@ class TestExcelLoaderEdgeCases(unittest.TestCase):
         os.remove(generic_path)
 
 
+class TestSheetGridCache(unittest.TestCase):
+    """Tests du décodage unique des feuilles lors d'un chargement"""
+    
+    def setUp(self):
+        self.loader = ExcelDataLoader()
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "liasse.xlsx")
+        
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)
+        bilan = workbook.create_sheet("Bilan")
+        bilan['E35'] = 1700000
+        bilan['I15'] = 600000
+        bilan['E26'] = "100 000"
+        cr = workbook.create_sheet("CR")
+        cr['E12'] = 1700000
+        cr['E8'] = "80000,5"
+        tft = workbook.create_sheet("TFT")
+        tft['E5'] = 30000
+        workbook.save(self.path)
+        workbook.close()
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+    
+    def test_each_sheet_decoded_once(self):
+        """Chaque feuille n'est décodée qu'une fois par chargement"""
+        data = self.loader.load_excel_template(self.path)
+        
+        self.assertIsNotNone(data)
+        self.assertEqual(self.loader.sheet_decode_counts, {'Bilan': 1, 'CR': 1, 'TFT': 1})
+    
+    def test_decode_counts_reset_per_load(self):
+        """Le compteur est propre à chaque chargement"""
+        self.loader.load_excel_template(self.path)
+        self.loader.load_excel_template(self.path)
+        
+        self.assertEqual(self.loader.sheet_decode_counts, {'Bilan': 1, 'CR': 1, 'TFT': 1})
+    
+    def test_grid_values_are_numeric(self):
+        """Les cellules texte sont converties une seule fois dans la grille"""
+        import pandas as pd
+        from modules.core.excel_loader import SheetGridCache
+        
+        sheets = SheetGridCache(pd.ExcelFile(self.path))
+        grid = sheets.get('CR')
+        sheets.get('CR')
+        
+        self.assertEqual(grid.dtype.kind, 'f')
+        self.assertEqual(self.loader._get_cell_value(grid, 'E8'), 80000.5)
+        self.assertEqual(self.loader._get_cell_value(grid, 'E12'), 1700000.0)
+        self.assertEqual(self.loader._get_cell_value(grid, 'Z99'), 0.0)
+        self.assertEqual(sheets.decode_counts, {'CR': 1})
+
+
 class TestExcelLoaderPerformance(unittest.TestCase):
     """Tests de performance pour le chargeur Excel"""
     
@@ -0,0 +1,157 @@
+"""
+Tests unitaires pour le recalcul incrémental de la saisie manuelle (incremental.py)
+"""
+
+import unittest
+import sys
+import os
+import json
+import random
+from unittest.mock import PropertyMock, patch
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.incremental import IncrementalAnalysis
+from modules.core.norms import NORMS_PATH
+from modules.core.ratio_graph import RatioGraph, RatioNode, ScalarOps
+from modules.core.ratios import ANALYSIS_RATIO_GRAPH
+from modules.core.scoring import SCORE_MODES, ScoreGrid
+
+FORM_DATA = {
+    'total_actif': 1000000, 'immobilisations_nettes': 600000, 'stocks': 150000,
+    'creances_clients': 100000, 'autres_creances': 50000, 'tresorerie': 100000,
+    'capitaux_propres': 400000, 'dettes_financieres': 300000, 'dettes_court_terme': 200000,
+    'fournisseurs_exploitation': 80000, 'chiffre_affaires': 1500000, 'valeur_ajoutee': 600000,
+    'charges_personnel': 300000, 'resultat_net': 100000, 'resultat_exploitation': 140000,
+    'excedent_brut': 220000, 'frais_financiers': -25000, 'cafg': 180000,
+    'achats_matieres_premieres': 500000, 'autres_achats': 200000, 'charges_exploitation': 1300000,
+    'ressources_stables': 700000, 'tresorerie_passif': 20000, 'marge_commerciale': 90000,
+}
+
+
+class TestIncrementalAnalysis(unittest.TestCase):
+    """Tests d'équivalence avec le calcul complet"""
+
+    def full(self, analyzer, data):
+        ratios = analyzer.calculate_ratios(data)
+        return ratios, analyzer.calculate_score(ratios)
+
+    def test_random_edits_match_full(self):
+        """Test qu'une suite de modifications aléatoires donne le calcul complet à chaque étape"""
+        rng = random.Random(7)
+        analyzer = FinancialAnalyzer()
+        incremental = IncrementalAnalysis(analyzer)
+        data = dict(FORM_DATA)
+
+        for _ in range(500):
+            field = rng.choice(list(FORM_DATA))
+            roll = rng.random()
+            if roll < 0.1:
+                data.pop(field, None)
+            elif roll < 0.25:
+                data[field] = 0
+            else:
+                data[field] = rng.uniform(-0.5, 2.0) * FORM_DATA[field]
+            # Le formulaire garde un total actif non nul (rotation de l'actif)
+            data['total_actif'] = abs(data.get('total_actif', 1)) or 1
+
+            update = incremental.update(data)
+            ratios, scores = self.full(analyzer, data)
+            self.assertEqual(list(update.ratios.items()), list(ratios.items()))
+            self.assertEqual(update.scores, scores)
+
+    def test_only_dependents_recomputed(self):
+        """Test qu'une modification ne recalcule que les ratios et composantes concernés"""
+        incremental = IncrementalAnalysis()
+        first = incremental.update(FORM_DATA)
+        self.assertEqual(len(first.rescored), 5)
+
+        data = dict(FORM_DATA, tresorerie_passif=150000)
+        update = incremental.update(data)
+        self.assertEqual(update.changed_fields, ('tresorerie_passif',))
+        self.assertEqual(update.changed_nodes, ('tresorerie_nette',))
+        self.assertEqual(update.rescored, ('liquidite',))
+
+        # Saisie inchangée (rerun) : rien n'est recalculé
+        update = incremental.update(data)
+        self.assertEqual((update.changed_fields, update.changed_nodes, update.rescored), ((), (), ()))
+
+        # Les stocks alimentent liquidité et activité, pas la rentabilité
+        update = incremental.update(dict(data, stocks=50000))
+        self.assertNotIn('roe', update.changed_nodes)
+        self.assertEqual(set(update.rescored), {'liquidite', 'activite'})
+
+    def test_sector_mode_matches_full(self):
+        """Test de la notation sectorielle : secteur et mode changés en cours de saisie"""
+        rng = random.Random(11)
+        analyzer = FinancialAnalyzer()
+        incremental = IncrementalAnalysis(analyzer)
+        sectors = list(analyzer.ratios_sectoriels) + [None, 'inconnu']
+        data = dict(FORM_DATA)
+
+        for _ in range(200):
+            field = rng.choice(list(FORM_DATA))
+            data[field] = rng.uniform(-0.5, 2.0) * FORM_DATA[field]
+            secteur = rng.choice(sectors)
+            mode = rng.choice(SCORE_MODES)
+
+            update = incremental.update(data, secteur, mode)
+            ratios = analyzer.calculate_ratios(data)
+            self.assertEqual(update.scores, analyzer.calculate_score(ratios, secteur, mode))
+
+    def test_reloaded_grid_rescored(self):
+        """Test qu'une grille rechargée (normes modifiées) fait renoter toutes les composantes"""
+        analyzer = FinancialAnalyzer()
+        incremental = IncrementalAnalysis(analyzer)
+        incremental.update(FORM_DATA)
+
+        with open(NORMS_PATH, 'r', encoding='utf-8') as f:
+            config = json.load(f)['grille_score']
+        for entry in config['composantes']['activite']:
+            entry['points'] = [0 for _ in entry['points']]
+        grid = ScoreGrid.from_config(config)
+
+        with patch.object(FinancialAnalyzer, 'score_grid', new_callable=PropertyMock, return_value=grid):
+            update = incremental.update(FORM_DATA)
+        self.assertEqual(update.changed_nodes, ())
+        self.assertEqual(set(update.rescored), set(grid.components))
+        self.assertEqual(update.scores['activite'], 0)
+        self.assertEqual(update.scores, grid.score(analyzer.calculate_ratios(FORM_DATA)))
+
+    def test_unchanged_intermediate_stops_propagation(self):
+        """Test qu'un intermédiaire recalculé à l'identique ne propage pas"""
+        calls = []
+
+        def counted(name, compute):
+            def wrapper(op, *args):
+                calls.append(name)
+                return compute(op, *args)
+            return wrapper
+
+        graph = RatioGraph([
+            RatioNode('somme', ('a', 'b'), counted('somme', lambda op, a, b: a + b), output=False),
+            RatioNode('double', ('somme',), counted('double', lambda op, s: s * 2)),
+            RatioNode('c_seul', ('c',), counted('c_seul', lambda op, c: c)),
+        ])
+        data = {'a': 1, 'b': 3, 'c': 5}
+        values = graph.evaluate_values(ScalarOps(data, None))
+        calls.clear()
+
+        data.update(a=2, b=2)
+        self.assertEqual(graph.reevaluate(ScalarOps(data, None), values, ['a', 'b']), [])
+        self.assertEqual(calls, ['somme'])
+        self.assertEqual(graph.results(values), {'double': 8, 'c_seul': 5})
+
+    def test_analyzer_uses_graph(self):
+        """Test que l'analyseur évalue le graphe de l'analyse"""
+        analyzer = FinancialAnalyzer()
+        self.assertIs(analyzer.ratio_graph, ANALYSIS_RATIO_GRAPH)
+        ratios = analyzer.calculate_ratios({'dettes_court_terme': 0, 'chiffre_affaires': 100, 'total_actif': 50})
+        self.assertNotIn('ratio_liquidite_generale', ratios)
+        self.assertEqual(ratios['rotation_actif'], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+"""
+Tests unitaires pour le service des normes BCEAO (norms.py)
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.norms import NORMS_PATH, NormsService, get_norms
+from modules.core.ratios import RatiosCalculator
+from modules.utils.ratios_validator import (get_ratio_category, get_ratio_norm_description,
+                                            validate_all_ratios, validate_ratio_status)
+
+# Normes historiques du validateur : (opérateur, cible, seuil d'alerte)
+LEGACY_NORMS = {
+    'ratio_liquidite_generale': ('>=', 1.5, 1.2),
+    'ratio_liquidite_reduite': ('>=', 1.0, 0.8),
+    'ratio_liquidite_immediate': ('>=', 0.3, 0.2),
+    'ratio_autonomie_financiere': ('>=', 30.0, 25.0),
+    'ratio_endettement': ('<=', 70.0, 75.0),
+    'ratio_couverture_charges': ('>=', 3.0, 2.5),
+    'roe': ('>=', 10.0, 5.0),
+    'roa': ('>=', 5.0, 2.0),
+    'marge_nette': ('>', 5.0, 3.0),
+    'marge_brute': ('>=', 20.0, 15.0),
+    'marge_exploitation': ('>=', 5.0, 3.0),
+    'rotation_actif': ('>=', 1.5, 1.0),
+    'rotation_stocks': ('>=', 6.0, 4.0),
+    'delai_recouvrement': ('<=', 45.0, 60.0),
+    'productivite_personnel': ('>=', 2.0, 1.5),
+    'charges_personnel_va': ('<=', 50.0, 60.0),
+    'cafg_ca': ('>=', 7.0, 5.0),
+}
+
+
+def legacy_status(ratio_key, value):
+    """Statut historique de validate_ratio_status, référence de parité"""
+    if ratio_key not in LEGACY_NORMS:
+        return "ℹ️ À analyser"
+    operator, target, warning = LEGACY_NORMS[ratio_key]
+    compare = {'>=': lambda a, b: a >= b, '>': lambda a, b: a > b, '<=': lambda a, b: a <= b}[operator]
+    try:
+        if compare(value, target):
+            return "✅ Conforme"
+        if warning and compare(value, warning):
+            return "⚠️ Limite"
+        return "❌ Non conforme"
+    except (ValueError, TypeError):
+        return "ℹ️ À analyser"
+
+
+class TestNormsParity(unittest.TestCase):
+    """Tests de parité avec les normes codées en dur auparavant"""
+
+    def test_validator_status(self):
+        """Test que chaque statut est identique à l'ancien validateur, valeurs limites comprises"""
+        values = [None, 'n/a', float('nan'), -10, 0, 1e9]
+        for _, target, warning in LEGACY_NORMS.values():
+            values += [target, warning, target - 1e-9, target + 1e-9, warning - 1e-9, warning + 1e-9]
+        for ratio_key in list(LEGACY_NORMS) + ['inconnu']:
+            for value in values:
+                self.assertEqual(validate_ratio_status(ratio_key, value), legacy_status(ratio_key, value),
+                                 (ratio_key, value))
+
+    def test_status_column(self):
+        """Test que les statuts en colonne égalent les statuts valeur par valeur"""
+        conformity = get_norms().conformity
+        values = np.concatenate([np.linspace(-20, 120, 2801), [np.nan]])
+        for ratio_key in list(LEGACY_NORMS) + ['inconnu']:
+            column = conformity.status_column(ratio_key, values)
+            if ratio_key == 'inconnu':
+                self.assertEqual(set(column), {"ℹ️ À analyser"})
+                continue
+            self.assertEqual(column.tolist(), [legacy_status(ratio_key, value) for value in values.tolist()])
+
+    def test_descriptions_and_report(self):
+        """Test des descriptions, catégories et du rapport complet"""
+        self.assertEqual(get_ratio_norm_description('ratio_endettement'), '< 70%')
+        self.assertEqual(get_ratio_norm_description('inconnu'), 'Non définie')
+        self.assertEqual(get_ratio_category('roe'), 'rentabilite')
+        self.assertEqual(get_ratio_category('inconnu'), 'autre')
+
+        report = validate_all_ratios({'roe': 12.0, 'roa': 3.0, 'ratio_endettement': 90.0, 'inconnu': 1.0})
+        self.assertEqual([info['ratio'] for info in report['conformes']], ['roe'])
+        self.assertEqual([info['ratio'] for info in report['limites']], ['roa'])
+        self.assertEqual([info['ratio'] for info in report['non_conformes']], ['ratio_endettement'])
+        self.assertEqual([info['ratio'] for info in report['a_analyser']], ['inconnu'])
+        self.assertEqual(report['taux_conformite'], 25.0)
+
+    def test_interpretation(self):
+        """Test des niveaux d'interprétation, bornes et valeurs hors intervalles"""
+        calculator = RatiosCalculator()
+        cases = [('ratio_liquidite_generale', 2.0, 'excellent'), ('ratio_liquidite_generale', 1.99, 'bon'),
+                 ('ratio_liquidite_generale', -0.5, 'unknown'), ('ratio_autonomie_financiere', 100, 'unknown'),
+                 ('roe', -40, 'faible'), ('marge_nette', 5, 'bon'), ('rotation_stocks', 5, 'unknown')]
+        for ratio_name, value, level in cases:
+            self.assertEqual(calculator.get_ratio_interpretation(ratio_name, value)['level'], level,
+                             (ratio_name, value))
+
+        interpretation = get_norms().interpretation
+        values = np.array([-1.0, 0.5, 1.0, 1.7, 2.0, np.nan])
+        self.assertEqual(interpretation.level_column('ratio_liquidite_generale', values).tolist(),
+                         [interpretation.level('ratio_liquidite_generale', value) for value in values.tolist()])
+
+    def test_prudential_norms(self):
+        """Test que l'analyseur lit les normes prudentielles du service"""
+        ratios_bceao = FinancialAnalyzer().ratios_bceao
+        self.assertEqual(ratios_bceao['solvabilite']['ratio_solvabilite_global'],
+                         {'min': 8.625, 'objectif': 11.5, 'poids': 0.30})
+        self.assertEqual(ratios_bceao['liquidite']['ratio_transformation']['max'], 100.0)
+
+
+class TestNormsService(unittest.TestCase):
+    """Tests du rechargement à chaud et de l'accès concurrent"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bceao_norms.json')
+        shutil.copyfile(NORMS_PATH, self.path)
+        self.service = NormsService(self.path, check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def rewrite(self, edit, mtime_offset=10):
+        """Réécrit le fichier (normes de référence modifiées) et avance sa date de modification"""
+        with open(NORMS_PATH, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        edit(config)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset * 10**9))
+
+    def test_load_once(self):
+        """Test que le fichier n'est relu que s'il a changé"""
+        first = self.service.current()
+        self.assertIs(self.service.current(), first)
+        self.assertEqual(self.service.reloads, 1)
+
+    def test_hot_reload(self):
+        """Test qu'une norme et un barème modifiés s'appliquent sans redémarrage"""
+        norms = self.service.current()
+        self.assertEqual(norms.conformity.status('roe', 8.0), "⚠️ Limite")
+        self.assertEqual(norms.score_grid.score({'roe': 16.0})['rentabilite'], 10)
+
+        def edit(config):
+            config['conformite_ratios']['roe']['cible'] = 8.0
+            config['grille_score']['composantes']['rentabilite'][0]['points'] = [0, 1, 2, 3]
+        self.rewrite(edit)
+
+        reloaded = self.service.current()
+        self.assertIsNot(reloaded, norms)
+        self.assertEqual(reloaded.conformity.status('roe', 8.0), "✅ Conforme")
+        self.assertEqual(reloaded.score_grid.score({'roe': 16.0})['rentabilite'], 3)
+        # L'instantané déjà obtenu n'est pas modifié
+        self.assertEqual(norms.conformity.status('roe', 8.0), "⚠️ Limite")
+
+    def test_invalid_file_keeps_norms(self):
+        """Test qu'un fichier invalide laisse les normes précédentes en place"""
+        norms = self.service.current()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"conformite_ratios": ')
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**10))
+        kept = self.service.current()
+        self.assertIs(kept.conformity, norms.conformity)
+        self.assertEqual(self.service.reloads, 1)
+
+        self.rewrite(lambda config: config['conformite_ratios']['roe'].update(cible=1.0), mtime_offset=20)
+        with self.assertRaises(FileNotFoundError):
+            NormsService(os.path.join(self.directory, 'absent.json')).current()
+        self.assertEqual(self.service.current().conformity.status('roe', 2.0), "✅ Conforme")
+
+    def test_concurrent_sessions(self):
+        """Test que des sessions concurrentes lisent toujours un instantané complet"""
+        errors = []
+        stop = threading.Event()
+
+        def session():
+            try:
+                while not stop.is_set():
+                    norms = self.service.current()
+                    # Cible et barème viennent du même fichier
+                    target = norms.conformity.targets[norms.conformity.index['roe']]
+                    points = norms.score_grid.score({'roe': 100.0})['rentabilite']
+                    self.assertEqual(points, int(target))
+            except Exception as e:  # pragma: no cover - remonté au fil principal
+                errors.append(e)
+
+        def edit(value):
+            def apply(config):
+                config['conformite_ratios']['roe']['cible'] = float(value)
+                config['grille_score']['composantes']['rentabilite'][0]['points'] = [0, 0, 0, value]
+            return apply
+
+        self.rewrite(edit(10))
+        threads = [threading.Thread(target=session) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for value in range(11, 31):
+            self.rewrite(edit(value), mtime_offset=value)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.service.current().conformity.status('roe', 30.0), "✅ Conforme")
+
+
+if __name__ == '__main__':
+    unittest.main()
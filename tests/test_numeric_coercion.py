@@ -0,0 +1,154 @@
+"""
+Tests unitaires pour la conversion des montants au format français (numeric_coercion.py)
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import openpyxl
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer, cell_to_float
+from modules.core.cell_mapping import TEMPLATE_SCHEMA
+from modules.core.excel_loader import ExcelDataLoader
+from modules.core.numeric_coercion import coerce_grid, parse_number, parse_numbers
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'assets', 'template_excel.xlsx')
+
+FRENCH_NUMBERS = {
+    '12 000': 12000.0,
+    '12\u00a0000': 12000.0,
+    '12\u202f000,50': 12000.5,
+    '(12 000)': -12000.0,
+    '1.234.567,89': 1234567.89,
+    '1,234,567.89': 1234567.89,
+    '1 500 FCFA': 1500.0,
+    '\u22122 500': -2500.0,
+    '12,5': 12.5,
+    '0.25': 0.25,
+    '+7': 7.0,
+}
+
+NOT_NUMBERS = ['N-1', 'Total actif', '', '   ', '12-', 'inf', 'nan', '--3', '31/12/2023']
+
+
+class TestParseNumber(unittest.TestCase):
+    """Tests des règles de conversion et de la parité scalaire / vectorisée"""
+
+    def test_french_formats(self):
+        """Test des séparateurs, négatifs entre parenthèses et mentions monétaires"""
+        for text, expected in FRENCH_NUMBERS.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_number(text), expected)
+
+    def test_non_numbers(self):
+        """Test que libellés, en-têtes d'exercice et dates donnent NaN"""
+        for text in NOT_NUMBERS:
+            with self.subTest(text=text):
+                self.assertTrue(np.isnan(parse_number(text)))
+
+    def test_vectorised_matches_scalar(self):
+        """Test que la version vectorisée applique exactement les mêmes règles"""
+        texts = list(FRENCH_NUMBERS) + NOT_NUMBERS
+        vectorised = parse_numbers(texts)
+        scalar = np.array([parse_number(text) for text in texts])
+        np.testing.assert_array_equal(vectorised, scalar)
+
+    def test_cell_to_float(self):
+        """Test que la lecture cellule par cellule de l'analyseur suit les mêmes règles"""
+        self.assertEqual(cell_to_float('(12 000)'), -12000.0)
+        self.assertEqual(cell_to_float('Total'), 0)
+        self.assertEqual(cell_to_float(None), 0)
+        self.assertEqual(cell_to_float(3), 3.0)
+
+
+class TestCoerceGrid(unittest.TestCase):
+    """Tests de la conversion d'une grille entière"""
+
+    def test_masks_and_report(self):
+        """Test du masque des NaN et du signalement des cellules converties"""
+        grid = np.array([['Poste', 'N', 'N-1'],
+                         ['Ventes', 1500.0, '1 200,5'],
+                         ['Achats', '(300)', None]], dtype=object)
+        result = coerce_grid(grid)
+
+        np.testing.assert_array_equal(result.values[1:, 1:], [[1500.0, 1200.5], [-300.0, np.nan]])
+        np.testing.assert_array_equal(result.missing[:, 0], [True, True, True])
+        self.assertEqual(result.coerced_cells(), ['C2', 'B3'])
+        self.assertFalse(result.coerced[1, 1])
+
+    def test_benchmark_against_per_cell_loop(self):
+        """Benchmark : feuille de 120 000 cellules, conversion vectorisée contre boucle par cellule"""
+        rng = np.random.default_rng(0)
+        n_rows = 20000
+        grid = np.empty((n_rows, 6), dtype=object)
+        grid[:, 0] = [f"Poste {row}" for row in range(n_rows)]
+        grid[:, 1:] = rng.integers(-10 ** 7, 10 ** 7, size=(n_rows, 5)).astype(np.float64)
+        text_rows = rng.choice(n_rows, size=n_rows // 20, replace=False)
+        grid[text_rows, 1] = [f"({int(abs(v)):,})".replace(',', '\u00a0') for v in grid[text_rows, 1]]
+        grid[::7, 2] = None
+
+        start = time.perf_counter()
+        result = coerce_grid(grid)
+        vectorised_time = time.perf_counter() - start
+
+        # Boucle de l'ancien chargeur : une conversion Python par cellule
+        start = time.perf_counter()
+        looped = np.empty(grid.shape, dtype=np.float64)
+        flat_looped = looped.ravel()
+        for index, value in enumerate(grid.ravel()):
+            if value is None:
+                flat_looped[index] = np.nan
+            elif isinstance(value, str):
+                flat_looped[index] = parse_number(value)
+            else:
+                flat_looped[index] = float(value)
+        loop_time = time.perf_counter() - start
+
+        np.testing.assert_array_equal(result.values, looped)
+        self.assertEqual(int(result.coerced.sum()), len(text_rows))
+        self.assertLess(vectorised_time, loop_time)
+
+
+class TestLoadersCoerceText(unittest.TestCase):
+    """Tests des deux chargeurs sur des montants saisis en texte"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "montants_texte.xlsx")
+        workbook = openpyxl.load_workbook(TEMPLATE_PATH)
+        sheet_name, self.stocks_cell = TEMPLATE_SCHEMA.location('stocks')
+        workbook[sheet_name][self.stocks_cell] = '1.234.567,89'
+        workbook[sheet_name]['A1'] = 'BILAN'
+        workbook.save(self.path)
+        workbook.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_analyzer(self):
+        """Test que l'analyseur convertit et signale le montant texte"""
+        analyzer = FinancialAnalyzer()
+        data = analyzer.load_excel_template(self.path)
+        self.assertEqual(data['stocks'], 1234567.89)
+        self.assertIn(self.stocks_cell, analyzer.coerced_cells['Bilan'])
+        self.assertEqual(analyzer.load_excel_template(self.path, use_streaming=False), data)
+
+    def test_loader(self):
+        """Test que ExcelDataLoader convertit et signale le montant texte"""
+        loader = ExcelDataLoader()
+        data = loader.load_excel_template(self.path)
+        self.assertEqual(data['stocks_et_encours'], 1234567.89)
+        self.assertIn(self.stocks_cell, loader.coerced_cells['Bilan'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests unitaires pour la notation de portefeuille (modules/core/portfolio.py)
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Ajouter le dossier parent au path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.portfolio import read_chunks, score_portfolio
+from modules.core.scoring import FINANCIAL_CLASSES, SCORE_SECTORIEL, score_class, score_class_column
+from tests.test_ratios import random_portfolio
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def legacy_financial_class(score):
+    """Échelle historique de SessionManager.get_financial_class, référence de parité"""
+    for bound, grade in ((85, "A+"), (70, "A"), (55, "B"), (40, "C"), (25, "D")):
+        if score >= bound:
+            return grade
+    return "E"
+
+
+class TestPortfolioScoring(unittest.TestCase):
+    """Tests de parité avec l'analyse ligne par ligne, des blocs et des formats"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.analyzer = FinancialAnalyzer()
+        self.frame = random_portfolio(300, seed=8)
+        self.csv_path = os.path.join(self.temp_dir, 'portefeuille.csv')
+        self.frame.to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_score_classes(self):
+        """Test des classes du score aux bornes, en valeur et en colonne"""
+        scores = np.arange(0, 101)
+        self.assertEqual([FINANCIAL_CLASSES[score_class(score)] for score in scores],
+                         [legacy_financial_class(score) for score in scores])
+        self.assertEqual(score_class_column(scores).tolist(), [score_class(score) for score in scores])
+        self.assertEqual(self.analyzer.get_interpretation(85), ("Excellente", "green"))
+        self.assertEqual(self.analyzer.get_interpretation(84), ("Très bonne", "lightgreen"))
+        self.assertEqual(self.analyzer.get_interpretation(24), ("Très faible", "darkred"))
+
+    def test_parity_with_row_by_row(self):
+        """Test que chaque ligne égale calculate_ratios, calculate_score et les classes"""
+        result, summary = score_portfolio(self.csv_path, chunk_rows=64)
+        self.assertEqual(summary['lignes'], len(self.frame))
+        self.assertEqual(summary['blocs'], 5)
+        self.assertEqual(list(result['entreprise']), list(self.frame['entreprise']))
+
+        for row in range(len(self.frame)):
+            data = {name: value for name, value in self.frame.iloc[row].items()
+                    if name != 'entreprise' and not pd.isna(value)}
+            ratios = self.analyzer.calculate_ratios(data)
+            scores = self.analyzer.calculate_score(ratios)
+            produced = {name[len('ratio.'):]: value for name, value in result.iloc[row].items()
+                        if name.startswith('ratio.') and not pd.isna(value)}
+            self.assertEqual(set(produced), set(ratios), f"ligne {row}")
+            for name, value in ratios.items():
+                self.assertAlmostEqual(produced[name], value, places=6, msg=f"ligne {row}, {name}")
+            self.assertEqual({name: result.iloc[row][f"score.{name}"] for name in scores}, scores)
+            label, color = self.analyzer.get_interpretation(scores['global'])
+            self.assertEqual(result.iloc[row]['interpretation'], label)
+            self.assertEqual(result.iloc[row]['couleur'], color)
+            self.assertEqual(result.iloc[row]['classe'], legacy_financial_class(scores['global']))
+        self.assertEqual(sum(summary['classes'].values()), len(self.frame))
+
+    def test_sector_column(self):
+        """Test de la notation sectorielle avec un secteur par ligne"""
+        sectors = list(self.analyzer.ratios_sectoriels)
+        self.frame['secteur'] = [sectors[row % len(sectors)] for row in range(len(self.frame))]
+        self.frame.to_csv(self.csv_path, index=False)
+
+        result, _ = score_portfolio(self.csv_path, chunk_rows=100, sector_column='secteur', mode=SCORE_SECTORIEL)
+        self.assertEqual(list(result['secteur']), list(self.frame['secteur']))
+        for row in range(0, len(self.frame), 17):
+            ratios = {name[len('ratio.'):]: value for name, value in result.iloc[row].items()
+                      if name.startswith('ratio.') and not pd.isna(value)}
+            expected = self.analyzer.calculate_score(ratios, self.frame['secteur'][row], SCORE_SECTORIEL)
+            self.assertEqual(result.iloc[row]['score.global'], expected['global'])
+
+    def test_output_formats(self):
+        """Test de l'écriture bloc par bloc : CSV et JSON lines égaux au résultat en mémoire"""
+        expected, _ = score_portfolio(self.csv_path, chunk_rows=1000)
+
+        csv_output = os.path.join(self.temp_dir, 'scores.csv')
+        result, summary = score_portfolio(self.csv_path, csv_output, chunk_rows=70)
+        self.assertIsNone(result)
+        written = pd.read_csv(csv_output)
+        self.assertEqual(len(written), summary['lignes'])
+        pd.testing.assert_frame_equal(written, expected, check_dtype=False)
+
+        jsonl_output = os.path.join(self.temp_dir, 'scores.jsonl')
+        score_portfolio(self.csv_path, jsonl_output, chunk_rows=70)
+        with open(jsonl_output, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), len(expected))
+        self.assertEqual([line['classe'] for line in lines], list(expected['classe']))
+
+        with self.assertRaises(ValueError):
+            score_portfolio(self.csv_path, os.path.join(self.temp_dir, 'scores.txt'))
+        with self.assertRaises(ValueError):
+            list(read_chunks(os.path.join(self.temp_dir, 'portefeuille.xlsx')))
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow non installé")
+    def test_parquet_round_trip(self):
+        """Test de la lecture et de l'écriture Parquet par blocs"""
+        parquet_path = os.path.join(self.temp_dir, 'portefeuille.parquet')
+        self.frame.to_parquet(parquet_path, index=False)
+        output = os.path.join(self.temp_dir, 'scores.parquet')
+        score_portfolio(parquet_path, output, chunk_rows=70)
+        expected, _ = score_portfolio(self.csv_path)
+        pd.testing.assert_frame_equal(pd.read_parquet(output), expected, check_dtype=False)
+
+    def test_benchmark_rows_per_minute(self):
+        """Benchmark : au moins 100 000 entreprises par minute sur un cœur (lecture CSV comprise)"""
+        frame = random_portfolio(100000, seed=9)
+        path = os.path.join(self.temp_dir, 'grand_portefeuille.csv')
+        frame.to_csv(path, index=False)
+
+        _, summary = score_portfolio(path, chunk_rows=25000)
+        self.assertEqual(summary['lignes'], 100000)
+        self.assertGreaterEqual(summary['lignes_par_minute'], 100000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Tests unitaires pour le contrôle préalable des classeurs importés (preflight.py)
+"""
+
+import unittest
+import sys
+import os
+import io
+import shutil
+import tempfile
+import time
+import zipfile
+
+import openpyxl
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.preflight import PreflightPolicy, preflight_workbook
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'assets', 'template_excel.xlsx')
+
+
+class TestPreflight(unittest.TestCase):
+    """Tests des motifs de refus renvoyés avant toute lecture de feuille"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        with open(TEMPLATE_PATH, 'rb') as f:
+            cls.content = f.read()
+
+        cls.no_cr_path = os.path.join(cls.temp_dir, "sans_cr.xlsx")
+        workbook = openpyxl.load_workbook(TEMPLATE_PATH)
+        workbook.remove(workbook['CR'])
+        workbook.save(cls.no_cr_path)
+        workbook.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir)
+
+    def test_valid_template(self):
+        """Test que le modèle officiel passe le contrôle, quelle que soit la source"""
+        for source in (TEMPLATE_PATH, self.content, memoryview(self.content), io.BytesIO(self.content)):
+            report = preflight_workbook(source)
+            self.assertTrue(report.ok, report.reason)
+            self.assertEqual(report.code, 'ok')
+            self.assertIn('Bilan', report.sheets)
+            self.assertIn('CR', report.sheets)
+            self.assertGreater(report.uncompressed_bytes, report.file_bytes)
+
+    def test_missing_sheet(self):
+        """Test que le motif nomme la feuille manquante et les feuilles présentes"""
+        report = preflight_workbook(self.no_cr_path)
+        self.assertFalse(report.ok)
+        self.assertEqual(report.code, 'feuilles_manquantes')
+        self.assertIn("'CR'", report.reason)
+        self.assertIn("'Bilan'", report.reason)
+        self.assertTrue(preflight_workbook(self.no_cr_path, required_sheets=('Bilan',)).ok)
+
+    def test_corrupt_archive(self):
+        """Test d'un classeur tronqué"""
+        report = preflight_workbook(self.content[:len(self.content) // 2], file_name='liasse.xlsx')
+        self.assertFalse(report.ok)
+        self.assertEqual(report.code, 'archive_corrompue')
+
+    def test_not_a_workbook(self):
+        """Test d'une archive zip sans xl/workbook.xml et d'un contenu non reconnu"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('document.txt', 'bonjour')
+        self.assertEqual(preflight_workbook(buffer.getvalue(), file_name='liasse.xlsx').code, 'format_inconnu')
+        self.assertEqual(preflight_workbook(b'\x00\x01binaire', file_name='liasse.xlsx').code, 'format_inconnu')
+
+    def test_zip_bomb(self):
+        """Test qu'une feuille très compressible est refusée sans être décompressée"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(self.content)) as source, \
+                zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for item in source.infolist():
+                archive.writestr(item, source.read(item.filename))
+            archive.writestr('xl/media/remplissage.bin', b'\x00' * (20 * 1024 * 1024))
+        report = preflight_workbook(buffer.getvalue())
+        self.assertFalse(report.ok)
+        self.assertEqual(report.code, 'bombe_zip')
+        self.assertIn('xl/media/remplissage.bin', report.reason)
+
+    def test_size_policy(self):
+        """Test des limites de taille du fichier et des éléments décompressés"""
+        report = preflight_workbook(TEMPLATE_PATH, policy=PreflightPolicy(max_file_bytes=1024))
+        self.assertEqual(report.code, 'fichier_trop_volumineux')
+        report = preflight_workbook(TEMPLATE_PATH, policy=PreflightPolicy(max_member_bytes=1024))
+        self.assertEqual(report.code, 'feuille_trop_volumineuse')
+
+    def test_text_content_skips_archive_checks(self):
+        """Test qu'un CSV n'est contrôlé que sur sa taille"""
+        report = preflight_workbook(b"poste;montant\nventes;100\n", file_name='export.csv')
+        self.assertTrue(report.ok)
+        self.assertEqual(report.format, 'csv')
+
+    def test_analyzer_reports_reason(self):
+        """Test que l'analyse complète renvoie le motif précis"""
+        result = FinancialAnalyzer().analyze_excel_file(self.no_cr_path)
+        self.assertFalse(result['success'])
+        self.assertIn("'CR'", result['error'])
+
+    def test_milliseconds(self):
+        """Benchmark : contrôle préalable contre chargement complet du modèle"""
+        repeat = 20
+        start = time.perf_counter()
+        for _ in range(repeat):
+            preflight_workbook(self.content)
+        preflight_time = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        FinancialAnalyzer().load_excel_template(self.content, use_streaming=False)
+        load_time = time.perf_counter() - start
+
+        self.assertLess(preflight_time * 10, load_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
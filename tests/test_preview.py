@@ -0,0 +1,173 @@
+"""
+Tests unitaires pour l'aperçu borné des fichiers importés (preview.py)
+"""
+
+import unittest
+import sys
+import os
+import io
+import shutil
+import tempfile
+import time
+import zipfile
+from unittest.mock import patch
+
+import openpyxl
+import pandas as pd
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer, TEMPLATE_CELLS, TEMPLATE_READ_ROWS
+from modules.core.preview import column_letter, read_preview
+from modules.core.xlsx_stream import (
+    SHARED_READER_CAPACITY, XlsxStreamReader, clear_shared_readers, open_mapped_workbook, release_shared_reader,
+    shared_reader,
+)
+from tests.test_xlsx_stream import create_template_workbook
+
+
+class TestReadPreview(unittest.TestCase):
+    """Tests pour la lecture des premières lignes de chaque feuille"""
+
+    def setUp(self):
+        clear_shared_readers()
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "liasse.xlsx")
+        create_template_workbook(self.path, filler_rows=200)
+        with open(self.path, 'rb') as f:
+            self.content = f.read()
+
+    def tearDown(self):
+        clear_shared_readers()
+        shutil.rmtree(self.temp_dir)
+
+    def test_column_letter(self):
+        """Test de la conversion numéro de colonne -> lettres Excel"""
+        self.assertEqual([column_letter(i) for i in (1, 5, 26, 27, 52)], ['A', 'E', 'Z', 'AA', 'AZ'])
+
+    def test_preview_matches_openpyxl(self):
+        """Test que l'aperçu reproduit les premières lignes lues par openpyxl"""
+        previews = read_preview(memoryview(self.content), max_rows=10)
+        workbook = openpyxl.load_workbook(self.path, data_only=True)
+
+        self.assertEqual(list(previews), workbook.sheetnames)
+        for sheet_name, frame in previews.items():
+            self.assertLessEqual(len(frame), 10)
+            for row in workbook[sheet_name].iter_rows(min_row=1, max_row=len(frame)):
+                for cell in row:
+                    if cell.column_letter in frame.columns and cell.value is not None:
+                        self.assertEqual(frame.at[cell.row, cell.column_letter], cell.value,
+                                         f"{sheet_name}!{cell.coordinate}")
+        self.assertEqual(previews['Bilan'].at[1, 'A'], 'Feuille Bilan')
+        workbook.close()
+
+    def test_only_preview_rows_are_decoded(self):
+        """Test que la lecture s'arrête après les lignes affichées"""
+        read_preview(self.content, max_rows=5)
+        reader = shared_reader(self.content)
+        for sheet_name in reader.sheetnames:
+            last_row, rows, complete = reader._row_cache[sheet_name]
+            self.assertEqual(last_row, 5)
+            self.assertFalse(complete)
+            self.assertTrue(all(row <= 5 for row in rows))
+        release_shared_reader(reader)
+
+    def test_analysis_reuses_prefetched_rows(self):
+        """Test que l'analyse lancée après l'aperçu ne relit pas le XML des feuilles"""
+        read_preview(self.content, max_rows=10, prefetch_rows=TEMPLATE_READ_ROWS)
+
+        with patch.object(XlsxStreamReader, '_parse_rows', side_effect=AssertionError("relecture")):
+            data = FinancialAnalyzer().load_excel_template(memoryview(self.content))
+
+        self.assertEqual(data, FinancialAnalyzer().load_excel_template(self.path))
+
+    def test_caller_buffer_released(self):
+        """Test que le buffer importé est lu sans copie, puis relâché après usage"""
+        upload = io.BytesIO(self.content)
+        reader = shared_reader(upload.getbuffer())
+        # Vue sur le buffer de l'appelant tant que le lecteur est utilisé
+        with self.assertRaises(BufferError):
+            upload.truncate(0)
+        release_shared_reader(reader)
+        read_preview(upload.getbuffer(), max_rows=5)
+        upload.close()
+
+        data = FinancialAnalyzer().load_excel_template(memoryview(self.content))
+        self.assertEqual(data, FinancialAnalyzer().load_excel_template(self.path))
+
+    def test_reader_closed_after_last_use(self):
+        """Test de la fermeture de l'archive au dernier utilisateur, même sortie du cache"""
+        workbook = open_mapped_workbook(self.content, TEMPLATE_CELLS)
+        leased = workbook._reader
+        others = []
+        for variant in range(SHARED_READER_CAPACITY):
+            # Contenus distincts : commentaire de l'archive modifié
+            buffer = io.BytesIO(self.content)
+            with zipfile.ZipFile(buffer, 'a') as archive:
+                archive.comment = f"variante {variant}".encode()
+            others.append(shared_reader(buffer.getvalue()))
+            release_shared_reader(others[-1])
+
+        # Sorti du cache mais encore lu : fermé à la fermeture du classeur
+        self.assertTrue(all(reader._zip.fp is None for reader in others))
+        self.assertIsNotNone(leased._zip.fp)
+        workbook['Bilan']
+        workbook.close()
+        workbook.close()
+        self.assertIsNone(leased._zip.fp)
+
+        # Contenu encore en cache : archive rouverte, lignes décodées conservées
+        reader = shared_reader(buffer.getvalue())
+        self.assertIs(reader, others[-1])
+        self.assertIsNotNone(reader._zip.fp)
+        release_shared_reader(reader)
+
+    def test_csv_preview(self):
+        """Test de l'aperçu d'un fichier CSV"""
+        content = "poste,montant\n" + "".join(f"ligne{i},{i}\n" for i in range(50))
+        previews = read_preview(content.encode('utf-8'), max_rows=5, file_name='export.csv')
+        self.assertEqual(list(previews), ['CSV'])
+        self.assertEqual(len(previews['CSV']), 5)
+        self.assertEqual(list(previews['CSV'].columns), ['poste', 'montant'])
+
+    def test_invalid_content_raises(self):
+        """Test qu'un contenu illisible lève une erreur exploitable par l'interface"""
+        with self.assertRaises(Exception):
+            read_preview(b"pas un classeur", file_name='faux.xlsx')
+
+
+class TestPreviewPerformance(unittest.TestCase):
+    """Comparaison aperçu borné / lecture complète par pandas"""
+
+    def setUp(self):
+        clear_shared_readers()
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "liasse_volumineuse.xlsx")
+        create_template_workbook(self.path, filler_rows=3000)
+        with open(self.path, 'rb') as f:
+            self.content = f.read()
+
+    def tearDown(self):
+        clear_shared_readers()
+        shutil.rmtree(self.temp_dir)
+
+    def test_preview_faster_than_full_read(self):
+        """Benchmark : l'aperçu ne matérialise pas les feuilles complètes"""
+        start = time.perf_counter()
+        full = pd.read_excel(self.path, sheet_name=None)
+        full_time = time.perf_counter() - start
+
+        preview_time = float('inf')
+        for _ in range(3):
+            clear_shared_readers()
+            start = time.perf_counter()
+            previews = read_preview(self.content, max_rows=10)
+            preview_time = min(preview_time, time.perf_counter() - start)
+
+        self.assertEqual(list(previews), list(full))
+        self.assertLess(preview_time * 10, full_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
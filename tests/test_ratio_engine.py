@@ -0,0 +1,125 @@
+"""
+Tests unitaires pour le moteur de ratios unique (modes et mémorisation)
+"""
+
+import unittest
+import sys
+import os
+import time
+
+import pandas as pd
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.ratios import (MODE_ANALYSE, MODE_COMPLET, RatioEngine, RatiosCalculator,
+                                 compute_ratios, get_ratio_engine)
+from tests.test_ratios import random_portfolio
+
+SAMPLE_DATA = {
+    'total_actif': 1000000, 'immobilisations_nettes': 600000, 'stocks': 150000,
+    'creances_clients': 100000, 'autres_creances': 50000, 'tresorerie': 100000,
+    'capitaux_propres': 400000, 'dettes_financieres': 300000, 'dettes_court_terme': 200000,
+    'fournisseurs_exploitation': 80000, 'clients_avances_recues': 30000, 'chiffre_affaires': 1500000,
+    'valeur_ajoutee': 600000, 'charges_personnel': 300000, 'resultat_net': 100000, 'cafg': 180000,
+    'achats_matieres_premieres': 500000, 'autres_achats': 200000, 'ressources_stables': 700000,
+}
+
+
+class TestRatioEngineModes(unittest.TestCase):
+    """Tests de parité : chaque mode reproduit son chemin historique, en dict comme en lots"""
+
+    def rows(self, frame):
+        for row in range(len(frame)):
+            yield row, {name: value for name, value in frame.iloc[row].items()
+                        if name != 'entreprise' and not pd.isna(value)}
+
+    def test_modes_match_entry_points(self):
+        """Test que l'analyseur et le calculateur sont deux modes du même moteur"""
+        engine = RatioEngine()
+        self.assertEqual(engine.calculate(SAMPLE_DATA, MODE_ANALYSE),
+                         FinancialAnalyzer().calculate_ratios(SAMPLE_DATA))
+        self.assertEqual(engine.calculate(SAMPLE_DATA, MODE_COMPLET),
+                         RatiosCalculator().calculate_all_ratios(SAMPLE_DATA))
+
+        # Le BFR du mode complet déduit les avances clients reçues
+        analyse = engine.calculate(SAMPLE_DATA, MODE_ANALYSE)
+        complet = engine.calculate(SAMPLE_DATA, MODE_COMPLET)
+        self.assertEqual(analyse['bfr'] - complet['bfr'], SAMPLE_DATA['clients_avances_recues'])
+        self.assertNotIn('ratio_liquidite_generale',
+                         engine.calculate(dict(SAMPLE_DATA, dettes_court_terme=0), MODE_ANALYSE))
+
+        with self.assertRaises(ValueError):
+            engine.calculate(SAMPLE_DATA, 'inconnu')
+
+    def test_batch_parity_per_mode(self):
+        """Test que le calcul par lots égale le calcul dict par dict, dans chaque mode"""
+        frame = random_portfolio(300, seed=3)
+        engine = RatioEngine()
+        for mode in (MODE_ANALYSE, MODE_COMPLET):
+            batch = engine.calculate_batch(frame, mode)
+            checked = 0
+            for row, data in self.rows(frame):
+                if mode == MODE_ANALYSE and data.get('chiffre_affaires', 0) > 0 and data.get('total_actif') == 0:
+                    # Rotation de l'actif : division par zéro historique du mode analyse
+                    continue
+                expected = engine.calculate(data, mode)
+                produced = batch.iloc[row].dropna().to_dict()
+                self.assertEqual(set(produced), set(expected), f"{mode}, ligne {row}")
+                for name, value in expected.items():
+                    self.assertEqual(produced[name], value, f"{mode}, ligne {row}, {name}")
+                checked += 1
+            self.assertGreater(checked, 250)
+
+    def test_cache_returns_copies(self):
+        """Test de la mémorisation : même contenu, même résultat, copie indépendante"""
+        engine = RatioEngine(max_entries=2)
+        first = engine.calculate(SAMPLE_DATA)
+        first['roe'] = -1
+        second = engine.calculate(dict(reversed(list(SAMPLE_DATA.items()))))
+        self.assertNotEqual(second['roe'], -1)
+        self.assertEqual(engine.stats, {'hits': 1, 'misses': 1})
+
+        # Demande partielle et mode distincts : entrées distinctes, LRU borné
+        self.assertEqual(list(engine.calculate(SAMPLE_DATA, names=['roe', 'roa'])), ['roe', 'roa'])
+        engine.calculate(SAMPLE_DATA, MODE_COMPLET)
+        self.assertEqual(len(engine._cache), 2)
+
+        # Valeur non hachable : calcul direct
+        self.assertIn('roe', engine.calculate(dict(SAMPLE_DATA, notes=['saisie'])))
+
+    def test_shared_engine(self):
+        """Test du moteur partagé par compute_ratios"""
+        self.assertIs(get_ratio_engine(), get_ratio_engine())
+        self.assertEqual(compute_ratios(SAMPLE_DATA, MODE_COMPLET),
+                         RatiosCalculator().calculate_all_ratios(SAMPLE_DATA))
+
+    def test_microbenchmark(self):
+        """Benchmark : calcul direct, calcul mémorisé et calcul par lots"""
+        engine = RatioEngine()
+        calculator = engine.calculator(MODE_ANALYSE)
+        repeat = 2000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            calculator.calculate_ratios(SAMPLE_DATA)
+        direct = (time.perf_counter() - start) / repeat
+
+        engine.calculate(SAMPLE_DATA)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            engine.calculate(SAMPLE_DATA)
+        cached = (time.perf_counter() - start) / repeat
+
+        frame = random_portfolio(20000)
+        start = time.perf_counter()
+        engine.calculate_batch(frame)
+        batch = (time.perf_counter() - start) / len(frame)
+
+        self.assertLess(cached * 3, direct)
+        self.assertLess(batch * 5, direct)
+
+
+if __name__ == '__main__':
+    unittest.main()
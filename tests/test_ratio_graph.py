@@ -0,0 +1,142 @@
+"""
+Tests unitaires pour le graphe des ratios (ratio_graph.py)
+"""
+
+import unittest
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.ratio_graph import ArrayOps, BatchColumns, RatioGraph, RatioNode, ScalarOps
+from modules.core.ratios import RATIO_GRAPH, RatiosCalculator
+
+
+SAMPLE_DATA = {
+    'total_actif': 1000000, 'immobilisations_nettes': 600000, 'stocks': 150000,
+    'creances_clients': 100000, 'autres_creances': 50000, 'tresorerie': 100000,
+    'capitaux_propres': 400000, 'dettes_financieres': 300000, 'dettes_court_terme': 200000,
+    'fournisseurs_exploitation': 80000, 'chiffre_affaires': 1500000, 'valeur_ajoutee': 600000,
+    'charges_personnel': 300000, 'resultat_net': 100000, 'cafg': 180000,
+    'achats_matieres_premieres': 500000, 'autres_achats': 200000,
+}
+
+
+class TestRatioGraph(unittest.TestCase):
+    """Tests des plans d'évaluation et du partage des intermédiaires"""
+
+    def counting_graph(self, calls):
+        def counted(name, compute):
+            def wrapper(op, *args):
+                calls[name] = calls.get(name, 0) + 1
+                return compute(op, *args)
+            return wrapper
+
+        return RatioGraph([
+            RatioNode('somme', ('a', 'b'), counted('somme', lambda op, a, b: a + b), output=False),
+            RatioNode('positif', ('somme',), counted('positif', lambda op, s: s > 0), output=False),
+            RatioNode('double', ('somme',), counted('double', lambda op, s: s * 2)),
+            RatioNode('part_a', ('a', 'somme'), counted('part_a', lambda op, a, s: op.div(a, s, 0)),
+                      when='positif'),
+            RatioNode('inverse_part', ('part_a',), counted('inverse_part', lambda op, p: op.div(1, p, 0)),
+                      when='positif'),
+        ])
+
+    def test_shared_intermediate_evaluated_once(self):
+        """Test que l'intermédiaire partagé n'est évalué qu'une fois"""
+        calls = {}
+        graph = self.counting_graph(calls)
+        divide = RatiosCalculator().safe_divide
+        result = graph.evaluate(ScalarOps({'a': 1.0, 'b': 3.0}, divide))
+        self.assertEqual(result, {'double': 8.0, 'part_a': 0.25, 'inverse_part': 4.0})
+        self.assertEqual(calls, {'somme': 1, 'positif': 1, 'double': 1, 'part_a': 1, 'inverse_part': 1})
+
+    def test_condition_and_descendants_absent(self):
+        """Test qu'un ratio conditionnel non produit entraîne ses descendants"""
+        calls = {}
+        graph = self.counting_graph(calls)
+        result = graph.evaluate(ScalarOps({'a': -5.0}, RatiosCalculator().safe_divide))
+        self.assertEqual(result, {'double': -10.0})
+        self.assertNotIn('part_a', calls)
+        self.assertNotIn('inverse_part', calls)
+
+    def test_subset_evaluates_only_ancestors(self):
+        """Test qu'une demande partielle n'évalue que les ancêtres des ratios demandés"""
+        calls = {}
+        graph = self.counting_graph(calls)
+        self.assertEqual(graph.plan(['double']).node_names, ['somme', 'double'])
+        self.assertEqual(graph.evaluate(ScalarOps({'a': 2, 'b': 2}, None), ['double']), {'double': 8})
+        self.assertEqual(calls, {'somme': 1, 'double': 1})
+
+        plan = RATIO_GRAPH.plan(['rotation_bfr'])
+        self.assertEqual(plan.node_names, ['bfr', 'has_bfr', 'rotation_bfr'])
+        self.assertEqual(RATIO_GRAPH.required_fields(['ratio_liquidite_generale']),
+                         ['stocks', 'creances_clients', 'autres_creances', 'tresorerie', 'dettes_court_terme'])
+
+    def test_every_node_once_in_full_plan(self):
+        """Test que le plan complet contient chaque nœud une seule fois, dépendances d'abord"""
+        names = RATIO_GRAPH.plan(RATIO_GRAPH.outputs()).node_names
+        self.assertEqual(len(names), len(set(names)))
+        self.assertEqual(set(names), set(RATIO_GRAPH.nodes))
+        position = {name: index for index, name in enumerate(names)}
+        for node in RATIO_GRAPH.nodes.values():
+            for dependency in node.inputs + ((node.when,) if node.when else ()):
+                if dependency in RATIO_GRAPH.nodes:
+                    self.assertLess(position[dependency], position[node.name])
+
+    def test_invalid_graphs(self):
+        """Test des nœuds dupliqués, des cycles et des ratios inconnus"""
+        with self.assertRaises(ValueError):
+            RatioGraph([RatioNode('x', (), lambda op: 1), RatioNode('x', (), lambda op: 2)])
+        with self.assertRaises(ValueError):
+            RatioGraph([RatioNode('x', ('y',), lambda op, y: y), RatioNode('y', ('x',), lambda op, x: x)])
+        with self.assertRaises(KeyError):
+            RATIO_GRAPH.plan(['ratio_inexistant'])
+
+    def test_array_evaluation(self):
+        """Test de l'évaluation en colonnes : NaN là où la condition n'est pas remplie"""
+        graph = self.counting_graph({})
+        columns = BatchColumns(pd.DataFrame({'a': [1.0, -5.0], 'b': [3.0, np.nan]}))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = graph.evaluate(ArrayOps(columns, RatiosCalculator().safe_divide_array))
+        np.testing.assert_array_equal(result['double'], [8.0, -10.0])
+        np.testing.assert_array_equal(result['part_a'], [0.25, np.nan])
+
+
+class TestCalculatorSubsets(unittest.TestCase):
+    """Tests des demandes partielles au calculateur"""
+
+    def setUp(self):
+        self.calculator = RatiosCalculator()
+
+    def test_subset_matches_full(self):
+        """Test qu'une demande partielle égale l'extrait du calcul complet"""
+        full = self.calculator.calculate_all_ratios(SAMPLE_DATA)
+        names = ['roe', 'rotation_bfr', 'capacite_remboursement', 'delai_recouvrement_clients']
+        subset = self.calculator.calculate_ratios(SAMPLE_DATA, names)
+        self.assertEqual(list(subset), names)
+        self.assertEqual(subset, {name: full[name] for name in names})
+
+        batch = self.calculator.calculate_all_ratios_batch(pd.DataFrame([SAMPLE_DATA]), names)
+        self.assertEqual(list(batch.columns), names)
+        self.assertEqual(batch.iloc[0].to_dict(), subset)
+
+    def test_category_methods(self):
+        """Test que les méthodes par catégorie se partagent le calcul complet"""
+        full = self.calculator.calculate_all_ratios(SAMPLE_DATA)
+        merged = {}
+        for method in (self.calculator.calculate_liquidite_ratios, self.calculator.calculate_solvabilite_ratios,
+                       self.calculator.calculate_rentabilite_ratios, self.calculator.calculate_activite_ratios,
+                       self.calculator.calculate_gestion_ratios, self.calculator.calculate_structure_ratios,
+                       self.calculator.calculate_bceao_ratios):
+            merged.update(method(SAMPLE_DATA))
+        self.assertEqual(merged, full)
+        self.assertEqual(self.calculator.calculate_bfr(SAMPLE_DATA), full['bfr'])
+
+
+if __name__ == '__main__':
+    unittest.main()
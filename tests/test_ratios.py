@@ -5,11 +5,16 @@ Tests unitaires pour le module ratios.py
 import unittest
 import sys
 import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
 
 # Ajouter le dossier parent au path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from modules.core.ratios import RatiosCalculator
+from modules.core.ratios import MODE_ANALYSE, RatiosCalculator, get_ratio_engine
 
 
 class TestRatiosCalculator(unittest.TestCase):
@@ -515,6 +520,98 @@ class TestRatiosEdgeCases(unittest.TestCase):
         self.assertLess(ratios['capacite_remboursement'], 2.0, "Capacité de remboursement excellente")
 
 
+def random_portfolio(n_rows, seed=0):
+    """Portefeuille aléatoire : zéros, négatifs et postes non renseignés (NaN)"""
+    rng = np.random.default_rng(seed)
+    fields = [
+        'total_actif', 'immobilisations_nettes', 'stocks', 'creances_clients', 'autres_creances',
+        'tresorerie', 'total_actif_circulant', 'capitaux_propres', 'dettes_financieres',
+        'dettes_court_terme', 'tresorerie_passif', 'ressources_stables', 'fournisseurs_exploitation',
+        'dettes_sociales_fiscales', 'autres_dettes', 'fournisseurs_avances_versees',
+        'clients_avances_recues', 'chiffre_affaires', 'valeur_ajoutee', 'charges_personnel',
+        'excedent_brut', 'resultat_exploitation', 'frais_financiers', 'resultat_net',
+        'achats_matieres_premieres', 'autres_achats', 'marge_commerciale', 'cafg',
+        'charges_exploitation', 'provisions_clients'
+    ]
+    values = rng.integers(-200000, 2000000, size=(n_rows, len(fields))).astype(np.float64)
+    values[rng.random(values.shape) < 0.1] = 0
+    values[rng.random(values.shape) < 0.1] = np.nan
+    frame = pd.DataFrame(values, columns=fields)
+    frame['entreprise'] = [f"E{row}" for row in range(n_rows)]
+    return frame
+
+
+class TestRatiosBatch(unittest.TestCase):
+    """Tests du calcul par lots : parité avec calculate_all_ratios et débit"""
+    
+    def setUp(self):
+        self.calculator = RatiosCalculator()
+    
+    def test_parity_with_scalar(self):
+        """Test que chaque ligne égale le calcul dict par dict (NaN = ratio non produit)"""
+        frame = random_portfolio(500)
+        batch = self.calculator.calculate_all_ratios_batch(frame)
+        self.assertEqual(len(batch), len(frame))
+        
+        for row in range(len(frame)):
+            data = {name: value for name, value in frame.iloc[row].items()
+                    if name != 'entreprise' and not pd.isna(value)}
+            expected = self.calculator.calculate_all_ratios(data)
+            produced = batch.iloc[row].dropna().to_dict()
+            self.assertEqual(set(produced), set(expected), f"ligne {row}")
+            for name, value in expected.items():
+                self.assertEqual(produced[name], value, f"ligne {row}, {name}")
+    
+    def test_sample_data_and_structured_array(self):
+        """Test sur un jeu complet et sur un tableau structuré NumPy"""
+        data = {'total_actif': 1000000.0, 'capitaux_propres': 400000.0, 'dettes_court_terme': 0.0,
+                'chiffre_affaires': 0.0, 'cafg': 0.0}
+        array = np.array([tuple(data.values())], dtype=[(name, np.float64) for name in data])
+        batch = self.calculator.calculate_all_ratios_batch(array)
+        
+        self.assertEqual(batch['ratio_autonomie_financiere'].iloc[0], 40.0)
+        self.assertEqual(batch['ratio_liquidite_generale'].iloc[0], 0)
+        self.assertEqual(batch['capacite_remboursement'].iloc[0], 999)
+        self.assertTrue(np.isnan(batch['marge_nette'].iloc[0]))
+        self.assertEqual(set(batch.columns), set(self.calculator.calculate_all_ratios_batch(random_portfolio(1)).columns))
+    
+    def test_analysis_zero_total_actif(self):
+        """Test d'un total actif nul en mode analyse : rotation non produite, sans inf ni avertissement"""
+        engine = get_ratio_engine()
+        rows = [
+            {'chiffre_affaires': 1500000.0, 'total_actif': 0.0, 'capitaux_propres': 200000.0},
+            {'chiffre_affaires': 1500000.0, 'capitaux_propres': 200000.0},
+        ]
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            batch = engine.calculate_batch(pd.DataFrame(rows), MODE_ANALYSE)
+        
+        self.assertNotIn('rotation_actif', engine.calculate(rows[0], MODE_ANALYSE))
+        self.assertTrue(np.isnan(batch['rotation_actif'].iloc[0]))
+        # Total actif non renseigné : diviseur 1 dans les deux chemins
+        self.assertEqual(engine.calculate(rows[1], MODE_ANALYSE)['rotation_actif'], 1500000.0)
+        self.assertEqual(batch['rotation_actif'].iloc[1], 1500000.0)
+        for row, data in enumerate(rows):
+            self.assertEqual(batch.iloc[row].dropna().to_dict(), engine.calculate(data, MODE_ANALYSE))
+    
+    def test_benchmark_rows_per_second(self):
+        """Benchmark : débit du calcul par lots contre la boucle dict par dict"""
+        frame = random_portfolio(50000, seed=1)
+        
+        start = time.perf_counter()
+        batch = self.calculator.calculate_all_ratios_batch(frame)
+        batch_rate = len(frame) / (time.perf_counter() - start)
+        
+        sample = frame.drop(columns='entreprise').iloc[:2000].fillna(0).to_dict('records')
+        start = time.perf_counter()
+        for data in sample:
+            self.calculator.calculate_all_ratios(data)
+        scalar_rate = len(sample) / (time.perf_counter() - start)
+        
+        self.assertEqual(len(batch), 50000)
+        self.assertGreater(batch_rate, 5 * scalar_rate)
+
+
 if __name__ == '__main__':
     # Configuration des tests
     unittest.main(verbosity=2, buffer=True)
@@ -0,0 +1,191 @@
+"""
+Tests unitaires pour le registre des lecteurs de classeurs (readers.py)
+"""
+
+import unittest
+import sys
+import os
+import importlib.util
+import shutil
+import tempfile
+import time
+import zipfile
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.excel_loader import ExcelDataLoader, SheetGridCache
+from modules.core.readers import (
+    CsvSheetReader, MAGIC_OLE2, ODS_MIMETYPE, XlsxSheetReader, open_sheet_reader,
+    register_reader, sniff_format, supported_extensions, _readers
+)
+from modules.core.xlsx_stream import clear_shared_readers
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'assets', 'template_excel.xlsx')
+
+
+class TestSniffing(unittest.TestCase):
+    """Tests de la reconnaissance du format d'après le contenu"""
+
+    def setUp(self):
+        with open(TEMPLATE_PATH, 'rb') as f:
+            self.xlsx_content = f.read()
+
+    def test_xlsx_recognised_regardless_of_extension(self):
+        """Test qu'un XLSX renommé en .xls reste lu comme XLSX"""
+        self.assertEqual(sniff_format(TEMPLATE_PATH), 'xlsx')
+        self.assertEqual(sniff_format(self.xlsx_content, 'export_banque.xls'), 'xlsx')
+        self.assertEqual(sniff_format(memoryview(self.xlsx_content)), 'xlsx')
+
+    def test_binary_signatures(self):
+        """Test des signatures OLE2 (xls) et OpenDocument (ods)"""
+        self.assertEqual(sniff_format(MAGIC_OLE2 + b'\x00' * 512, 'ancien.xls'), 'xls')
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            ods_path = os.path.join(temp_dir, 'classeur.ods')
+            with zipfile.ZipFile(ods_path, 'w') as archive:
+                archive.writestr('mimetype', ODS_MIMETYPE)
+                archive.writestr('content.xml', '<office:document-content/>')
+            self.assertEqual(sniff_format(ods_path), 'ods')
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_text_content(self):
+        """Test qu'un texte n'est un CSV que si son nom ne prétend pas être un classeur"""
+        content = b"poste;montant\nventes;100\n"
+        self.assertEqual(sniff_format(content), 'csv')
+        self.assertEqual(sniff_format(content, 'export.csv'), 'csv')
+        self.assertIsNone(sniff_format(content, 'liasse.xlsx'))
+        self.assertIsNone(sniff_format(b'\x00\x01binaire'))
+        with self.assertRaises(ValueError):
+            open_sheet_reader(b"pas un classeur", 'faux.xlsx')
+
+    def test_supported_extensions(self):
+        """Test que les extensions proposées à l'import viennent du registre"""
+        extensions = supported_extensions()
+        for extension in ('.xlsx', '.xls', '.ods', '.csv'):
+            self.assertIn(extension, extensions)
+        self.assertEqual(ExcelDataLoader().supported_formats, extensions)
+
+
+class TestCsvReader(unittest.TestCase):
+    """Tests du lecteur CSV typé"""
+
+    def test_semicolon_and_typed_cells(self):
+        """Test du séparateur point-virgule et du typage des cellules"""
+        content = "\ufeffposte;montant;taux\nventes;1500;0.25\nachats;;\n".encode('utf-8')
+        with open_sheet_reader(content, 'export.csv') as reader:
+            self.assertIsInstance(reader, CsvSheetReader)
+            grid = reader.read_sheet('CSV')
+        self.assertEqual(grid.shape, (3, 3))
+        self.assertEqual(list(grid[0]), ['poste', 'montant', 'taux'])
+        self.assertEqual(list(grid[1]), ['ventes', 1500, 0.25])
+        self.assertIsNone(grid[2, 1])
+
+    def test_windows_encoding(self):
+        """Test d'un export Excel français en Windows-1252"""
+        content = "poste,montant\nRésultat net,12\n".encode('cp1252')
+        with open_sheet_reader(content, 'export.csv') as reader:
+            self.assertEqual(reader.read_sheet('CSV')[1, 0], 'Résultat net')
+
+    def test_read_grid_pads_and_filters_rows(self):
+        """Test que read_grid a la sémantique du lecteur en flux"""
+        reader = open_sheet_reader(b"a,b\nc,d\ne,f\n", 'export.csv')
+        grid = reader.read_grid('CSV', (4, 3), rows=[1, 3])
+        self.assertEqual(grid.shape, (4, 3))
+        self.assertEqual(list(grid[:, 0]), ['a', None, 'e', None])
+        with self.assertRaises(KeyError):
+            reader.read_sheet('Bilan')
+
+
+class TestRegistry(unittest.TestCase):
+    """Tests de l'extension du registre et de la parité des chargeurs"""
+
+    def tearDown(self):
+        clear_shared_readers()
+
+    def test_register_custom_reader(self):
+        """Test qu'un format ajouté au registre est reconnu avant les autres"""
+        class TsvReportReader(CsvSheetReader):
+            format = 'rapport'
+            extensions = ('.rpt',)
+
+            @classmethod
+            def sniff(cls, signature):
+                return signature.head.startswith(b'#RAPPORT')
+
+        register_reader(TsvReportReader, first=True)
+        try:
+            self.assertEqual(sniff_format(b"#RAPPORT\tv1\nx\t1\n"), 'rapport')
+            self.assertIn('.rpt', supported_extensions())
+        finally:
+            _readers.remove(TsvReportReader)
+
+    def test_xlsx_reader_matches_pandas(self):
+        """Test que les grilles décodées en flux égalent celles de pd.read_excel"""
+        expected = SheetGridCache(pd.ExcelFile(TEMPLATE_PATH))
+        with open_sheet_reader(TEMPLATE_PATH) as reader:
+            self.assertIsInstance(reader, XlsxSheetReader)
+            sheets = SheetGridCache(reader)
+            for sheet_name in ('Bilan', 'CR', 'TFT'):
+                with self.subTest(sheet=sheet_name):
+                    np.testing.assert_array_equal(sheets.get(sheet_name), expected.get(sheet_name))
+                    self.assertEqual(sheets.anchors(sheet_name).labels, expected.anchors(sheet_name).labels)
+
+    def test_loaders_accept_misnamed_xlsx(self):
+        """Test que les deux chargeurs lisent un XLSX nommé .xls"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            misnamed = os.path.join(temp_dir, 'liasse.xls')
+            shutil.copy(TEMPLATE_PATH, misnamed)
+            loader = ExcelDataLoader()
+            self.assertEqual(loader.load_excel_template(misnamed), loader.load_excel_template(TEMPLATE_PATH))
+            analyzer = FinancialAnalyzer()
+            self.assertEqual(analyzer.load_excel_template(misnamed), analyzer.load_excel_template(TEMPLATE_PATH))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_loader_closes_reader_on_error(self):
+        """Test que le chargeur ferme le lecteur quand l'extraction échoue"""
+        loader = ExcelDataLoader()
+        with patch.object(XlsxSheetReader, 'close', autospec=True) as close, \
+                patch.object(loader, '_extract_cr_precise', side_effect=RuntimeError("extraction")):
+            self.assertIsNone(loader.load_excel_template(TEMPLATE_PATH))
+        close.assert_called_once()
+
+    @unittest.skipUnless(importlib.util.find_spec('xlrd'), "xlrd non installé")
+    def test_xls_reader(self):
+        """Test du lecteur xlrd sur un en-tête OLE2 invalide : erreur de lecture, pas de repli silencieux"""
+        with self.assertRaises(Exception):
+            open_sheet_reader(MAGIC_OLE2 + b'\x00' * 512)
+
+    def test_stream_decode_faster_than_pandas(self):
+        """Benchmark : décodage complet des trois feuilles, lecteur en flux contre pd.read_excel"""
+        repeat = 5
+        start = time.perf_counter()
+        for _ in range(repeat):
+            sheets = SheetGridCache(pd.ExcelFile(TEMPLATE_PATH))
+            for sheet_name in ('Bilan', 'CR', 'TFT'):
+                sheets.get(sheet_name)
+        pandas_time = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            with open_sheet_reader(TEMPLATE_PATH) as reader:
+                sheets = SheetGridCache(reader)
+                for sheet_name in ('Bilan', 'CR', 'TFT'):
+                    sheets.get(sheet_name)
+        stream_time = (time.perf_counter() - start) / repeat
+
+        self.assertLess(stream_time, pandas_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
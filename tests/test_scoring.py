@@ -0,0 +1,234 @@
+"""
+Tests unitaires pour le score piloté par grille (scoring.py)
+"""
+
+import unittest
+import sys
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.scoring import (SCORE_ABSOLU, SCORE_SECTORIEL, QuartileTable, ScoreGrid, ScoreRule,
+                                  SectorTables, get_score_grid)
+
+
+def ladder(value, steps, otherwise):
+    """Échelon historique : premier (condition, points) vérifié, sinon ``otherwise``"""
+    for condition, points in steps:
+        if condition(value):
+            return points
+    return otherwise
+
+
+def legacy_score(ratios):
+    """Barème historique de calculate_score (échelles if/elif), référence de parité"""
+    def at_least(threshold):
+        return lambda value: value >= threshold
+
+    def at_most(threshold):
+        return lambda value: value <= threshold
+
+    ladders = {
+        'liquidite': [
+            ('ratio_liquidite_generale', [(at_least(2.0), 15), (at_least(1.5), 12), (at_least(1.0), 8)], 3),
+            ('ratio_liquidite_immediate', [(at_least(1.0), 10), (at_least(0.8), 8), (at_least(0.6), 5)], 2),
+            ('bfr_jours_ca', [(at_most(30), 10), (at_most(60), 7), (at_most(90), 4)], 1),
+            ('tresorerie_nette', [(lambda value: value > 0, 5)], 1),
+        ],
+        'solvabilite': [
+            ('ratio_autonomie_financiere', [(at_least(50), 20), (at_least(40), 16), (at_least(30), 12),
+                                            (at_least(20), 8)], 3),
+            ('ratio_endettement', [(at_most(50), 15), (at_most(65), 12), (at_most(80), 8)], 3),
+            ('capacite_remboursement', [(at_most(3), 5), (at_most(5), 3)], 1),
+        ],
+        'rentabilite': [
+            ('roe', [(at_least(15), 10), (at_least(10), 8), (at_least(5), 5)], 2),
+            ('roa', [(at_least(5), 8), (at_least(3), 6), (at_least(1), 4)], 1),
+            ('marge_nette', [(at_least(10), 7), (at_least(5), 5), (at_least(2), 3)], 1),
+            ('marge_exploitation', [(at_least(10), 5), (at_least(5), 4), (at_least(2), 2)], 1),
+        ],
+        'activite': [
+            ('rotation_actif', [(at_least(2.0), 5), (at_least(1.5), 4), (at_least(1.0), 3)], 1),
+            ('rotation_stocks', [(at_least(8), 5), (at_least(6), 4), (at_least(4), 3)], 1),
+            ('delai_recouvrement_clients', [(at_most(30), 5), (at_most(45), 4), (at_most(60), 3)], 1),
+        ],
+        'gestion': [
+            ('productivite_personnel', [(at_least(3), 5), (at_least(2), 4), (at_least(1.5), 3)], 1),
+            ('taux_charges_personnel', [(at_most(40), 5), (at_most(50), 4), (at_most(60), 3)], 1),
+            ('ratio_cafg_ca', [(at_least(10), 5), (at_least(7), 4), (at_least(5), 3)], 1),
+        ],
+    }
+    scores = {}
+    for component, rules in ladders.items():
+        scores[component] = sum(ladder(ratios[name], steps, otherwise)
+                                for name, steps, otherwise in rules if name in ratios)
+    scores['global'] = min(100, int(sum(scores.values()) * 100 / 140))
+    return scores
+
+
+def random_ratios(n_rows, seed=0):
+    """Ratios aléatoires : valeurs sur les seuils, juste autour, quelconques ou absentes"""
+    rng = random.Random(seed)
+    grid = get_score_grid()
+    rows = []
+    for _ in range(n_rows):
+        ratios = {}
+        for rule in grid.rules:
+            roll = rng.random()
+            if roll < 0.15:
+                continue
+            if roll < 0.5:
+                ratios[rule.ratio] = rng.choice(rule.thresholds) + rng.choice((0.0, -1e-9, 1e-9))
+            else:
+                ratios[rule.ratio] = rng.uniform(-50, 150)
+        rows.append(ratios)
+    return rows
+
+
+class TestScoreGrid(unittest.TestCase):
+    """Tests de parité avec le barème historique et de la notation en colonnes"""
+
+    def setUp(self):
+        self.analyzer = FinancialAnalyzer()
+
+    def test_scalar_parity(self):
+        """Test que chaque analyse obtient les mêmes points par composante et le même score global"""
+        for ratios in random_ratios(5000):
+            self.assertEqual(self.analyzer.calculate_score(ratios), legacy_score(ratios), ratios)
+        self.assertEqual(self.analyzer.calculate_score({}), legacy_score({}))
+
+    def test_frame_parity(self):
+        """Test qu'un DataFrame de ratios donne un DataFrame de scores identique, ligne par ligne"""
+        rows = random_ratios(3000, seed=1)
+        frame = pd.DataFrame(rows, index=[f"E{row}" for row in range(len(rows))])
+        scores = self.analyzer.calculate_score_batch(frame)
+        expected = pd.DataFrame([legacy_score(ratios) for ratios in rows], index=frame.index)
+        self.assertEqual(list(scores.columns), list(expected.columns))
+        pd.testing.assert_frame_equal(scores, expected, check_dtype=False)
+
+        # Colonne absente : aucun point pour ce ratio
+        partial = self.analyzer.calculate_score_batch(frame.drop(columns=['roe']))
+        expected = [legacy_score({name: value for name, value in ratios.items() if name != 'roe'})['rentabilite']
+                    for ratios in rows]
+        self.assertEqual(partial['rentabilite'].tolist(), expected)
+
+    def test_edited_grid(self):
+        """Test qu'un barème modifié s'applique sans toucher au code"""
+        grid = ScoreGrid([ScoreRule('roe', 'rentabilite', '>=', (5.0, 20.0), (0, 10, 40))], total_points=40)
+        self.assertEqual(grid.score({'roe': 20.0}), {'rentabilite': 40, 'global': 100})
+        self.assertEqual(grid.score({'roe': 19.9}), {'rentabilite': 10, 'global': 25})
+        frame = grid.score_frame(pd.DataFrame({'roe': [20.0, 4.0, np.nan]}))
+        self.assertEqual(frame['global'].tolist(), [100, 0, 0])
+
+        with self.assertRaises(ValueError):
+            ScoreGrid([ScoreRule('roe', 'rentabilite', '>=', (20.0, 5.0), (0, 10, 40))])
+        with self.assertRaises(ValueError):
+            ScoreGrid([ScoreRule('roe', 'rentabilite', '>=', (5.0,), (0, 10, 40))])
+        with self.assertRaises(ValueError):
+            ScoreGrid([ScoreRule('roe', 'rentabilite', '=', (5.0,), (0, 10))])
+
+    def test_benchmark_rows_per_second(self):
+        """Benchmark : notation en colonnes contre notation analyse par analyse"""
+        frame = pd.DataFrame(random_ratios(2000, seed=2) * 50)
+        start = time.perf_counter()
+        scores = self.analyzer.calculate_score_batch(frame)
+        batch_rate = len(frame) / (time.perf_counter() - start)
+
+        sample = frame.head(2000).to_dict('records')
+        sample = [{name: value for name, value in ratios.items() if value == value} for ratios in sample]
+        start = time.perf_counter()
+        for ratios in sample:
+            self.analyzer.calculate_score(ratios)
+        scalar_rate = len(sample) / (time.perf_counter() - start)
+
+        self.assertEqual(len(scores), len(frame))
+        self.assertGreater(batch_rate, 10 * scalar_rate)
+
+
+class TestSectorScoring(unittest.TestCase):
+    """Tests de la notation relative aux quartiles du secteur"""
+
+    def setUp(self):
+        self.analyzer = FinancialAnalyzer()
+
+    def test_quartile_positions(self):
+        """Test de l'interpolation : quartiles, points intermédiaires et bornes"""
+        table = QuartileTable.from_quartiles(8, 15, 22)
+        self.assertEqual([table.position(value) for value in (8, 15, 22)], [0.25, 0.5, 0.75])
+        self.assertEqual(table.position(11.5), 0.375)
+        self.assertEqual(table.position(-1000), 0.0)
+        self.assertEqual(table.position(1000), 1.0)
+        with self.assertRaises(ValueError):
+            QuartileTable.from_quartiles(3, 2, 1)
+
+        rule = ScoreRule('roe', 'rentabilite', '>=', (5, 10, 15), (2, 5, 8, 10))
+        self.assertEqual([rule.score_position(position) for position in (0.0, 0.5, 1.0)], [2, 6, 10])
+        lower_is_better = ScoreRule('ratio_endettement', 'solvabilite', '<=', (50, 65, 80), (15, 12, 8, 3))
+        self.assertEqual(lower_is_better.score_position(0.0), 15)
+        self.assertEqual(lower_is_better.score_position(1.0), 3)
+
+    def test_sector_relative_score(self):
+        """Test que la même entreprise est notée différemment selon son secteur"""
+        ratios = {'roe': 15.0, 'marge_nette': 2.0, 'roa': 4.0}
+        absolute = self.analyzer.calculate_score(ratios, 'services_professionnels')
+        self.assertEqual(absolute, self.analyzer.calculate_score(ratios))
+
+        industrie = self.analyzer.calculate_score(ratios, 'industrie_manufacturiere', mode=SCORE_SECTORIEL)
+        services = self.analyzer.calculate_score(ratios, 'services_professionnels', mode=SCORE_SECTORIEL)
+        # roe à la médiane de l'industrie (6 points), marge nette au q1 (3), roa noté en absolu (6)
+        self.assertEqual(industrie['rentabilite'], 6 + 3 + 6)
+        self.assertLess(services['rentabilite'], industrie['rentabilite'])
+
+        # Secteur inconnu : seuils absolus
+        self.assertEqual(self.analyzer.calculate_score(ratios, 'inconnu', mode=SCORE_SECTORIEL), absolute)
+        self.analyzer.score_mode = SCORE_SECTORIEL
+        self.assertEqual(self.analyzer.calculate_score(ratios, 'industrie_manufacturiere'), industrie)
+        self.assertEqual(self.analyzer.calculate_score(ratios, 'industrie_manufacturiere', SCORE_ABSOLU), absolute)
+        with self.assertRaises(ValueError):
+            self.analyzer.calculate_score(ratios, 'industrie_manufacturiere', mode='percentile')
+
+    def test_sectoral_norms_file(self):
+        """Test des tables lues dans data/sectoral_norms.json (noms ramenés à ceux du moteur)"""
+        tables = SectorTables.from_json()
+        self.assertIn('industrie', tables)
+        self.assertIn('ratio_endettement', tables.for_sector('industrie'))
+        self.assertIn('delai_recouvrement_clients', tables.for_sector('btp'))
+
+        grid = get_score_grid()
+        # Endettement : plus bas est meilleur, le q1 du secteur rapporte plus que le q3
+        q1, _, q3 = tables.for_sector('industrie')['ratio_endettement'].values[1:4]
+        low = grid.score({'ratio_endettement': q1}, tables, 'industrie')['solvabilite']
+        high = grid.score({'ratio_endettement': q3}, tables, 'industrie')['solvabilite']
+        self.assertGreater(low, high)
+
+    def test_frame_parity(self):
+        """Test qu'un portefeuille multi-secteurs égale la notation ligne par ligne"""
+        rows = random_ratios(3000, seed=3)
+        sectors = list(self.analyzer.ratios_sectoriels) + ['inconnu', None]
+        rng = random.Random(3)
+        row_sectors = [rng.choice(sectors) for _ in rows]
+        frame = pd.DataFrame(rows)
+
+        scores = self.analyzer.calculate_score_batch(frame, row_sectors, mode=SCORE_SECTORIEL)
+        expected = pd.DataFrame([self.analyzer.calculate_score(ratios, sector, mode=SCORE_SECTORIEL)
+                                 for ratios, sector in zip(rows, row_sectors)])
+        pd.testing.assert_frame_equal(scores, expected, check_dtype=False)
+
+        # Un seul secteur pour tout le portefeuille
+        single = self.analyzer.calculate_score_batch(frame, 'commerce_detail', mode=SCORE_SECTORIEL)
+        self.assertEqual(single['global'].tolist(),
+                         [self.analyzer.calculate_score(ratios, 'commerce_detail', SCORE_SECTORIEL)['global']
+                          for ratios in rows])
+        pd.testing.assert_frame_equal(self.analyzer.calculate_score_batch(frame, row_sectors),
+                                      self.analyzer.calculate_score_batch(frame))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests unitaires pour le module sources.py (analyse en mémoire)
+"""
+
+import unittest
+import sys
+import os
+import io
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.excel_loader import ExcelDataLoader
+from modules.core.sources import BufferReader, as_readable, describe_source
+from tests.test_xlsx_stream import create_template_workbook
+
+
+class TestBufferReader(unittest.TestCase):
+    """Tests pour le lecteur adossé à un memoryview"""
+
+    def test_read_seek_tell(self):
+        """Test des opérations de lecture utilisées par zipfile"""
+        reader = BufferReader(memoryview(b"0123456789"))
+        self.assertEqual(reader.read(3), b"012")
+        self.assertEqual(reader.tell(), 3)
+        reader.seek(-2, io.SEEK_END)
+        self.assertEqual(reader.read(), b"89")
+        self.assertEqual(reader.read(5), b"")
+        reader.seek(1)
+        target = bytearray(4)
+        self.assertEqual(reader.readinto(target), 4)
+        self.assertEqual(bytes(target), b"1234")
+
+    def test_as_readable(self):
+        """Test de la normalisation des sources"""
+        self.assertEqual(as_readable("liasse.xlsx"), "liasse.xlsx")
+        self.assertIsInstance(as_readable(b"abc"), BufferReader)
+        self.assertIsInstance(as_readable(memoryview(b"abc")), BufferReader)
+
+        stream = io.BytesIO(b"abc")
+        stream.read()
+        self.assertIs(as_readable(stream), stream)
+        self.assertEqual(stream.tell(), 0)
+
+        with self.assertRaises(TypeError):
+            as_readable(42)
+
+    def test_describe_source(self):
+        """Test du libellé affiché pendant le chargement"""
+        self.assertEqual(describe_source("liasse.xlsx"), "liasse.xlsx")
+        self.assertEqual(describe_source(b"abcd"), "<mémoire: 4 octets>")
+
+
+class TestInMemoryAnalysis(unittest.TestCase):
+    """Tests de l'analyse d'un classeur sans fichier temporaire"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "liasse.xlsx")
+        create_template_workbook(self.path)
+        with open(self.path, 'rb') as f:
+            self.content = f.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _sources(self):
+        return {
+            'bytes': self.content,
+            'memoryview': memoryview(bytearray(self.content)),
+            'fichier': io.BytesIO(self.content),
+        }
+
+    def test_analyzer_sources_match_path(self):
+        """Test que FinancialAnalyzer donne le même résultat pour toutes les sources"""
+        analyzer = FinancialAnalyzer()
+        reference = analyzer.load_excel_template(self.path)
+        self.assertIsNotNone(reference)
+
+        for label, source in self._sources().items():
+            with self.subTest(source=label):
+                self.assertEqual(analyzer.load_excel_template(source), reference)
+
+    def test_analyzer_openpyxl_fallback_accepts_buffer(self):
+        """Test que le chemin openpyxl accepte aussi un memoryview"""
+        analyzer = FinancialAnalyzer()
+        reference = analyzer.load_excel_template(self.path, use_streaming=False)
+        data = analyzer.load_excel_template(memoryview(self.content), use_streaming=False)
+        self.assertEqual(data, reference)
+
+    def test_excel_loader_sources_match_path(self):
+        """Test que ExcelDataLoader accepte bytes, memoryview et objet fichier"""
+        loader = ExcelDataLoader()
+        reference = loader.load_excel_template(self.path)
+        self.assertIsNotNone(reference)
+
+        for label, source in self._sources().items():
+            with self.subTest(source=label):
+                self.assertEqual(loader.load_excel_template(source), reference)
+
+    def test_analyze_excel_file_without_temp_file(self):
+        """Test qu'aucun fichier temporaire n'est créé pendant l'analyse"""
+        analyzer = FinancialAnalyzer()
+        with patch('tempfile.NamedTemporaryFile', side_effect=AssertionError("fichier temporaire")):
+            result = analyzer.analyze_excel_file(memoryview(self.content), 'commerce')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data'], analyzer.load_excel_template(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Tests unitaires pour les enregistrements compacts à schéma fixe (statement.py)
+"""
+
+import unittest
+import sys
+import os
+import json
+import pickle
+
+import numpy as np
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer
+from modules.core.ratios import MODE_ANALYSE, MODE_COMPLET, RatioEngine, RatiosCalculator
+from modules.core.statement import (STATEMENT_SCHEMA, FinancialStatement, RatioRecord,
+                                    json_default, stack_records)
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'assets', 'template_excel.xlsx')
+
+
+def realistic_data(seed=0):
+    """Tous les postes du schéma renseignés, montants distincts"""
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(10000, 5000000, size=len(STATEMENT_SCHEMA)).astype(float)
+    return dict(zip(STATEMENT_SCHEMA.names, amounts.tolist()))
+
+
+def dict_bytes(mapping):
+    """Coût d'une analyse en dict : table du dict et floats encapsulés (clés partagées exclues)"""
+    return sys.getsizeof(mapping) + sum(sys.getsizeof(value) for value in mapping.values())
+
+
+def record_bytes(record):
+    """Coût d'un enregistrement : objet, tableau float64 et postes hors schéma (schéma partagé exclu)"""
+    values = record.as_array()
+    return sys.getsizeof(record) + sys.getsizeof(values) + (sys.getsizeof(record._extras) if record._extras else 0)
+
+
+class TestFixedRecord(unittest.TestCase):
+    """Tests de l'accès de type dict et des conversions"""
+
+    def setUp(self):
+        self.data = FinancialAnalyzer().load_excel_template(TEMPLATE_PATH)
+
+    def test_round_trip(self):
+        """Test que la conversion aller-retour restitue le dict, ordre compris"""
+        statement = FinancialStatement.from_mapping(self.data)
+        self.assertEqual(statement.to_dict(), self.data)
+        self.assertEqual(list(statement), list(self.data))
+        self.assertEqual(len(statement), len(self.data))
+        self.assertEqual(statement, self.data)
+        self.assertIs(FinancialStatement.from_mapping(statement), statement)
+
+    def test_dict_access(self):
+        """Test des accès, absences, clés hors schéma et valeurs non numériques"""
+        statement = FinancialStatement.from_mapping({'chiffre_affaires': 1500, 'commentaire': 'audité'})
+        self.assertEqual(statement['chiffre_affaires'], 1500.0)
+        self.assertIsInstance(statement['chiffre_affaires'], float)
+        self.assertEqual(statement['commentaire'], 'audité')
+        self.assertNotIn('stocks', statement)
+        self.assertEqual(statement.get('stocks', 0), 0)
+        with self.assertRaises(KeyError):
+            statement['stocks']
+
+        statement['stocks'] = 200
+        statement['tresorerie'] = 'non communiqué'
+        self.assertEqual(statement['stocks'], 200.0)
+        self.assertEqual(statement['tresorerie'], 'non communiqué')
+        statement['tresorerie'] = 50
+        self.assertEqual(statement['tresorerie'], 50.0)
+        del statement['stocks']
+        self.assertNotIn('stocks', statement)
+        with self.assertRaises(KeyError):
+            del statement['stocks']
+        self.assertEqual(dict(statement), {'tresorerie': 50.0, 'chiffre_affaires': 1500.0, 'commentaire': 'audité'})
+
+        copy = statement.copy()
+        copy['tresorerie'] = 0
+        self.assertEqual(statement['tresorerie'], 50.0)
+        self.assertEqual(pickle.loads(pickle.dumps(statement)), statement)
+
+    def test_zero_copy_array(self):
+        """Test que from_array et as_array partagent le tableau"""
+        matrix = np.zeros((3, len(STATEMENT_SCHEMA)))
+        row = FinancialStatement.from_array(matrix[1])
+        row['chiffre_affaires'] = 42
+        self.assertEqual(matrix[1, STATEMENT_SCHEMA.index['chiffre_affaires']], 42)
+        self.assertTrue(np.shares_memory(row.as_array(), matrix))
+        with self.assertRaises(ValueError):
+            FinancialStatement.from_array(np.zeros(3))
+
+    def test_json_export(self):
+        """Test de l'export JSON des enregistrements"""
+        statement = FinancialStatement.from_mapping(self.data)
+        exported = json.loads(json.dumps({'data': statement}, default=json_default))
+        self.assertEqual(exported['data'], self.data)
+        result = FinancialAnalyzer().export_analysis_json({'data': statement, 'ratios': RatioRecord(), 'scores': {}})
+        self.assertEqual(json.loads(result)['donnees_financieres'], self.data)
+
+    def test_memory_per_analysis(self):
+        """
+        Test de l'empreinte mémoire : au moins 5 fois moins que les dicts
+
+        Coût marginal d'une analyse supplémentaire. Les chaînes des clés (mêmes
+        objets pour toutes les analyses) et le schéma des enregistrements
+        (un par processus) sont des coûts fixes partagés, exclus des deux côtés.
+        """
+        data = realistic_data()
+        ratios = RatiosCalculator(MODE_COMPLET).calculate_ratios(data)
+        statement = FinancialStatement.from_mapping(data)
+        record = RatioRecord.from_mapping(ratios)
+
+        before = dict_bytes(data) + dict_bytes(ratios)
+        after = record_bytes(statement) + record_bytes(record)
+        self.assertGreaterEqual(before / after, 5)
+
+
+class TestRecordRatios(unittest.TestCase):
+    """Tests du calcul des ratios sur enregistrements"""
+
+    def test_ratios_match_dict(self):
+        """Test que les deux modes donnent le même résultat sur dict et sur enregistrement"""
+        for seed in range(5):
+            data = realistic_data(seed)
+            del data['stocks']
+            statement = FinancialStatement.from_mapping(data)
+            for mode in (MODE_ANALYSE, MODE_COMPLET):
+                calculator = RatiosCalculator(mode)
+                self.assertEqual(calculator.calculate_ratios(statement), calculator.calculate_ratios(data))
+
+    def test_engine_cache_fingerprint(self):
+        """Test que le moteur mémorise un enregistrement par son contenu"""
+        engine = RatioEngine()
+        statement = FinancialStatement.from_mapping(realistic_data())
+        first = engine.calculate(statement)
+        statement_bis = statement.copy()
+        self.assertEqual(engine.calculate(statement_bis), first)
+        self.assertEqual(engine.stats, {'hits': 1, 'misses': 1})
+        statement_bis['chiffre_affaires'] = 1
+        self.assertNotEqual(engine.calculate(statement_bis), first)
+
+    def test_stack_records_batch(self):
+        """Test que le portefeuille assemblé égale le calcul enregistrement par enregistrement"""
+        statements = [FinancialStatement.from_mapping(realistic_data(seed)) for seed in range(20)]
+        calculator = RatiosCalculator(MODE_COMPLET)
+        batch = calculator.calculate_all_ratios_batch(stack_records(statements))
+        for row, statement in enumerate(statements):
+            self.assertEqual(batch.iloc[row].dropna().to_dict(), calculator.calculate_ratios(statement))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Tests unitaires pour l'identification des variantes de modèle (template_variants.py)
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import openpyxl
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer, TEMPLATE_CELLS
+from modules.core.cell_mapping import CellField, TEMPLATE_SCHEMA, read_sheet_grid
+from modules.core.template_variants import (
+    TemplateVariantRegistry, get_template_registry, normalize_label, sheet_fingerprint, shift_fields
+)
+from modules.core.xlsx_stream import open_mapped_workbook, split_cell_ref
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'assets', 'template_excel.xlsx')
+
+
+def create_labelled_workbook(path, cr_inserted_row=None):
+    """
+    Classeur avec libellés en colonne A et une valeur distincte par poste
+
+    Avec ``cr_inserted_row``, une ligne est insérée dans le CR à cette position :
+    les libellés et les postes suivants descendent d'une ligne.
+    """
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+
+    for sheet_index, sheet_name in enumerate(('Bilan', 'CR', 'TFT')):
+        sheet = workbook.create_sheet(sheet_name)
+        shift_from = cr_inserted_row if sheet_name == 'CR' and cr_inserted_row else None
+        last_row = TEMPLATE_SCHEMA.sheet(sheet_name).shape[0]
+
+        def target_row(row):
+            return row + 1 if shift_from and row >= shift_from else row
+
+        for row in range(1, last_row + 1):
+            sheet.cell(row=target_row(row), column=1, value=f"{sheet_name} poste {row}")
+        if shift_from:
+            sheet.cell(row=shift_from, column=1, value="Ligne ajoutée par le client")
+            sheet.cell(row=shift_from, column=5, value=999999)
+
+        for position, cell_ref in enumerate(TEMPLATE_CELLS[sheet_name]):
+            row, col = split_cell_ref(cell_ref)
+            sheet.cell(row=target_row(row), column=col,
+                       value=(sheet_index + 1) * 100000 + position * 1000 + 0.5)
+
+    workbook.save(path)
+    workbook.close()
+
+
+def read_grids(path):
+    """Grilles des trois feuilles sur l'étendue du modèle officiel"""
+    workbook = open_mapped_workbook(path, TEMPLATE_CELLS)
+    grids = {sheet: read_sheet_grid(workbook, TEMPLATE_SCHEMA.sheet(sheet)) for sheet in ('Bilan', 'CR', 'TFT')}
+    workbook.close()
+    return grids
+
+
+class TestFingerprint(unittest.TestCase):
+    """Tests pour l'empreinte des colonnes de libellés"""
+
+    def test_normalize_label(self):
+        """Test que casse, espaces et entiers stockés en flottants sont neutralisés"""
+        self.assertEqual(normalize_label("  Chiffre   d'affaires "), "CHIFFRE D'AFFAIRES")
+        self.assertEqual(normalize_label(12.0), normalize_label(12))
+        self.assertEqual(normalize_label(None), '')
+
+    def test_fingerprint_ignores_formatting(self):
+        """Test qu'une différence de mise en forme des libellés ne change pas l'empreinte"""
+        grid = np.array([['Clients', 1.0], ['Stocks', 2.0]], dtype=object)
+        spaced = np.array([[' CLIENTS ', 5.0], ['stocks', 6.0]], dtype=object)
+        shifted = np.array([['Stocks', 1.0], ['Clients', 2.0]], dtype=object)
+        self.assertEqual(sheet_fingerprint(grid, ('A',), 2), sheet_fingerprint(spaced, ('A',), 2))
+        self.assertNotEqual(sheet_fingerprint(grid, ('A',), 2), sheet_fingerprint(shifted, ('A',), 2))
+
+    def test_official_template_is_registered(self):
+        """Test que le modèle officiel est reconnu, en flux comme via openpyxl"""
+        registry = get_template_registry()
+        match = registry.identify(read_grids(TEMPLATE_PATH))
+        self.assertTrue(match.known)
+        self.assertEqual(set(match.variants.values()), {'officiel_bceao'})
+
+        workbook = openpyxl.load_workbook(TEMPLATE_PATH, data_only=True)
+        grids = {sheet: read_sheet_grid(workbook, TEMPLATE_SCHEMA.sheet(sheet)) for sheet in ('Bilan', 'CR', 'TFT')}
+        workbook.close()
+        self.assertEqual(registry.fingerprint(grids), match.fingerprints)
+
+    def test_fingerprint_cost(self):
+        """Benchmark : l'empreinte d'un classeur est négligeable devant sa lecture"""
+        registry = TemplateVariantRegistry()
+        start = time.perf_counter()
+        grids = read_grids(TEMPLATE_PATH)
+        read_time = time.perf_counter() - start
+
+        repeat = 200
+        start = time.perf_counter()
+        for _ in range(repeat):
+            registry.fingerprint(grids)
+        elapsed = (time.perf_counter() - start) / repeat
+
+        self.assertLess(elapsed * 10, read_time)
+
+
+class TestVariantRegistry(unittest.TestCase):
+    """Tests pour la résolution des variantes et le signalement des inconnues"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.official_path = os.path.join(self.temp_dir, "officiel.xlsx")
+        self.shifted_path = os.path.join(self.temp_dir, "ligne_inseree.xlsx")
+        create_labelled_workbook(self.official_path)
+        create_labelled_workbook(self.shifted_path, cr_inserted_row=12)
+
+        official = TemplateVariantRegistry().fingerprint(read_grids(self.official_path))
+        shifted = TemplateVariantRegistry().fingerprint(read_grids(self.shifted_path))
+        self.registry = TemplateVariantRegistry()
+        self.registry.register_config({'name': 'officiel', 'fingerprints': official})
+        self.registry.register_config({
+            'name': 'cr_ligne_12_inseree',
+            'fingerprints': {'CR': [shifted['CR']]},
+            'row_shifts': {'CR': [[12, 1]]},
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _analyzer(self):
+        analyzer = FinancialAnalyzer()
+        analyzer.template_registry = self.registry
+        return analyzer
+
+    def test_shift_fields(self):
+        """Test du décalage cumulatif des lignes et des déplacements isolés"""
+        fields = [CellField('CR', 'E10', 'a'), CellField('CR', 'E20', 'b'), CellField('Bilan', 'E20', 'c')]
+        shifted = shift_fields(fields, {'CR': [[12, 1], [15, 1]]}, {'c': 'F21'})
+        self.assertEqual([f.cell for f in shifted], ['E10', 'E22', 'F21'])
+
+    def test_shifted_variant_reads_same_values(self):
+        """Test qu'une ligne insérée est absorbée par la variante enregistrée"""
+        analyzer = self._analyzer()
+        shifted = analyzer.load_excel_template(self.shifted_path)
+        self.assertEqual(analyzer.template_match.variants,
+                         {'Bilan': 'officiel', 'CR': 'cr_ligne_12_inseree', 'TFT': 'officiel'})
+        self.assertEqual(shifted, self._analyzer().load_excel_template(self.official_path))
+        self.assertEqual(shifted, analyzer.load_excel_template(self.shifted_path, use_streaming=False))
+
+    def test_unknown_variant_is_reported(self):
+        """Test qu'une variante inconnue est signalée et lue avec le schéma officiel"""
+        registry = TemplateVariantRegistry()
+        analyzer = FinancialAnalyzer()
+        analyzer.template_registry = registry
+        analyzer.load_excel_template(self.shifted_path)
+        analyzer.load_excel_template(self.shifted_path)
+
+        self.assertFalse(analyzer.template_match.known)
+        self.assertEqual(analyzer.template_match.sheets['CR'], TEMPLATE_SCHEMA.sheet('CR'))
+        report = registry.unknown_report()
+        self.assertEqual({entry['feuille'] for entry in report}, {'Bilan', 'CR', 'TFT'})
+        self.assertTrue(all(entry['occurrences'] == 2 for entry in report))
+
+    def test_resolution_cached_per_fingerprint(self):
+        """Test que la correspondance d'un jeu d'empreintes n'est calculée qu'une fois"""
+        fingerprints = self.registry.fingerprint(read_grids(self.shifted_path))
+        self.assertIs(self.registry.resolve(fingerprints), self.registry.resolve(dict(fingerprints)))
+
+    def test_conflicting_fingerprint_rejected(self):
+        """Test qu'une empreinte ne peut pas désigner deux variantes"""
+        fingerprint = self.registry.variants['officiel'].fingerprints['Bilan'][0]
+        with self.assertRaises(ValueError):
+            self.registry.register_config({'name': 'autre', 'fingerprints': {'Bilan': fingerprint}})
+
+
+if __name__ == '__main__':
+    unittest.main()
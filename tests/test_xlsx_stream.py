@@ -0,0 +1,152 @@
+"""
+Tests unitaires pour le module xlsx_stream.py
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+import openpyxl
+
+# Ajouter le dossier parent au path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.core.analyzer import FinancialAnalyzer, TEMPLATE_CELLS
+from modules.core.xlsx_stream import XlsxStreamReader, open_mapped_workbook, split_cell_ref
+
+
+def create_template_workbook(path, with_tft=True, filler_rows=0):
+    """Crée un classeur au format du modèle BCEAO avec une valeur distincte par cellule mappée"""
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+
+    sheet_names = ['Bilan', 'CR'] + (['TFT'] if with_tft else [])
+    for sheet_index, sheet_name in enumerate(sheet_names):
+        sheet = workbook.create_sheet(sheet_name)
+        sheet['A1'] = f"Feuille {sheet_name}"
+        for position, cell_ref in enumerate(TEMPLATE_CELLS[sheet_name]):
+            sheet[cell_ref] = (sheet_index + 1) * 100000 + position * 1000 + 0.5
+
+        # Lignes hors mapping (libellés, notes, annexes)
+        for row in range(60, 60 + filler_rows):
+            sheet.cell(row=row, column=1, value=f"Annexe ligne {row}")
+            for col in range(2, 10):
+                sheet.cell(row=row, column=col, value=row * col)
+
+    workbook.save(path)
+    workbook.close()
+
+
+class TestXlsxStreamReader(unittest.TestCase):
+    """Tests pour la lecture en flux des cellules mappées"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "liasse.xlsx")
+        self.analyzer = FinancialAnalyzer()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_split_cell_ref(self):
+        """Test de la conversion des adresses de cellules"""
+        self.assertEqual(split_cell_ref('E26'), (26, 5))
+        self.assertEqual(split_cell_ref('AA3'), (3, 27))
+        self.assertEqual(split_cell_ref('$I$35'), (35, 9))
+        with self.assertRaises(ValueError):
+            split_cell_ref('E')
+
+    def test_read_cells_value_types(self):
+        """Test du décodage des types de cellules (nombre, texte partagé, booléen, formule)"""
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = 'Bilan'
+        sheet['E5'] = 1500
+        sheet['E6'] = "12 500,50"
+        sheet['E7'] = True
+        sheet['E8'] = '=E5*2'
+        sheet['E9'] = "12 500,50"
+        workbook.save(self.path)
+        workbook.close()
+
+        with XlsxStreamReader(self.path) as reader:
+            cells = reader.read_cells('Bilan', ['E5', 'E6', 'E7', 'E8', 'E9', 'E10'])
+
+        self.assertEqual(cells['E5'], 1500.0)
+        self.assertEqual(cells['E6'], "12 500,50")
+        self.assertEqual(cells['E9'], "12 500,50")
+        self.assertIs(cells['E7'], True)
+        # Formule sans valeur en cache : même comportement qu'openpyxl data_only
+        self.assertIsNone(cells.get('E8'))
+        self.assertNotIn('E10', cells)
+
+    def test_missing_sheet_raises_key_error(self):
+        """Test qu'une feuille absente lève KeyError comme openpyxl"""
+        create_template_workbook(self.path, with_tft=False)
+        workbook = open_mapped_workbook(self.path, TEMPLATE_CELLS)
+        with self.assertRaises(KeyError):
+            workbook['TFT']
+        workbook.close()
+
+    def test_non_xlsx_source_returns_none(self):
+        """Test qu'une source non XLSX est laissée au chargeur openpyxl"""
+        with open(self.path, 'w') as f:
+            f.write("pas un classeur")
+        self.assertIsNone(open_mapped_workbook(self.path, TEMPLATE_CELLS))
+
+    def test_parity_with_openpyxl(self):
+        """Test que la lecture en flux produit le même dictionnaire que openpyxl"""
+        create_template_workbook(self.path)
+
+        streamed = self.analyzer.load_excel_template(self.path)
+        reference = self.analyzer.load_excel_template(self.path, use_streaming=False)
+
+        self.assertIsNotNone(streamed)
+        self.assertEqual(streamed, reference)
+
+    def test_parity_without_tft(self):
+        """Test du repli TFT identique entre les deux chemins"""
+        create_template_workbook(self.path, with_tft=False)
+
+        streamed = self.analyzer.load_excel_template(self.path)
+        reference = self.analyzer.load_excel_template(self.path, use_streaming=False)
+
+        self.assertEqual(streamed, reference)
+        self.assertEqual(streamed['cafg'], streamed['excedent_brut'] + streamed['dotations_amortissements'])
+
+
+class TestXlsxStreamPerformance(unittest.TestCase):
+    """Comparaison des temps de chargement flux / openpyxl"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "liasse_volumineuse.xlsx")
+        create_template_workbook(self.path, filler_rows=3000)
+        self.analyzer = FinancialAnalyzer()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _best_time(self, use_streaming, repeat=3):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = self.analyzer.load_excel_template(self.path, use_streaming=use_streaming)
+            best = min(best, time.perf_counter() - start)
+        self.assertIsNotNone(data)
+        return best
+
+    def test_streaming_faster_than_openpyxl(self):
+        """Benchmark : le flux s'arrête à la dernière ligne mappée"""
+        openpyxl_time = self._best_time(use_streaming=False, repeat=1)
+        streaming_time = self._best_time(use_streaming=True)
+
+        print(f"\nopenpyxl: {openpyxl_time * 1000:.1f} ms | flux: {streaming_time * 1000:.1f} ms "
+              f"| gain x{openpyxl_time / streaming_time:.1f}")
+        self.assertLess(streaming_time, openpyxl_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,6 @@ Développé par Kaizen Business Support
 """
 
 import streamlit as st
-import pandas as pd
 import io
 import traceback
 from datetime import datetime
@@ -69,13 +68,19 @@ def process_excel_file(uploaded_file):
         st.success(f"✅ Fichier **{uploaded_file.name}** prêt pour l'analyse")
         
         # Afficher les informations du fichier
-        file_size = len(uploaded_file.getvalue())
+        file_buffer = uploaded_file.getbuffer()
+        file_size = file_buffer.nbytes
         st.info(f"📁 Taille: {file_size:,} octets")
         
         # Prévisualisation du fichier
         try:
-            # Lire le fichier Excel
-            df = pd.read_excel(uploaded_file, sheet_name=None)  # Lire toutes les feuilles
+            from modules.core.analyzer import TEMPLATE_READ_ROWS
+            from modules.core.preview import read_preview
+            
+            # Lire uniquement les premières lignes de chaque feuille ; les lignes
+            # utiles à l'analyse sont décodées dans la même passe et réutilisées
+            df = read_preview(file_buffer, max_rows=10, file_name=uploaded_file.name,
+                              prefetch_rows=TEMPLATE_READ_ROWS)
             
             st.subheader("📋 Aperçu du fichier")
             
@@ -86,12 +91,12 @@ def process_excel_file(uploaded_file):
                 # Afficher chaque feuille
                 for sheet_name, sheet_df in df.items():
                     with st.expander(f"Feuille: {sheet_name}"):
-                        st.dataframe(sheet_df.head(10), use_container_width=True)
+                        st.dataframe(sheet_df, use_container_width=True)
             else:
                 # Une seule feuille
                 sheet_name = list(df.keys())[0]
                 sheet_df = df[sheet_name]
-                st.dataframe(sheet_df.head(10), use_container_width=True)
+                st.dataframe(sheet_df, use_container_width=True)
                 
         except Exception as e:
             st.warning(f"⚠️ Impossible de prévisualiser le fichier: {e}")
@@ -142,6 +147,12 @@ def process_excel_file(uploaded_file):
         st.error(f"❌ Erreur traitement fichier: {e}")
         st.code(traceback.format_exc())
 
+def compute_ratios_and_scores(analyzer, data, secteur):
+    """Calcule les ratios et scores (résultat mis en cache par fichier et secteur)"""
+    ratios = analyzer.calculate_ratios(data)
+    scores = analyzer.calculate_score(ratios, secteur)
+    return {'ratios': ratios, 'scores': scores}
+
 def launch_financial_analysis(uploaded_file, secteur):
     """Lance l'analyse financière"""
     
@@ -152,26 +163,47 @@ def launch_financial_analysis(uploaded_file, secteur):
             try:
                 from modules.core.analyzer import FinancialAnalyzer
                 
+                from modules.core.analysis_cache import get_analysis_cache
+                from modules.core.preflight import preflight_workbook
+                from modules.core.statement import FinancialStatement, RatioRecord
+                
                 # Créer l'analyseur
                 analyzer = FinancialAnalyzer()
                 
-                # Créer un fichier temporaire pour l'analyse
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    temp_file_path = tmp_file.name
+                # Un fichier déjà analysé (même contenu) est servi depuis le cache
+                cache = get_analysis_cache()
+                file_buffer = uploaded_file.getbuffer()
+                file_hash = cache.hash_bytes(file_buffer)
                 
-                # Lancer l'analyse
-                analysis_result = analyzer.analyze_excel_file(temp_file_path, secteur)
+                # Contrôle préalable : motif précis sans décoder les feuilles
+                preflight = preflight_workbook(file_buffer, file_name=uploaded_file.name)
+                data = None
+                if preflight.ok:
+                    # Analyse directe du buffer en mémoire (pas de fichier temporaire)
+                    data = cache.get_or_compute_data(
+                        file_hash, lambda: analyzer.load_excel_template(file_buffer)
+                    )
                 
-                # Nettoyer le fichier temporaire
-                os.unlink(temp_file_path)
+                if not preflight.ok:
+                    analysis_result = {'success': False, 'error': preflight.reason}
+                elif data is None:
+                    analysis_result = {'success': False, 'error': 'Erreur lors du chargement du fichier Excel'}
+                else:
+                    analysis = cache.get_or_compute_analysis(
+                        file_hash, secteur, lambda: compute_ratios_and_scores(analyzer, data, secteur)
+                    )
+                    analysis_result = {
+                        'success': True,
+                        'data': data,
+                        'ratios': analysis['ratios'],
+                        'scores': analysis['scores']
+                    }
                 
                 if analysis_result.get('success', False):
                     # Stocker les résultats dans le format attendu par SessionManager
                     analysis_results = {
-                        'data': analysis_result['data'],
-                        'ratios': analysis_result['ratios'],
+                        'data': FinancialStatement.from_mapping(analysis_result['data']),
+                        'ratios': RatioRecord.from_mapping(analysis_result['ratios']),
                         'scores': analysis_result['scores'],
                         'metadata': {
                             'source': 'Excel Import',
@@ -340,11 +372,11 @@ def process_manual_input(data: dict, secteur: str):
             try:
                 # Import sécurisé des modules
                 from modules.core.analyzer import FinancialAnalyzer
-                from modules.core.ratios import RatiosCalculator
+                from modules.core.ratios import MODE_COMPLET, compute_ratios
+                from modules.core.statement import FinancialStatement, RatioRecord
                 
-                # Calculer les ratios
-                ratios_calc = RatiosCalculator()
-                ratios = ratios_calc.calculate_all_ratios(data)
+                # Calculer les ratios (moteur partagé, mode complet)
+                ratios = compute_ratios(data, MODE_COMPLET)
                 
                 # Calculer les scores
                 analyzer = FinancialAnalyzer()
@@ -352,8 +384,8 @@ def process_manual_input(data: dict, secteur: str):
                 
                 # Stocker les résultats dans le format attendu par SessionManager
                 analysis_results = {
-                    'data': data,
-                    'ratios': ratios,
+                    'data': FinancialStatement.from_mapping(data),
+                    'ratios': RatioRecord.from_mapping(ratios),
                     'scores': scores,
                     'metadata': {
                         'source': 'Saisie Manuelle',